@@ -1,10 +1,63 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.routers import movieRoute, reviewRoute, userRoute, replyRoute, adminRoute, favoritesRoute, authRoute, likeReviewRoute
+from app.routers import (
+    movieRoute,
+    reviewRoute,
+    userRoute,
+    replyRoute,
+    adminRoute,
+    favoritesRoute,
+    authRoute,
+    likeReviewRoute,
+    metricsRoute,
+    healthRoute,
+)
 from app.externalAPI import tmdbRouter
+from app.repos.repo import startWriteBehind, stopWriteBehind
+from app.utilities.responseCache import ResponseCacheMiddleware
+from app.utilities.compression import CompressionMiddleware
+from app.utilities.warmup import CACHE_WARMER
+from app.utilities.metrics import (
+    MetricsMiddleware,
+    TimedJSONResponse,
+    REGISTRY,
+)
+from app.services.storageStatsService import storageMetricLines
+from app.services.recommendationService import (
+    FACTOR_TRAINING_AT_STARTUP,
+    startFactorTraining,
+)
+from app.utilities.profiler import ProfileMiddleware
+from app.routers.authRoute import requireAdminHeader
 from fastapi.middleware.cors import CORSMiddleware
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # fill the repo caches on worker threads, in the background unless
+    # WARMUP_MODE says otherwise
+    await CACHE_WARMER.start()
+    await startWriteBehind()
+    # recommendations serve popular movies until the factors are ready
+    if FACTOR_TRAINING_AT_STARTUP:
+        startFactorTraining()
+    yield
+    await CACHE_WARMER.stop()
+    # write out anything still waiting in the write-behind queue before exit
+    await stopWriteBehind()
+
+
 # Create FastAPI instance w the name of our project
-app = FastAPI(title = "SpoilerAlert API")
+app = FastAPI(
+    title="SpoilerAlert API",
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse,
+)
+# innermost first: the cache serves its own compressed variants, compression
+# handles everything else, CORS headers wrap both, admins can profile any of it
+# with ?profile=1, and metrics time it all
+app.add_middleware(ResponseCacheMiddleware)
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -17,6 +70,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ProfileMiddleware, authorize=requireAdminHeader)
+app.add_middleware(MetricsMiddleware)
+# repo cache sizes and file counters are always exported on /metrics
+REGISTRY.addCollector(storageMetricLines)
 
 # Include routers for different modules
 app.include_router(movieRoute.router)
@@ -28,8 +85,10 @@ app.include_router(authRoute.router)
 app.include_router(adminRoute.router)
 app.include_router(replyRoute.router)
 app.include_router(tmdbRouter.router)
+app.include_router(metricsRoute.router)
+app.include_router(healthRoute.router)
 
 # Basic root endpoint to verify API is running
 @app.get("/")
-def root():
+async def root():
     return {"message": "Hello from SpoilerAlert!"}
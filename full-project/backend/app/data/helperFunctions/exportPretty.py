@@ -0,0 +1,19 @@
+import sys
+
+from app.repos.repo import _baseLoadAll, _baseSaveAll
+
+# Rewrite data files indented for reading or diffing; the app itself saves
+# them compact. Run from full-project/backend:
+#   python -m app.data.helperFunctions.exportPretty movies.json replies.json
+fileNames = sys.argv[1:]
+if not fileNames:
+    print(
+        "Usage: python -m app.data.helperFunctions.exportPretty"
+        " <file.json> ..."
+    )
+    sys.exit(1)
+
+for fileName in fileNames:
+    items = _baseLoadAll(fileName)
+    _baseSaveAll(fileName, items, pretty=True)
+    print(f"{fileName}: exported {len(items)} items")
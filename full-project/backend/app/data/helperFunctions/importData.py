@@ -63,7 +63,9 @@ for folder in os.listdir(DATA_DIR):
                 "review_title": row.get("Review Title"),
                 "review_text": row.get("Review"),
                 "rating": row.get("User's Rating out of 10"),
-                "date_posted": row.get("Date of Review")
+                "date_posted": row.get("Date of Review"),
+                "usefulness_vote": int(row.get("Usefulness Vote") or 0),
+                "total_votes": int(row.get("Total Votes") or 0)
             })
             reviewId += 1
 
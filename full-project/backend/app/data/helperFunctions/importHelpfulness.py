@@ -0,0 +1,43 @@
+import csv
+from pathlib import Path
+
+from app.repos.repo import _baseLoadAll, _baseSaveAll
+from app.repos.reviewRepo import REVIEW_DATA_PATH
+
+# Copy the IMDb "Usefulness Vote" / "Total Votes" columns onto an
+# existing reviews.json that was imported before the vote counts were
+# kept. Reviews are matched to their CSV row by title and text, since
+# ids were assigned on import. The file is written back the way the app
+# saves it (compact, JSON_CODEC). Run from full-project/backend:
+#   python -m app.data.helperFunctions.importHelpfulness
+DATA_DIR = Path(__file__).resolve().parent.parent
+
+
+def _key(title, body):
+    return ((title or "").strip(), (body or "").strip())
+
+
+votes = {}
+for csvPath in sorted(DATA_DIR.glob("*/movieReviews.csv")):
+    with csvPath.open(newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            votes[_key(row.get("Review Title"), row.get("Review"))] = (
+                int(row.get("Usefulness Vote") or 0),
+                int(row.get("Total Votes") or 0),
+            )
+
+reviews = _baseLoadAll(REVIEW_DATA_PATH)
+
+matched = 0
+for review in reviews:
+    found = votes.get(
+        _key(review.get("reviewTitle"), review.get("reviewBody"))
+    )
+    if found is None:
+        continue
+    review["usefulVotes"], review["totalVotes"] = found
+    matched += 1
+
+_baseSaveAll(REVIEW_DATA_PATH, reviews)
+
+print(f"Added vote counts to {matched} of {len(reviews)} reviews.")
@@ -0,0 +1,19 @@
+from app.repos.repo import _baseLoadAll
+from app.repos.reviewRepo import REVIEW_DATA_PATH, getReviewSnapshotPath
+from app.repos.reviewSnapshot import writeReviewSnapshot
+from app.schemas.review import Review
+
+# Convert reviews.json into the columnar reviews.bin snapshot that reviewRepo
+# reads on startup while it is newer than reviews.json. Rows are validated
+# here once so the app can trust the snapshot. Run from full-project/backend:
+#   python -m app.data.helperFunctions.reviewsToSnapshot
+snapshotPath = getReviewSnapshotPath()
+print(f"Reading: {REVIEW_DATA_PATH}")
+
+reviews = (Review(**review) for review in _baseLoadAll(REVIEW_DATA_PATH))
+count = writeReviewSnapshot(snapshotPath, reviews)
+
+print(
+    f"Wrote {count} reviews to {snapshotPath} "
+    f"({snapshotPath.stat().st_size} bytes)"
+)
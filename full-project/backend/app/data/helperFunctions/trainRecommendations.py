@@ -0,0 +1,19 @@
+import time
+
+from app.services.recommendationService import (
+    FACTOR_MODEL_PATH,
+    trainRecommendations,
+)
+
+# Rebuild the collaborative-filtering factors behind /users/me/recommendations
+# from the current reviews, likes, favorites and watchlists. Run from
+# full-project/backend whenever enough new activity has built up:
+#   python -m app.data.helperFunctions.trainRecommendations
+start = time.perf_counter()
+model = trainRecommendations()
+
+print(
+    f"Trained rank {model.rank} factors for {len(model.userIds)} users and "
+    f"{len(model.movieIds)} movies in "
+    f"{time.perf_counter() - start:.1f}s -> {FACTOR_MODEL_PATH}"
+)
@@ -5,6 +5,7 @@ from fastapi import FastAPI
 
 from ..tmdbRouter import router
 from ..tmdbSchema import TMDbMovie, TMDbRecommendation
+from app.schemas.movie import Movie
 
 
 @pytest.fixture
@@ -19,7 +20,6 @@ def client(app):
     return TestClient(app)
 
 
-
 @patch("app.externalAPI.tmdbRouter.getMovieDetailsByName")
 def test_tmdbDetailsByNameSuccess(mockGetDetails, client):
     fakeMovie = TMDbMovie(
@@ -53,8 +53,6 @@ def test_tmdbDetailsByNameNotFound(mockGetDetails, client):
     assert response.json()["detail"] == "Movie not found"
 
 
-
-
 @patch("app.externalAPI.tmdbRouter.getMovieDetailsById")
 @patch("app.externalAPI.tmdbRouter.getMovieById")
 def test_tmdbDetailsByIdSuccess(mockGetMovieById, mockGetDetailsById, client):
@@ -93,8 +91,6 @@ def test_tmdbDetailsByIdMovieNotFound(mockGetMovieById, client):
     assert response.json()["detail"] == "Movie not found"
 
 
-
-
 @patch("app.externalAPI.tmdbRouter.getRecommendationsByName")
 def test_tmdbRecommendationsByNameSuccess(mockGetRecs, client):
     fakeRecs = [
@@ -127,11 +123,12 @@ def test_tmdbRecommendationsByNameEmpty(mockGetRecs, client):
     mockGetRecs.assert_called_once_with("TestMovie")
 
 
-
-
+@patch("app.externalAPI.tmdbRouter.similarMovies", return_value=[])
 @patch("app.externalAPI.tmdbRouter.getRecommendationsById")
 @patch("app.externalAPI.tmdbRouter.getMovieById")
-def test_tmdbRecommendationsByIdSuccess(mockGetMovieById, mockGetRecsById, client):
+def test_tmdbRecommendationsByIdSuccess(
+    mockGetMovieById, mockGetRecsById, mockSimilar, client
+):
     mockGetMovieById.return_value = type("FakeMovie", (), {"tmdbId": 333})
 
     fakeRecs = [
@@ -151,6 +148,41 @@ def test_tmdbRecommendationsByIdSuccess(mockGetMovieById, mockGetRecsById, clien
     mockGetRecsById.assert_called_once_with(333)
 
 
+@patch("app.externalAPI.tmdbRouter.getEnrichmentDetails")
+@patch("app.externalAPI.tmdbRouter.getRecommendationsById")
+@patch("app.externalAPI.tmdbRouter.similarMovies")
+@patch("app.externalAPI.tmdbRouter.getMovieById")
+def test_tmdbRecommendationsByIdPrefersLocalMatches(
+    mockGetMovieById, mockSimilar, mockGetRecsById, mockDetails, client
+):
+    mockGetMovieById.return_value = type("FakeMovie", (), {"tmdbId": 333})
+    mockSimilar.return_value = [
+        Movie(
+            id=7,
+            tmdbId=70,
+            title="Local A",
+            movieGenres=["Drama"],
+            duration=100,
+            movieIMDbRating=7.5,
+        ),
+        Movie(id=8, title="Local B", movieGenres=["Drama"], duration=100),
+    ]
+    mockDetails.return_value = TMDbMovie(
+        id=70, title="Local A", poster="pA", overview=None, rating=None
+    )
+
+    response = client.get("/tmdb/recommendations/1")
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 7, "title": "Local A", "poster": "pA", "rating": 7.5},
+        {"id": 8, "title": "Local B", "poster": None, "rating": None},
+    ]
+    mockSimilar.assert_called_once_with(1, 5)
+    mockDetails.assert_called_once_with(70)
+    mockGetRecsById.assert_not_called()
+
+
 @patch("app.externalAPI.tmdbRouter.getMovieById")
 def test_tmdbRecommendationsByIdMovieNotFound(mockGetMovieById, client):
     mockGetMovieById.return_value = None
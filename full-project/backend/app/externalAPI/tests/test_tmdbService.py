@@ -1,11 +1,14 @@
 import pytest
+import requests
 from unittest.mock import patch, MagicMock
 
+from .. import tmdbService
 from ..tmdbService import (
     getMovieDetailsByName,
     getMovieDetailsById,
     getRecommendationsById,
-    getRecommendationsByName
+    getRecommendationsByName,
+    getEnrichmentDetails,
 )
 from ..tmdbSchema import TMDbMovie, TMDbRecommendation
 
@@ -130,3 +133,46 @@ def test_getRecommendationsByName_success(mockGet):
     assert recs[0].title == "Interstellar"
     assert recs[0].poster.endswith("/interstellar.jpg")
     assert recs[0].rating == 8.6
+
+
+@pytest.fixture
+def freshEnrichment(monkeypatch):
+    monkeypatch.setattr(tmdbService, "TMDB_API_KEY", "key")
+    monkeypatch.setattr(tmdbService, "_ENRICHMENT_CACHE", {})
+    monkeypatch.setattr(tmdbService, "_ENRICHMENT_RETRY_AT", 0.0)
+
+
+@patch("app.externalAPI.tmdbService.requests.get")
+def test_tmdbCallsUseATimeout(mockGet):
+    mockGet.return_value.json.return_value = {"results": []}
+
+    getMovieDetailsByName("Inception")
+
+    assert (
+        mockGet.call_args.kwargs["timeout"] == tmdbService.TMDB_TIMEOUT_SECONDS
+    )
+
+
+@patch("app.externalAPI.tmdbService.requests.get")
+def test_enrichmentSkipsTmdbForAWhileAfterAFailure(mockGet, freshEnrichment):
+    mockGet.side_effect = requests.Timeout("TMDb did not answer")
+
+    assert [getEnrichmentDetails(tmdbId) for tmdbId in (1, 2, 3)] == [None] * 3
+    # only the first movie waited for TMDb
+    assert mockGet.call_count == 1
+
+    tmdbService._ENRICHMENT_RETRY_AT = 0.0
+    mockGet.side_effect = None
+    mockGet.return_value.json.return_value = {
+        "id": 2, "title": "Avatar", "poster_path": None, "vote_average": 7.8
+    }
+    assert getEnrichmentDetails(2).title == "Avatar"
+
+
+@patch("app.externalAPI.tmdbService.requests.get")
+def test_enrichmentCachesMoviesTmdbDoesNotKnow(mockGet, freshEnrichment):
+    mockGet.return_value.json.return_value = {"status_code": 34}
+
+    assert getEnrichmentDetails(5) is None
+    assert getEnrichmentDetails(5) is None
+    assert mockGet.call_count == 1
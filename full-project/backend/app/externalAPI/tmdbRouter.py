@@ -4,13 +4,17 @@ from app.externalAPI.tmdbService import (
     getMovieDetailsById,
     getRecommendationsByName,
     getRecommendationsById,
+    getEnrichmentDetails,
 )
 from app.schemas.movie import Movie
 from app.services.movieService import getMovieById
+from app.services.recommendationService import similarMovies
 from .tmdbSchema import TMDbMovie, TMDbRecommendation
 
 router = APIRouter(prefix="/tmdb", tags=["tmdb"])
 
+RECOMMENDATION_LIMIT = 5
+
 
 @router.get("/details/name/{movieName}", response_model=TMDbMovie)
 def movieDetailsByName(movieName: str):
@@ -37,16 +41,51 @@ def recommendationsByName(movieName: str):
     return getRecommendationsByName(movieName)
 
 
-
 @router.get("/recommendations/{movieId}", response_model=list[TMDbRecommendation])
-def recommendationsById(movieId: int):
-    
+def recommendationsById(movieId: int, enrich: bool = True):
+    """
+    Recommends movies from our own catalog that are most similar in genres,
+    directors, stars and description.
+
+    With enrich, posters and ratings are filled in from TMDb when it answers.
+    TMDb's own recommendations are only used when nothing in the catalog is
+    similar.
+    """
     movie = getMovieById(movieId)  
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found")
 
-    #Extract tmdbId from our DB entry
+    similar = similarMovies(movieId, RECOMMENDATION_LIMIT)
+    if similar:
+        return [
+            localRecommendation(similarMovie, enrich)
+            for similarMovie in similar
+        ]
+
+    # Extract tmdbId from our DB entry
     tmdbId = movie.tmdbId
+    if not enrich or tmdbId is None:
+        return []
 
-    #Fetch recommendations by TMDb ID
+    # Fetch recommendations by TMDb ID
     return getRecommendationsById(tmdbId)
+
+
+def localRecommendation(movie: Movie, enrich: bool) -> TMDbRecommendation:
+    """
+    Shape a catalog movie like a TMDb recommendation, using our ids.
+    """
+    rating = (
+        float(movie.movieIMDbRating)
+        if movie.movieIMDbRating is not None
+        else None
+    )
+    poster = None
+    if enrich and movie.tmdbId is not None:
+        details = getEnrichmentDetails(movie.tmdbId)
+        if details is not None:
+            poster = details.poster
+            rating = details.rating if details.rating is not None else rating
+    return TMDbRecommendation(
+        id=movie.id, title=movie.title, poster=poster, rating=rating
+    )
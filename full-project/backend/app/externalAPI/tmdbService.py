@@ -1,20 +1,46 @@
-import requests
 import os
+import threading
+import time
 from dotenv import load_dotenv
 from .tmdbSchema import TMDbMovie, TMDbRecommendation
+from ..utilities.metrics import span, SPAN_TMDB
+from ..utilities.lazyImport import lazyImport
+
+requests = lazyImport("requests")
 
 load_dotenv()
 
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
-BASE_URL = "https://api.themoviedb.org/3"
-
+# TMDB_BASE_URL points the service at a
+# stand-in server, e.g. benchmarks/fakeTmdb.py
+BASE_URL = os.getenv("TMDB_BASE_URL", "https://api.themoviedb.org/3")
+
+# seconds to wait for TMDb to connect or answer before giving up
+TMDB_TIMEOUT_SECONDS = float(os.getenv("TMDB_TIMEOUT_SECONDS", "3"))
+# after a failed enrichment lookup, skip TMDb for this many seconds
+TMDB_RETRY_AFTER_SECONDS = float(os.getenv("TMDB_RETRY_AFTER_SECONDS", "60"))
+
+# tmdbId -> details fetched to decorate local results, None when TMDb has
+# no such movie; kept for the life of the process
+_ENRICHMENT_CACHE: dict[int, TMDbMovie | None] = {}
+# time.monotonic() before which enrichment does not call TMDb
+_ENRICHMENT_RETRY_AT = 0.0
+_ENRICHMENT_LOCK = threading.Lock()
+
+
+def _tmdbGet(path: str, params: dict) -> "requests.Response":
+    """GET a TMDb path, timed as the request's TMDb span."""
+    with span(SPAN_TMDB):
+        return requests.get(
+            f"{BASE_URL}{path}", params=params, timeout=TMDB_TIMEOUT_SECONDS
+        )
 
 
 def getMovieDetailsByName(movieName: str) -> TMDbMovie | None:
     """Retrieve main movie details from TMDb by searching name."""
     
-    response = requests.get(
-        f"{BASE_URL}/search/movie",
+    response = _tmdbGet(
+        "/search/movie",
         params={"api_key": TMDB_API_KEY, "query": movieName}
     )
     data = response.json()
@@ -34,10 +60,9 @@ def getMovieDetailsByName(movieName: str) -> TMDbMovie | None:
     )
 
 
-
 def getMovieDetailsById(tmdbId: int) -> TMDbMovie | None:
-    response = requests.get(
-        f"{BASE_URL}/movie/{tmdbId}",
+    response = _tmdbGet(
+        f"/movie/{tmdbId}",
         params={"api_key": TMDB_API_KEY}
     )
     data = response.json()
@@ -56,11 +81,37 @@ def getMovieDetailsById(tmdbId: int) -> TMDbMovie | None:
     )
 
 
+def getEnrichmentDetails(tmdbId: int) -> TMDbMovie | None:
+    """
+    Poster and rating for a local movie, or None when TMDb is not
+    configured or unreachable.
+
+    Used to decorate results we compute ourselves, so a TMDb failure never
+    fails the request. Answers are cached, movies TMDb does not know
+    included. A failed call (timeout, connection or bad reply) stops
+    enrichment for TMDB_RETRY_AFTER_SECONDS, so the other movies of the
+    same response do not each wait for an unreachable TMDb.
+    """
+    global _ENRICHMENT_RETRY_AT
+    if tmdbId in _ENRICHMENT_CACHE:
+        return _ENRICHMENT_CACHE[tmdbId]
+    if not TMDB_API_KEY or time.monotonic() < _ENRICHMENT_RETRY_AT:
+        return None
+    try:
+        details = getMovieDetailsById(tmdbId)
+    except (requests.RequestException, ValueError, KeyError):
+        with _ENRICHMENT_LOCK:
+            _ENRICHMENT_RETRY_AT = time.monotonic() + TMDB_RETRY_AFTER_SECONDS
+        return None
+    _ENRICHMENT_CACHE[tmdbId] = details
+    return details
+
+
 def getRecommendationsByName(movieName: str) -> list[TMDbRecommendation]:
     """Search movie by name first, then fetch recommendations using its TMDb ID."""
     
-    search = requests.get(
-        f"{BASE_URL}/search/movie",
+    search = _tmdbGet(
+        "/search/movie",
         params={"api_key": TMDB_API_KEY, "query": movieName}
     )
     searchData = search.json()
@@ -70,8 +121,8 @@ def getRecommendationsByName(movieName: str) -> list[TMDbRecommendation]:
 
     tmdbId = searchData["results"][0]["id"]
 
-    receivedResponse = requests.get(
-        f"{BASE_URL}/movie/{tmdbId}/recommendations",
+    receivedResponse = _tmdbGet(
+        f"/movie/{tmdbId}/recommendations",
         params={"api_key": TMDB_API_KEY}
     )
     receivedData = receivedResponse.json()
@@ -90,8 +141,8 @@ def getRecommendationsByName(movieName: str) -> list[TMDbRecommendation]:
     ]
 
 def getRecommendationsById(tmdbId: int) -> list[TMDbRecommendation]:
-    receivedResponse = requests.get(
-        f"{BASE_URL}/movie/{tmdbId}/recommendations",
+    receivedResponse = _tmdbGet(
+        f"/movie/{tmdbId}/recommendations",
         params={"api_key": TMDB_API_KEY}
     )
     receivedData = receivedResponse.json()
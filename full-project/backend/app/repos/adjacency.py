@@ -0,0 +1,258 @@
+"""
+Compressed adjacency indexes for the many-to-many link files.
+
+likeReviews.json and favorites.json are flat lists of (userId, otherId)
+pairs. Adjacency packs one direction of such a list in CSR form: a row
+pointer array indexed directly by the (dense, non-negative) key id and one
+array of neighbour ids sorted within each key. Listing a key's neighbours is
+a slice, its degree is a subtraction and membership is a binary search over
+that key's neighbours only.
+
+Edits go to a small per-key overlay of sorted arrays and are folded back
+into the packed arrays once the overlay grows past COMPACT_THRESHOLD keys.
+EdgeIndex keeps both directions (e.g. user -> reviews and review -> users)
+in step.
+"""
+
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from heapq import merge
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+COMPACT_THRESHOLD = 1024
+
+# pairs are packed as key << _SHIFT | neighbour while sorting
+_SHIFT = 32
+_MAX_ID = (1 << _SHIFT) - 1
+
+
+class Adjacency:
+    """
+    One direction of a link list: key id -> sorted neighbour ids.
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[int, int]] = ()):
+        self._overrides: Dict[int, array] = {}
+        self._pack(list(pairs))
+
+    def _pack(self, pairs: List[Tuple[int, int]]) -> None:
+        """
+        Rebuild the CSR arrays from (key, neighbour) pairs.
+        """
+        # sort and dedupe on one int per pair (key
+        # in the high bits) instead of tuples
+        codes = sorted(
+            {(key << _SHIFT) | neighbour for key, neighbour in pairs}
+        )
+        if codes and (
+            codes[0] < 0 or any(neighbour >> _SHIFT for _, neighbour in pairs)
+        ):
+            raise ValueError(f"Adjacency ids must be between 0 and {_MAX_ID}")
+        keyCount = (codes[-1] >> _SHIFT) + 1 if codes else 0
+
+        degrees = Counter(code >> _SHIFT for code in codes)
+        offsets = array("Q", [0])
+        offsets.extend(
+            accumulate(degrees.get(key, 0) for key in range(keyCount))
+        )
+
+        self._offsets = offsets
+        self._neighbours = array("q", [code & _MAX_ID for code in codes])
+        self._overrides = {}
+        self._edgeCount = len(codes)
+
+    def _span(self, key: int) -> Tuple[int, int]:
+        if 0 <= key < len(self._offsets) - 1:
+            return self._offsets[key], self._offsets[key + 1]
+        return 0, 0
+
+    def neighbours(self, key: int) -> array:
+        """
+        Return the sorted neighbour ids of key (a copy).
+        """
+        override = self._overrides.get(key)
+        if override is not None:
+            return array("q", override)
+        start, end = self._span(key)
+        return self._neighbours[start:end]
+
+    def degree(self, key: int) -> int:
+        """
+        Return how many neighbours key has.
+        """
+        override = self._overrides.get(key)
+        if override is not None:
+            return len(override)
+        start, end = self._span(key)
+        return end - start
+
+    def contains(self, key: int, neighbour: int) -> bool:
+        """
+        Return True if the (key, neighbour) link exists.
+        """
+        override = self._overrides.get(key)
+        if override is not None:
+            position = bisect_left(override, neighbour)
+            return position < len(override) and override[position] == neighbour
+        start, end = self._span(key)
+        position = bisect_left(self._neighbours, neighbour, start, end)
+        return position < end and self._neighbours[position] == neighbour
+
+    def _detach(self, key: int) -> array:
+        """
+        Move key's neighbours into the editable overlay.
+        """
+        override = self._overrides.get(key)
+        if override is None:
+            start, end = self._span(key)
+            override = self._overrides[key] = self._neighbours[start:end]
+        return override
+
+    def add(self, key: int, neighbour: int) -> bool:
+        """
+        Add a link. Returns False if it already existed.
+        """
+        if not (0 <= key <= _MAX_ID and 0 <= neighbour <= _MAX_ID):
+            raise ValueError(f"Adjacency ids must be between 0 and {_MAX_ID}")
+        if self.contains(key, neighbour):
+            return False
+        insort(self._detach(key), neighbour)
+        self._edgeCount += 1
+        self._maybeCompact()
+        return True
+
+    def remove(self, key: int, neighbour: int) -> bool:
+        """
+        Remove a link. Returns False if it did not exist.
+        """
+        if not self.contains(key, neighbour):
+            return False
+        override = self._detach(key)
+        del override[bisect_left(override, neighbour)]
+        self._edgeCount -= 1
+        self._maybeCompact()
+        return True
+
+    def _maybeCompact(self) -> None:
+        if len(self._overrides) > COMPACT_THRESHOLD:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Fold the overlay back into the packed arrays.
+        """
+        self._pack(list(self.pairs()))
+
+    def keys(self) -> Iterator[int]:
+        """
+        Yield every key with at least one neighbour, in ascending order.
+        """
+        packedKeys = (
+            key
+            for key in range(len(self._offsets) - 1)
+            if key not in self._overrides
+            and self._offsets[key + 1] > self._offsets[key]
+        )
+        overrideKeys = (
+            key for key in sorted(self._overrides) if self._overrides[key]
+        )
+        yield from merge(packedKeys, overrideKeys)
+
+    def pairs(self) -> Iterator[Tuple[int, int]]:
+        """
+        Yield every (key, neighbour) link, ordered by key then neighbour.
+        """
+        for key in self.keys():
+            for neighbour in self.neighbours(key):
+                yield key, neighbour
+
+    def pairsFrom(self, start: int) -> Iterator[Tuple[int, int]]:
+        """
+        Yield the (key, neighbour) links with key >= start, ordered like
+        pairs().
+
+        Keys are looked up one at a time instead of walking the packed arrays,
+        so the index may be edited (and compacted) between steps; keys added
+        past the largest key at the start are not visited.
+        """
+        end = max(
+            len(self._offsets) - 1, max(list(self._overrides), default=-1) + 1
+        )
+        for key in range(max(start, 0), end):
+            for neighbour in self.neighbours(key):
+                yield key, neighbour
+
+    def __len__(self) -> int:
+        return self._edgeCount
+
+    def nbytes(self) -> int:
+        """
+        Estimate the memory held by the packed arrays and overlay, in bytes.
+        """
+        overlayBytes = sum(
+            len(override) * override.itemsize
+            for override in self._overrides.values()
+        )
+        return (
+            len(self._offsets) * self._offsets.itemsize
+            + len(self._neighbours) * self._neighbours.itemsize
+            + overlayBytes
+        )
+
+
+class EdgeIndex:
+    """
+    Both directions of a link list, kept in step.
+
+    `forward` maps the first field (e.g. userId) to the second (e.g. reviewId);
+    `backward` maps the second field back to the first.
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[int, int]] = ()):
+        pairs = list(pairs)
+        self.forward = Adjacency(pairs)
+        self.backward = Adjacency((right, left) for left, right in pairs)
+
+    def add(self, left: int, right: int) -> bool:
+        """
+        Add a link in both directions. Returns False if it already existed.
+        """
+        if not self.forward.add(left, right):
+            return False
+        self.backward.add(right, left)
+        return True
+
+    def remove(self, left: int, right: int) -> bool:
+        """
+        Remove a link in both directions. Returns False if it did not exist.
+        """
+        if not self.forward.remove(left, right):
+            return False
+        self.backward.remove(right, left)
+        return True
+
+    def contains(self, left: int, right: int) -> bool:
+        return self.forward.contains(left, right)
+
+    def __len__(self) -> int:
+        return len(self.forward)
+
+    def dumpRows(self, leftName: str, rightName: str) -> List[Dict[str, int]]:
+        """
+        Return every link as a dict ready to be written out.
+        """
+        return [
+            {leftName: left, rightName: right}
+            for left, right in self.forward.pairs()
+        ]
+
+    def nbytes(self) -> int:
+        """
+        Estimate the memory held by both directions, in bytes.
+        """
+        return self.forward.nbytes() + self.backward.nbytes()
+
+
+__all__ = ["Adjacency", "EdgeIndex", "COMPACT_THRESHOLD"]
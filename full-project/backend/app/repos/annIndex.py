@@ -0,0 +1,301 @@
+"""
+Approximate nearest-neighbour search over sparse vectors (HNSW).
+
+HnswIndex is a hierarchical navigable small-world graph (Malkov & Yashunin):
+every node sits on layer 0 and, with exponentially falling probability, on
+the layers above it. A query greedily descends from the sparse top layer to
+layer 0 and then runs a best-first search that keeps `ef` candidates, so it
+compares the query against a few hundred vectors instead of the whole
+collection.
+
+Vectors are sparse dicts (term -> weight) that are already L2-normalized, so
+similarity is their dot product. Nodes are inserted one at a time; removing
+or replacing a key leaves a tombstone node that still routes searches but is
+never returned, and the graph is rebuilt once tombstones reach
+REBUILD_TOMBSTONE_SHARE of the nodes.
+"""
+
+import math
+import random
+from heapq import heappop, heappush, nlargest
+from typing import Any, Dict, Iterable, List, Tuple
+
+REBUILD_TOMBSTONE_SHARE = 0.2
+
+Vector = Dict[str, float]
+
+
+def sparseDot(left: Vector, right: Vector) -> float:
+    """
+    Dot product of two sparse vectors.
+    """
+    if len(left) > len(right):
+        left, right = right, left
+    get = right.get
+    return sum(weight * get(term, 0.0) for term, weight in left.items())
+
+
+class HnswIndex:
+    """
+    Incrementally built HNSW graph keyed by integer ids.
+    """
+
+    def __init__(
+        self,
+        links: int = 8,
+        efConstruction: int = 48,
+        efSearch: int = 64,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            links (int): Neighbours kept per node on upper layers (twice as
+                many on layer 0).
+            efConstruction (int): Candidates kept while linking a new node.
+            efSearch (int): Minimum candidates kept while answering a query.
+            seed (int): Seed for the layer assignment.
+        """
+        self.links = links
+        self.efConstruction = efConstruction
+        self.efSearch = efSearch
+        self._levelScale = 1 / math.log(max(links, 2))
+        self._random = random.Random(seed)
+        # parallel per-node lists; a node is a position in them
+        self._keys: List[int] = []
+        self._vectors: List[Vector] = []
+        self._neighbours: List[List[List[int]]] = []
+        self._live: List[bool] = []
+        self._nodeOf: Dict[int, int] = {}
+        self._entry = -1
+
+    def _similarity(self, query: Vector, node: int) -> float:
+        return sparseDot(query, self._vectors[node])
+
+    def _searchLayer(
+        self, query: Vector, entries: List[int], ef: int, layer: int
+    ) -> List[Tuple[float, int]]:
+        """
+        Best-first search of one layer; returns up to ef (similarity, node)
+        pairs.
+        """
+        visited = set(entries)
+        # max-heap on similarity
+        candidates: List[Tuple[float, int]] = []
+        # min-heap on similarity
+        found: List[Tuple[float, int]] = []
+        for node in entries:
+            similarity = self._similarity(query, node)
+            heappush(candidates, (-similarity, node))
+            heappush(found, (similarity, node))
+        while len(found) > ef:
+            heappop(found)
+
+        while candidates:
+            negSimilarity, node = heappop(candidates)
+            if -negSimilarity < found[0][0] and len(found) >= ef:
+                break
+            for neighbour in self._neighbours[node][layer]:
+                if neighbour in visited:
+                    continue
+                visited.add(neighbour)
+                similarity = self._similarity(query, neighbour)
+                if len(found) < ef or similarity > found[0][0]:
+                    heappush(candidates, (-similarity, neighbour))
+                    heappush(found, (similarity, neighbour))
+                    if len(found) > ef:
+                        heappop(found)
+        return found
+
+    def _selectNeighbours(
+        self, found: List[Tuple[float, int]], limit: int
+    ) -> List[int]:
+        """
+        Pick up to limit neighbours from (similarity, node) candidates.
+
+        A candidate is skipped when it is closer to an already picked
+        neighbour than to the base node, so links spread out in different
+        directions instead of all pointing into one tight cluster; skipped
+        candidates fill any places left over.
+        """
+        chosen: List[int] = []
+        skipped: List[int] = []
+        for similarity, candidate in sorted(found, reverse=True):
+            if len(chosen) >= limit:
+                break
+            vector = self._vectors[candidate]
+            if all(
+                self._similarity(vector, other) < similarity
+                for other in chosen
+            ):
+                chosen.append(candidate)
+            else:
+                skipped.append(candidate)
+        return chosen + skipped[: limit - len(chosen)]
+
+    def _shrink(self, node: int, layer: int, limit: int) -> None:
+        """
+        Cut a node's neighbours on a layer back to `limit`.
+        """
+        neighbours = self._neighbours[node][layer]
+        if len(neighbours) > limit:
+            vector = self._vectors[node]
+            found = [
+                (self._similarity(vector, other), other)
+                for other in neighbours
+            ]
+            self._neighbours[node][layer] = self._selectNeighbours(
+                found, limit
+            )
+
+    def _layerLimit(self, layer: int) -> int:
+        return self.links * 2 if layer == 0 else self.links
+
+    def add(self, key: int, vector: Vector) -> None:
+        """
+        Insert a key, replacing its previous vector if it was already indexed.
+        """
+        self.remove(key)
+        node = len(self._keys)
+        level = int(-math.log(1.0 - self._random.random()) * self._levelScale)
+        self._keys.append(key)
+        self._vectors.append(vector)
+        self._neighbours.append([[] for _ in range(level + 1)])
+        self._live.append(True)
+        self._nodeOf[key] = node
+
+        if self._entry == -1:
+            self._entry = node
+            return
+
+        entry = self._entry
+        topLevel = len(self._neighbours[entry]) - 1
+        entries = [entry]
+        for layer in range(topLevel, level, -1):
+            entries = [max(self._searchLayer(vector, entries, 1, layer))[1]]
+        for layer in range(min(level, topLevel), -1, -1):
+            found = self._searchLayer(
+                vector, entries, self.efConstruction, layer
+            )
+            chosen = self._selectNeighbours(found, self.links)
+            self._neighbours[node][layer] = chosen
+            for other in chosen:
+                self._neighbours[other][layer].append(node)
+                self._shrink(other, layer, self._layerLimit(layer))
+            entries = [other for _, other in found]
+        if level > topLevel:
+            self._entry = node
+
+    def remove(self, key: int) -> bool:
+        """
+        Stop returning a key. Returns False if it was not indexed.
+        """
+        node = self._nodeOf.pop(key, None)
+        if node is None:
+            return False
+        self._live[node] = False
+        if len(self._keys) - len(self._nodeOf) > REBUILD_TOMBSTONE_SHARE * len(
+            self._keys
+        ):
+            self.rebuild()
+        return True
+
+    def rebuild(self) -> None:
+        """
+        Re-insert the live keys into a fresh graph, dropping tombstones.
+        """
+        liveItems = [
+            (self._keys[node], self._vectors[node])
+            for node in self._nodeOf.values()
+        ]
+        self._keys, self._vectors, self._neighbours, self._live = (
+            [],
+            [],
+            [],
+            [],
+        )
+        self._nodeOf, self._entry = {}, -1
+        for key, vector in sorted(liveItems):
+            self.add(key, vector)
+
+    def search(
+        self, vector: Vector, limit: int, exclude: Iterable[int] = ()
+    ) -> List[Tuple[int, float]]:
+        """
+        Return up to limit (key, similarity) pairs approximately closest to
+        vector.
+        """
+        if self._entry == -1 or not vector:
+            return []
+        skipped = set(exclude)
+        entries = [self._entry]
+        for layer in range(len(self._neighbours[self._entry]) - 1, 0, -1):
+            entries = [max(self._searchLayer(vector, entries, 1, layer))[1]]
+        ef = max(self.efSearch, limit + len(skipped))
+        found = self._searchLayer(vector, entries, ef, 0)
+        results = [
+            (self._keys[node], similarity)
+            for similarity, node in found
+            if self._live[node] and self._keys[node] not in skipped
+        ]
+        return nlargest(limit, results, key=lambda item: (item[1], -item[0]))
+
+    def vector(self, key: int) -> Vector:
+        node = self._nodeOf.get(key)
+        return {} if node is None else self._vectors[node]
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._nodeOf
+
+    def __len__(self) -> int:
+        return len(self._nodeOf)
+
+    def dumpRows(self) -> List[Dict[str, Any]]:
+        """
+        Return the graph as one dict per node, ready to be written out.
+
+        Vectors are not included; they are supplied again on load.
+        """
+        return [
+            {
+                "key": key,
+                "live": live,
+                "neighbours": [list(layer) for layer in neighbours],
+            }
+            for key, live, neighbours in zip(
+                self._keys, self._live, self._neighbours
+            )
+        ]
+
+    @classmethod
+    def fromRows(
+        cls, rows: List[Dict[str, Any]], vectors: Dict[int, Vector], **options
+    ) -> "HnswIndex":
+        """
+        Restore a graph written by dumpRows.
+
+        Tombstoned nodes whose key has no vector any more keep an empty vector.
+
+        Raises:
+            KeyError: If a live node's key has no vector.
+        """
+        index = cls(**options)
+        for node, row in enumerate(rows):
+            key, live = row["key"], row["live"]
+            index._keys.append(key)
+            index._vectors.append(
+                vectors[key] if live else vectors.get(key, {})
+            )
+            index._neighbours.append(
+                [list(layer) for layer in row["neighbours"]]
+            )
+            index._live.append(live)
+            if live:
+                index._nodeOf[key] = node
+            if index._entry == -1 or len(row["neighbours"]) > len(
+                index._neighbours[index._entry]
+            ):
+                index._entry = node
+        return index
+
+
+__all__ = ["HnswIndex", "sparseDot", "REBUILD_TOMBSTONE_SHARE"]
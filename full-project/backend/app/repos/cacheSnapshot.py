@@ -0,0 +1,231 @@
+"""
+Pickled snapshots of the validated repo caches, for fast worker starts.
+
+Filling a cache from JSON means parsing the file and validating every row
+through Pydantic, which takes seconds on large datasets. With
+CACHE_SNAPSHOTS=1, a repo that had to do that work pickles the finished
+cache (rows, compact stores or link indexes) next to the data file, in
+.snapshots/<file>.pickle. The next worker to start unpickles it instead.
+
+A snapshot is only used while it still matches:
+
+- the BLAKE2b hash of the data file it was built from,
+- the repo's schema fingerprint (the model's fields, so a changed model
+  invalidates it), and
+- SNAPSHOT_FORMAT_VERSION.
+
+When any of them differ, the repo falls back to JSON and writes a fresh
+snapshot. Hashing a large file costs more than unpickling its cache, so the
+snapshot also records the file's size and modification time: while both are
+unchanged the recorded hash is trusted and the file is not read at all.
+
+Snapshots are pickles and are trusted like the data files themselves, so
+keep DATA_DIR writable only by the app.
+"""
+
+import gc
+import hashlib
+import logging
+import os
+import pickle
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Tuple, Type
+
+from pydantic import BaseModel
+
+from app.utilities.metrics import span, SPAN_REPO_LOAD
+from . import repo
+
+CACHE_SNAPSHOTS = os.getenv("CACHE_SNAPSHOTS", "0") == "1"
+
+# bump when the layout of a pickled cache
+# changes in a way the fingerprints do not see
+SNAPSHOT_FORMAT_VERSION = 2
+SNAPSHOT_DIR_NAME = ".snapshots"
+
+logger = logging.getLogger(__name__)
+
+
+def snapshotPath(source: Path) -> Path:
+    """
+    Return where the snapshot of a data file is kept.
+    """
+    return source.parent / SNAPSHOT_DIR_NAME / f"{source.name}.pickle"
+
+
+def schemaFingerprint(kind: str, model: Type[BaseModel]) -> str:
+    """
+    Describe what a cache holds, so a snapshot of another shape is not used.
+
+    Args:
+        kind (str): The cache layout, e.g. "rows" or "edgeIndex".
+        model (Type[BaseModel]): The model the rows were validated against.
+
+    Returns:
+        str: kind, model name and a hash of the model's field definitions.
+    """
+    fields = repr(
+        [(name, repr(info)) for name, info in model.model_fields.items()]
+    )
+    digest = hashlib.blake2b(fields.encode("utf-8"), digest_size=8).hexdigest()
+    return f"{kind}:{model.__name__}:{digest}"
+
+
+def fileDigest(path: Path) -> str:
+    """
+    Return the BLAKE2b hash of a file's contents.
+    """
+    digest = hashlib.blake2b()
+    with path.open("rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _sourceKey(source: Path, stat=None) -> Dict[str, Any]:
+    """
+    Identify the current contents of a data file: its hash, size and
+    modification time.
+    """
+    # stat before hashing, so a write racing the hash makes the key stale
+    # rather than wrong
+    stat = stat or source.stat()
+    return {
+        "digest": fileDigest(source),
+        "size": stat.st_size,
+        "mtimeNs": stat.st_mtime_ns,
+    }
+
+
+def _matches(header: Any, schema: str, source: Path) -> bool:
+    """
+    Return True if a snapshot header fits this schema and the data file as it
+    is now.
+    """
+    if (
+        not isinstance(header, dict)
+        or header.get("format") != SNAPSHOT_FORMAT_VERSION
+    ):
+        return False
+    if header.get("schema") != schema:
+        return False
+    recorded = header.get("source") or {}
+    stat = source.stat()
+    if (recorded.get("size"), recorded.get("mtimeNs")) == (
+        stat.st_size,
+        stat.st_mtime_ns,
+    ):
+        return True
+    # touched or copied: only the contents decide
+    return recorded.get("digest") == fileDigest(source)
+
+
+@contextmanager
+def _gcPaused():
+    # unpickling allocates millions of containers; pausing the cyclic GC saves
+    # its repeated passes
+    wasEnabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if wasEnabled:
+            gc.enable()
+
+
+def loadSnapshot(
+    source: Path, schema: str
+) -> Tuple[Any | None, Dict[str, Any] | None]:
+    """
+    Load the snapshot of a data file if it still matches the file.
+
+    Args:
+        source (Path): The data file.
+        schema (str): The repo's schemaFingerprint.
+
+    Returns:
+        Tuple: (cache, None) on a hit. On a miss, (None, sourceKey), where
+        sourceKey identifies the data file's contents and is passed to
+        saveSnapshot once the cache is rebuilt. It is None when no snapshot
+        may be written, e.g. while snapshots are disabled or a deferred save
+        makes the file stale.
+    """
+    if (
+        not CACHE_SNAPSHOTS
+        or not source.exists()
+        or repo._hasPendingSave(source)
+    ):
+        return None, None
+
+    with span(SPAN_REPO_LOAD):
+        path = snapshotPath(source)
+        stat = source.stat()
+        try:
+            with path.open("rb") as file:
+                # the header is a pickle of its own, so
+                # a stale snapshot is rejected unread
+                if _matches(pickle.load(file), schema, source):
+                    with _gcPaused():
+                        return pickle.load(file), None
+        except FileNotFoundError:
+            pass
+        except Exception:
+            logger.warning(
+                "Ignoring unreadable cache snapshot %s", path, exc_info=True
+            )
+        return None, _sourceKey(source, stat)
+
+
+def saveSnapshot(
+    source: Path, schema: str, sourceKey: Dict[str, Any] | None, cache: Any
+) -> bool:
+    """
+    Pickle a freshly built cache as the snapshot of its data file.
+
+    Atomically writes to a temporary file first, so a worker starting
+    meanwhile never reads half a snapshot. Failures are logged, not raised:
+    the cache is already built and the next start simply reads JSON again.
+    Args:
+        source (Path): The data file the cache was built from.
+        schema (str): The repo's schemaFingerprint.
+        sourceKey (Dict | None): The key returned by loadSnapshot; nothing is
+            written when None.
+        cache: The cache, before any request could change it.
+
+    Returns:
+        bool: True if the snapshot was written.
+    """
+    if sourceKey is None:
+        return False
+    path = snapshotPath(source)
+    temp = path.with_suffix(path.suffix + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with temp.open("wb") as file:
+            header = {
+                "format": SNAPSHOT_FORMAT_VERSION,
+                "schema": schema,
+                "source": sourceKey,
+            }
+            pickle.dump(header, file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(cache, file, protocol=pickle.HIGHEST_PROTOCOL)
+        temp.replace(path)
+    except Exception:
+        logger.warning(
+            "Could not write cache snapshot %s", path, exc_info=True
+        )
+        temp.unlink(missing_ok=True)
+        return False
+    return True
+
+
+__all__ = [
+    "CACHE_SNAPSHOTS",
+    "SNAPSHOT_FORMAT_VERSION",
+    "snapshotPath",
+    "schemaFingerprint",
+    "fileDigest",
+    "loadSnapshot",
+    "saveSnapshot",
+]
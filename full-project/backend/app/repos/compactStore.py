@@ -0,0 +1,602 @@
+"""
+Column-oriented in-memory stores for the largest cached collections.
+
+A Pydantic model per review costs roughly a kilobyte once its __dict__, field
+strings and validator state are counted. ReviewStore keeps reviews as typed
+arrays instead: numeric fields in `array` columns, review text as UTF-8 spans
+in one buffer per field and posting dates interned in a small string pool. A
+Review model is only built when a row is read.
+
+EdgeStore does the same for the two-integer link records (LikedReview,
+Favorite), which are stored as a pair of int64 columns.
+
+Review ids are normally appended in ascending order, so ReviewStore.indexOf
+finds a review by id with a binary search and only falls back to a linear
+scan once the id column has been written out of order.
+
+Both stores behave like a list of models: rows can be read, replaced,
+inserted and deleted by position. Reading returns a fresh model, so changes
+to a returned model must be written back with `store[index] = model`.
+
+ReviewStore also keeps the JSON encoding of recently served reviews, keyed
+by review id and bounded by ENCODED_CACHE_ROWS, and drops a review's
+encoding whenever its row is written or deleted.
+
+Replacing or deleting a review leaves its old text in the buffer. The store
+counts those dead bytes and rewrites a text buffer with only the live spans
+once DEAD_TEXT_RATIO of it is dead.
+
+A store built with ReviewStore.fromSnapshot reads its columns and text
+straight from the snapshot's memory mapping, decoding text only when a row
+is read. The first write copies the columns into arrays, after which the
+store no longer uses the mapping.
+"""
+
+import operator
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from bisect import bisect_left
+from itertools import accumulate, islice
+from collections.abc import MutableSequence
+from typing import Any, Dict, Iterable, Iterator, List, Type
+
+from pydantic import BaseModel
+
+from ..schemas.review import Review
+from .lazyRecords import encodeRecord
+
+# most review encodings ReviewStore keeps,
+# least recently served are dropped first
+ENCODED_CACHE_ROWS = 100_000
+
+# share of a text buffer that may be dead (replaced
+# or deleted text) before it is compacted
+DEAD_TEXT_RATIO = 0.5
+
+# 1 = True, 0 = False, -1 = None
+_FLAG_CODES = {True: 1, False: 0, None: -1}
+_FLAG_VALUES = {1: True, 0: False, -1: None}
+
+_NUMERIC_FIELDS = (
+    "id",
+    "movieId",
+    "userId",
+    "rating",
+    "usefulVotes",
+    "totalVotes",
+)
+_NUMERIC_TYPECODES = {
+    "id": "q",
+    "movieId": "q",
+    "userId": "q",
+    "rating": "b",
+    "usefulVotes": "i",
+    "totalVotes": "i",
+}
+# vote counts may be missing from rows written before they were imported
+_COUNT_FIELDS = frozenset({"usefulVotes", "totalVotes"})
+_TEXT_FIELDS = ("reviewTitle", "reviewBody")
+
+
+def _field(record: Any, name: str) -> Any:
+    """
+    Read a field from a record dict or model.
+    """
+    if isinstance(record, dict):
+        return record.get(name)
+    return getattr(record, name)
+
+
+def _copyColumn(typecode: str, column: Any) -> array:
+    """
+    Copy a typed column, array or memoryview, into a new array.
+    """
+    copy = array(typecode)
+    copy.frombytes(memoryview(column).cast("B"))
+    return copy
+
+
+class ReviewStore(MutableSequence):
+    """
+    Reviews held as typed columns, materialized into Review models on read.
+    """
+
+    # findIndex looks these up through indexOf
+    indexedFields = ("id",)
+
+    def __init__(self, reviews: Iterable[Any] = ()):
+        self._numeric: Dict[str, array] = {
+            name: array(typecode)
+            for name, typecode in _NUMERIC_TYPECODES.items()
+        }
+        self._flagged = array("b")
+        # index into _datePool, -1 when datePosted is None
+        self._dateRefs = array("i")
+        self._datePool: List[str] = []
+        self._dateLookup: Dict[str, int] = {}
+        # UTF-8 buffer plus (start, end) byte offsets for each text field
+        self._text: Dict[str, bytearray] = {
+            field: bytearray() for field in _TEXT_FIELDS
+        }
+        self._spans: Dict[str, tuple[array, array]] = {
+            field: (array("Q"), array("Q")) for field in _TEXT_FIELDS
+        }
+        # bytes of each text buffer no span points at any more
+        self._deadBytes: Dict[str, int] = {field: 0 for field in _TEXT_FIELDS}
+        # True while the id column is ascending,
+        # None when it must be re-checked
+        self._idsSorted: bool | None = True
+        # review id -> JSON bytes of the review
+        self._encoded: "OrderedDict[int, bytes]" = OrderedDict()
+        # the open ReviewSnapshot the columns are views of, None once copied
+        self._snapshot = None
+        self._lock = threading.RLock()
+        for review in reviews:
+            self.append(review)
+
+    @classmethod
+    def fromRows(cls, rows: Iterable[Dict[str, Any]]) -> "ReviewStore":
+        """
+        Build a store from validated review dicts, one column at a time.
+
+        Much faster than appending row by row for large collections.
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        store = cls()
+        for name, typecode in _NUMERIC_TYPECODES.items():
+            store._numeric[name] = array(typecode, [row[name] for row in rows])
+        store._idsSorted = None
+        store._flagged = array(
+            "b", [_FLAG_CODES[row["flagged"]] for row in rows]
+        )
+        store._dateRefs = array(
+            "i", [store._dateRef(row["datePosted"]) for row in rows]
+        )
+
+        for field in _TEXT_FIELDS:
+            encoded = [(row[field] or "").encode("utf-8") for row in rows]
+            ends = array("Q", accumulate(map(len, encoded)))
+            starts = array("Q", [0]) + ends[:-1]
+            store._text[field] = bytearray(b"".join(encoded))
+            store._spans[field] = (starts, ends)
+        return store
+
+    @classmethod
+    def fromSnapshot(cls, snapshot) -> "ReviewStore":
+        """
+        Build a store that reads an open ReviewSnapshot in place.
+
+        The columns are the snapshot's own memoryviews, so nothing is
+        copied and only the date pool is decoded. The snapshot must stay
+        open while the store uses it.
+
+        Raises:
+            SnapshotFormatError: If the date pool is damaged.
+        """
+        store = cls()
+        store._datePool = list(snapshot.dates())
+        store._dateLookup = {
+            date: ref for ref, date in enumerate(store._datePool)
+        }
+        columns = snapshot.columns
+        for name in _NUMERIC_FIELDS:
+            store._numeric[name] = columns[name]
+        store._idsSorted = None
+        store._flagged = columns["flagged"]
+        store._dateRefs = columns["dateRefs"]
+        for field in _TEXT_FIELDS:
+            offsets = columns[f"{field}Offsets"]
+            store._text[field] = columns[field]
+            store._spans[field] = (offsets[:-1], offsets[1:])
+        store._snapshot = snapshot
+        return store
+
+    def _ensureWritable(self) -> None:
+        """
+        Copy columns still backed by a snapshot mapping into arrays.
+
+        Called with the lock held before any write.
+        """
+        if self._snapshot is None:
+            return
+        for name, typecode in _NUMERIC_TYPECODES.items():
+            self._numeric[name] = _copyColumn(typecode, self._numeric[name])
+        self._flagged = _copyColumn("b", self._flagged)
+        self._dateRefs = _copyColumn("i", self._dateRefs)
+        for field in _TEXT_FIELDS:
+            starts, ends = self._spans[field]
+            self._spans[field] = (
+                _copyColumn("Q", starts), _copyColumn("Q", ends)
+            )
+            self._text[field] = bytearray(self._text[field])
+        self._snapshot = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # pickled for the cache snapshots: columns only, without the lock,
+        # the encodings or the snapshot mapping
+        with self._lock:
+            self._ensureWritable()
+            state = dict(self.__dict__)
+        del state["_lock"]
+        state["_encoded"] = OrderedDict()
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._snapshot = None
+        self._lock = threading.RLock()
+
+    def _dateRef(self, value: str | None) -> int:
+        if value is None:
+            return -1
+        ref = self._dateLookup.get(value)
+        if ref is None:
+            ref = len(self._datePool)
+            self._datePool.append(value)
+            self._dateLookup[value] = ref
+        return ref
+
+    def _textAt(self, field: str, index: int) -> str:
+        starts, ends = self._spans[field]
+        span = self._text[field][starts[index] : ends[index]]
+        return str(span, "utf-8")
+
+    def _put(self, index: int | None, review: Any) -> None:
+        """
+        Write one review's values at index, or append when index is None.
+        """
+        self._ensureWritable()
+        values = [_field(review, name) for name in _NUMERIC_FIELDS]
+        values = [
+            0 if value is None and name in _COUNT_FIELDS else value
+            for name, value in zip(_NUMERIC_FIELDS, values)
+        ]
+        flagCode = _FLAG_CODES[_field(review, "flagged")]
+        dateRef = self._dateRef(_field(review, "datePosted"))
+        spans = []
+        # replaced text is left in the buffer
+        # and counted as dead, see _maybeCompact
+        for field in _TEXT_FIELDS:
+            buffer = self._text[field]
+            start = len(buffer)
+            buffer += (_field(review, field) or "").encode("utf-8")
+            spans.append((start, len(buffer)))
+
+        if index is None:
+            ids = self._numeric["id"]
+            if self._idsSorted and ids and values[0] < ids[-1]:
+                self._idsSorted = False
+            for name, value in zip(_NUMERIC_FIELDS, values):
+                self._numeric[name].append(value)
+            self._flagged.append(flagCode)
+            self._dateRefs.append(dateRef)
+            for field, (start, end) in zip(_TEXT_FIELDS, spans):
+                starts, ends = self._spans[field]
+                starts.append(start)
+                ends.append(end)
+        else:
+            self._idsSorted = None
+            self._encoded.pop(self._numeric["id"][index], None)
+            self._encoded.pop(values[0], None)
+            for name, value in zip(_NUMERIC_FIELDS, values):
+                self._numeric[name][index] = value
+            self._flagged[index] = flagCode
+            self._dateRefs[index] = dateRef
+            for field, (start, end) in zip(_TEXT_FIELDS, spans):
+                starts, ends = self._spans[field]
+                self._deadBytes[field] += ends[index] - starts[index]
+                starts[index] = start
+                ends[index] = end
+            self._maybeCompact()
+
+    def _maybeCompact(self) -> None:
+        for field in _TEXT_FIELDS:
+            dead = self._deadBytes[field]
+            if dead and dead >= len(self._text[field]) * DEAD_TEXT_RATIO:
+                self._compactText(field)
+
+    def _compactText(self, field: str) -> None:
+        """
+        Rewrite one text buffer with only the live spans, in row order.
+        """
+        starts, ends = self._spans[field]
+        buffer = self._text[field]
+        pieces = [buffer[start:end] for start, end in zip(starts, ends)]
+        newEnds = array("Q", accumulate(map(len, pieces)))
+        newStarts = array("Q", [0]) + newEnds[:-1] if pieces else array("Q")
+        self._text[field] = bytearray(b"".join(pieces))
+        self._spans[field] = (newStarts, newEnds)
+        self._deadBytes[field] = 0
+
+    def compact(self) -> None:
+        """
+        Drop the text of replaced and deleted reviews from the buffers now.
+        """
+        with self._lock:
+            self._ensureWritable()
+            for field in _TEXT_FIELDS:
+                if self._deadBytes[field]:
+                    self._compactText(field)
+
+    def _columns(self) -> List[array]:
+        columns = list(self._numeric.values()) + [
+            self._flagged,
+            self._dateRefs,
+        ]
+        for starts, ends in self._spans.values():
+            columns += [starts, ends]
+        return columns
+
+    def __len__(self) -> int:
+        return len(self._flagged)
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """
+        Return one review as a dict shaped like Review.model_dump().
+        """
+        with self._lock:
+            dateRef = self._dateRefs[index]
+            return {
+                "id": self._numeric["id"][index],
+                "movieId": self._numeric["movieId"][index],
+                "userId": self._numeric["userId"][index],
+                "reviewTitle": self._textAt("reviewTitle", index),
+                "reviewBody": self._textAt("reviewBody", index),
+                "rating": self._numeric["rating"][index],
+                "datePosted": (
+                    None if dateRef == -1 else self._datePool[dateRef]
+                ),
+                "flagged": _FLAG_VALUES[self._flagged[index]],
+                "usefulVotes": self._numeric["usefulVotes"][index],
+                "totalVotes": self._numeric["totalVotes"][index],
+            }
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(len(self))[index]]
+        return Review.model_construct(**self.row(index))
+
+    def __setitem__(self, index: int, review: Any) -> None:
+        if isinstance(index, slice):
+            raise TypeError("ReviewStore does not support slice assignment")
+        with self._lock:
+            self._put(range(len(self))[index], review)
+
+    def __delitem__(self, index) -> None:
+        with self._lock:
+            self._ensureWritable()
+            positions = (
+                range(len(self))[index]
+                if isinstance(index, slice)
+                else [index]
+            )
+            for position in positions:
+                self._encoded.pop(self._numeric["id"][position], None)
+                for field in _TEXT_FIELDS:
+                    starts, ends = self._spans[field]
+                    self._deadBytes[field] += ends[position] - starts[position]
+            for column in self._columns():
+                del column[index]
+            self._maybeCompact()
+
+    def insert(self, index: int, review: Any) -> None:
+        with self._lock:
+            if index >= len(self):
+                self._put(None, review)
+                return
+            if index < 0:
+                index = max(0, len(self) + index)
+            self._ensureWritable()
+            # open a slot in every column, then write the row into it
+            for column in self._columns():
+                column.insert(index, 0)
+            self._put(index, review)
+
+    def append(self, review: Any) -> None:
+        with self._lock:
+            self._put(None, review)
+
+    def __iter__(self) -> Iterator[Review]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ReviewStore, list)):
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other)
+            )
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ReviewStore({len(self)} reviews)"
+
+    def indexOf(self, reviewId: int, name: str = "id") -> int:
+        """
+        Return the position of the review with this id, or -1.
+
+        Binary search while the ids are ascending, a scan otherwise.
+        """
+        with self._lock:
+            ids = self._numeric["id"]
+            if self._idsSorted is None:
+                self._idsSorted = all(
+                    a <= b for a, b in zip(ids, islice(ids, 1, None))
+                )
+            if not self._idsSorted:
+                try:
+                    return operator.indexOf(ids, reviewId)
+                except ValueError:
+                    return -1
+            position = bisect_left(ids, reviewId)
+            return (
+                position
+                if position < len(ids) and ids[position] == reviewId
+                else -1
+            )
+
+    def encoded(self, index: int) -> bytes:
+        """
+        Return one review's JSON bytes, encoding it on first use.
+        """
+        with self._lock:
+            reviewId = self._numeric["id"][index]
+            data = self._encoded.get(reviewId)
+            if data is not None:
+                self._encoded.move_to_end(reviewId)
+                return data
+            data = encodeRecord(Review, self.row(index))
+            self._encoded[reviewId] = data
+            if len(self._encoded) > ENCODED_CACHE_ROWS:
+                self._encoded.popitem(last=False)
+            return data
+
+    def value(self, index: int, name: str) -> Any:
+        """
+        Read one field of one review without building a model.
+        """
+        if name in self._numeric:
+            return self._numeric[name][index]
+        if name == "flagged":
+            return _FLAG_VALUES[self._flagged[index]]
+        if name in self._spans:
+            return self._textAt(name, index)
+        return self.row(index)[name]
+
+    def column(self, name: str) -> Iterable[Any]:
+        """
+        Return every value of one field in row order.
+
+        Numeric fields come back as the backing array itself, which must be
+        treated as read-only.
+        """
+        if name in self._numeric:
+            return self._numeric[name]
+        if name == "flagged":
+            return [_FLAG_VALUES[code] for code in self._flagged]
+        if name == "datePosted":
+            return [
+                None if ref == -1 else self._datePool[ref]
+                for ref in self._dateRefs
+            ]
+        return [self._textAt(name, index) for index in range(len(self))]
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every review as a dict without building models.
+        """
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def dumpRows(self) -> List[Dict[str, Any]]:
+        """
+        Return every review as a dict ready to be written out.
+        """
+        with self._lock:
+            return list(self.rows())
+
+    def nbytes(self) -> int:
+        """
+        Estimate the memory held by the store, in bytes.
+        """
+        columnBytes = sum(
+            len(column) * column.itemsize for column in self._columns()
+        )
+        poolBytes = sum(sys.getsizeof(date) for date in self._datePool)
+        textBytes = sum(len(buffer) for buffer in self._text.values())
+        return columnBytes + textBytes + poolBytes
+
+
+class EdgeStore(MutableSequence):
+    """
+    Two-integer link records (e.g. user -> review) held as int64 columns.
+
+    The model must have exactly two int fields; their order in the model
+    decides the column order.
+    """
+
+    def __init__(self, model: Type[BaseModel], records: Iterable[Any] = ()):
+        self.model = model
+        self.fields = tuple(model.model_fields)
+        if len(self.fields) != 2:
+            raise ValueError(f"{model.__name__} is not a two-field link model")
+        self._left = array("q")
+        self._right = array("q")
+        for record in records:
+            self.append(record)
+
+    def __len__(self) -> int:
+        return len(self._left)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(len(self))[index]]
+        left, right = self.fields
+        return self.model.model_construct(
+            **{left: self._left[index], right: self._right[index]}
+        )
+
+    def __setitem__(self, index: int, record: Any) -> None:
+        if isinstance(index, slice):
+            raise TypeError("EdgeStore does not support slice assignment")
+        self._left[index] = _field(record, self.fields[0])
+        self._right[index] = _field(record, self.fields[1])
+
+    def __delitem__(self, index) -> None:
+        del self._left[index]
+        del self._right[index]
+
+    def insert(self, index: int, record: Any) -> None:
+        self._left.insert(index, _field(record, self.fields[0]))
+        self._right.insert(index, _field(record, self.fields[1]))
+
+    def append(self, record: Any) -> None:
+        self._left.append(_field(record, self.fields[0]))
+        self._right.append(_field(record, self.fields[1]))
+
+    def __iter__(self) -> Iterator[BaseModel]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (EdgeStore, list)):
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other)
+            )
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"EdgeStore({self.model.__name__}, {len(self)} links)"
+
+    def value(self, index: int, name: str) -> int:
+        """
+        Read one field of one link without building a model.
+        """
+        return self.column(name)[index]
+
+    def column(self, name: str) -> array:
+        """
+        Return the backing array for one field; treat it as read-only.
+        """
+        if name == self.fields[0]:
+            return self._left
+        if name == self.fields[1]:
+            return self._right
+        raise KeyError(name)
+
+    def dumpRows(self) -> List[Dict[str, int]]:
+        """
+        Return every link as a dict ready to be written out.
+        """
+        left, right = self.fields
+        return [{left: a, right: b} for a, b in zip(self._left, self._right)]
+
+    def nbytes(self) -> int:
+        """
+        Estimate the memory held by the store, in bytes.
+        """
+        return (len(self._left) + len(self._right)) * self._left.itemsize
+
+
+__all__ = ["ReviewStore", "EdgeStore"]
@@ -0,0 +1,419 @@
+"""
+Low-rank user and movie factors for collaborative-filtering recommendations.
+
+trainFactorModel factorizes a sparse user x movie interaction matrix A with
+PureSVD: subspace iteration finds the k strongest right singular vectors V
+of A, which become the movie factors, and a user's factors are their
+interaction row projected onto them, p_u = a_u V. The user's predicted
+affinity for every movie is p_u V^T. Since a user's factors are only that
+projection, users who were not in the training data are folded in the same
+way without retraining.
+
+The model is plain Python: factors are `array('d')` columns and the inner
+loops `map` over whole vectors. A model is saved as a small binary file of
+those arrays.
+"""
+
+import math
+import random
+import struct
+from array import array
+from heapq import nlargest
+from itertools import repeat
+from operator import add, mul
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+FACTOR_MAGIC = b"SARF"
+FACTOR_VERSION = 1
+_HEADER = struct.Struct("<4sHHQQ")
+
+# eigenvalues below this share of the largest are treated as zero
+_RANK_TOLERANCE = 1e-10
+
+
+class FactorFormatError(Exception):
+    """Raised when a file is not a readable factor model."""
+    pass
+
+
+def _dot(left: Sequence[float], right: Sequence[float]) -> float:
+    return sum(map(mul, left, right))
+
+
+def _axpy(
+    total: List[float], vector: Sequence[float], scale: float
+) -> List[float]:
+    """
+    Return total + scale * vector.
+    """
+    return list(map(add, total, map(mul, vector, repeat(scale))))
+
+
+def _orthonormalize(rows: List[List[float]], width: int) -> List[List[float]]:
+    """
+    Orthonormalize the columns of a row-major matrix (modified Gram-Schmidt).
+
+    Columns that are (numerically) dependent on earlier ones become zero.
+    """
+    columns = (
+        [list(column) for column in zip(*rows)]
+        if rows
+        else [[] for _ in range(width)]
+    )
+    for index, column in enumerate(columns):
+        for previous in columns[:index]:
+            column = _axpy(column, previous, -_dot(previous, column))
+        norm = math.sqrt(_dot(column, column))
+        columns[index] = (
+            [value / norm for value in column]
+            if norm > 1e-12
+            else [0.0] * len(column)
+        )
+    return [list(row) for row in zip(*columns)]
+
+
+def _symmetricEigen(
+    matrix: List[List[float]], sweeps: int = 50
+) -> Tuple[List[float], List[List[float]]]:
+    """
+    Eigen-decompose a small symmetric matrix with cyclic Jacobi rotations.
+
+    Returns:
+        (eigenvalues, eigenvectors) with eigenvectors[i][j] the i-th entry of
+        the j-th vector.
+    """
+    size = len(matrix)
+    a = [list(row) for row in matrix]
+    vectors = [
+        [1.0 if i == j else 0.0 for j in range(size)] for i in range(size)
+    ]
+    for _ in range(sweeps):
+        offDiagonal = sum(
+            a[i][j] ** 2 for i in range(size) for j in range(i + 1, size)
+        )
+        if offDiagonal < 1e-22:
+            break
+        for p in range(size):
+            for q in range(p + 1, size):
+                if abs(a[p][q]) < 1e-300:
+                    continue
+                theta = (a[q][q] - a[p][p]) / (2 * a[p][q])
+                t = math.copysign(1.0, theta) / (
+                    abs(theta) + math.sqrt(theta * theta + 1)
+                )
+                c = 1 / math.sqrt(t * t + 1)
+                s = t * c
+                for k in range(size):
+                    akp, akq = a[k][p], a[k][q]
+                    a[k][p], a[k][q] = c * akp - s * akq, s * akp + c * akq
+                for k in range(size):
+                    apk, aqk = a[p][k], a[q][k]
+                    a[p][k], a[q][k] = c * apk - s * aqk, s * apk + c * aqk
+                for k in range(size):
+                    vkp, vkq = vectors[k][p], vectors[k][q]
+                    vectors[k][p], vectors[k][q] = (
+                        c * vkp - s * vkq,
+                        s * vkp + c * vkq,
+                    )
+    return [a[i][i] for i in range(size)], vectors
+
+
+class FactorModel:
+    """
+    Movie factors (one column per latent dimension) plus trained user factors.
+    """
+
+    def __init__(
+        self,
+        movieIds: Iterable[int],
+        movieColumns: List[array],
+        popularity: Iterable[float],
+        userIds: Iterable[int] = (),
+        userFactors: Iterable[float] = (),
+    ):
+        self.movieIds = array("q", movieIds)
+        self.movieColumns = movieColumns
+        self.popularity = array("d", popularity)
+        self.userIds = array("q", userIds)
+        self.userFactors = array("d", userFactors)
+        self._moviePositions = {
+            movieId: position for position, movieId in enumerate(self.movieIds)
+        }
+        self._userPositions = {
+            userId: position for position, userId in enumerate(self.userIds)
+        }
+        self._movieRows: List[Tuple[float, ...]] | None = None
+
+    @property
+    def rank(self) -> int:
+        return len(self.movieColumns)
+
+    def _rows(self) -> List[Tuple[float, ...]]:
+        if self._movieRows is None:
+            self._movieRows = (
+                list(zip(*self.movieColumns))
+                if self.rank
+                else [() for _ in self.movieIds]
+            )
+        return self._movieRows
+
+    def factorsFor(self, userId: int) -> List[float] | None:
+        """
+        Return a trained user's factors, or None if they were not in the
+        training data.
+        """
+        position = self._userPositions.get(userId)
+        if position is None:
+            return None
+        start = position * self.rank
+        return self.userFactors[start : start + self.rank].tolist()
+
+    def foldIn(self, interactions: Iterable[Tuple[int, float]]) -> List[float]:
+        """
+        Project (movieId, weight) interactions onto the movie factors.
+
+        Movies the model has not seen are ignored.
+        """
+        rows = self._rows()
+        factors = [0.0] * self.rank
+        for movieId, weight in interactions:
+            position = self._moviePositions.get(movieId)
+            if position is not None:
+                factors = _axpy(factors, rows[position], weight)
+        return factors
+
+    def scores(self, factors: Sequence[float]) -> List[float]:
+        """
+        Return the predicted affinity of a user for every movie, in movieIds
+        order.
+        """
+        total = [0.0] * len(self.movieIds)
+        for weight, column in zip(factors, self.movieColumns):
+            if weight:
+                total = _axpy(total, column, weight)
+        return total
+
+    def _top(
+        self, scores: Sequence[float], limit: int, exclude: Iterable[int]
+    ) -> List[Tuple[int, float]]:
+        skipped = set(exclude)
+        ranked = (
+            (movieId, score)
+            for movieId, score in zip(self.movieIds, scores)
+            if movieId not in skipped
+        )
+        return nlargest(limit, ranked, key=lambda item: (item[1], -item[0]))
+
+    def recommend(
+        self, factors: Sequence[float], limit: int, exclude: Iterable[int] = ()
+    ) -> List[Tuple[int, float]]:
+        """
+        Return up to limit (movieId, score) pairs with the highest predicted
+        affinity.
+        """
+        return self._top(self.scores(factors), limit, exclude)
+
+    def popular(
+        self, limit: int, exclude: Iterable[int] = ()
+    ) -> List[Tuple[int, float]]:
+        """
+        Return the movies with the most positive interactions, for users with
+        no history.
+        """
+        return self._top(self.popularity, limit, exclude)
+
+    def save(self, path: str | Path) -> None:
+        """
+        Write the model atomically to a binary file.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_suffix(path.suffix + ".tmp")
+        with temp.open("wb") as file:
+            file.write(
+                _HEADER.pack(
+                    FACTOR_MAGIC,
+                    FACTOR_VERSION,
+                    self.rank,
+                    len(self.movieIds),
+                    len(self.userIds),
+                )
+            )
+            for values in [
+                self.movieIds,
+                self.popularity,
+                *self.movieColumns,
+                self.userIds,
+                self.userFactors,
+            ]:
+                values.tofile(file)
+        temp.replace(path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "FactorModel":
+        """
+        Read a model written by save.
+
+        Raises:
+            FactorFormatError: If the file is not a factor model of this
+                version.
+        """
+        path = Path(path)
+        with path.open("rb") as file:
+            header = file.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise FactorFormatError(f"Truncated factor model: {path}")
+            magic, version, rank, movieCount, userCount = _HEADER.unpack(
+                header
+            )
+            if magic != FACTOR_MAGIC or version != FACTOR_VERSION:
+                raise FactorFormatError(
+                    f"Not a version {FACTOR_VERSION} factor model: {path}"
+                )
+
+            def read(typecode: str, count: int) -> array:
+                values = array(typecode)
+                try:
+                    values.fromfile(file, count)
+                except EOFError:
+                    raise FactorFormatError(f"Truncated factor model: {path}")
+                return values
+
+            movieIds = read("q", movieCount)
+            popularity = read("d", movieCount)
+            movieColumns = [read("d", movieCount) for _ in range(rank)]
+            userIds = read("q", userCount)
+            userFactors = read("d", userCount * rank)
+        return cls(movieIds, movieColumns, popularity, userIds, userFactors)
+
+
+def trainFactorModel(
+    interactions: Iterable[Tuple[int, int, float]],
+    rank: int = 16,
+    iterations: int = 4,
+    oversample: int = 4,
+    seed: int = 0,
+) -> FactorModel:
+    """
+    Factorize (userId, movieId, weight) interactions into a FactorModel.
+
+    Repeated (user, movie) pairs are summed. Runs `iterations` passes of
+    subspace iteration with `rank + oversample` vectors, then keeps the
+    `rank` strongest directions.
+
+    Args:
+        interactions (Iterable): (userId, movieId, weight) triples.
+        rank (int): Number of latent dimensions to keep.
+        iterations (int): Subspace iteration passes; more gives more accurate
+            factors.
+        oversample (int): Extra vectors carried during iteration for faster
+            convergence.
+        seed (int): Seed for the random starting subspace.
+
+    Returns:
+        FactorModel: The trained model.
+    """
+    matrix: Dict[int, Dict[int, float]] = {}
+    for userId, movieId, weight in interactions:
+        userRow = matrix.setdefault(userId, {})
+        userRow[movieId] = userRow.get(movieId, 0.0) + weight
+
+    movieIds = sorted(
+        {movieId for userRow in matrix.values() for movieId in userRow}
+    )
+    positions = {
+        movieId: position for position, movieId in enumerate(movieIds)
+    }
+    userIds = sorted(matrix)
+    # CSR-style rows: (movie positions, weights) per user
+    rows = [
+        (
+            [positions[movieId] for movieId in matrix[userId]],
+            list(matrix[userId].values()),
+        )
+        for userId in userIds
+    ]
+    del matrix
+
+    movieCount = len(movieIds)
+    width = min(rank + oversample, movieCount)
+    popularity = [0.0] * movieCount
+    for moviePositions, weights in rows:
+        for position, weight in zip(moviePositions, weights):
+            if weight > 0:
+                popularity[position] += weight
+
+    def gram(basis: List[List[float]]) -> List[List[float]]:
+        """
+        Return A^T A basis, one pass over the interactions.
+        """
+        result = [[0.0] * width for _ in range(movieCount)]
+        for moviePositions, weights in rows:
+            projected = [0.0] * width
+            for position, weight in zip(moviePositions, weights):
+                projected = _axpy(projected, basis[position], weight)
+            for position, weight in zip(moviePositions, weights):
+                result[position] = _axpy(result[position], projected, weight)
+        return result
+
+    generator = random.Random(seed)
+    basis = _orthonormalize(
+        [
+            [generator.gauss(0.0, 1.0) for _ in range(width)]
+            for _ in range(movieCount)
+        ],
+        width,
+    )
+    for _ in range(iterations):
+        basis = _orthonormalize(gram(basis), width)
+
+    # Rayleigh-Ritz: rotate the subspace onto its singular directions
+    product = gram(basis)
+    basisColumns = list(zip(*basis)) if movieCount else []
+    productColumns = list(zip(*product)) if movieCount else []
+    projected = [
+        [_dot(left, right) for right in productColumns]
+        for left in basisColumns
+    ]
+    projected = [
+        [(projected[i][j] + projected[j][i]) / 2 for j in range(width)]
+        for i in range(width)
+    ]
+    eigenvalues, eigenvectors = _symmetricEigen(projected)
+    order = sorted(range(width), key=lambda index: -eigenvalues[index])
+    largest = eigenvalues[order[0]] if order else 0.0
+    kept = [
+        index
+        for index in order[:rank]
+        if eigenvalues[index] > largest * _RANK_TOLERANCE
+    ]
+
+    rotation = [
+        [eigenvectors[i][index] for index in kept] for i in range(width)
+    ]
+    rotationColumns = list(zip(*rotation)) if rotation else []
+    movieRows = [
+        [_dot(row, column) for column in rotationColumns] for row in basis
+    ]
+    movieColumns = (
+        [array("d", column) for column in zip(*movieRows)]
+        if kept and movieRows
+        else []
+    )
+
+    model = FactorModel(movieIds, movieColumns, popularity)
+    userFactors = array("d")
+    for userId, (moviePositions, weights) in zip(userIds, rows):
+        userFactors.extend(
+            model.foldIn(
+                (movieIds[position], weight)
+                for position, weight in zip(moviePositions, weights)
+            )
+        )
+    return FactorModel(
+        movieIds, movieColumns, popularity, userIds, userFactors
+    )
+
+
+__all__ = ["FactorModel", "FactorFormatError", "trainFactorModel"]
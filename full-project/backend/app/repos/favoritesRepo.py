@@ -1,13 +1,115 @@
-from typing import List
+import threading
+from typing import Any, Dict, List
 from ..schemas.favorites import Favorite
-from .repo import _baseLoadAll, _baseSaveAll, DATA_DIR
+from .repo import _baseLoadAll, _baseSaveAll, _baseDeferSave, DATA_DIR
+from .storageStats import describeCache, recordHit, timedLoad
+from .cacheSnapshot import loadSnapshot, saveSnapshot, schemaFingerprint
+from .compactStore import EdgeStore
+from .lazyRecords import validateRows, dumpRecords
+from .adjacency import EdgeIndex
 
 FILE = DATA_DIR / "favorites.json"
+# userId -> movieId links, with the reverse movieId -> userId direction
+_FAVORITE_INDEX: EdgeIndex | None = None
+_FAVORITE_LOCK = threading.RLock()
+_FAVORITE_SNAPSHOT_SCHEMA = schemaFingerprint("edgeIndex", Favorite)
 
 def loadFavorites() -> List[Favorite]:
     raw = _baseLoadAll(FILE)
-    return [Favorite(**fav) for fav in raw]
+    return EdgeStore(Favorite, validateRows(Favorite, raw))
+
+
+def loadFavoriteIndex() -> EdgeIndex:
+    """
+    Load the favorite links into a cached two-way adjacency index.
+
+    Returns:
+        EdgeIndex: forward maps userId -> favorite movieIds,
+            backward maps movieId -> userIds who favorited it.
+    """
+    global _FAVORITE_INDEX
+    if _FAVORITE_INDEX is None:
+        with _FAVORITE_LOCK:
+            # another thread, such as the warm-up,
+            # may have built it while we waited
+            if _FAVORITE_INDEX is None:
+                with timedLoad(FILE):
+                    index, sourceKey = loadSnapshot(
+                        FILE, _FAVORITE_SNAPSHOT_SCHEMA
+                    )
+                    if index is None:
+                        favs = loadFavorites()
+                        index = EdgeIndex(
+                            zip(favs.column("userId"), favs.column("movieId"))
+                        )
+                        saveSnapshot(
+                            FILE, _FAVORITE_SNAPSHOT_SCHEMA, sourceKey, index
+                        )
+                    _FAVORITE_INDEX = index
+                return _FAVORITE_INDEX
+    recordHit(FILE)
+    return _FAVORITE_INDEX
+
+
+def _dumpIndex(index: EdgeIndex) -> List[dict]:
+    # runs on the write-behind thread too, so
+    # take the lock before walking the index
+    with _FAVORITE_LOCK:
+        return index.dumpRows("userId", "movieId")
+
+
+def _saveFavoriteIndex(index: EdgeIndex) -> None:
+    """
+    Save the index; the caller holds _FAVORITE_LOCK.
+    """
+    if _baseDeferSave(FILE, lambda: _dumpIndex(index)):
+        return
+    _baseSaveAll(FILE, index.dumpRows("userId", "movieId"))
+
+
+def addFavoriteEdge(userId: int, movieId: int) -> bool:
+    """
+    Record a user's favorite movie and save.
+
+    Returns:
+        bool: False if the movie was already a favorite.
+    """
+    with _FAVORITE_LOCK:
+        index = loadFavoriteIndex()
+        if not index.add(userId, movieId):
+            return False
+        _saveFavoriteIndex(index)
+        return True
+
+
+def removeFavoriteEdge(userId: int, movieId: int) -> bool:
+    """
+    Remove a movie from a user's favorites and save.
+
+    Returns:
+        bool: False if the movie was not a favorite.
+    """
+    with _FAVORITE_LOCK:
+        index = loadFavoriteIndex()
+        if not index.remove(userId, movieId):
+            return False
+        _saveFavoriteIndex(index)
+        return True
+
 
 def saveFavorites(favs: List[Favorite]):
-    raw = [f.model_dump() for f in favs]
+    global _FAVORITE_INDEX
+    # the index is rebuilt from the saved list on next use
+    _FAVORITE_INDEX = None
+    if _baseDeferSave(FILE, lambda: dumpRecords(favs)):
+        return
+    raw = dumpRecords(favs)
     _baseSaveAll(FILE, raw)
+
+
+def getStorageStats() -> Dict[str, Any]:
+    """
+    Report the favorite index: link count, estimated memory, load and save
+    counters.
+    """
+    return describeCache(FILE, _FAVORITE_INDEX)
@@ -0,0 +1,434 @@
+"""
+Cached collections that keep validated rows and build models on demand.
+
+Building a Pydantic model for every row of a large data file is most of the
+cold-start cost of the repo caches, while most requests only ever return a
+handful of records. LazyRecords holds the rows as plain dicts (validated in
+bulk with a TypeAdapter, or trusted when they come from our own snapshots)
+and turns a row into its model the first time that row is read.
+
+The collections also keep each record's JSON encoding once it has been
+produced, so list endpoints can stitch cached bytes together instead of
+validating and serializing every model again (see encodedRecords). An
+encoding is dropped when its record is replaced, and built models (which
+can be edited in place) lose theirs when the collection is saved.
+
+LazyRecords also keeps a dict index for its key fields (the id, and e.g.
+the username for users), so findIndex on those fields is a lookup rather
+than a scan. The index follows appends, replacements, inserts and deletes;
+key fields must be changed by replacing the record, not edited in place.
+"""
+
+from array import array
+from collections.abc import MutableSequence
+from functools import lru_cache
+from typing import (
+    Any,
+    Annotated,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Set,
+    Type,
+)
+
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import NotRequired, TypedDict
+
+
+@lru_cache(maxsize=None)
+def _rowAdapter(model: Type[BaseModel]) -> TypeAdapter:
+    """
+    Build (once per model) an adapter that validates a list of rows for a
+    model.
+
+    The row type is a TypedDict carrying the model's field types, constraints,
+    aliases and defaults, so validation matches the model's field validation
+    but yields dicts instead of model instances. Model-level validators are
+    not part of the row type.
+    """
+    annotations = {}
+    for name, info in model.model_fields.items():
+        fieldType = Annotated[info.annotation, info]
+        annotations[name] = (
+            fieldType if info.is_required() else NotRequired[fieldType]
+        )
+    rowType = TypedDict(f"{model.__name__}Row", annotations)
+    return TypeAdapter(List[rowType])
+
+
+@lru_cache(maxsize=None)
+def _modelAdapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def encodeRecord(
+    model: Type[BaseModel], record: Any, exclude: Set[str] | None = None
+) -> bytes:
+    """
+    Encode one record as the JSON bytes FastAPI sends for it as a response
+    model.
+
+    Args:
+        model (Type[BaseModel]): The record's model.
+        record: A model instance or a validated row dict.
+        exclude (Set[str] | None): Field names to leave out.
+    """
+    if type(record) is dict:
+        record = model.model_construct(**record)
+    return _modelAdapter(model).dump_json(record, exclude=exclude)
+
+
+def validateRows(
+    model: Type[BaseModel], rows: Iterable[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Validate raw rows for a model in one pass.
+
+    Args:
+        model (Type[BaseModel]): The model the rows describe.
+        rows (Iterable[Dict]): Raw rows, e.g. straight from a JSON file.
+
+    Returns:
+        List[Dict]: Rows keyed by field name with defaults filled in.
+
+    Raises:
+        pydantic.ValidationError: If any row is invalid for the model.
+    """
+    rowList = rows if isinstance(rows, list) else list(rows)
+    return _rowAdapter(model).validate_python(rowList)
+
+
+class LazyRecords(MutableSequence):
+    """
+    A list of models stored as validated row dicts until they are read.
+
+    Reading an item builds its model and keeps it in place of the row, so
+    in-place edits to a returned model are seen by later reads and saves.
+    Rows must already be validated; they are not checked again.
+    """
+
+    def __init__(
+        self,
+        model: Type[BaseModel],
+        rows: Iterable[Dict[str, Any]] = (),
+        indexedFields: Iterable[str] = ("id",),
+    ):
+        """
+        Args:
+            model (Type[BaseModel]): The model rows are built into.
+            rows (Iterable[Dict]): Validated rows.
+            indexedFields (Iterable[str]): Key fields findIndex looks up
+                in a dict; their values are expected to be unique.
+        """
+        self.model = model
+        self._items: List[Any] = (
+            rows if isinstance(rows, list) else list(rows)
+        )
+        # JSON bytes per record, parallel to _items; None until first encoded
+        self._encoded: List[bytes | None] = [None] * len(self._items)
+        self.indexedFields = tuple(indexedFields)
+        # field -> value -> position of the first record holding it
+        self._indexes: Dict[str, Dict[Any, int]] = {
+            name: {} for name in self.indexedFields
+        }
+        self._reindexFrom(0)
+
+    def _reindexFrom(self, start: int) -> None:
+        """
+        Point the key indexes at every record from position start on.
+        """
+        for name, index in self._indexes.items():
+            for position in range(start, len(self._items)):
+                index.setdefault(self.value(position, name), position)
+
+    def _unindex(self, positions: Iterable[int]) -> None:
+        """
+        Drop the key index entries of the records at positions.
+        """
+        for position in positions:
+            for name, index in self._indexes.items():
+                value = self.value(position, name)
+                if index.get(value) == position:
+                    del index[value]
+
+    def _shiftedFrom(self, start: int) -> None:
+        """
+        Re-point the indexes after records from start on changed position.
+        """
+        for index in self._indexes.values():
+            for value in [
+                value for value, position in index.items()
+                if position >= start
+            ]:
+                del index[value]
+        self._reindexFrom(start)
+
+    def _build(self, index: int) -> BaseModel:
+        item = self._items[index]
+        if type(item) is dict:
+            item = self.model.model_construct(**item)
+            self._items[index] = item
+        return item
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [
+                self._build(position)
+                for position in range(len(self._items))[index]
+            ]
+        return self._build(index)
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            self._items[index] = value
+            self._encoded = [None] * len(self._items)
+            self._shiftedFrom(0)
+            return
+        position = range(len(self._items))[index]
+        self._unindex([position])
+        self._items[position] = value
+        self._encoded[position] = None
+        for name, fieldIndex in self._indexes.items():
+            fieldIndex.setdefault(self.value(position, name), position)
+
+    def __delitem__(self, index) -> None:
+        positions = range(len(self._items))
+        removed = (
+            positions[index]
+            if isinstance(index, slice)
+            else [positions[index]]
+        )
+        del self._items[index]
+        del self._encoded[index]
+        if removed:
+            self._shiftedFrom(min(removed))
+
+    def insert(self, index: int, value: BaseModel) -> None:
+        length = len(self._items)
+        # clamp the index the way list.insert does
+        position = min(max(index + length if index < 0 else index, 0), length)
+        self._items.insert(position, value)
+        self._encoded.insert(position, None)
+        self._shiftedFrom(position)
+
+    def append(self, value: BaseModel) -> None:
+        self._items.append(value)
+        self._encoded.append(None)
+        self._reindexFrom(len(self._items) - 1)
+
+    def indexOf(self, value: Any, name: str = "id") -> int:
+        """
+        Return the position of the record whose key field equals value, or -1.
+
+        Raises:
+            KeyError: If name is not one of indexedFields.
+        """
+        try:
+            return self._indexes[name].get(value, -1)
+        except TypeError:
+            # unhashable values cannot be keys
+            return -1
+
+    def __iter__(self) -> Iterator[BaseModel]:
+        for index in range(len(self._items)):
+            yield self._build(index)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (LazyRecords, list)):
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other)
+            )
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LazyRecords({self.model.__name__}, {len(self._items)} rows)"
+
+    def value(self, index: int, name: str) -> Any:
+        """
+        Read one field of one record without building its model.
+        """
+        item = self._items[index]
+        return item[name] if type(item) is dict else getattr(item, name)
+
+    def row(self, index: int) -> Any:
+        """
+        Return one record as stored: its row dict, or its model once built.
+        """
+        return self._items[index]
+
+    def column(self, name: str) -> Iterator[Any]:
+        """
+        Yield one field of every record in order, without building models.
+        """
+        for index in range(len(self._items)):
+            yield self.value(index, name)
+
+    def encoded(self, index: int) -> bytes:
+        """
+        Return one record's JSON bytes, encoding it on first use.
+        """
+        data = self._encoded[index]
+        if data is None:
+            data = encodeRecord(self.model, self._items[index])
+            self._encoded[index] = data
+        return data
+
+    def forgetBuiltEncodings(self) -> None:
+        """
+        Drop the cached bytes of every record that was built into a model.
+
+        Built models may have been edited in place, so savers call this;
+        rows still held as dicts cannot have changed.
+        """
+        for index, item in enumerate(self._items):
+            if type(item) is not dict:
+                self._encoded[index] = None
+
+    def builtCount(self) -> int:
+        """
+        Return how many records have been turned into models so far.
+        """
+        return sum(1 for item in self._items if type(item) is not dict)
+
+    def dumpRows(self) -> List[Dict[str, Any]]:
+        """
+        Return every record as a dict, dumping only the models that were built.
+        """
+        return [
+            item if type(item) is dict else item.model_dump()
+            for item in self._items
+        ]
+
+
+def _fieldValues(records: Iterable[Any], name: str) -> Iterable[Any]:
+    """
+    Return one field of every record, using the collection's own column
+    access when it has one (LazyRecords and the compact stores).
+    """
+    column = getattr(records, "column", None)
+    if column is not None:
+        return column(name)
+    return (getattr(record, name) for record in records)
+
+
+def iterField(records: Iterable[Any], name: str) -> Iterator[Any]:
+    """
+    Yield one field of every record without building lazy models.
+
+    Works on LazyRecords, the compact stores and plain lists of models alike.
+    """
+    return iter(_fieldValues(records, name))
+
+
+def findIndex(records: Iterable[Any], name: str, value: Any) -> int:
+    """
+    Return the position of the first record whose field equals value, or -1.
+    """
+    # key fields of LazyRecords and the compact stores are looked up in a dict
+    if name in getattr(records, "indexedFields", ()):
+        try:
+            return records.indexOf(value, name)
+        except TypeError:
+            return -1
+    values = _fieldValues(records, name)
+    if isinstance(values, (array, list)):
+        try:
+            return values.index(value)
+        except (ValueError, TypeError):
+            return -1
+    for index, fieldValue in enumerate(values):
+        if fieldValue == value:
+            return index
+    return -1
+
+
+def selectWhere(
+    records: Iterable[Any], name: str, test: Callable[[Any], bool]
+) -> List[Any]:
+    """
+    Return the records whose field passes test, building only those models.
+    """
+    if hasattr(records, "column"):
+        return [
+            records[index]
+            for index, fieldValue in enumerate(iterField(records, name))
+            if test(fieldValue)
+        ]
+    return [record for record in records if test(getattr(record, name))]
+
+
+def fieldAt(records: Any, index: int, name: str) -> Any:
+    """
+    Read one field of one record, without building a lazy model when possible.
+    """
+    value = getattr(records, "value", None)
+    if value is not None:
+        return value(index, name)
+    return getattr(records[index], name)
+
+
+def recordAt(records: Any, index: int) -> Any:
+    """
+    Return one record as a model or row dict, without building a lazy model.
+    """
+    row = getattr(records, "row", None)
+    if row is not None:
+        return row(index)
+    return records[index]
+
+
+def encodedRecords(
+    records: Any,
+    model: Type[BaseModel],
+    start: int = 0,
+    stop: int | None = None,
+) -> List[bytes]:
+    """
+    Return the JSON bytes of records[start:stop], in order.
+
+    Uses the collection's cached encodings when it keeps them and encodes
+    each model directly otherwise (e.g. a plain list).
+    """
+    positions = range(len(records))[start:stop]
+    encoded = getattr(records, "encoded", None)
+    if encoded is not None:
+        return [encoded(index) for index in positions]
+    return [encodeRecord(model, records[index]) for index in positions]
+
+
+def jsonArray(parts: Iterable[bytes]) -> bytes:
+    """
+    Join encoded JSON values into one JSON array.
+    """
+    return b"[" + b",".join(parts) + b"]"
+
+
+def dumpRecords(records: Iterable[Any]) -> List[Dict[str, Any]]:
+    """
+    Turn a cached collection into dicts ready to be written out.
+    """
+    dumpRows = getattr(records, "dumpRows", None)
+    if dumpRows is not None:
+        return dumpRows()
+    return [record.model_dump() for record in records]
+
+
+__all__ = [
+    "LazyRecords",
+    "validateRows",
+    "encodeRecord",
+    "iterField",
+    "findIndex",
+    "fieldAt",
+    "recordAt",
+    "selectWhere",
+    "encodedRecords",
+    "jsonArray",
+    "dumpRecords",
+]
@@ -1,12 +1,156 @@
-from typing import List
+import threading
+import anyio
+from typing import Any, Dict, Iterable, List, Tuple
 from ..schemas.likedReviews import LikedReview
-from .repo import _baseLoadAll, _baseSaveAll, DATA_DIR
+from .repo import _baseLoadAll, _baseSaveAll, _baseDeferSave, DATA_DIR
+from .storageStats import describeCache, recordHit, timedLoad
+from .cacheSnapshot import loadSnapshot, saveSnapshot, schemaFingerprint
+from .compactStore import EdgeStore
+from .lazyRecords import validateRows, dumpRecords
+from .adjacency import EdgeIndex
 
 FILE = DATA_DIR / "likeReviews.json"
+# userId -> reviewId links, with the reverse reviewId -> userId direction
+_LIKE_INDEX: EdgeIndex | None = None
+_LIKE_LOCK = threading.RLock()
+_LIKE_SNAPSHOT_SCHEMA = schemaFingerprint("edgeIndex", LikedReview)
+
+
 def loadLikedReviews() -> List[LikedReview]:
     raw = _baseLoadAll(FILE)
-    return [LikedReview(**like) for like in raw]
+    return EdgeStore(LikedReview, validateRows(LikedReview, raw))
+
+
+def loadLikeIndex() -> EdgeIndex:
+    """
+    Load the like links into a cached two-way adjacency index.
+
+    Returns:
+        EdgeIndex: forward maps userId -> liked reviewIds,
+            backward maps reviewId -> userIds who liked it.
+    """
+    global _LIKE_INDEX
+    if _LIKE_INDEX is None:
+        with _LIKE_LOCK:
+            # another thread, such as the warm-up,
+            # may have built it while we waited
+            if _LIKE_INDEX is None:
+                with timedLoad(FILE):
+                    index, sourceKey = loadSnapshot(
+                        FILE, _LIKE_SNAPSHOT_SCHEMA
+                    )
+                    if index is None:
+                        likes = loadLikedReviews()
+                        index = EdgeIndex(
+                            zip(
+                                likes.column("userId"),
+                                likes.column("reviewId"),
+                            )
+                        )
+                        saveSnapshot(
+                            FILE, _LIKE_SNAPSHOT_SCHEMA, sourceKey, index
+                        )
+                    _LIKE_INDEX = index
+                return _LIKE_INDEX
+    recordHit(FILE)
+    return _LIKE_INDEX
+
+
+async def loadLikeIndexAsync() -> EdgeIndex:
+    """
+    Load the like index without blocking the event loop.
+
+    Served from the cache once it is warm; a cold index is built on a
+    worker thread, which also waits out a build already holding _LIKE_LOCK.
+    Routes await this to warm the index before reading it through
+    loadLikeIndex, so no hit is counted here.
+    Returns:
+        EdgeIndex: The like index.
+    """
+    if _LIKE_INDEX is None:
+        return await anyio.to_thread.run_sync(loadLikeIndex)
+    return _LIKE_INDEX
+
+
+def _dumpIndex(index: EdgeIndex) -> List[dict]:
+    # runs on the write-behind thread too, so
+    # take the lock before walking the index
+    with _LIKE_LOCK:
+        return index.dumpRows("userId", "reviewId")
+
+
+def _saveLikeIndex(index: EdgeIndex) -> None:
+    """
+    Save the index; the caller holds _LIKE_LOCK.
+    """
+    if _baseDeferSave(FILE, lambda: _dumpIndex(index)):
+        return
+    _baseSaveAll(FILE, index.dumpRows("userId", "reviewId"))
+
+
+def addLikeEdge(userId: int, reviewId: int) -> bool:
+    """
+    Record that a user liked a review and save.
+
+    Returns:
+        bool: False if the user had already liked the review.
+    """
+    with _LIKE_LOCK:
+        index = loadLikeIndex()
+        if not index.add(userId, reviewId):
+            return False
+        _saveLikeIndex(index)
+        return True
+
+
+def addLikeEdges(pairs: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Record several (userId, reviewId) likes and save once.
+
+    Returns:
+        List[Tuple[int, int]]: The pairs that were added; ones already liked
+            are skipped.
+    """
+    with _LIKE_LOCK:
+        index = loadLikeIndex()
+        added = [
+            (userId, reviewId)
+            for userId, reviewId in pairs
+            if index.add(userId, reviewId)
+        ]
+        if added:
+            _saveLikeIndex(index)
+        return added
+
+
+def removeLikeEdge(userId: int, reviewId: int) -> bool:
+    """
+    Remove a user's like of a review and save.
+
+    Returns:
+        bool: False if the user had not liked the review.
+    """
+    with _LIKE_LOCK:
+        index = loadLikeIndex()
+        if not index.remove(userId, reviewId):
+            return False
+        _saveLikeIndex(index)
+        return True
+
 
 def saveLikedReviews(likes: List[LikedReview]):
-    raw = [like.model_dump() for like in likes]
-    _baseSaveAll(FILE, raw)
\ No newline at end of file
+    global _LIKE_INDEX
+    # the index is rebuilt from the saved list on next use
+    _LIKE_INDEX = None
+    if _baseDeferSave(FILE, lambda: dumpRecords(likes)):
+        return
+    raw = dumpRecords(likes)
+    _baseSaveAll(FILE, raw)
+
+
+def getStorageStats() -> Dict[str, Any]:
+    """
+    Report the like index: link count, estimated memory, load and save
+    counters.
+    """
+    return describeCache(FILE, _LIKE_INDEX)
@@ -1,16 +1,40 @@
-from typing import List
-from .repo import _baseLoadAll, _baseSaveAll, DATA_DIR
+import threading
+import anyio
+from typing import List, Dict, Any
+from .repo import _baseLoadAll, _baseSaveAll, _baseDeferSave, DATA_DIR
+from .storageStats import describeCache, recordHit, timedLoad
+from .cacheSnapshot import loadSnapshot, saveSnapshot, schemaFingerprint
+from .lazyRecords import LazyRecords, validateRows, iterField, dumpRecords
 from app.schemas.movie import Movie
 
 MOVIE_DATA_PATH = DATA_DIR / "movies.json"
 _MOVIE_CACHE: List[Movie] | None = None
 _NEXT_MOVIE_ID: int | None = None
+_MOVIE_LOAD_LOCK = threading.Lock()
+# held by every read-modify-write of the movie cache, and by the
+# write-behind writer while it builds movies.json from it
+MOVIE_WRITE_LOCK = threading.RLock()
+_MOVIE_SNAPSHOT_SCHEMA = schemaFingerprint("rows", Movie)
 
 def _getMaxMovieId(movies: List[Movie]) -> int:
     """
     Return the maximum Movie ID in a list of movies, or 0 if empty.
     """
-    return max((movie.id for movie in movies), default=0)
+    return max(iterField(movies, "id"), default=0)
+
+
+def _setMovieCache(rows: List[Dict[str, Any]]) -> List[Movie]:
+    """
+    Build the movie cache from validated movie rows and initialize the next ID.
+
+    Rows are kept as dicts; a Movie model is only built when a row is read.
+    """
+    global _MOVIE_CACHE, _NEXT_MOVIE_ID
+    _MOVIE_CACHE = LazyRecords(Movie, rows)
+
+    maxId = _getMaxMovieId(_MOVIE_CACHE)
+    _NEXT_MOVIE_ID = maxId + 1
+    return _MOVIE_CACHE
 
 
 def _loadMovieCache() -> List[Movie]:
@@ -18,16 +42,32 @@ def _loadMovieCache() -> List[Movie]:
     Load movies from the data file into a cache.
 
     Loads the movies only once and caches them for future calls.
+    Uses the cache snapshot instead of JSON while it matches the data file.
     Returns:
         List[Movie]: A list of movies.
     """
-    global _MOVIE_CACHE, _NEXT_MOVIE_ID
     if _MOVIE_CACHE is None:
-        movie_dicts = _baseLoadAll(MOVIE_DATA_PATH)
-        _MOVIE_CACHE = [Movie(**movie) for movie in movie_dicts]
-
-        maxId = _getMaxMovieId(_MOVIE_CACHE)
-        _NEXT_MOVIE_ID = maxId + 1
+        with _MOVIE_LOAD_LOCK:
+            # another thread, such as the warm-up,
+            # may have filled it while we waited
+            if _MOVIE_CACHE is None:
+                with timedLoad(MOVIE_DATA_PATH):
+                    rows, sourceKey = loadSnapshot(
+                        MOVIE_DATA_PATH, _MOVIE_SNAPSHOT_SCHEMA
+                    )
+                    if rows is None:
+                        rows = validateRows(
+                            Movie, _baseLoadAll(MOVIE_DATA_PATH)
+                        )
+                        saveSnapshot(
+                            MOVIE_DATA_PATH,
+                            _MOVIE_SNAPSHOT_SCHEMA,
+                            sourceKey,
+                            rows,
+                        )
+                    _setMovieCache(rows)
+                return _MOVIE_CACHE
+    recordHit(MOVIE_DATA_PATH)
     return _MOVIE_CACHE
 
 def getNextMovieId() -> int:
@@ -57,6 +97,28 @@ def loadMovies() -> List[Movie]:
     return _loadMovieCache()
 
 
+async def loadMoviesAsync() -> List[Movie]:
+    """
+    Load all movies without blocking the event loop.
+
+    Served from the cache once it is warm; a cold cache is filled on a
+    worker thread, reading and validating included. Routes await this to
+    warm the cache before reading it through the sync loader, so no hit
+    is counted here.
+    Returns:
+        List[Movie]: A list of movie items.
+    """
+    if _MOVIE_CACHE is None:
+        return await anyio.to_thread.run_sync(_loadMovieCache)
+    return _MOVIE_CACHE
+
+
+def _dumpMovies(movies: List[Movie]) -> List[Dict[str, Any]]:
+    # runs on the write-behind thread, so wait out any mutation in progress
+    with MOVIE_WRITE_LOCK:
+        return dumpRecords(movies)
+
+
 def saveMovies(movies: List[Movie]) -> None:
     """
     Save all movies to the movies data file.
@@ -65,13 +127,29 @@ def saveMovies(movies: List[Movie]) -> None:
     """
     global _MOVIE_CACHE, _NEXT_MOVIE_ID
     _MOVIE_CACHE = movies
+    # a movie edited in place must not be served from its old encoding
+    forgetEncodings = getattr(movies, "forgetBuiltEncodings", None)
+    if forgetEncodings is not None:
+        forgetEncodings()
 
     maxId = _getMaxMovieId(movies)
     if _NEXT_MOVIE_ID is None or _NEXT_MOVIE_ID <= maxId:
         _NEXT_MOVIE_ID = maxId + 1
 
-    movie_dicts = [movie.model_dump() for movie in movies]
+    if _baseDeferSave(MOVIE_DATA_PATH, lambda: _dumpMovies(movies)):
+        return
+    movie_dicts = dumpRecords(movies)
     _baseSaveAll(MOVIE_DATA_PATH, movie_dicts)
 
 
-__all__ = ["loadMovies", "saveMovies"]
+def getStorageStats() -> Dict[str, Any]:
+    """
+    Report the movie cache: item count, estimated memory, load and save
+    counters.
+    """
+    return describeCache(MOVIE_DATA_PATH, _MOVIE_CACHE)
+
+
+__all__ = [
+    "loadMovies", "loadMoviesAsync", "saveMovies", "MOVIE_WRITE_LOCK"
+]
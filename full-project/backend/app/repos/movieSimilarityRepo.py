@@ -0,0 +1,109 @@
+import hashlib
+import threading
+from typing import Any, Dict, List
+from .repo import _baseLoadAll, _baseSaveAll, _baseDeferSave, DATA_DIR
+from .annIndex import HnswIndex
+from .movieVectors import MovieVectorIndex, movieTerms
+
+# the similar-movies graph, saved next to movies.json
+FILE = DATA_DIR / "movieSimilarity.json"
+_GRAPH_LOCK = threading.RLock()
+
+
+def featureDigest(movie: Any) -> str:
+    """
+    Short fingerprint of the features a movie's vector is built from.
+    """
+    terms = sorted(movieTerms(movie).items())
+    return hashlib.blake2b(
+        repr(terms).encode("utf-8"), digest_size=8
+    ).hexdigest()
+
+
+def buildSimilarityGraph(
+    movies: List[Any], vectors: MovieVectorIndex
+) -> HnswIndex:
+    """
+    Insert every movie's content vector into a new graph.
+    """
+    graph = HnswIndex()
+    for movie in movies:
+        graph.add(movie.id, vectors.vector(movie.id))
+    return graph
+
+
+def loadSimilarityGraph(
+    movies: List[Any], vectors: MovieVectorIndex
+) -> HnswIndex:
+    """
+    Load the saved graph, or build and save a new one if it is missing or
+    was built from different movie features.
+
+    Returns:
+        HnswIndex: keyed by movie id, over the vectors in `vectors`.
+    """
+    digests = {movie.id: featureDigest(movie) for movie in movies}
+    try:
+        rows = _baseLoadAll(FILE)
+    except (FileNotFoundError, ValueError):
+        rows = None
+
+    if rows is not None:
+        savedDigests = {
+            row["key"]: row.get("digest") for row in rows if row.get("live")
+        }
+        if savedDigests == digests:
+            try:
+                return HnswIndex.fromRows(
+                    rows,
+                    {movieId: vectors.vector(movieId) for movieId in digests},
+                )
+            except (KeyError, TypeError):
+                pass
+
+    with _GRAPH_LOCK:
+        graph = buildSimilarityGraph(movies, vectors)
+        saveSimilarityGraph(graph, movies)
+    return graph
+
+
+def addToSimilarityGraph(
+    graph: HnswIndex, movies: List[Any], movie: Any, vector: Dict[str, float]
+) -> None:
+    """
+    Insert or re-insert one movie and save the graph.
+    """
+    with _GRAPH_LOCK:
+        graph.add(movie.id, vector)
+        saveSimilarityGraph(graph, movies)
+
+
+def _dumpGraph(graph: HnswIndex, movies: List[Any]) -> List[Dict[str, Any]]:
+    # runs on the write-behind thread too, so
+    # take the lock before walking the graph
+    with _GRAPH_LOCK:
+        digests = {movie.id: featureDigest(movie) for movie in movies}
+        rows = graph.dumpRows()
+    for row in rows:
+        if row["live"]:
+            row["digest"] = digests.get(row["key"])
+    return rows
+
+
+def saveSimilarityGraph(graph: HnswIndex, movies: List[Any]) -> None:
+    """
+    Save the graph with the feature digest of each live movie; the caller holds
+    _GRAPH_LOCK.
+    """
+    if _baseDeferSave(FILE, lambda: _dumpGraph(graph, movies)):
+        return
+    _baseSaveAll(FILE, _dumpGraph(graph, movies))
+
+
+__all__ = [
+    "loadSimilarityGraph",
+    "saveSimilarityGraph",
+    "addToSimilarityGraph",
+    "buildSimilarityGraph",
+    "featureDigest",
+]
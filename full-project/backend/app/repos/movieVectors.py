@@ -0,0 +1,235 @@
+"""
+Sparse content vectors for movie-to-movie similarity.
+
+Each movie becomes a TF-IDF weighted bag of terms: one term per genre,
+director and main star (one-hot) plus the words of its description. Terms
+are prefixed by the field they came from ("genre:drama", "word:heist"), and
+each field carries its own weight so a shared director counts for more than
+a shared common word. Vectors are L2-normalized, so the dot product of two
+vectors is their cosine similarity.
+
+MovieVectorIndex keeps an inverted index (term -> {movieId: weight}) so a
+top-K query only touches the movies that share at least one term with the
+query movie. Adding or updating a movie weights it with the current
+document frequencies and leaves the others alone; all vectors are
+re-weighted once the catalog has grown by REWEIGHT_GROWTH since the last
+full weighting.
+"""
+
+import math
+import re
+from collections import Counter
+from heapq import nlargest
+from typing import Any, Dict, Iterable, List, Tuple
+
+REWEIGHT_GROWTH = 0.1
+
+FIELD_WEIGHTS = {"genre": 1.0, "director": 0.7, "star": 0.8, "word": 1.0}
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_MIN_WORD_LENGTH = 3
+_STOP_WORDS = frozenset(
+    """
+    the and for with from that this his her their they them are was were has
+    have had into onto its who whom what when where which while will would can
+    could after before about over under more most some than then there these
+    those one two out off all any but not our your you she him own upon also
+    been being only very just such each other
+    """.split()
+)
+
+Vector = Dict[str, float]
+
+
+def movieTerms(movie: Any) -> Counter:
+    """
+    Count the feature terms of a movie model or movie dict.
+
+    Returns:
+        Counter: term -> occurrences; list fields count once per entry.
+    """
+    get = (
+        movie.get
+        if isinstance(movie, dict)
+        else lambda name: getattr(movie, name, None)
+    )
+    terms: Counter = Counter()
+    for prefix, field in (
+        ("genre", "movieGenres"),
+        ("director", "directors"),
+        ("star", "mainStars"),
+    ):
+        for value in get(field) or ():
+            name = " ".join(str(value).lower().split())
+            if name:
+                terms[f"{prefix}:{name}"] = 1
+    for word in _WORD_PATTERN.findall((get("description") or "").lower()):
+        if len(word) >= _MIN_WORD_LENGTH and word not in _STOP_WORDS:
+            terms[f"word:{word}"] += 1
+    return terms
+
+
+class MovieVectorIndex:
+    """
+    TF-IDF vectors for a movie catalog with cosine top-K queries.
+    """
+
+    def __init__(self, movies: Iterable[Any] = ()):
+        """
+        Args:
+            movies (Iterable): Movie models or movie dicts with an id.
+        """
+        self._terms: Dict[int, Counter] = {}
+        self._documentFrequency: Counter = Counter()
+        self._vectors: Dict[int, Vector] = {}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._idf: Dict[str, float] = {}
+        self._weightedCount = 0
+        for movie in movies:
+            movieId, terms = self._movieId(movie), movieTerms(movie)
+            self._forget(movieId)
+            self._terms[movieId] = terms
+            self._documentFrequency.update(terms.keys())
+        self.reweight()
+
+    @staticmethod
+    def _movieId(movie: Any) -> int:
+        return int(movie["id"] if isinstance(movie, dict) else movie.id)
+
+    def _inverseFrequency(self, term: str) -> float:
+        idf = self._idf.get(term)
+        if idf is None:
+            # a term first seen since the last reweight
+            idf = (
+                math.log(
+                    (1 + len(self._terms))
+                    / (1 + self._documentFrequency[term])
+                )
+                + 1
+            )
+        return idf
+
+    def _weigh(self, terms: Counter) -> Vector:
+        vector = {
+            term: FIELD_WEIGHTS[term.split(":", 1)[0]]
+            * (1 + math.log(count))
+            * self._inverseFrequency(term)
+            for term, count in terms.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return (
+            {term: weight / norm for term, weight in vector.items()}
+            if norm
+            else {}
+        )
+
+    def _post(self, movieId: int, vector: Vector) -> None:
+        self._vectors[movieId] = vector
+        for term, weight in vector.items():
+            self._postings.setdefault(term, {})[movieId] = weight
+
+    def _unpost(self, movieId: int) -> None:
+        for term in self._vectors.pop(movieId, {}):
+            posting = self._postings[term]
+            del posting[movieId]
+            if not posting:
+                del self._postings[term]
+
+    def _forget(self, movieId: int) -> None:
+        """
+        Drop a movie's terms and vector, if it is indexed.
+        """
+        terms = self._terms.pop(movieId, None)
+        if terms is None:
+            return
+        for term in terms:
+            self._documentFrequency[term] -= 1
+            if self._documentFrequency[term] <= 0:
+                del self._documentFrequency[term]
+        self._unpost(movieId)
+
+    def reweight(self) -> None:
+        """
+        Recompute every vector from the current document frequencies.
+        """
+        count = len(self._terms)
+        self._idf = {
+            term: math.log((1 + count) / (1 + frequency)) + 1
+            for term, frequency in self._documentFrequency.items()
+        }
+        self._vectors, self._postings = {}, {}
+        for movieId, terms in self._terms.items():
+            self._post(movieId, self._weigh(terms))
+        self._weightedCount = count
+
+    def add(self, movie: Any) -> None:
+        """
+        Index a new movie, or re-index an existing one after an update.
+        """
+        movieId = self._movieId(movie)
+        terms = movieTerms(movie)
+        self._forget(movieId)
+        self._terms[movieId] = terms
+        self._documentFrequency.update(terms.keys())
+        if len(self._terms) > self._weightedCount * (1 + REWEIGHT_GROWTH):
+            self.reweight()
+        else:
+            self._post(movieId, self._weigh(terms))
+
+    def remove(self, movieId: int) -> bool:
+        """
+        Drop a movie from the index. Returns False if it was not indexed.
+        """
+        if movieId not in self._terms:
+            return False
+        self._forget(movieId)
+        return True
+
+    def vector(self, movieId: int) -> Vector:
+        """
+        Return a movie's normalized vector (empty if it is not indexed).
+        """
+        return dict(self._vectors.get(movieId, {}))
+
+    def query(
+        self, vector: Vector, limit: int, exclude: Iterable[int] = ()
+    ) -> List[Tuple[int, float]]:
+        """
+        Return up to limit (movieId, cosine) pairs closest to a normalized
+        vector.
+
+        Only movies sharing a term with the vector are scored.
+        """
+        scores: Dict[int, float] = {}
+        for term, weight in vector.items():
+            for movieId, movieWeight in self._postings.get(term, {}).items():
+                scores[movieId] = (
+                    scores.get(movieId, 0.0) + weight * movieWeight
+                )
+        for movieId in exclude:
+            scores.pop(movieId, None)
+        return nlargest(
+            limit, scores.items(), key=lambda item: (item[1], -item[0])
+        )
+
+    def similar(self, movieId: int, limit: int) -> List[Tuple[int, float]]:
+        """
+        Return up to limit (movieId, cosine) pairs most like the given movie.
+        """
+        return self.query(
+            self._vectors.get(movieId, {}), limit, exclude=(movieId,)
+        )
+
+    def __contains__(self, movieId: int) -> bool:
+        return movieId in self._terms
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+
+__all__ = [
+    "MovieVectorIndex",
+    "movieTerms",
+    "FIELD_WEIGHTS",
+    "REWEIGHT_GROWTH",
+]
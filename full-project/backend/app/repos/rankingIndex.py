@@ -0,0 +1,91 @@
+"""
+Per-group rankings that are updated in place instead of re-sorted per request.
+
+RankedGroups keeps, for each group (e.g. a movie), its items (e.g. reviews)
+in a list sorted by descending score, so the top K of a group is a slice.
+Changing one item's score is a binary search to remove its old entry and
+another to insert the new one.
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Tuple
+
+# entries sort by score descending, then item id ascending
+_Entry = Tuple[float, int]
+
+
+class RankedGroups:
+    """
+    Items ranked by score within their group.
+    """
+
+    def __init__(self, items: Iterable[Tuple[int, int, float]] = ()):
+        """
+        Args:
+            items (Iterable): (groupId, itemId, score) triples.
+        """
+        self._groups: Dict[int, List[_Entry]] = {}
+        # itemId -> (groupId, score) for the items currently ranked
+        self._items: Dict[int, Tuple[int, float]] = {}
+        for groupId, itemId, score in items:
+            self._items[itemId] = (groupId, score)
+            self._groups.setdefault(groupId, []).append((-score, itemId))
+        for entries in self._groups.values():
+            entries.sort()
+
+    def set(self, groupId: int, itemId: int, score: float) -> None:
+        """
+        Rank an item, or move it to a new score.
+        """
+        self.remove(itemId)
+        self._items[itemId] = (groupId, score)
+        insort(self._groups.setdefault(groupId, []), (-score, itemId))
+
+    def remove(self, itemId: int) -> bool:
+        """
+        Drop an item from its group. Returns False if it was not ranked.
+        """
+        current = self._items.pop(itemId, None)
+        if current is None:
+            return False
+        groupId, score = current
+        entries = self._groups[groupId]
+        del entries[bisect_left(entries, (-score, itemId))]
+        if not entries:
+            del self._groups[groupId]
+        return True
+
+    def groupOf(self, itemId: int) -> int | None:
+        """
+        Return the group an item is ranked in, or None if it is not ranked.
+        """
+        current = self._items.get(itemId)
+        return None if current is None else current[0]
+
+    def score(self, itemId: int) -> float | None:
+        """
+        Return an item's current score, or None if it is not ranked.
+        """
+        current = self._items.get(itemId)
+        return None if current is None else current[1]
+
+    def top(
+        self, groupId: int, limit: int, offset: int = 0
+    ) -> List[Tuple[int, float]]:
+        """
+        Return up to limit (itemId, score) pairs of a group, best first.
+        """
+        entries = self._groups.get(groupId, [])
+        return [
+            (itemId, -negScore)
+            for negScore, itemId in entries[offset : offset + limit]
+        ]
+
+    def groupSize(self, groupId: int) -> int:
+        return len(self._groups.get(groupId, ()))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+__all__ = ["RankedGroups"]
@@ -1,10 +1,19 @@
-from typing import List
-from.repo import _baseSaveAll, _baseLoadAll, DATA_DIR
+import threading
+import anyio
+from typing import List, Dict, Any
+from.repo import _baseSaveAll, _baseLoadAll, _baseDeferSave, DATA_DIR
+from .storageStats import describeCache, recordHit, timedLoad
+from .cacheSnapshot import loadSnapshot, saveSnapshot, schemaFingerprint
 from ..schemas.reply import Reply
 
 _REPLY_DATA_PATH = DATA_DIR / "replies.json"
 _REPLY_CACHE: List[Reply] | None = None
 _NEXT_REPLY_ID: int | None = None
+_REPLY_LOAD_LOCK = threading.Lock()
+# held by every read-modify-write of the reply cache, and by the
+# write-behind writer while it builds replies.json from it
+REPLY_WRITE_LOCK = threading.RLock()
+_REPLY_SNAPSHOT_SCHEMA = schemaFingerprint("models", Reply)
 
 def getMaxReplyId(replies: List[Reply]) -> int:
     """
@@ -13,19 +22,48 @@ def getMaxReplyId(replies: List[Reply]) -> int:
     return max((reply.id for reply in replies), default=0)
 
 
+def _setReplyCache(replies: List[Reply]) -> List[Reply]:
+    """
+    Build the reply cache from validated replies and initialize the next ID.
+    """
+    global _REPLY_CACHE, _NEXT_REPLY_ID
+    _REPLY_CACHE = replies
+    _NEXT_REPLY_ID = getMaxReplyId(_REPLY_CACHE) + 1
+    return _REPLY_CACHE
+
+
 def _loadReplyCache() -> List[Reply]: 
     """
     Load reply from the data file into a cache.
 
     Loads the reply only once and caches them for future calls.
+    Uses the cache snapshot instead of JSON while it matches the data file.
     Returns:
         List[Reply]: A list of reply.
     """
-    global _REPLY_CACHE, _NEXT_REPLY_ID
     if _REPLY_CACHE is None:
-        reply_dicts = _baseLoadAll(_REPLY_DATA_PATH)
-        _REPLY_CACHE = [Reply(**reply) for reply in reply_dicts]
-        _NEXT_REPLY_ID = getMaxReplyId(_REPLY_CACHE) + 1
+        with _REPLY_LOAD_LOCK:
+            # another thread, such as the warm-up,
+            # may have filled it while we waited
+            if _REPLY_CACHE is None:
+                with timedLoad(_REPLY_DATA_PATH):
+                    replies, sourceKey = loadSnapshot(
+                        _REPLY_DATA_PATH, _REPLY_SNAPSHOT_SCHEMA
+                    )
+                    if replies is None:
+                        replies = [
+                            Reply(**reply)
+                            for reply in _baseLoadAll(_REPLY_DATA_PATH)
+                        ]
+                        saveSnapshot(
+                            _REPLY_DATA_PATH,
+                            _REPLY_SNAPSHOT_SCHEMA,
+                            sourceKey,
+                            replies,
+                        )
+                    _setReplyCache(replies)
+                return _REPLY_CACHE
+    recordHit(_REPLY_DATA_PATH)
     return _REPLY_CACHE
 
 def getNextReplyId() -> int:
@@ -53,7 +91,28 @@ def loadReplies() -> List[Reply]:
         List[Reply]: A list of reply items.
     """
     return _loadReplyCache()
-    
+
+async def loadRepliesAsync() -> List[Reply]:
+    """
+    Load all replies without blocking the event loop.
+
+    Served from the cache once it is warm; a cold cache is filled on a
+    worker thread, reading and validating included. Routes await this to
+    warm the cache before reading it through the sync loader, so no hit
+    is counted here.
+    Returns:
+        List[Reply]: A list of reply items.
+    """
+    if _REPLY_CACHE is None:
+        return await anyio.to_thread.run_sync(_loadReplyCache)
+    return _REPLY_CACHE
+
+def _dumpReplies(replies: List[Reply]) -> List[Dict[str, Any]]:
+    # runs on the write-behind thread, so wait out any mutation in progress
+    with REPLY_WRITE_LOCK:
+        return [reply.model_dump() for reply in replies]
+
+
 def saveReplies(replies: List[Reply]) -> None: 
     """
     Save all replies to the reviews data file.
@@ -63,7 +122,23 @@ def saveReplies(replies: List[Reply]) -> None:
     """
     global _REPLY_CACHE
     _REPLY_CACHE = replies
+    if _baseDeferSave(_REPLY_DATA_PATH, lambda: _dumpReplies(replies)):
+        return
     reply_dict = [reply.model_dump() for reply in replies]
     _baseSaveAll(_REPLY_DATA_PATH, reply_dict)
 
-__all__ = ["loadReplies", "saveReplies", "getNextReplyId"]
+def getStorageStats() -> Dict[str, Any]:
+    """
+    Report the reply cache: item count, estimated memory, load and save
+    counters.
+    """
+    return describeCache(_REPLY_DATA_PATH, _REPLY_CACHE)
+
+
+__all__ = [
+    "loadReplies",
+    "loadRepliesAsync",
+    "saveReplies",
+    "getNextReplyId",
+    "REPLY_WRITE_LOCK",
+]
@@ -1,11 +1,48 @@
+import asyncio
 from datetime import date, datetime
 from decimal import Decimal
 import json
+import logging
+import os
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any
+import anyio
 from app.tools.Paths import getProjectRoot
+from app.utilities.metrics import span, SPAN_REPO_LOAD, SPAN_REPO_SAVE
+from .storageStats import recordRead, recordSave
 
-DATA_DIR = getProjectRoot() / "backend" / "app" / "data"
+try:
+    import orjson
+except ImportError:
+    # fall back to the stdlib codec when orjson is not installed
+    orjson = None
+
+# where the data files live; set DATA_DIR to serve
+# another directory, such as a synthetic dataset
+DATA_DIR = Path(
+    os.getenv("DATA_DIR") or getProjectRoot() / "backend" / "app" / "data"
+)
+
+# how often the background writer flushes
+# dirty data files, 0 disables write-behind
+WRITE_BEHIND_MS = int(os.getenv("WRITE_BEHIND_MS", "250"))
+
+logger = logging.getLogger(__name__)
+
+# JSON codec used for data files: "orjson" when available, otherwise "json"
+JSON_CODEC = os.getenv("JSON_CODEC", "orjson" if orjson else "json")
+if JSON_CODEC == "orjson" and orjson is None:
+    JSON_CODEC = "json"
+
+# data file path -> callable that builds the items to write for it
+_PENDING_SAVES: Dict[Path, Callable[[], List[Dict[str, Any]]]] = {}
+_PENDING_LOCK = threading.Lock()
+_WRITER_TASK: asyncio.Task | None = None
+# data file path -> number of saves so far,
+# read by the response cache to spot changes
+_DATA_VERSIONS: Dict[Path, int] = {}
 
 def _fullPath (name: str | Path) -> Path:
     """
@@ -34,7 +71,32 @@ def _ensureFile(path: Path) -> None:
     """
     if not path.exists():
         raise FileNotFoundError(f"Missing data file: {path}")
-    
+
+def _markChanged(path: Path) -> None:
+    with _PENDING_LOCK:
+        _DATA_VERSIONS[path] = _DATA_VERSIONS.get(path, 0) + 1
+
+def dataVersion(datafile: str | Path) -> int:
+    """
+    Return a counter that changes every time the data file is saved.
+
+    Saves count when they are made, deferred or not, so the counter moves
+    before the write-behind flush reaches disk.
+    Args:
+        datafile (str | Path): The name of the data file or a Path object.
+
+    Returns:
+        int: 0 until the first save since startup.
+    """
+    return _DATA_VERSIONS.get(_fullPath(datafile), 0)
+
+def _hasPendingSave(datafile: str | Path) -> bool:
+    """
+    Return True if the data file has a save still waiting for the writer.
+    """
+    with _PENDING_LOCK:
+        return _fullPath(datafile) in _PENDING_SAVES
+
 def _baseLoadAll(datafile: str | Path) -> List[Dict[str, Any]]:
     """
     Load all items from the specified data file.
@@ -46,32 +108,181 @@ def _baseLoadAll(datafile: str | Path) -> List[Dict[str, Any]]:
         List[Dict[str, Any]]: A list of items loaded from the data file.
     """
     path = _fullPath(datafile)
-    _ensureFile(path)
-    with path.open("r", encoding="utf-8") as file:
-        return json.load(file)
+    with _PENDING_LOCK:
+        pending = _PENDING_SAVES.get(path)
+    # a save still waiting for the writer is newer than what is on disk
+    if pending is not None:
+        return pending()
+
+    with span(SPAN_REPO_LOAD):
+        _ensureFile(path)
+        data = path.read_bytes()
+        recordRead(path, len(data))
+        return _decodeJson(data)
 
-def _baseSaveAll(datafile: str | Path, items: List[Dict[str, Any]]) -> None:
+def _encodeValue(value: Any) -> Any:
+    """
+    Encode values the JSON codecs do not handle on their own.
+
+    Raises:
+        TypeError: If the value cannot be encoded.
+    """
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(
+        f"Object of type {type(value).__name__} is not JSON serializable"
+    )
+
+def _decodeJson(data: bytes) -> Any:
+    """
+    Decode JSON bytes with the configured codec.
+    """
+    if JSON_CODEC == "orjson":
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+def _encodeJson(items: Any, pretty: bool = False) -> bytes:
+    """
+    Encode items as UTF-8 JSON bytes with the configured codec.
+
+    Output is compact unless pretty is requested.
+    """
+    if JSON_CODEC == "orjson":
+        # orjson encodes date and datetime
+        # natively, only Decimal needs the hook
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        return orjson.dumps(items, default=_encodeValue, option=option)
+    if pretty:
+        text = json.dumps(
+            items, indent=2, ensure_ascii=False, default=_encodeValue
+        )
+    else:
+        text = json.dumps(
+            items,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=_encodeValue,
+        )
+    return text.encode("utf-8")
+
+
+def _baseSaveAll(
+    datafile: str | Path, items: List[Dict[str, Any]], pretty: bool = False
+) -> None:
     """
     Save all items to the specified data file.
     
     Atomically writes to a temporary file first to avoid data corruption.
+    Files are written compact; pass pretty=True for a human-readable export.
     Args:
         datafile (str | Path): The name of the data file or a Path object.
         items (List[Dict[str, Any]]): A list of items to save.
+        pretty (bool): Indent the output by two spaces.
     """
     path = _fullPath(datafile)
+    _markChanged(path)
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    temp = path.with_suffix(path.suffix + ".tmp")
+    with span(SPAN_REPO_SAVE):
+        start = time.perf_counter()
+        temp = path.with_suffix(path.suffix + ".tmp")
+        data = _encodeJson(items, pretty)
+        temp.write_bytes(data)
+
+        temp.replace(path)
+        recordSave(path, time.perf_counter() - start, len(data))
+
+
+def _baseDeferSave(
+    datafile: str | Path, buildItems: Callable[[], List[Dict[str, Any]]]
+) -> bool:
+    """
+    Mark a data file dirty so the background writer saves it later.
+
+    Only the latest pending save per file is kept, so a burst of mutations
+    costs one write. Items are built at flush time, not on every mutation.
+    Args:
+        datafile (str | Path): The name of the data file or a Path object.
+        buildItems (Callable): Returns the items to write when the file is
+            flushed.
+
+    Returns:
+        bool: True if the save was deferred, False if write-behind is not
+            running and the caller should save immediately.
+    """
+    if _WRITER_TASK is None:
+        return False
+    path = _fullPath(datafile)
+    _markChanged(path)
+    with _PENDING_LOCK:
+        _PENDING_SAVES[path] = buildItems
+    return True
+
 
-    def encodeValue(value):
-        if isinstance(value, Decimal):
-            return float(value)
-        if isinstance(value, (date, datetime)):
-            return value.isoformat()
-        return value
+def _baseFlushPending() -> int:
+    """
+    Write every dirty data file now.
+
+    A file stays marked dirty until its write succeeds, and is only cleared if
+    no newer save arrived while it was being written.
+    Returns:
+        int: The number of files written.
+    """
+    with _PENDING_LOCK:
+        pending = dict(_PENDING_SAVES)
 
-    with temp.open("w", encoding="utf-8") as file:
-        json.dump(items, file, indent=2, ensure_ascii=False, default=encodeValue)
+    written = 0
+    for path, buildItems in pending.items():
+        try:
+            _baseSaveAll(path, buildItems())
+        except Exception:
+            logger.exception("Write-behind flush failed for %s", path)
+            continue
+        written += 1
+        with _PENDING_LOCK:
+            if _PENDING_SAVES.get(path) is buildItems:
+                del _PENDING_SAVES[path]
+    return written
 
-    temp.replace(path)
\ No newline at end of file
+async def _writeBehindLoop(intervalSeconds: float) -> None:
+    """
+    Flush dirty data files on a worker thread every interval.
+    """
+    while True:
+        await asyncio.sleep(intervalSeconds)
+        await anyio.to_thread.run_sync(_baseFlushPending)
+
+async def startWriteBehind(intervalMs: int | None = None) -> None:
+    """
+    Start the background writer that coalesces saves (group commit).
+
+    Does nothing if write-behind is disabled or the writer is already running.
+    Args:
+        intervalMs (int | None): Flush interval in milliseconds, defaults to
+            WRITE_BEHIND_MS.
+    """
+    global _WRITER_TASK
+    interval = WRITE_BEHIND_MS if intervalMs is None else intervalMs
+    if interval <= 0 or _WRITER_TASK is not None:
+        return
+    _WRITER_TASK = asyncio.create_task(_writeBehindLoop(interval / 1000))
+
+async def stopWriteBehind() -> None:
+    """
+    Stop the background writer and flush whatever is still dirty.
+
+    Saves made after this point are written immediately again.
+    """
+    global _WRITER_TASK
+    if _WRITER_TASK is None:
+        return
+    task = _WRITER_TASK
+    _WRITER_TASK = None
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    await anyio.to_thread.run_sync(_baseFlushPending)
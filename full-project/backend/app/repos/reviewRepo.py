@@ -1,16 +1,124 @@
-from typing import List, Dict, Any
-from .repo import _baseLoadAll, _baseSaveAll, DATA_DIR
+import logging
+import threading
+from pathlib import Path
+from typing import Iterable, List, Dict, Any
+import anyio
+from .repo import _baseLoadAll, _baseSaveAll, _baseDeferSave, DATA_DIR
+from .storageStats import describeCache, recordHit, timedLoad
+from .cacheSnapshot import loadSnapshot, saveSnapshot, schemaFingerprint
+from .reviewSnapshot import ReviewSnapshot, SnapshotFormatError
+from .lazyRecords import validateRows, iterField, dumpRecords
+from .compactStore import ReviewStore
 from ..schemas.review import Review
 
+logger = logging.getLogger(__name__)
+
 REVIEW_DATA_PATH = DATA_DIR / "reviews.json"
 _REVIEW_CACHE: List[Review] | None = None
 _NEXT_REVIEW_ID: int | None = None
+_REVIEW_LOAD_LOCK = threading.Lock()
+# held by every read-modify-write of the review cache, and by the
+# write-behind writer while it builds reviews.json from it
+REVIEW_WRITE_LOCK = threading.RLock()
+_REVIEW_SNAPSHOT_SCHEMA = schemaFingerprint("reviewStore", Review)
 
 def _getMaxReviewId(reviews: List[Review]) -> int:
     """
     Return the maximum Review ID in a list of reviews, or 0 if empty.
     """
-    return max((review.id for review in reviews), default=0)
+    return max(iterField(reviews, "id"), default=0)
+
+
+def _fillReviewCache(review_dicts: Iterable[Dict[str, Any]]) -> List[Review]:
+    """
+    Build the review cache from raw review dicts and initialize the next ID.
+
+    Rows are validated in bulk and packed into a ReviewStore; a Review model
+    is only built when a row is read.
+    """
+    global _REVIEW_CACHE
+    _REVIEW_CACHE = ReviewStore.fromRows(validateRows(Review, review_dicts))
+    _setNextReviewId()
+    return _REVIEW_CACHE
+
+
+def _setNextReviewId() -> None:
+    """
+    Initialize the next review ID from the cached reviews.
+    """
+    global _NEXT_REVIEW_ID
+    maxId = _getMaxReviewId(_REVIEW_CACHE)
+    _NEXT_REVIEW_ID = maxId + 1
+
+
+def getReviewSnapshotPath() -> Path:
+    """
+    Return the path of the optional columnar copy of the reviews data file.
+    """
+    return REVIEW_DATA_PATH.with_suffix(".bin")
+
+
+def _isSnapshotFresh() -> bool:
+    """
+    Return True if a review snapshot exists and is not older than reviews.json.
+    """
+    snapshotPath = getReviewSnapshotPath()
+    if not snapshotPath.exists():
+        return False
+    if not REVIEW_DATA_PATH.exists():
+        return True
+    return snapshotPath.stat().st_mtime >= REVIEW_DATA_PATH.stat().st_mtime
+
+
+def _loadFromSnapshot() -> bool:
+    """
+    Fill the review cache from a fresh snapshot.
+
+    A damaged snapshot is logged and ignored.
+
+    Returns:
+        bool: False if there is no usable snapshot and JSON must be read
+            instead.
+    """
+    if not _isSnapshotFresh():
+        return False
+    try:
+        snapshot = ReviewSnapshot(getReviewSnapshotPath())
+    except SnapshotFormatError:
+        return False
+    global _REVIEW_CACHE
+    try:
+        snapshot.validate()
+        # snapshot rows were validated when it was written, so the store
+        # reads them in place; the snapshot stays open as long as it does
+        store = ReviewStore.fromSnapshot(snapshot)
+    except SnapshotFormatError:
+        logger.warning(
+            "Ignoring damaged review snapshot %s",
+            snapshot.path,
+            exc_info=True,
+        )
+        snapshot.close()
+        return False
+    _REVIEW_CACHE = store
+    _setNextReviewId()
+    return True
+
+
+def _loadFromCacheSnapshot() -> None:
+    """
+    Fill the review cache from its cache snapshot, or from JSON and write one.
+    """
+    global _REVIEW_CACHE
+    store, sourceKey = loadSnapshot(REVIEW_DATA_PATH, _REVIEW_SNAPSHOT_SCHEMA)
+    if store is None:
+        store = _fillReviewCache(_baseLoadAll(REVIEW_DATA_PATH))
+        saveSnapshot(
+            REVIEW_DATA_PATH, _REVIEW_SNAPSHOT_SCHEMA, sourceKey, store
+        )
+        return
+    _REVIEW_CACHE = store
+    _setNextReviewId()
 
 
 def _loadReviewCache() -> List[Review]:
@@ -18,16 +126,21 @@ def _loadReviewCache() -> List[Review]:
     Load reviews from the data file into a cache.
 
     Loads the reviews only once and caches them for future calls.
+    Reads the binary snapshot instead of JSON when it is up to date, and
+    otherwise the cache snapshot while it matches the data file.
     Returns:
         List[Review]: A list of reviews.
     """
-    global _REVIEW_CACHE, _NEXT_REVIEW_ID
     if _REVIEW_CACHE is None:
-        review_dicts = _baseLoadAll(REVIEW_DATA_PATH)
-        _REVIEW_CACHE = [Review(**review) for review in review_dicts]
-
-        maxId = _getMaxReviewId(_REVIEW_CACHE)
-        _NEXT_REVIEW_ID = maxId + 1
+        with _REVIEW_LOAD_LOCK:
+            # another thread, such as the warm-up,
+            # may have filled it while we waited
+            if _REVIEW_CACHE is None:
+                with timedLoad(REVIEW_DATA_PATH):
+                    if not _loadFromSnapshot():
+                        _loadFromCacheSnapshot()
+                return _REVIEW_CACHE
+    recordHit(REVIEW_DATA_PATH)
     return _REVIEW_CACHE
 
 def getNextReviewId() -> int:
@@ -56,7 +169,28 @@ def loadReviews() -> List[Review]:
         List[Review]: A list of review items.
     """
     return _loadReviewCache()
-    
+
+async def loadReviewsAsync() -> List[Review]:
+    """
+    Load all reviews without blocking the event loop.
+
+    Served from the cache once it is warm; a cold cache is filled on a
+    worker thread, reading and validating included. Routes await this to
+    warm the cache before reading it through the sync loader, so no hit
+    is counted here.
+    Returns:
+        List[Review]: A list of review items.
+    """
+    if _REVIEW_CACHE is None:
+        return await anyio.to_thread.run_sync(_loadReviewCache)
+    return _REVIEW_CACHE
+
+def _dumpReviews(reviews: List[Review]) -> List[Dict[str, Any]]:
+    # runs on the write-behind thread, so wait out any mutation in progress
+    with REVIEW_WRITE_LOCK:
+        return dumpRecords(reviews)
+
+
 def saveReviews(reviews: List[Review]) -> None:
     """
     Save all reviews to the reviews data file.
@@ -71,7 +205,19 @@ def saveReviews(reviews: List[Review]) -> None:
     if _NEXT_REVIEW_ID is None or _NEXT_REVIEW_ID <= maxId:
         _NEXT_REVIEW_ID = maxId + 1
 
-    review_dict = [review.model_dump() for review in reviews]
+    if _baseDeferSave(REVIEW_DATA_PATH, lambda: _dumpReviews(reviews)):
+        return
+    review_dict = dumpRecords(reviews)
     _baseSaveAll(REVIEW_DATA_PATH, review_dict)
 
-__all__ = ["loadReviews", "saveReviews"]
\ No newline at end of file
+def getStorageStats() -> Dict[str, Any]:
+    """
+    Report the review cache: item count, estimated memory, load and save
+    counters.
+    """
+    return describeCache(REVIEW_DATA_PATH, _REVIEW_CACHE)
+
+
+__all__ = [
+    "loadReviews", "loadReviewsAsync", "saveReviews", "REVIEW_WRITE_LOCK"
+]
@@ -0,0 +1,395 @@
+"""
+Binary columnar snapshot format for the reviews collection.
+
+A snapshot stores each review field as its own column so a reader can mmap
+the file and pull values out without parsing JSON. Layout, with every
+header field and column value little-endian:
+
+    header   magic "SARV", version u16, column count u16, row count u64
+    directory one (offset u64, length u64) entry per column, in COLUMNS order
+    columns  8-byte aligned raw arrays
+
+Numeric columns are fixed-width arrays. Text columns are stored as a u64
+offsets array (row count + 1 entries) followed by a UTF-8 blob column.
+Posting dates repeat heavily, so they are stored once each in a date pool
+(offsets plus blob, like a text column) and every row keeps an i32 ref into
+it, -1 for no date.
+
+On little-endian hosts the columns are views straight over the mapping; a
+big-endian host reads byte-swapped copies instead.
+
+Opening a snapshot checks that every column lies inside the file and has
+one value per row, so a truncated file fails with SnapshotFormatError.
+ReviewSnapshot.validate also checks the text offsets and date refs, for
+callers that keep the columns without reading them. Review text is only
+decoded when a row is read, so damaged UTF-8 surfaces then.
+"""
+
+import mmap
+import operator
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+SNAPSHOT_MAGIC = b"SARV"
+SNAPSHOT_VERSION = 3
+
+_HEADER = struct.Struct("<4sHHQ")
+_DIRECTORY_ENTRY = struct.Struct("<QQ")
+_ALIGNMENT = 8
+# columns are little-endian on disk and swapped on big-endian hosts
+_SWAP_BYTES = sys.byteorder != "little"
+
+# (column name, array typecode) in file order
+COLUMNS: List[Tuple[str, str]] = [
+    ("id", "q"),
+    ("movieId", "q"),
+    ("userId", "q"),
+    ("rating", "b"),
+    # 1 = True, 0 = False, -1 = None
+    ("flagged", "b"),
+    ("usefulVotes", "i"),
+    ("totalVotes", "i"),
+    ("reviewTitleOffsets", "Q"),
+    ("reviewTitle", "B"),
+    ("reviewBodyOffsets", "Q"),
+    ("reviewBody", "B"),
+    ("datePoolOffsets", "Q"),
+    ("datePool", "B"),
+    # index into the date pool, -1 where datePosted is None
+    ("dateRefs", "i"),
+]
+
+TEXT_FIELDS = ["reviewTitle", "reviewBody"]
+
+
+class SnapshotFormatError(Exception):
+    """Raised when a file is not a readable review snapshot."""
+    pass
+
+
+def _field(review: Any, name: str) -> Any:
+    """
+    Read a field from a review dict or Review model.
+    """
+    if isinstance(review, dict):
+        return review.get(name)
+    return getattr(review, name)
+
+
+def writeReviewSnapshot(path: str | Path, reviews: Iterable[Any]) -> int:
+    """
+    Write reviews to a columnar snapshot file.
+
+    The reviews must already be validated; the reader trusts them.
+    Atomically writes to a temporary file first to avoid data corruption.
+    Args:
+        path (str | Path): Where to write the snapshot.
+        reviews (Iterable): Review models or review dicts.
+
+    Returns:
+        int: The number of reviews written.
+    """
+    columns = {name: array(typecode) for name, typecode in COLUMNS}
+    for field in TEXT_FIELDS + ["datePool"]:
+        columns[f"{field}Offsets"].append(0)
+    # date -> its index in the date pool
+    dateRefs: Dict[str, int] = {}
+
+    count = 0
+    for review in reviews:
+        columns["id"].append(_field(review, "id"))
+        columns["movieId"].append(_field(review, "movieId"))
+        columns["userId"].append(_field(review, "userId"))
+        columns["rating"].append(_field(review, "rating"))
+
+        flagged = _field(review, "flagged")
+        columns["flagged"].append(-1 if flagged is None else int(flagged))
+        columns["usefulVotes"].append(_field(review, "usefulVotes") or 0)
+        columns["totalVotes"].append(_field(review, "totalVotes") or 0)
+
+        datePosted = _field(review, "datePosted")
+        if datePosted is not None and datePosted not in dateRefs:
+            dateRefs[datePosted] = len(dateRefs)
+            columns["datePool"].frombytes(datePosted.encode("utf-8"))
+            columns["datePoolOffsets"].append(len(columns["datePool"]))
+        columns["dateRefs"].append(
+            -1 if datePosted is None else dateRefs[datePosted]
+        )
+
+        for field in TEXT_FIELDS:
+            text = _field(review, field) or ""
+            columns[field].frombytes(text.encode("utf-8"))
+            columns[f"{field}Offsets"].append(len(columns[field]))
+        count += 1
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_suffix(path.suffix + ".tmp")
+
+    headerSize = _HEADER.size + _DIRECTORY_ENTRY.size * len(COLUMNS)
+    directory = []
+    offset = headerSize
+    for name, _ in COLUMNS:
+        offset += -offset % _ALIGNMENT
+        length = len(columns[name]) * columns[name].itemsize
+        directory.append((offset, length))
+        offset += length
+
+    with temp.open("wb") as file:
+        file.write(_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(COLUMNS), count
+        ))
+        for entry in directory:
+            file.write(_DIRECTORY_ENTRY.pack(*entry))
+        for (name, _), (columnOffset, _) in zip(COLUMNS, directory):
+            file.write(b"\0" * (columnOffset - file.tell()))
+            column = columns[name]
+            if _SWAP_BYTES:
+                column.byteswap()
+            column.tofile(file)
+
+    temp.replace(path)
+    return count
+
+
+class ReviewSnapshot:
+    """
+    Read-only, memory-mapped view of a review snapshot file.
+
+    Columns are exposed as typed memoryviews over the mapping, so opening a
+    snapshot costs an mmap and a header read regardless of its size.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with self.path.open("rb") as file:
+            if self.path.stat().st_size < _HEADER.size:
+                raise SnapshotFormatError(
+                    f"Truncated review snapshot: {self.path}"
+                )
+            self._mmap = mmap.mmap(
+                file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+        self._buffer = memoryview(self._mmap)
+        self.columns: Dict[str, memoryview] = {}
+        # decoded date pool, filled on first use
+        self._dates: List[str] | None = None
+        try:
+            self._readDirectory()
+        except SnapshotFormatError:
+            self.close()
+            raise
+        except (struct.error, TypeError, ValueError) as error:
+            self.close()
+            raise SnapshotFormatError(
+                f"Damaged review snapshot: {self.path}"
+            ) from error
+
+    def _mapColumn(
+        self, offset: int, length: int, typecode: str
+    ) -> memoryview:
+        """
+        Return one column as a typed memoryview in native byte order.
+        """
+        column = self._buffer[offset : offset + length].cast(typecode)
+        if not _SWAP_BYTES or column.itemsize == 1:
+            return column
+        swapped = array(typecode, column)
+        column.release()
+        swapped.byteswap()
+        return memoryview(swapped)
+
+    def _readDirectory(self) -> None:
+        """
+        Parse the header and directory and map every column.
+
+        Raises:
+            SnapshotFormatError: If the file is not a complete version
+                SNAPSHOT_VERSION snapshot.
+        """
+        buffer = self._buffer
+        magic, version, columnCount, self._count = _HEADER.unpack_from(
+            buffer, 0
+        )
+        if (
+            magic != SNAPSHOT_MAGIC
+            or version != SNAPSHOT_VERSION
+            or columnCount != len(COLUMNS)
+        ):
+            raise SnapshotFormatError(
+                f"Not a version {SNAPSHOT_VERSION} review snapshot: "
+                f"{self.path}"
+            )
+        fileSize = len(buffer)
+        if fileSize < _HEADER.size + _DIRECTORY_ENTRY.size * len(COLUMNS):
+            raise SnapshotFormatError(
+                f"Truncated review snapshot: {self.path}"
+            )
+
+        for index, (name, typecode) in enumerate(COLUMNS):
+            offset, length = _DIRECTORY_ENTRY.unpack_from(
+                buffer, _HEADER.size + index * _DIRECTORY_ENTRY.size
+            )
+            if offset + length > fileSize:
+                raise SnapshotFormatError(
+                    f"Truncated review snapshot: {self.path}"
+                )
+            self.columns[name] = self._mapColumn(offset, length, typecode)
+
+        # the date pool has one entry per distinct date, not per row
+        perRowColumns = [
+            name for name, _ in COLUMNS
+            if name not in TEXT_FIELDS and not name.startswith("datePool")
+        ]
+        for name in perRowColumns:
+            expected = self._count
+            if name.endswith("Offsets"):
+                expected += 1
+            if len(self.columns[name]) != expected:
+                raise SnapshotFormatError(
+                    f"Column {name} has the wrong length in {self.path}"
+                )
+        for field in TEXT_FIELDS + ["datePool"]:
+            offsets = self.columns[f"{field}Offsets"]
+            if (
+                not offsets
+                or offsets[0] != 0
+                or offsets[-1] != len(self.columns[field])
+            ):
+                raise SnapshotFormatError(
+                    f"Column {field} has bad offsets in {self.path}"
+                )
+
+    def validate(self) -> None:
+        """
+        Check that text offsets never go backwards and date refs are in range.
+
+        Reads every offset and date ref once but no review text, which is
+        decoded when its row is read.
+        Raises:
+            SnapshotFormatError: If a text or date column is damaged.
+        """
+        for field in TEXT_FIELDS + ["datePool"]:
+            offsets = self.columns[f"{field}Offsets"].tolist()
+            if not all(map(operator.le, offsets, offsets[1:])):
+                raise SnapshotFormatError(
+                    f"Column {field} has bad offsets in {self.path}"
+                )
+        refs = self.columns["dateRefs"]
+        if refs and (min(refs) < -1 or max(refs) >= len(self.dates())):
+            raise SnapshotFormatError(
+                f"Column dateRefs is out of range in {self.path}"
+            )
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _decode(self, field: str, start: int, end: int) -> str:
+        try:
+            return str(self.columns[field][start:end], "utf-8")
+        except UnicodeDecodeError as error:
+            raise SnapshotFormatError(
+                f"Column {field} is not valid UTF-8 in {self.path}"
+            ) from error
+
+    def text(self, field: str, index: int) -> str:
+        """
+        Decode one text value without touching the rest of the column.
+        """
+        offsets = self.columns[f"{field}Offsets"]
+        return self._decode(field, offsets[index], offsets[index + 1])
+
+    def dates(self) -> List[str]:
+        """
+        Return the date pool, decoded once; dateRefs index into it.
+        """
+        if self._dates is None:
+            offsets = self.columns["datePoolOffsets"].tolist()
+            self._dates = [
+                self._decode("datePool", start, end)
+                for start, end in zip(offsets, offsets[1:])
+            ]
+        return self._dates
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """
+        Return one review as a dict shaped like Review.model_dump().
+        """
+        columns = self.columns
+        flagged = columns["flagged"][index]
+        dateRef = columns["dateRefs"][index]
+        return {
+            "id": columns["id"][index],
+            "movieId": columns["movieId"][index],
+            "userId": columns["userId"][index],
+            "reviewTitle": self.text("reviewTitle", index),
+            "reviewBody": self.text("reviewBody", index),
+            "rating": columns["rating"][index],
+            "datePosted": None if dateRef == -1 else self.dates()[dateRef],
+            "flagged": None if flagged == -1 else bool(flagged),
+            "usefulVotes": columns["usefulVotes"][index],
+            "totalVotes": columns["totalVotes"][index],
+        }
+
+    def _texts(self, field: str) -> Iterator[str]:
+        """
+        Decode a whole text column in row order.
+        """
+        offsets = self.columns[f"{field}Offsets"].tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield self._decode(field, start, end)
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every review as a dict, reading each column sequentially.
+        """
+        columns = self.columns
+        dates = self.dates()
+        for rowValues in zip(
+            columns["id"].tolist(),
+            columns["movieId"].tolist(),
+            columns["userId"].tolist(),
+            self._texts("reviewTitle"),
+            self._texts("reviewBody"),
+            columns["rating"].tolist(),
+            columns["dateRefs"].tolist(),
+            columns["flagged"].tolist(),
+            columns["usefulVotes"].tolist(),
+            columns["totalVotes"].tolist(),
+        ):
+            (
+                reviewId, movieId, userId, title, body, rating,
+                dateRef, flagged, usefulVotes, totalVotes,
+            ) = rowValues
+            yield {
+                "id": reviewId,
+                "movieId": movieId,
+                "userId": userId,
+                "reviewTitle": title,
+                "reviewBody": body,
+                "rating": rating,
+                "datePosted": None if dateRef == -1 else dates[dateRef],
+                "flagged": None if flagged == -1 else bool(flagged),
+                "usefulVotes": usefulVotes,
+                "totalVotes": totalVotes,
+            }
+
+    def close(self) -> None:
+        """
+        Release the column views and the mapping.
+
+        A ReviewStore built with ReviewStore.fromSnapshot reads through the
+        column views, so the snapshot must stay open while the store does.
+        """
+        for column in self.columns.values():
+            column.release()
+        self.columns = {}
+        self._buffer.release()
+        self._mmap.close()
+
+
+__all__ = ["writeReviewSnapshot", "ReviewSnapshot", "SnapshotFormatError"]
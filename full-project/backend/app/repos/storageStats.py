@@ -0,0 +1,228 @@
+"""
+Counters and memory estimates for the repo caches, for sizing workers.
+
+Each data file gets a StorageStats: how often its cache was served warm
+(hits) or had to be filled (misses), how long the last fill took (read,
+parse and validation), bytes read and written, and how many saves there
+were and how long they took. The counters are updated by _baseLoadAll,
+_baseSaveAll and the repos' cache loaders; describeCache adds the item
+count and an estimated memory footprint of a live cache.
+"""
+
+import sys
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from types import FunctionType, ModuleType
+from typing import Any, Dict, List
+
+# collections longer than this are measured from a sample of their items
+MEMORY_SAMPLE_SIZE = 200
+
+_ATOMIC_TYPES = (
+    str,
+    bytes,
+    bytearray,
+    int,
+    float,
+    bool,
+    complex,
+    type(None),
+    array,
+    memoryview,
+)
+_SKIPPED_TYPES = (
+    type,
+    FunctionType,
+    ModuleType,
+    type(threading.Lock()),
+    type(threading.RLock()),
+)
+
+
+class StorageStats:
+    """
+    Cache and file counters of one data file.
+    """
+
+    __slots__ = (
+        "hits", "misses", "loads", "lastLoadSeconds", "bytesRead",
+        "saves", "lastSaveSeconds", "totalSaveSeconds", "bytesWritten",
+    )
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.lastLoadSeconds = 0.0
+        self.bytesRead = 0
+        self.saves = 0
+        self.lastSaveSeconds = 0.0
+        self.totalSaveSeconds = 0.0
+        self.bytesWritten = 0
+
+    def asDict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+# data file path -> its counters
+_STATS: Dict[Path, StorageStats] = {}
+_STATS_LOCK = threading.Lock()
+
+
+def statsFor(path: Path) -> StorageStats:
+    """
+    Return the counters of a data file, creating them on first use.
+    """
+    stats = _STATS.get(path)
+    if stats is None:
+        with _STATS_LOCK:
+            stats = _STATS.setdefault(path, StorageStats())
+    return stats
+
+
+def resetStats() -> None:
+    with _STATS_LOCK:
+        _STATS.clear()
+
+
+def recordHit(path: Path) -> None:
+    # unlocked: a lost increment under contention only blurs a statistic
+    statsFor(path).hits += 1
+
+
+def recordRead(path: Path, size: int) -> None:
+    stats = statsFor(path)
+    with _STATS_LOCK:
+        stats.bytesRead += size
+
+
+def recordSave(path: Path, seconds: float, size: int) -> None:
+    stats = statsFor(path)
+    with _STATS_LOCK:
+        stats.saves += 1
+        stats.lastSaveSeconds = seconds
+        stats.totalSaveSeconds += seconds
+        stats.bytesWritten += size
+
+
+@contextmanager
+def timedLoad(path: Path):
+    """
+    Count a cache miss and time the block that fills the cache.
+    """
+    stats = statsFor(path)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _STATS_LOCK:
+            stats.misses += 1
+            stats.loads += 1
+            stats.lastLoadSeconds = elapsed
+
+
+def estimateMemory(value: Any, sampleSize: int = MEMORY_SAMPLE_SIZE) -> int:
+    """
+    Estimate the bytes held by an object and everything it references.
+
+    Containers longer than sampleSize are measured from a sample of their items
+    (evenly spaced for lists and tuples, the first ones otherwise) and scaled
+    up; objects reachable twice are counted once within a sample. Classes,
+    functions, modules and locks are not counted.
+
+    Returns:
+        int: The estimate in bytes.
+    """
+    seen = set()
+
+    def sizeOf(item: Any) -> float:
+        if isinstance(item, _SKIPPED_TYPES) or id(item) in seen:
+            return 0
+        seen.add(id(item))
+        size = sys.getsizeof(item)
+        if isinstance(item, _ATOMIC_TYPES):
+            return size
+        if isinstance(item, (dict, list, tuple, set, frozenset)):
+            length = len(item)
+            try:
+                if isinstance(item, (list, tuple)):
+                    step = max(length / sampleSize, 1)
+                    children = [
+                        item[int(position * step)]
+                        for position in range(min(length, sampleSize))
+                    ]
+                else:
+                    # no random access: the first items stand in for the rest
+                    children = list(
+                        islice(
+                            item.items() if isinstance(item, dict) else item,
+                            sampleSize,
+                        )
+                    )
+            except (RuntimeError, IndexError):
+                # resized by a writer while we
+                # looked; count the container alone
+                return size
+            if isinstance(item, dict):
+                total = sum(
+                    sizeOf(key) + sizeOf(child) for key, child in children
+                )
+            else:
+                total = sum(sizeOf(child) for child in children)
+            return size + total * length / max(len(children), 1)
+        attributes = getattr(item, "__dict__", None)
+        if attributes is not None:
+            size += sizeOf(attributes)
+        for slotName in _slotNames(type(item)):
+            size += sizeOf(getattr(item, slotName, None))
+        return size
+
+    return int(sizeOf(value))
+
+
+def _slotNames(cls: type) -> List[str]:
+    names = []
+    for base in cls.__mro__:
+        slots = base.__dict__.get("__slots__", ())
+        names += (
+            [slots]
+            if isinstance(slots, str)
+            else [
+                name
+                for name in slots
+                if name not in ("__dict__", "__weakref__")
+            ]
+        )
+    return names
+
+
+def describeCache(path: Path, cache: Any) -> Dict[str, Any]:
+    """
+    Report one repo: its file, whether the cache is loaded, item count,
+    estimated memory and counters.
+    """
+    return {
+        "file": path.name,
+        "cached": cache is not None,
+        "items": len(cache) if cache is not None else 0,
+        "memoryBytes": estimateMemory(cache) if cache is not None else 0,
+        **statsFor(path).asDict(),
+    }
+
+
+__all__ = [
+    "StorageStats",
+    "statsFor",
+    "resetStats",
+    "recordHit",
+    "recordRead",
+    "recordSave",
+    "timedLoad",
+    "estimateMemory",
+    "describeCache",
+]
@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+import app.repos.adjacency as adjacencyModule
+import app.repos.favoritesRepo as favoritesRepo
+import app.repos.likeReviewRepo as likeReviewRepo
+from app.repos.adjacency import Adjacency, EdgeIndex
+
+
+@pytest.fixture
+def samplePairs():
+    # (userId, reviewId)
+    return [(1, 10), (1, 12), (2, 10), (3, 11), (1, 11), (2, 10)]
+
+
+def testAdjacencyListsSortedNeighboursAndDegrees(samplePairs):
+    adjacency = Adjacency(samplePairs)
+
+    assert list(adjacency.neighbours(1)) == [10, 11, 12]
+    assert list(adjacency.neighbours(2)) == [10]
+    assert list(adjacency.neighbours(99)) == []
+    assert adjacency.degree(1) == 3
+    assert adjacency.degree(0) == 0
+    assert len(adjacency) == 5
+
+
+def testAdjacencyMembership(samplePairs):
+    adjacency = Adjacency(samplePairs)
+
+    assert adjacency.contains(1, 11)
+    assert not adjacency.contains(1, 13)
+    assert not adjacency.contains(4, 10)
+    assert not adjacency.contains(-1, 10)
+
+
+def testAdjacencyAddAndRemove(samplePairs):
+    adjacency = Adjacency(samplePairs)
+
+    assert adjacency.add(1, 5) is True
+    assert adjacency.add(1, 5) is False
+    assert adjacency.add(7, 1) is True
+    assert adjacency.remove(2, 10) is True
+    assert adjacency.remove(2, 10) is False
+
+    assert list(adjacency.neighbours(1)) == [5, 10, 11, 12]
+    assert list(adjacency.neighbours(7)) == [1]
+    assert adjacency.degree(2) == 0
+    assert list(adjacency.keys()) == [1, 3, 7]
+    assert len(adjacency) == 6
+
+
+def testAdjacencyCompactsOverlay(monkeypatch, samplePairs):
+    monkeypatch.setattr(adjacencyModule, "COMPACT_THRESHOLD", 2)
+    adjacency = Adjacency(samplePairs)
+
+    adjacency.add(4, 1)
+    adjacency.add(5, 1)
+    adjacency.add(6, 1)
+
+    assert adjacency._overrides == {}
+    assert list(adjacency.pairs()) == sorted(
+        set(samplePairs) | {(4, 1), (5, 1), (6, 1)}
+    )
+
+
+def testAdjacencyPairsFromSkipsEarlierKeysAndSeesLaterEdits(samplePairs):
+    adjacency = Adjacency(samplePairs)
+    adjacency.add(5, 1)
+
+    pairs = adjacency.pairsFrom(2)
+    assert next(pairs) == (2, 10)
+    adjacency.add(1, 99)
+    adjacency.add(3, 12)
+
+    assert list(pairs) == [(3, 11), (3, 12), (5, 1)]
+    assert list(adjacency.pairsFrom(0)) == list(adjacency.pairs())
+
+
+def testAdjacencyRejectsNegativeKeys():
+    with pytest.raises(ValueError):
+        Adjacency([(-1, 3)])
+
+
+def testEdgeIndexKeepsBothDirectionsInStep(samplePairs):
+    index = EdgeIndex(samplePairs)
+
+    assert list(index.backward.neighbours(10)) == [1, 2]
+    assert index.add(3, 10) is True
+    assert index.backward.degree(10) == 3
+    assert index.remove(1, 10) is True
+    assert list(index.backward.neighbours(10)) == [2, 3]
+    assert index.contains(3, 10)
+    assert index.dumpRows("userId", "reviewId")[:2] == [
+        {"userId": 1, "reviewId": 11},
+        {"userId": 1, "reviewId": 12},
+    ]
+
+
+def testLikeEdgesPersistThroughIndex(tmp_path, monkeypatch):
+    likeFile = tmp_path / "likeReviews.json"
+    likeFile.write_text(json.dumps([{"userId": 1, "reviewId": 10}]))
+    monkeypatch.setattr(likeReviewRepo, "FILE", likeFile)
+    monkeypatch.setattr(likeReviewRepo, "_LIKE_INDEX", None)
+
+    assert likeReviewRepo.addLikeEdge(2, 10) is True
+    assert likeReviewRepo.addLikeEdge(2, 10) is False
+    assert likeReviewRepo.removeLikeEdge(1, 10) is True
+    assert likeReviewRepo.removeLikeEdge(1, 10) is False
+
+    assert json.loads(likeFile.read_text()) == [{"userId": 2, "reviewId": 10}]
+    assert list(likeReviewRepo.loadLikeIndex().backward.neighbours(10)) == [2]
+
+
+def testSavingFavoritesListResetsIndex(tmp_path, monkeypatch):
+    favoriteFile = tmp_path / "favorites.json"
+    favoriteFile.write_text(json.dumps([{"userId": 1, "movieId": 3}]))
+    monkeypatch.setattr(favoritesRepo, "FILE", favoriteFile)
+    monkeypatch.setattr(favoritesRepo, "_FAVORITE_INDEX", None)
+
+    assert favoritesRepo.loadFavoriteIndex().contains(1, 3)
+
+    favoritesRepo.saveFavorites([])
+
+    assert not favoritesRepo.loadFavoriteIndex().contains(1, 3)
@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from app.repos.annIndex import HnswIndex, sparseDot
+
+
+def normalize(vector):
+    norm = sum(weight * weight for weight in vector.values()) ** 0.5
+    return {term: weight / norm for term, weight in vector.items()}
+
+
+@pytest.fixture
+def vectors():
+    generator = random.Random(5)
+    return {
+        key: normalize(
+            {
+                f"t{term}": generator.random()
+                for term in generator.sample(range(30), 6)
+            }
+        )
+        for key in range(1, 301)
+    }
+
+
+def exactTop(vectors, key, limit):
+    scored = [
+        (other, sparseDot(vectors[key], vector))
+        for other, vector in vectors.items()
+        if other != key
+    ]
+    return {
+        other for other, _ in sorted(scored, key=lambda item: -item[1])[:limit]
+    }
+
+
+def testSearchFindsNearestNeighbours(vectors):
+    index = HnswIndex()
+    for key, vector in vectors.items():
+        index.add(key, vector)
+
+    hits = sum(
+        len(
+            exactTop(vectors, key, 5)
+            & {
+                other
+                for other, _ in index.search(vectors[key], 5, exclude=(key,))
+            }
+        )
+        for key in range(1, 51)
+    )
+
+    assert len(index) == 300
+    assert hits / 250 > 0.9
+
+
+def testRemovedAndReplacedKeysAreNotReturnedStale(vectors):
+    index = HnswIndex()
+    for key, vector in vectors.items():
+        index.add(key, vector)
+
+    assert index.remove(7)
+    assert not index.remove(7)
+    assert 7 not in index
+    assert all(key != 7 for key, _ in index.search(vectors[7], 10))
+
+    index.add(8, {"only": 1.0})
+    assert index.search({"only": 1.0}, 1) == [(8, 1.0)]
+
+
+def testRebuildDropsTombstones(vectors):
+    index = HnswIndex()
+    for key, vector in vectors.items():
+        index.add(key, vector)
+    for key in range(1, 101):
+        index.remove(key)
+
+    assert len(index) == 200
+    assert len(index.dumpRows()) < 300
+    assert all(key > 100 for key, _ in index.search(vectors[1], 20))
+
+
+def testRowsRoundTrip(vectors):
+    index = HnswIndex()
+    for key, vector in vectors.items():
+        index.add(key, vector)
+    index.remove(3)
+
+    restored = HnswIndex.fromRows(index.dumpRows(), vectors)
+
+    assert len(restored) == len(index)
+    assert 3 not in restored
+    for key in (1, 50, 200):
+        assert restored.search(
+            vectors[key], 5, exclude=(key,)
+        ) == index.search(vectors[key], 5, exclude=(key,))
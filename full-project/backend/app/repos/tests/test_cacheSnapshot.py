@@ -0,0 +1,199 @@
+import json
+import os
+import pickle
+
+import pytest
+
+import app.repos.cacheSnapshot as cacheSnapshot
+import app.repos.likeReviewRepo as likeReviewRepo
+import app.repos.movieRepo as movieRepo
+import app.repos.repo as repo
+import app.repos.reviewRepo as reviewRepo
+from app.repos.cacheSnapshot import (
+    loadSnapshot,
+    saveSnapshot,
+    schemaFingerprint,
+    snapshotPath,
+)
+from app.schemas.movie import Movie
+from app.schemas.review import Review
+
+
+@pytest.fixture(autouse=True)
+def snapshotsEnabled(monkeypatch):
+    monkeypatch.setattr(cacheSnapshot, "CACHE_SNAPSHOTS", True)
+
+
+@pytest.fixture
+def moviesFile(tmp_path, monkeypatch):
+    path = tmp_path / "movies.json"
+    path.write_text(json.dumps([
+        {"id": 1, "title": "A", "movieGenres": ["Drama"], "duration": 90},
+        {"id": 2, "title": "B", "movieGenres": ["Comedy"], "duration": 100},
+    ]), encoding="utf-8")
+    monkeypatch.setattr(movieRepo, "MOVIE_DATA_PATH", path)
+    monkeypatch.setattr(movieRepo, "_MOVIE_CACHE", None)
+    monkeypatch.setattr(movieRepo, "_NEXT_MOVIE_ID", None)
+    return path
+
+
+def failingLoad(datafile):
+    raise AssertionError("JSON should not be read")
+
+
+def coldLoadMovies(monkeypatch):
+    monkeypatch.setattr(movieRepo, "_MOVIE_CACHE", None)
+    monkeypatch.setattr(movieRepo, "_NEXT_MOVIE_ID", None)
+    return movieRepo.loadMovies()
+
+
+def testColdLoadWritesSnapshotAndNextStartSkipsJson(moviesFile, monkeypatch):
+    movies = movieRepo.loadMovies()
+    assert snapshotPath(moviesFile).exists()
+
+    monkeypatch.setattr(movieRepo, "_baseLoadAll", failingLoad)
+    reloaded = coldLoadMovies(monkeypatch)
+
+    assert [movie.model_dump() for movie in reloaded] == [
+        movie.model_dump() for movie in movies
+    ]
+    assert movieRepo.getNextMovieId() == 3
+
+
+def testChangedDataFileFallsBackToJson(moviesFile, monkeypatch):
+    movieRepo.loadMovies()
+    moviesFile.write_text(json.dumps([
+        {"id": 7, "title": "C", "movieGenres": ["Horror"], "duration": 80},
+    ]), encoding="utf-8")
+
+    movies = coldLoadMovies(monkeypatch)
+
+    assert [movie.id for movie in movies] == [7]
+    # the rewritten snapshot now matches the new file
+    rows, sourceKey = loadSnapshot(
+        moviesFile, movieRepo._MOVIE_SNAPSHOT_SCHEMA
+    )
+    assert [row["id"] for row in rows] == [7] and sourceKey is None
+
+
+def testTouchedButUnchangedFileKeepsItsSnapshot(moviesFile, monkeypatch):
+    movieRepo.loadMovies()
+    stat = moviesFile.stat()
+    os.utime(moviesFile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    monkeypatch.setattr(movieRepo, "_baseLoadAll", failingLoad)
+    assert [movie.id for movie in coldLoadMovies(monkeypatch)] == [1, 2]
+
+
+def testSchemaOrFormatChangeInvalidatesSnapshot(moviesFile, monkeypatch):
+    movieRepo.loadMovies()
+
+    assert (
+        loadSnapshot(moviesFile, schemaFingerprint("rows", Review))[0] is None
+    )
+    monkeypatch.setattr(
+        cacheSnapshot,
+        "SNAPSHOT_FORMAT_VERSION",
+        cacheSnapshot.SNAPSHOT_FORMAT_VERSION + 1,
+    )
+    assert (
+        loadSnapshot(moviesFile, movieRepo._MOVIE_SNAPSHOT_SCHEMA)[0] is None
+    )
+
+
+def testCorruptSnapshotIsIgnored(moviesFile, monkeypatch):
+    movieRepo.loadMovies()
+    snapshotPath(moviesFile).write_bytes(b"not a pickle")
+
+    assert [movie.id for movie in coldLoadMovies(monkeypatch)] == [1, 2]
+    assert (
+        loadSnapshot(moviesFile, movieRepo._MOVIE_SNAPSHOT_SCHEMA)[0]
+        is not None
+    )
+
+
+def testNothingIsWrittenWhileDisabledOrASaveIsPending(moviesFile, monkeypatch):
+    monkeypatch.setattr(cacheSnapshot, "CACHE_SNAPSHOTS", False)
+    movieRepo.loadMovies()
+    assert not snapshotPath(moviesFile).exists()
+
+    monkeypatch.setattr(cacheSnapshot, "CACHE_SNAPSHOTS", True)
+    monkeypatch.setitem(repo._PENDING_SAVES, moviesFile, lambda: [])
+    assert loadSnapshot(moviesFile, movieRepo._MOVIE_SNAPSHOT_SCHEMA) == (
+        None,
+        None,
+    )
+    assert (
+        saveSnapshot(moviesFile, movieRepo._MOVIE_SNAPSHOT_SCHEMA, None, [])
+        is False
+    )
+
+
+def testReviewStoreAndLikeIndexRoundTrip(tmp_path, monkeypatch):
+    reviewsFile = tmp_path / "reviews.json"
+    reviewsFile.write_text(
+        json.dumps(
+            [
+                {
+                    "id": 1,
+                    "movieId": 10,
+                    "userId": 5,
+                    "reviewTitle": "Great film",
+                    "reviewBody": "Loved every minute of it.",
+                    "rating": 9,
+                    "datePosted": "2025-01-12",
+                },
+            ]
+        ),
+        encoding="utf-8",
+    )
+    likesFile = tmp_path / "likeReviews.json"
+    likesFile.write_text(
+        json.dumps(
+            [{"userId": 5, "reviewId": 1}, {"userId": 6, "reviewId": 1}]
+        ),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(reviewRepo, "REVIEW_DATA_PATH", reviewsFile)
+    monkeypatch.setattr(likeReviewRepo, "FILE", likesFile)
+
+    for repoModule, cacheName in (
+        (reviewRepo, "_REVIEW_CACHE"),
+        (likeReviewRepo, "_LIKE_INDEX"),
+    ):
+        monkeypatch.setattr(repoModule, cacheName, None)
+    reviews = reviewRepo.loadReviews()
+    reviews.encoded(0)
+    likeReviewRepo.loadLikeIndex()
+
+    with snapshotPath(reviewsFile).open("rb") as file:
+        pickle.load(file)
+        store = pickle.load(file)
+    assert list(store) == list(reviews)
+    assert store._encoded == {}
+
+    monkeypatch.setattr(reviewRepo, "_REVIEW_CACHE", None)
+    monkeypatch.setattr(likeReviewRepo, "_LIKE_INDEX", None)
+    monkeypatch.setattr(reviewRepo, "_baseLoadAll", failingLoad)
+    monkeypatch.setattr(likeReviewRepo, "_baseLoadAll", failingLoad)
+
+    store = reviewRepo.loadReviews()
+    assert reviewRepo.getNextReviewId() == 2
+    # the unpickled store has a working lock of its own
+    store.append(Review(id=2, movieId=10, userId=6, reviewTitle="Not for me",
+                        reviewBody="Too long and too loud.", rating=3))
+    assert [review.id for review in store] == [1, 2]
+    assert sorted(likeReviewRepo.loadLikeIndex().backward.neighbours(1)) == [
+        5,
+        6,
+    ]
+
+
+def testSchemaFingerprintFollowsModelFields():
+    assert schemaFingerprint("rows", Movie) == schemaFingerprint("rows", Movie)
+    assert schemaFingerprint("rows", Movie) != schemaFingerprint(
+        "rows", Review
+    )
+    assert schemaFingerprint("rows", Movie) != schemaFingerprint(
+        "edgeIndex", Movie
+    )
@@ -0,0 +1,275 @@
+import pytest
+
+import app.repos.compactStore as compactStoreModule
+from app.repos.compactStore import EdgeStore, ReviewStore
+from app.repos.lazyRecords import dumpRecords, findIndex, selectWhere
+from app.repos.reviewSnapshot import ReviewSnapshot, writeReviewSnapshot
+from app.schemas.favorites import Favorite
+from app.schemas.likedReviews import LikedReview
+from app.schemas.review import Review
+
+
+@pytest.fixture
+def sampleReviews():
+    return [
+        Review(
+            id=1,
+            movieId=7,
+            userId=3,
+            reviewTitle="Great",
+            reviewBody="Loved every minute",
+            rating=9,
+            datePosted="4 January 2021",
+            flagged=False,
+        ),
+        Review(
+            id=2,
+            movieId=8,
+            userId=4,
+            reviewTitle="Ça va",
+            reviewBody="Nicht schlecht 🎬",
+            rating=5,
+            datePosted=None,
+            flagged=True,
+        ),
+        Review(
+            id=3,
+            movieId=7,
+            userId=5,
+            reviewTitle="Bad",
+            reviewBody="Walked out early",
+            rating=2,
+            datePosted="4 January 2021",
+            flagged=None,
+        ),
+    ]
+
+
+def testReviewStoreRoundTripsReviews(sampleReviews):
+    store = ReviewStore(sampleReviews)
+
+    assert len(store) == 3
+    assert store == sampleReviews
+    assert isinstance(store[1], Review)
+    assert store[-1] == sampleReviews[-1]
+    assert store[0:2] == sampleReviews[0:2]
+    assert dumpRecords(store) == [
+        review.model_dump() for review in sampleReviews
+    ]
+
+
+def testReviewStoreInternsDates(sampleReviews):
+    store = ReviewStore(sampleReviews)
+
+    assert store._datePool == ["4 January 2021"]
+    assert list(store._dateRefs) == [0, -1, 0]
+
+
+def testReviewStoreSupportsListEdits(sampleReviews):
+    store = ReviewStore(sampleReviews)
+
+    store[0] = sampleReviews[0].model_copy(
+        update={"reviewTitle": "Even better", "flagged": True}
+    )
+    del store[1]
+    store.insert(0, sampleReviews[1])
+    store.append(
+        Review(
+            id=4,
+            movieId=9,
+            userId=1,
+            reviewTitle="New one",
+            reviewBody="Brand new review",
+            rating=6,
+        )
+    )
+
+    assert [review.id for review in store] == [2, 1, 3, 4]
+    assert store[1].reviewTitle == "Even better"
+    assert store[1].flagged is True
+    assert store[0].reviewBody == "Nicht schlecht 🎬"
+
+
+def testReviewStoreColumnsWorkWithLookupHelpers(sampleReviews):
+    store = ReviewStore(sampleReviews)
+
+    assert findIndex(store, "id", 3) == 2
+    assert findIndex(store, "id", 42) == -1
+    assert [
+        review.id
+        for review in selectWhere(
+            store, "movieId", lambda movieId: movieId == 7
+        )
+    ] == [1, 3]
+    assert [review.id for review in selectWhere(store, "flagged", bool)] == [2]
+    assert store.value(1, "reviewTitle") == "Ça va"
+
+
+def testReviewStoreLoadsFromSnapshot(tmp_path, sampleReviews):
+    snapshotPath = tmp_path / "reviews.bin"
+    writeReviewSnapshot(snapshotPath, sampleReviews)
+
+    snapshot = ReviewSnapshot(snapshotPath)
+    try:
+        store = ReviewStore.fromSnapshot(snapshot)
+        # read in place from the mapping until the first write
+        assert store.column("movieId") is snapshot.columns["movieId"]
+        assert store == sampleReviews
+
+        store.append(Review(
+            id=4, movieId=9, userId=1, reviewTitle="Added later",
+            reviewBody="After the snapshot", rating=6,
+        ))
+    finally:
+        snapshot.close()
+
+    assert store[:3] == sampleReviews
+    assert store[3].reviewTitle == "Added later"
+
+
+def testReviewStoreIsSmallerThanModels(sampleReviews):
+    store = ReviewStore(sampleReviews * 100)
+
+    assert store.nbytes() < 100 * 3 * 200
+
+
+def testReviewStoreCompactsReplacedAndDeletedText(sampleReviews):
+    store = ReviewStore(sampleReviews)
+    bodyBytes = len(store._text["reviewBody"])
+
+    for _ in range(10):
+        store[0] = sampleReviews[0].model_copy(
+            update={"reviewBody": "Loved every minute, again"}
+        )
+
+    # never more than about as much dead text as live text
+    assert len(store._text["reviewBody"]) < 2 * bodyBytes + 2 * len(
+        "Loved every minute, again"
+    )
+    assert store[0].reviewBody == "Loved every minute, again"
+    assert store[1:] == sampleReviews[1:]
+
+    del store[0]
+    store.compact()
+
+    assert store._deadBytes == {"reviewTitle": 0, "reviewBody": 0}
+    assert bytes(store._text["reviewTitle"]) == "Ça vaBad".encode("utf-8")
+    assert store == sampleReviews[1:]
+
+    del store[:]
+    store.compact()
+    assert len(store._text["reviewBody"]) == 0 and len(store) == 0
+    store.append(sampleReviews[2])
+    assert store == sampleReviews[2:]
+
+
+def testEdgeStoreRoundTripsLinks():
+    likes = [
+        LikedReview(userId=1, reviewId=10),
+        LikedReview(userId=2, reviewId=10),
+    ]
+    store = EdgeStore(LikedReview, likes)
+
+    store.append(LikedReview(userId=1, reviewId=11))
+    del store[1]
+
+    assert store == [
+        LikedReview(userId=1, reviewId=10),
+        LikedReview(userId=1, reviewId=11),
+    ]
+    assert list(store.column("reviewId")) == [10, 11]
+    assert dumpRecords(store) == [
+        {"userId": 1, "reviewId": 10},
+        {"userId": 1, "reviewId": 11},
+    ]
+    assert store.nbytes() == 32
+
+
+def testEdgeStoreUsesModelFieldOrder():
+    store = EdgeStore(Favorite, [{"userId": 3, "movieId": 7}])
+
+    assert store.fields == ("userId", "movieId")
+    assert store[0] == Favorite(userId=3, movieId=7)
+
+
+def testEdgeStoreRejectsWideModels():
+    with pytest.raises(ValueError):
+        EdgeStore(Review)
+
+
+def testReviewStoreFromRowsMatchesAppending(sampleReviews):
+    rows = [review.model_dump() for review in sampleReviews]
+
+    store = ReviewStore.fromRows(rows)
+    store.append(
+        Review(
+            id=4,
+            movieId=9,
+            userId=1,
+            reviewTitle="Added later",
+            reviewBody="After the bulk load",
+            rating=6,
+        )
+    )
+
+    assert store[:3] == sampleReviews
+    assert store._datePool == ["4 January 2021"]
+    assert store[3].reviewBody == "After the bulk load"
+
+
+def testReviewStoreFindsIdsBySearchOrScan(sampleReviews):
+    store = ReviewStore.fromRows(
+        [review.model_dump() for review in sampleReviews]
+    )
+
+    assert store.indexOf(3) == 2
+    assert store.indexOf(4) == -1
+    assert findIndex(store, "id", 2) == 1
+    assert findIndex(store, "id", "2") == -1
+
+    store.append(sampleReviews[0].model_copy(update={"id": 0}))
+
+    assert store._idsSorted is False
+    assert store.indexOf(0) == 3
+    assert store.indexOf(3) == 2
+
+
+def testReviewStoreKeepsVoteCounts(sampleReviews):
+    voted = sampleReviews[0].model_copy(
+        update={"usefulVotes": 34, "totalVotes": 51}
+    )
+    store = ReviewStore(
+        [
+            voted,
+            {
+                **sampleReviews[1].model_dump(),
+                "usefulVotes": None,
+                "totalVotes": None,
+            },
+        ]
+    )
+
+    assert store[0].usefulVotes == 34
+    assert list(store.column("totalVotes")) == [51, 0]
+
+
+def testReviewStoreCachesEncodingsUntilRowsChange(monkeypatch, sampleReviews):
+    monkeypatch.setattr(compactStoreModule, "ENCODED_CACHE_ROWS", 2)
+    store = ReviewStore(sampleReviews)
+
+    assert [store.encoded(index) for index in range(3)] == [
+        review.model_dump_json().encode() for review in sampleReviews
+    ]
+    assert (
+        len(store._encoded) == 2
+    )  # the least recently served one was dropped
+    assert store.encoded(2) is store.encoded(2)
+
+    store[2] = sampleReviews[2].model_copy(update={"rating": 10})
+    assert b'"rating":10' in store.encoded(2)
+
+    del store[0]
+    store.insert(
+        0, sampleReviews[0].model_copy(update={"reviewTitle": "Changed"})
+    )
+    assert b'"reviewTitle":"Changed"' in store.encoded(0)
@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from app.repos.factorModel import (
+    FactorFormatError,
+    FactorModel,
+    trainFactorModel,
+)
+
+
+@pytest.fixture
+def clusteredInteractions():
+    # users 1-3 like movies 10-12, users 4-6 like movies 20-22
+    interactions = []
+    for userId in (1, 2, 3):
+        interactions += [(userId, movieId, 1.0) for movieId in (10, 11, 12)]
+    for userId in (4, 5, 6):
+        interactions += [(userId, movieId, 1.0) for movieId in (20, 21, 22)]
+    # user 7 has only seen movie 10
+    interactions.append((7, 10, 1.0))
+    return interactions
+
+
+def testLowRankMatrixIsReconstructed():
+    rng = random.Random(3)
+    userTastes = [[rng.random(), rng.random()] for _ in range(20)]
+    movieTraits = [[rng.random(), rng.random()] for _ in range(12)]
+    interactions = [
+        (
+            userId,
+            movieId,
+            sum(
+                a * b for a, b in zip(userTastes[userId], movieTraits[movieId])
+            ),
+        )
+        for userId in range(20)
+        for movieId in range(12)
+    ]
+
+    model = trainFactorModel(interactions, rank=2)
+
+    assert model.rank == 2
+    for userId, movieId, weight in interactions[:50]:
+        assert model.scores(model.factorsFor(userId))[
+            movieId
+        ] == pytest.approx(weight)
+
+
+def testRecommendsFromTheUsersCluster(clusteredInteractions):
+    model = trainFactorModel(clusteredInteractions, rank=2)
+
+    ranked = model.recommend(model.factorsFor(7), 2, exclude={10})
+
+    assert [movieId for movieId, _ in ranked] == [11, 12]
+    assert model.factorsFor(99) is None
+
+
+def testFoldInMatchesTrainedFactors(clusteredInteractions):
+    model = trainFactorModel(clusteredInteractions, rank=2)
+
+    foldedIn = model.foldIn([(20, 1.0), (21, 1.0), (22, 1.0), (404, 1.0)])
+
+    assert foldedIn == pytest.approx(model.factorsFor(4))
+
+
+def testPopularSkipsExcludedMovies(clusteredInteractions):
+    model = trainFactorModel(clusteredInteractions + [(8, 22, -1.0)], rank=2)
+
+    assert [movieId for movieId, _ in model.popular(2, exclude={10})] == [
+        11,
+        12,
+    ]
+
+
+def testSaveAndLoadRoundTrip(tmp_path, clusteredInteractions):
+    model = trainFactorModel(clusteredInteractions, rank=2)
+    path = tmp_path / "factors.bin"
+
+    model.save(path)
+    loaded = FactorModel.load(path)
+
+    assert list(loaded.movieIds) == list(model.movieIds)
+    assert loaded.factorsFor(5) == model.factorsFor(5)
+    assert loaded.recommend(loaded.factorsFor(7), 3) == model.recommend(
+        model.factorsFor(7), 3
+    )
+
+
+def testLoadRejectsOtherFiles(tmp_path):
+    path = tmp_path / "factors.bin"
+    path.write_bytes(b"not a factor model at all")
+
+    with pytest.raises(FactorFormatError):
+        FactorModel.load(path)
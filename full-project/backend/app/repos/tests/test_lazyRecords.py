@@ -0,0 +1,250 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+from app.repos.lazyRecords import (
+    LazyRecords,
+    dumpRecords,
+    encodedRecords,
+    findIndex,
+    jsonArray,
+    iterField,
+    selectWhere,
+    validateRows,
+)
+from app.schemas.movie import Movie
+from app.schemas.review import Review
+from app.schemas.role import Role
+from app.schemas.user import User
+
+
+def makeReviewRows():
+    return [
+        {
+            "id": 1,
+            "movieId": 7,
+            "userId": 3,
+            "reviewTitle": "Great",
+            "reviewBody": "Loved it",
+            "rating": 9,
+        },
+        {
+            "id": 2,
+            "movieId": 8,
+            "userId": 4,
+            "reviewTitle": "Meh",
+            "reviewBody": "It was fine",
+            "rating": 5,
+            "flagged": True,
+        },
+        {
+            "id": 3,
+            "movieId": 7,
+            "userId": 5,
+            "reviewTitle": "Bad",
+            "reviewBody": "Walked out",
+            "rating": 2,
+        },
+    ]
+
+
+def testValidateRowsFillsDefaultsAndAppliesAliases():
+    movieRows = validateRows(
+        Movie,
+        [
+            {
+                "movieId": 1,
+                "movieName": "Alien",
+                "movieGenre": ["Horror"],
+                "length": 117,
+                "movieIMDb": 8.5,
+            },
+        ],
+    )
+    userRows = validateRows(
+        User,
+        [
+            {
+                "id": 1,
+                "username": "ripley",
+                "firstName": "Ellen",
+                "lastName": "Ripley",
+                "age": 30,
+                "email": "e@r.com",
+                "pw": "x",
+                "role": "admin",
+                "penaltyCount": 2,
+            },
+        ],
+    )
+
+    assert movieRows[0]["id"] == 1
+    assert movieRows[0]["title"] == "Alien"
+    assert movieRows[0]["duration"] == 117
+    assert movieRows[0]["directors"] == []
+    assert userRows[0]["role"] == Role.ADMIN
+    assert userRows[0]["penalties"] == 2
+    assert userRows[0]["watchlist"] == []
+
+
+def testValidateRowsRejectsInvalidRow():
+    rows = makeReviewRows()
+    rows[1]["rating"] = 11
+
+    with pytest.raises(ValidationError):
+        validateRows(Review, rows)
+
+
+def testLazyRecordsBuildsOnlyReadModels():
+    records = LazyRecords(Review, validateRows(Review, makeReviewRows()))
+
+    assert records.builtCount() == 0
+    assert len(records) == 3
+
+    review = records[1]
+
+    assert isinstance(review, Review)
+    assert review.flagged is True
+    assert records.builtCount() == 1
+    assert records[1] is review
+
+
+def testLazyRecordsMatchesEagerModels():
+    rows = makeReviewRows()
+    records = LazyRecords(Review, validateRows(Review, rows))
+
+    assert records == [Review(**row) for row in rows]
+    assert records[0:2] == [Review(**row) for row in rows[0:2]]
+
+
+def testLazyRecordsKeepsInPlaceEditsAndListOperations():
+    records = LazyRecords(Review, validateRows(Review, makeReviewRows()))
+    records[0].rating = 1
+    del records[2]
+    records.append(
+        Review(
+            id=4,
+            movieId=9,
+            userId=1,
+            reviewTitle="New one",
+            reviewBody="Brand new review",
+            rating=6,
+        )
+    )
+
+    dumped = dumpRecords(records)
+
+    assert [row["id"] for row in dumped] == [1, 2, 4]
+    assert dumped[0]["rating"] == 1
+    assert records.builtCount() == 2
+
+
+def testFieldHelpersDoNotBuildModels():
+    records = LazyRecords(Review, validateRows(Review, makeReviewRows()))
+
+    assert list(iterField(records, "id")) == [1, 2, 3]
+    assert findIndex(records, "id", 3) == 2
+    assert findIndex(records, "id", 99) == -1
+    assert records.builtCount() == 0
+
+    matches = selectWhere(records, "movieId", lambda movieId: movieId == 7)
+
+    assert [review.id for review in matches] == [1, 3]
+    assert records.builtCount() == 2
+
+
+def testKeyIndexesFollowEdits():
+    rows = makeReviewRows()
+    records = LazyRecords(
+        Review, validateRows(Review, rows), indexedFields=("id", "userId")
+    )
+    newReview = Review(**{**rows[0], "id": 9, "userId": 6})
+
+    records.append(newReview)
+    records[1] = Review(**{**rows[1], "userId": 8})
+    del records[0]
+    records.insert(0, Review(**{**rows[0], "id": 10, "userId": 7}))
+
+    expected = [(10, 7), (2, 8), (3, 5), (9, 6)]
+    assert [(review.id, review.userId) for review in records] == expected
+    for position, (reviewId, userId) in enumerate(expected):
+        assert findIndex(records, "id", reviewId) == position
+        assert findIndex(records, "userId", userId) == position
+    assert findIndex(records, "id", 1) == -1
+    assert findIndex(records, "userId", 4) == -1
+    assert findIndex(records, "userId", [4]) == -1
+
+    del records[1:3]
+    assert findIndex(records, "id", 9) == 1
+    assert findIndex(records, "id", 3) == -1
+
+
+def testFieldHelpersWorkOnPlainLists():
+    items = [
+        SimpleNamespace(id=5, movieId=1),
+        SimpleNamespace(id=6, movieId=2),
+    ]
+
+    assert list(iterField(items, "id")) == [5, 6]
+    assert findIndex(items, "id", 6) == 1
+    assert selectWhere(items, "movieId", lambda movieId: movieId == 1) == [
+        items[0]
+    ]
+
+
+def testEncodedRecordsMatchModelJsonAndAreCached():
+    records = LazyRecords(Review, validateRows(Review, makeReviewRows()))
+    expected = [
+        review.model_dump_json().encode()
+        for review in LazyRecords(
+            Review, validateRows(Review, makeReviewRows())
+        )
+    ]
+
+    first = encodedRecords(records, Review)
+
+    assert first == expected
+    assert encodedRecords(records, Review, 1, 2)[0] is first[1]
+    assert records.builtCount() == 0
+    assert json.loads(jsonArray(first))[2]["reviewTitle"] == "Bad"
+    assert encodedRecords(list(records), Review) == expected
+
+
+def testEncodingsAreDroppedOnWrites():
+    records = LazyRecords(Review, validateRows(Review, makeReviewRows()))
+    encodedRecords(records, Review)
+
+    records[0] = Review(
+        id=1,
+        movieId=7,
+        userId=3,
+        reviewTitle="Replaced",
+        reviewBody="Loved it",
+        rating=9,
+    )
+    records.insert(
+        0,
+        Review(
+            id=9,
+            movieId=7,
+            userId=3,
+            reviewTitle="Inserted",
+            reviewBody="Loved it",
+            rating=9,
+        ),
+    )
+    del records[3]
+    records[2].rating = 1
+
+    assert (
+        json.loads(records.encoded(2))["rating"] == 5
+    )  # edited in place, not saved yet
+    records.forgetBuiltEncodings()
+
+    assert [
+        json.loads(data)["reviewTitle"]
+        for data in encodedRecords(records, Review)
+    ] == ["Inserted", "Replaced", "Meh"]
+    assert json.loads(records.encoded(2))["rating"] == 1
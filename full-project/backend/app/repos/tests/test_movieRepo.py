@@ -41,22 +41,18 @@ def testGetMaxMovieIdReturnsMaxIdFromMovies():
 
 
 @patch("app.repos.movieRepo._baseLoadAll")
-def testLoadMovieCacheInitializesCacheAndNextId(mockBaseLoadAll, monkeypatch):
+def testLoadMovieCacheInitializesCacheAndNextId(mockBaseLoadAll):
     movieData = [
-        {"id": 10, "title": "A"},
-        {"id": 20, "title": "B"},
+        {"id": 10, "title": "A", "movieGenres": ["Drama"], "duration": 90},
+        {"id": 20, "title": "B", "movieGenres": ["Comedy"], "duration": 100},
     ]
     mockBaseLoadAll.return_value = movieData
 
-    class DummyMovie:
-        def __init__(self, **kwargs):
-            self.__dict__.update(kwargs)
-
-    monkeypatch.setattr(movieRepoModule, "Movie", DummyMovie)
     with patch("app.repos.movieRepo._getMaxMovieId", return_value=20):
         resultMovies = _loadMovieCache()
 
-    assert isinstance(resultMovies[0], DummyMovie)
+    assert isinstance(resultMovies[0], Movie)
+    assert resultMovies[0].title == "A"
     assert len(resultMovies) == 2
     assert movieRepoModule._MOVIE_CACHE is resultMovies
     assert movieRepoModule._NEXT_MOVIE_ID == 21
@@ -64,15 +60,10 @@ def testLoadMovieCacheInitializesCacheAndNextId(mockBaseLoadAll, monkeypatch):
 
 
 @patch("app.repos.movieRepo._baseLoadAll")
-def testLoadMovieCacheUsesCachedValueOnSecondCall(mockBaseLoadAll, monkeypatch):
-    movieData = [{"id": 1}]
-
-    class DummyMovie:
-        def __init__(self, **kwargs):
-            self.__dict__.update(kwargs)
+def testLoadMovieCacheUsesCachedValueOnSecondCall(mockBaseLoadAll):
+    movieData = [{"id": 1, "title": "A", "movieGenres": [], "duration": 90}]
 
     mockBaseLoadAll.return_value = movieData
-    monkeypatch.setattr(movieRepoModule, "Movie", DummyMovie)
 
     firstResult = _loadMovieCache()
     mockBaseLoadAll.reset_mock()
@@ -0,0 +1,95 @@
+import pytest
+
+import app.repos.movieSimilarityRepo as similarityRepoModule
+from app.repos.movieSimilarityRepo import (
+    addToSimilarityGraph,
+    featureDigest,
+    loadSimilarityGraph,
+)
+from app.repos.movieVectors import MovieVectorIndex
+from app.schemas.movie import Movie
+
+
+@pytest.fixture
+def sampleMovies():
+    return [
+        Movie(
+            id=1,
+            title="Heist",
+            movieGenres=["Crime"],
+            directors=["Ann Lee"],
+            description="A crew plans a heist.",
+            duration=120,
+        ),
+        Movie(
+            id=2,
+            title="Heist Two",
+            movieGenres=["Crime"],
+            directors=["Ann Lee"],
+            description="The crew is back.",
+            duration=110,
+        ),
+        Movie(
+            id=3,
+            title="Space",
+            movieGenres=["Sci-Fi"],
+            directors=["Cy Park"],
+            description="Astronauts drift.",
+            duration=140,
+        ),
+    ]
+
+
+@pytest.fixture
+def graphFile(monkeypatch, tmp_path):
+    path = tmp_path / "movieSimilarity.json"
+    monkeypatch.setattr(similarityRepoModule, "FILE", path)
+    return path
+
+
+def testGraphIsSavedAndReloaded(graphFile, sampleMovies):
+    vectors = MovieVectorIndex(sampleMovies)
+
+    graph = loadSimilarityGraph(sampleMovies, vectors)
+
+    assert graphFile.exists()
+    assert graph.search(vectors.vector(1), 1, exclude=(1,))[0][0] == 2
+
+    reloaded = loadSimilarityGraph(sampleMovies, vectors)
+    assert reloaded.dumpRows() == graph.dumpRows()
+
+
+def testChangedFeaturesRebuildTheGraph(graphFile, sampleMovies):
+    loadSimilarityGraph(sampleMovies, MovieVectorIndex(sampleMovies))
+    sampleMovies[2] = sampleMovies[2].model_copy(
+        update={"movieGenres": ["Crime"]}
+    )
+
+    graph = loadSimilarityGraph(sampleMovies, MovieVectorIndex(sampleMovies))
+
+    assert featureDigest(sampleMovies[2]) in {
+        row.get("digest")
+        for row in similarityRepoModule._baseLoadAll(graphFile)
+    }
+    assert len(graph) == 3
+
+
+def testAddedMoviesAreSaved(graphFile, sampleMovies):
+    vectors = MovieVectorIndex(sampleMovies)
+    graph = loadSimilarityGraph(sampleMovies, vectors)
+    movie = Movie(
+        id=4,
+        title="Orbit",
+        movieGenres=["Sci-Fi"],
+        description="Astronauts again.",
+        duration=150,
+    )
+    sampleMovies.append(movie)
+    vectors.add(movie)
+
+    addToSimilarityGraph(graph, sampleMovies, movie, vectors.vector(4))
+
+    assert graph.search(vectors.vector(3), 1, exclude=(3,))[0][0] == 4
+    assert {
+        row["key"] for row in similarityRepoModule._baseLoadAll(graphFile)
+    } == {1, 2, 3, 4}
@@ -0,0 +1,109 @@
+import math
+
+import pytest
+
+import app.repos.movieVectors as movieVectorsModule
+from app.repos.movieVectors import MovieVectorIndex, movieTerms
+from app.schemas.movie import Movie
+
+
+@pytest.fixture
+def sampleMovies():
+    return [
+        Movie(
+            id=1,
+            title="Heist",
+            movieGenres=["Crime", "Thriller"],
+            directors=["Ann Lee"],
+            mainStars=["Bo Chen"],
+            description="A crew plans one last heist.",
+            duration=120,
+        ),
+        Movie(
+            id=2,
+            title="Heist Two",
+            movieGenres=["Crime"],
+            directors=["Ann Lee"],
+            mainStars=["Bo Chen"],
+            description="The crew returns for another heist.",
+            duration=110,
+        ),
+        Movie(
+            id=3,
+            title="Space",
+            movieGenres=["Sci-Fi"],
+            directors=["Cy Park"],
+            mainStars=["Di Ross"],
+            description="Astronauts drift far from home.",
+            duration=140,
+        ),
+        Movie(
+            id=4,
+            title="Courtroom",
+            movieGenres=["Drama", "Crime"],
+            directors=["Ed Fox"],
+            mainStars=["Fay Wu"],
+            description="A lawyer defends a thief.",
+            duration=100,
+        ),
+    ]
+
+
+def testMovieTermsCoverEveryFeatureField(sampleMovies):
+    terms = movieTerms(sampleMovies[0])
+
+    assert terms["genre:crime"] == 1
+    assert terms["director:ann lee"] == 1
+    assert terms["star:bo chen"] == 1
+    assert terms["word:heist"] == 1
+    # a stop word
+    assert "word:one" not in terms
+    assert movieTerms({"movieGenres": ["Crime"], "description": None}) == {
+        "genre:crime": 1
+    }
+
+
+def testVectorsAreNormalized(sampleMovies):
+    index = MovieVectorIndex(sampleMovies)
+
+    for movie in sampleMovies:
+        assert math.isclose(
+            sum(weight * weight for weight in index.vector(movie.id).values()),
+            1.0,
+        )
+
+
+def testSimilarRanksSharedFeaturesFirst(sampleMovies):
+    index = MovieVectorIndex(sampleMovies)
+
+    ranked = index.similar(1, 3)
+
+    assert [movieId for movieId, _ in ranked] == [2, 4]
+    assert ranked[0][1] > ranked[1][1] > 0
+    assert index.similar(99, 3) == []
+
+
+def testAddAndRemoveUpdateTheIndex(monkeypatch, sampleMovies):
+    monkeypatch.setattr(movieVectorsModule, "REWEIGHT_GROWTH", 10)
+    index = MovieVectorIndex(sampleMovies)
+
+    index.add(
+        Movie(
+            id=5,
+            title="Orbit",
+            movieGenres=["Sci-Fi"],
+            directors=["Cy Park"],
+            description="Astronauts return home.",
+            duration=90,
+        )
+    )
+    assert [movieId for movieId, _ in index.similar(3, 1)] == [5]
+
+    index.add(sampleMovies[3].model_copy(update={"directors": ["Ann Lee"]}))
+    assert [movieId for movieId, _ in index.similar(1, 2)] == [2, 4]
+
+    assert index.remove(2) is True
+    assert index.remove(2) is False
+    assert 2 not in index
+    assert [movieId for movieId, _ in index.similar(1, 3)] == [4]
+    assert len(index) == 4
@@ -0,0 +1,30 @@
+from app.repos.rankingIndex import RankedGroups
+
+
+def testRankedGroupsOrdersByScoreThenId():
+    ranking = RankedGroups([(1, 10, 2), (1, 11, 5), (1, 12, 2), (2, 20, 1)])
+
+    assert ranking.top(1, 10) == [(11, 5), (10, 2), (12, 2)]
+    assert ranking.top(1, 2, offset=1) == [(10, 2), (12, 2)]
+    assert ranking.top(3, 5) == []
+    assert len(ranking) == 4
+
+
+def testRankedGroupsUpdatesScoresInPlace():
+    ranking = RankedGroups([(1, 10, 2), (1, 11, 5)])
+
+    ranking.set(1, 10, 7)
+    ranking.set(2, 30, 1)
+
+    assert ranking.top(1, 10) == [(10, 7), (11, 5)]
+    assert ranking.score(10) == 7
+    assert ranking.groupOf(30) == 2
+
+
+def testRankedGroupsRemove():
+    ranking = RankedGroups([(1, 10, 2)])
+
+    assert ranking.remove(10) is True
+    assert ranking.remove(10) is False
+    assert ranking.groupSize(1) == 0
+    assert ranking.score(10) is None
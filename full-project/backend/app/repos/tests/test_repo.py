@@ -1,4 +1,7 @@
+import asyncio
 import json
+from datetime import date
+from decimal import Decimal
 from pathlib import Path
 
 import pytest
@@ -89,3 +92,104 @@ def test_baseSaveAllWritesFileAuto(tmp_path, monkeypatch, sampleItems):
     # content is correct JSON
     loaded = json.loads(dataPath.read_text(encoding="utf-8"))
     assert loaded == sampleItems
+
+
+def test_deferSaveWithoutWriterReturnsFalse(
+    tmp_path, monkeypatch, sampleItems
+):
+    monkeypatch.setattr(repo, "DATA_DIR", tmp_path)
+
+    assert repo._baseDeferSave("users.json", lambda: sampleItems) is False
+    assert repo._PENDING_SAVES == {}
+
+
+def test_writeBehindCoalescesSavesIntoOneWrite(
+    tmp_path, monkeypatch, sampleItems
+):
+    monkeypatch.setattr(repo, "DATA_DIR", tmp_path)
+    writes = []
+    realSaveAll = repo._baseSaveAll
+
+    def countingSaveAll(datafile, items):
+        writes.append(datafile)
+        realSaveAll(datafile, items)
+
+    monkeypatch.setattr(repo, "_baseSaveAll", countingSaveAll)
+
+    async def burstOfSaves():
+        # long interval so only the shutdown flush writes
+        await repo.startWriteBehind(intervalMs=60_000)
+        for count in range(1, 101):
+            items = sampleItems * count
+            assert repo._baseDeferSave("users.json", lambda items=items: items)
+
+        # pending data is visible to loads before it reaches disk
+        assert len(repo._baseLoadAll("users.json")) == 100
+        assert not (tmp_path / "users.json").exists()
+
+        await repo.stopWriteBehind()
+
+    asyncio.run(burstOfSaves())
+
+    assert writes == [tmp_path / "users.json"]
+    loaded = json.loads((tmp_path / "users.json").read_text(encoding="utf-8"))
+    assert len(loaded) == 100
+    assert repo._PENDING_SAVES == {}
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson"])
+def test_baseSaveAllEncodesDecimalAndDates(tmp_path, monkeypatch, codec):
+    if codec == "orjson" and repo.orjson is None:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(repo, "JSON_CODEC", codec)
+    monkeypatch.setattr(repo, "DATA_DIR", tmp_path)
+    items = [
+        {
+            "id": 1,
+            "rating": Decimal("8.5"),
+            "datePublished": date(1994, 10, 14),
+        }
+    ]
+
+    repo._baseSaveAll("movies.json", items)
+
+    assert repo._baseLoadAll("movies.json") == [
+        {"id": 1, "rating": 8.5, "datePublished": "1994-10-14"}
+    ]
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson"])
+def test_baseSaveAllIsCompactUnlessPretty(
+    tmp_path, monkeypatch, sampleItems, codec
+):
+    if codec == "orjson" and repo.orjson is None:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(repo, "JSON_CODEC", codec)
+    monkeypatch.setattr(repo, "DATA_DIR", tmp_path)
+
+    repo._baseSaveAll("compact.json", sampleItems)
+    repo._baseSaveAll("pretty.json", sampleItems, pretty=True)
+
+    compactText = (tmp_path / "compact.json").read_text(encoding="utf-8")
+    prettyText = (tmp_path / "pretty.json").read_text(encoding="utf-8")
+    assert "\n" not in compactText
+    assert prettyText.startswith("[\n  {")
+    assert json.loads(compactText) == json.loads(prettyText) == sampleItems
+
+
+def test_dataVersionChangesOnEverySave(tmp_path, monkeypatch, sampleItems):
+    monkeypatch.setattr(repo, "DATA_DIR", tmp_path)
+    before = repo.dataVersion("users.json")
+
+    repo._baseSaveAll("users.json", sampleItems)
+    assert repo.dataVersion("users.json") == before + 1
+
+    async def deferredSave():
+        await repo.startWriteBehind(intervalMs=60_000)
+        repo._baseDeferSave("users.json", lambda: sampleItems)
+        # counted when the save is made, not when it is flushed
+        assert repo.dataVersion("users.json") == before + 2
+        await repo.stopWriteBehind()
+
+    asyncio.run(deferredSave())
+    assert repo.dataVersion(tmp_path / "users.json") >= before + 2
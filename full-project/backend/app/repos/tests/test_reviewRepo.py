@@ -1,7 +1,12 @@
+import asyncio
 import json
+import os
+import threading
 import pytest
 
+import app.repos.repo as repo
 import app.repos.reviewRepo as reviewRepo
+from app.repos.reviewSnapshot import writeReviewSnapshot
 from app.schemas.review import Review
 
 
@@ -45,7 +50,6 @@ def sampleReviews():
     monkeypatch.setattr(reviewRepo, "_NEXT_REVIEW_ID", None)
 
 
-
 def testReviewLoadReadsJsonAndReturnsModels(reviewDataPath, sampleReviews):
     initialJson = [review.model_dump(mode="json") for review in sampleReviews]
     reviewDataPath.write_text(json.dumps(initialJson, ensure_ascii=False), encoding="utf-8")
@@ -71,3 +75,86 @@ def testReviewSaveWritesJsonCorrectly(reviewDataPath, sampleReviews):
     expectedJson = [review.model_dump(mode="json") for review in sampleReviews]
 
     assert savedJson == expectedJson
+
+
+def testReviewLoadAsyncFillsCacheFromJson(
+    reviewDataPath, sampleReviews, monkeypatch
+):
+    monkeypatch.setattr(reviewRepo, "_REVIEW_CACHE", None)
+    monkeypatch.setattr(reviewRepo, "_NEXT_REVIEW_ID", None)
+    initialJson = [review.model_dump(mode="json") for review in sampleReviews]
+    reviewDataPath.write_text(
+        json.dumps(initialJson, ensure_ascii=False), encoding="utf-8"
+    )
+
+    loadedReviews = asyncio.run(reviewRepo.loadReviewsAsync())
+
+    assert [review.id for review in loadedReviews] == [1, 2]
+    assert reviewRepo.loadReviews() is loadedReviews
+    assert reviewRepo.getNextReviewId() == 3
+
+
+def testReviewLoadPrefersFreshSnapshot(
+    reviewDataPath, sampleReviews, monkeypatch
+):
+    monkeypatch.setattr(reviewRepo, "_REVIEW_CACHE", None)
+    monkeypatch.setattr(reviewRepo, "_NEXT_REVIEW_ID", None)
+    reviewDataPath.write_text("[]", encoding="utf-8")
+    writeReviewSnapshot(reviewRepo.getReviewSnapshotPath(), sampleReviews)
+
+    loadedReviews = reviewRepo.loadReviews()
+
+    assert loadedReviews == sampleReviews
+    assert reviewRepo.getNextReviewId() == 3
+
+
+def testReviewLoadIgnoresStaleSnapshot(
+    reviewDataPath, sampleReviews, monkeypatch
+):
+    monkeypatch.setattr(reviewRepo, "_REVIEW_CACHE", None)
+    monkeypatch.setattr(reviewRepo, "_NEXT_REVIEW_ID", None)
+    snapshotPath = reviewRepo.getReviewSnapshotPath()
+    writeReviewSnapshot(snapshotPath, sampleReviews)
+    reviewDataPath.write_text("[]", encoding="utf-8")
+    staleTime = reviewDataPath.stat().st_mtime - 10
+    os.utime(snapshotPath, (staleTime, staleTime))
+
+    assert reviewRepo.loadReviews() == []
+
+
+def testReviewLoadFallsBackToJsonWhenSnapshotIsDamaged(
+    reviewDataPath, sampleReviews, monkeypatch
+):
+    monkeypatch.setattr(reviewRepo, "_REVIEW_CACHE", None)
+    monkeypatch.setattr(reviewRepo, "_NEXT_REVIEW_ID", None)
+    reviewDataPath.write_text(
+        json.dumps([review.model_dump() for review in sampleReviews]),
+        encoding="utf-8",
+    )
+    snapshotPath = reviewRepo.getReviewSnapshotPath()
+    writeReviewSnapshot(snapshotPath, sampleReviews)
+    snapshotPath.write_bytes(snapshotPath.read_bytes()[:-16])
+
+    assert reviewRepo.loadReviews() == sampleReviews
+
+
+def testWriteBehindWaitsForReviewMutation(
+    reviewDataPath, sampleReviews, monkeypatch
+):
+    monkeypatch.setattr(repo, "_WRITER_TASK", object())
+    monkeypatch.setattr(repo, "_PENDING_SAVES", {})
+    monkeypatch.setattr(reviewRepo, "_NEXT_REVIEW_ID", None)
+    reviews = sampleReviews[:1]
+
+    with reviewRepo.REVIEW_WRITE_LOCK:
+        reviewRepo.saveReviews(reviews)
+        flush = threading.Thread(target=repo._baseFlushPending)
+        flush.start()
+        flush.join(0.1)
+        # the flush must not read the list while it is being changed
+        assert flush.is_alive() and not reviewDataPath.exists()
+        reviews.append(sampleReviews[1])
+    flush.join()
+
+    saved = json.loads(reviewDataPath.read_text(encoding="utf-8"))
+    assert [review["id"] for review in saved] == [1, 2]
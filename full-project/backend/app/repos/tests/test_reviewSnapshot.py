@@ -0,0 +1,176 @@
+import pytest
+
+from app.repos import reviewSnapshot
+from app.repos.reviewSnapshot import (
+    ReviewSnapshot,
+    SnapshotFormatError,
+    writeReviewSnapshot,
+)
+from app.schemas.review import Review
+
+
+@pytest.fixture
+def sampleReviews():
+    return [
+        Review(
+            id=1,
+            movieId=101,
+            userId=7,
+            reviewTitle="First review title",
+            reviewBody="Unicode survives the round trip: café, 映画, 🎬.",
+            rating=8,
+            datePosted="2025-01-12",
+            flagged=False,
+        ),
+        Review(
+            id=2,
+            movieId=202,
+            userId=3,
+            reviewTitle="Second review title",
+            reviewBody="This is the second review body, also long enough.",
+            rating=6,
+            datePosted=None,
+            flagged=None,
+        ),
+        Review(
+            id=3,
+            movieId=101,
+            userId=9,
+            reviewTitle="Third review title",
+            reviewBody="",
+            rating=1,
+            datePosted="3 March 2021",
+            flagged=True,
+        ),
+    ]
+
+
+def testSnapshotRoundTripMatchesModelDump(tmp_path, sampleReviews):
+    path = tmp_path / "reviews.bin"
+
+    count = writeReviewSnapshot(path, sampleReviews)
+    snapshot = ReviewSnapshot(path)
+    try:
+        assert count == len(snapshot) == 3
+        assert list(snapshot.rows()) == [
+            review.model_dump() for review in sampleReviews
+        ]
+        assert snapshot.columns["movieId"].tolist() == [101, 202, 101]
+        assert snapshot.text("reviewTitle", 2) == "Third review title"
+    finally:
+        snapshot.close()
+
+
+def testSnapshotAcceptsDictsAndEmptyInput(tmp_path, sampleReviews):
+    path = tmp_path / "reviews.bin"
+
+    writeReviewSnapshot(
+        path, [review.model_dump() for review in sampleReviews[:1]]
+    )
+    snapshot = ReviewSnapshot(path)
+    assert snapshot.row(0) == sampleReviews[0].model_dump()
+    snapshot.close()
+
+    writeReviewSnapshot(path, [])
+    snapshot = ReviewSnapshot(path)
+    assert len(snapshot) == 0
+    assert list(snapshot.rows()) == []
+    snapshot.close()
+
+
+def testSnapshotRejectsOtherFiles(tmp_path):
+    path = tmp_path / "reviews.bin"
+    path.write_bytes(b"[]")
+    with pytest.raises(SnapshotFormatError):
+        ReviewSnapshot(path)
+
+    path.write_bytes(b"NOPE" + b"\0" * 64)
+    with pytest.raises(SnapshotFormatError):
+        ReviewSnapshot(path)
+
+
+def testSnapshotRejectsTruncatedFiles(tmp_path, sampleReviews):
+    path = tmp_path / "reviews.bin"
+    writeReviewSnapshot(path, sampleReviews)
+    data = path.read_bytes()
+
+    for size in (40, len(data) - 8):
+        path.write_bytes(data[:size])
+        with pytest.raises(SnapshotFormatError):
+            ReviewSnapshot(path)
+
+
+def testSnapshotRejectsDamagedDirectoryAndText(tmp_path, sampleReviews):
+    path = tmp_path / "reviews.bin"
+    writeReviewSnapshot(path, sampleReviews)
+    data = bytearray(path.read_bytes())
+
+    # point the first column far past the end of the file
+    damaged = bytearray(data)
+    damaged[16:24] = (1 << 40).to_bytes(8, "little")
+    path.write_bytes(damaged)
+    with pytest.raises(SnapshotFormatError):
+        ReviewSnapshot(path)
+
+    damaged = bytearray(data)
+    start = damaged.index("café".encode("utf-8"))
+    damaged[start + 3] = 0xFF
+    path.write_bytes(damaged)
+    snapshot = ReviewSnapshot(path)
+    try:
+        # text is only decoded when its row is read
+        snapshot.validate()
+        with pytest.raises(SnapshotFormatError):
+            snapshot.text("reviewBody", 0)
+    finally:
+        snapshot.close()
+
+
+def testSnapshotColumnsAreLittleEndian(tmp_path, sampleReviews):
+    path = tmp_path / "reviews.bin"
+    writeReviewSnapshot(path, sampleReviews)
+    data = path.read_bytes()
+
+    # movieId is the second directory entry, after the 16-byte header
+    offset = int.from_bytes(data[32:40], "little")
+    movieIds = [
+        int.from_bytes(data[start : start + 8], "little", signed=True)
+        for start in range(offset, offset + 24, 8)
+    ]
+    assert movieIds == [101, 202, 101]
+
+
+def testSnapshotRejectsDateRefsOutsideThePool(tmp_path, sampleReviews):
+    path = tmp_path / "reviews.bin"
+    writeReviewSnapshot(path, sampleReviews)
+    data = bytearray(path.read_bytes())
+
+    # dateRefs is the last directory entry
+    entry = 16 + 16 * 13
+    offset = int.from_bytes(data[entry : entry + 8], "little")
+    data[offset : offset + 4] = (7).to_bytes(4, "little")
+    path.write_bytes(data)
+    snapshot = ReviewSnapshot(path)
+    try:
+        with pytest.raises(SnapshotFormatError):
+            snapshot.validate()
+    finally:
+        snapshot.close()
+
+
+def testSnapshotRoundTripsWithByteSwapping(
+    tmp_path, sampleReviews, monkeypatch
+):
+    # what a big-endian host does on both write and read
+    monkeypatch.setattr(reviewSnapshot, "_SWAP_BYTES", True)
+    path = tmp_path / "reviews.bin"
+    writeReviewSnapshot(path, sampleReviews)
+
+    snapshot = ReviewSnapshot(path)
+    try:
+        snapshot.validate()
+        assert list(snapshot.rows()) == [
+            review.model_dump() for review in sampleReviews
+        ]
+    finally:
+        snapshot.close()
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+import app.repos.movieRepo as movieRepo
+import app.repos.storageStats as storageStats
+from app.repos.storageStats import (
+    describeCache,
+    estimateMemory,
+    statsFor,
+    timedLoad,
+)
+
+
+@pytest.fixture
+def moviesFile(tmp_path, monkeypatch):
+    path = tmp_path / "movies.json"
+    path.write_text(json.dumps([
+        {"id": 1, "title": "A", "movieGenres": ["Drama"], "duration": 90},
+        {"id": 2, "title": "B", "movieGenres": ["Comedy"], "duration": 100},
+    ]), encoding="utf-8")
+    monkeypatch.setattr(movieRepo, "MOVIE_DATA_PATH", path)
+    monkeypatch.setattr(movieRepo, "_MOVIE_CACHE", None)
+    monkeypatch.setattr(movieRepo, "_NEXT_MOVIE_ID", None)
+    monkeypatch.setattr(storageStats, "_STATS", {})
+    return path
+
+
+def testCacheLoadsAndHitsAreCounted(moviesFile):
+    movieRepo.loadMovies()
+    movieRepo.loadMovies()
+    movieRepo.loadMovies()
+
+    stats = statsFor(moviesFile)
+    assert (stats.misses, stats.loads, stats.hits) == (1, 1, 2)
+    assert stats.bytesRead == moviesFile.stat().st_size
+    assert stats.lastLoadSeconds > 0
+
+
+def testSavesRecordDurationAndBytes(moviesFile):
+    movies = movieRepo.loadMovies()
+    movieRepo.saveMovies(movies)
+    movieRepo.saveMovies(movies)
+
+    stats = statsFor(moviesFile)
+    assert stats.saves == 2
+    assert stats.bytesWritten == 2 * moviesFile.stat().st_size
+    assert stats.totalSaveSeconds >= stats.lastSaveSeconds > 0
+
+
+def testTimedLoadCountsFailedFills(moviesFile):
+    with pytest.raises(FileNotFoundError):
+        with timedLoad(moviesFile):
+            raise FileNotFoundError
+
+    assert statsFor(moviesFile).misses == 1
+
+
+def testDescribeCacheReportsItemsAndMemory(moviesFile):
+    assert describeCache(moviesFile, None)["cached"] is False
+
+    movieRepo.loadMovies()
+    report = movieRepo.getStorageStats()
+
+    assert report["file"] == "movies.json"
+    assert report["cached"] is True
+    assert report["items"] == 2
+    assert report["memoryBytes"] > 0
+    assert report["misses"] == 1
+
+
+def testEstimateMemoryScalesSampledCollections():
+    small = [f"row {index:05d}" * 10 for index in range(100)]
+    large = [f"row {index:05d}" * 10 for index in range(10_000)]
+
+    smallSize = estimateMemory(small, sampleSize=50)
+    largeSize = estimateMemory(large, sampleSize=50)
+
+    assert largeSize == pytest.approx(smallSize * 100, rel=0.05)
+
+
+def testEstimateMemoryFollowsObjectsAndCountsSharedOnesOnce():
+    class Holder:
+        __slots__ = ("payload", "alias")
+
+        def __init__(self, payload):
+            self.payload = payload
+            self.alias = payload
+
+    payload = "x" * 10_000
+    assert estimateMemory(Holder(payload)) < estimateMemory(payload) + 200
+    assert estimateMemory({"a": payload}) > 10_000
@@ -1,17 +1,44 @@
-from typing import List
-from .repo import _baseLoadAll, _baseSaveAll, DATA_DIR
+import threading
+import anyio
+from typing import List, Dict, Any
+from .repo import _baseLoadAll, _baseSaveAll, _baseDeferSave, DATA_DIR
+from .storageStats import describeCache, recordHit, timedLoad
+from .cacheSnapshot import loadSnapshot, saveSnapshot, schemaFingerprint
+from .lazyRecords import LazyRecords, validateRows, iterField, dumpRecords
 from ..schemas.user import User
 
 _USER_DATA_PATH = DATA_DIR / "users.json"
 _USER_CACHE: List[User] | None = None
 _NEXT_USER_ID: int | None = None
+_USER_LOAD_LOCK = threading.Lock()
+# held by every read-modify-write of the user cache, and by the
+# write-behind writer while it builds users.json from it
+USER_WRITE_LOCK = threading.RLock()
+_USER_SNAPSHOT_SCHEMA = schemaFingerprint("rows", User)
 
 
 def _getMaxUserId(users: List[User]) -> int:
     """
     Return the maximum user ID in a list of users, or 0 if empty.
     """
-    return max((user.id for user in users), default=0)
+    return max(iterField(users, "id"), default=0)
+
+
+def _setCache(rows: List[Dict[str, Any]]) -> List[User]:
+    """
+    Build the user cache from validated user rows and initialize the next user
+    ID.
+
+    Rows are kept as dicts; a User model is only built when a row is read.
+    """
+    global _USER_CACHE, _NEXT_USER_ID
+    _USER_CACHE = LazyRecords(
+        User, rows, indexedFields=("id", "username")
+    )
+
+    max_id = _getMaxUserId(_USER_CACHE)
+    _NEXT_USER_ID = max_id + 1
+    return _USER_CACHE
 
 
 def _loadCache() -> List[User]:
@@ -20,16 +47,32 @@ def _loadCache() -> List[User]:
 
     Loads the users only once and caches them for future calls.
     Also initializes the next user ID.
+    Uses the cache snapshot instead of JSON while it matches the data file.
     Returns:
         List[User]: A list of users.
     """
-    global _USER_CACHE, _NEXT_USER_ID
     if _USER_CACHE is None:
-        user_dicts = _baseLoadAll(_USER_DATA_PATH)
-        _USER_CACHE = [User(**user) for user in user_dicts]
-
-        max_id = _getMaxUserId(_USER_CACHE)
-        _NEXT_USER_ID = max_id + 1
+        with _USER_LOAD_LOCK:
+            # another thread, such as the warm-up,
+            # may have filled it while we waited
+            if _USER_CACHE is None:
+                with timedLoad(_USER_DATA_PATH):
+                    rows, sourceKey = loadSnapshot(
+                        _USER_DATA_PATH, _USER_SNAPSHOT_SCHEMA
+                    )
+                    if rows is None:
+                        rows = validateRows(
+                            User, _baseLoadAll(_USER_DATA_PATH)
+                        )
+                        saveSnapshot(
+                            _USER_DATA_PATH,
+                            _USER_SNAPSHOT_SCHEMA,
+                            sourceKey,
+                            rows,
+                        )
+                    _setCache(rows)
+                return _USER_CACHE
+    recordHit(_USER_DATA_PATH)
     return _USER_CACHE
 
 
@@ -61,6 +104,28 @@ def loadUsers() -> List[User]:
     return _loadCache()
 
 
+async def loadUsersAsync() -> List[User]:
+    """
+    Load all users without blocking the event loop.
+
+    Served from the cache once it is warm; a cold cache is filled on a
+    worker thread, reading and validating included. Routes await this to
+    warm the cache before reading it through the sync loader, so no hit
+    is counted here.
+    Returns:
+        List[User]: A list of users.
+    """
+    if _USER_CACHE is None:
+        return await anyio.to_thread.run_sync(_loadCache)
+    return _USER_CACHE
+
+
+def _dumpUsers(users: List[User]) -> List[Dict[str, Any]]:
+    # runs on the write-behind thread, so wait out any mutation in progress
+    with USER_WRITE_LOCK:
+        return dumpRecords(users)
+
+
 def saveUsers(users: List[User]):
     """
     Save all users to the users data file.
@@ -75,8 +140,18 @@ def saveUsers(users: List[User]):
     if _NEXT_USER_ID is None or _NEXT_USER_ID <= max_id:
         _NEXT_USER_ID = max_id + 1
 
-    user_dicts = [user.model_dump() for user in users]
+    if _baseDeferSave(_USER_DATA_PATH, lambda: _dumpUsers(users)):
+        return
+    user_dicts = dumpRecords(users)
     _baseSaveAll(_USER_DATA_PATH, user_dicts)
 
 
-__all__ = ["loadUsers", "saveUsers"]
+def getStorageStats() -> Dict[str, Any]:
+    """
+    Report the user cache: item count, estimated memory, load and save
+    counters.
+    """
+    return describeCache(_USER_DATA_PATH, _USER_CACHE)
+
+
+__all__ = ["loadUsers", "loadUsersAsync", "saveUsers", "USER_WRITE_LOCK"]
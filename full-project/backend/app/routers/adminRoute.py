@@ -1,4 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+import os
+import anyio
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from ..services.reviewService import (
     deleteReview,
     getReviewById,
@@ -7,13 +12,33 @@ from ..services.reviewService import (
     getFlaggedReviews,
 )
 from ..utilities.penalties import incrementPenaltyForUser
+from ..utilities.profiler import (
+    startProfile,
+    finishProfile,
+    ProfilerBusyError,
+    PROFILE_MAX_SECONDS,
+    DEFAULT_SAMPLE_INTERVAL_MS,
+)
 from ..schemas.user import CurrentUser
 from .authRoute import requireAdmin
 from ..schemas.admin import AdminFlagResponse, PaginatedFlaggedReviewsResponse
 from ..services.adminService import grantAdmin, revokeAdmin, AdminActionError
+from ..services.exportService import (
+    exportReviews,
+    exportUsers,
+    exportLikes,
+    exportFavorites,
+)
+from ..services.storageStatsService import getStorageStats
 from app.services.userService import UserNotFoundError
+from ..repos.reviewRepo import loadReviewsAsync
+from .cacheDependencies import requireWarmCaches
 
-router = APIRouter(prefix="/admin", tags=["admin"])
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(requireWarmCaches(loadReviewsAsync))],
+)
 
 
 # ---------------------------
@@ -22,7 +47,9 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 
 
 @router.post("/reviews/{reviewId}/acceptFlag", response_model=AdminFlagResponse)
-def acceptReviewFlag(reviewId: int, currentAdmin: CurrentUser = Depends(requireAdmin)):
+async def acceptReviewFlag(
+    reviewId: int, currentAdmin: CurrentUser = Depends(requireAdmin)
+):
     """Accept a review flag, delete the review, and penalize the user."""
     try:
         review = getReviewById(reviewId)
@@ -34,8 +61,10 @@ def acceptReviewFlag(reviewId: int, currentAdmin: CurrentUser = Depends(requireA
             status_code=400, detail="Cannot accept flag. Review is not flagged."
         )
 
-    updatedUser = incrementPenaltyForUser(review.userId)
-    deleteReview(reviewId)
+    updatedUser = await run_in_threadpool(
+        incrementPenaltyForUser, review.userId
+    )
+    await run_in_threadpool(deleteReview, reviewId)
 
     return AdminFlagResponse(
         message="Review flag accepted. Review deleted and user penalized.",
@@ -51,7 +80,9 @@ def acceptReviewFlag(reviewId: int, currentAdmin: CurrentUser = Depends(requireA
 
 
 @router.post("/reviews/{reviewId}/rejectFlag", response_model=AdminFlagResponse)
-def rejectReviewFlag(reviewId: int, currentAdmin: CurrentUser = Depends(requireAdmin)):
+async def rejectReviewFlag(
+    reviewId: int, currentAdmin: CurrentUser = Depends(requireAdmin)
+):
     """Reject a review flag and unflag the review."""
     try:
         review = getReviewById(reviewId)
@@ -64,7 +95,7 @@ def rejectReviewFlag(reviewId: int, currentAdmin: CurrentUser = Depends(requireA
             detail="Cannot reject flag. Review is not flagged.",
         )
 
-    updatedReview = unflagReview(reviewId)
+    updatedReview = await run_in_threadpool(unflagReview, reviewId)
 
     return AdminFlagResponse(
         message="Flag rejected. Review unflagged (no penalty applied).",
@@ -80,12 +111,13 @@ def rejectReviewFlag(reviewId: int, currentAdmin: CurrentUser = Depends(requireA
 
 
 @router.get("/reports/reviews", response_model=PaginatedFlaggedReviewsResponse)
-def getFlaggedReviewReports(
+async def getFlaggedReviewReports(
     page: int = 1,
     pageSize: int = 20,
     currentAdmin: CurrentUser = Depends(requireAdmin),
 ):
-    flaggedReviewList = getFlaggedReviews()
+    # scans every review, so off the event loop
+    flaggedReviewList = await run_in_threadpool(getFlaggedReviews)
 
     startIndex = (page - 1) * pageSize
     endIndex = startIndex + pageSize
@@ -101,12 +133,12 @@ def getFlaggedReviewReports(
 
 
 @router.put("/{userId}/grantAdmin")
-def grantAdminPrivileges(
+async def grantAdminPrivileges(
     userId: int, currentAdmin: CurrentUser = Depends(requireAdmin)
 ):
     """Grant admin privileges to a user."""
     try:
-        updatedUser = grantAdmin(userId, currentAdmin)
+        updatedUser = await run_in_threadpool(grantAdmin, userId, currentAdmin)
     except AdminActionError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except UserNotFoundError as e:
@@ -119,12 +151,14 @@ def grantAdminPrivileges(
 
 
 @router.put("/{userId}/revokeAdmin")
-def revokeAdminPrivileges(
+async def revokeAdminPrivileges(
     userId: int, currentAdmin: CurrentUser = Depends(requireAdmin)
 ):
     """Revoke admin privileges from a user."""
     try:
-        updatedUser = revokeAdmin(userId, currentAdmin)
+        updatedUser = await run_in_threadpool(
+            revokeAdmin, userId, currentAdmin
+        )
     except AdminActionError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except UserNotFoundError as e:
@@ -134,3 +168,125 @@ def revokeAdminPrivileges(
         "userId": updatedUser.id,
         "role": updatedUser.role,
     }
+
+
+# ---------------------------
+# NDJSON exports
+# ---------------------------
+
+
+def _exportResponse(name: str, chunks) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.ndjson"'
+        },
+    )
+
+
+@router.get("/export/reviews.ndjson")
+async def exportReviewsNdjson(
+    sinceId: int = Query(0, ge=0, alias="since_id"),
+    currentAdmin: CurrentUser = Depends(requireAdmin),
+):
+    """Stream reviews with an id above since_id, one JSON object per line."""
+    return _exportResponse("reviews", exportReviews(sinceId))
+
+
+@router.get("/export/users.ndjson")
+async def exportUsersNdjson(
+    sinceId: int = Query(0, ge=0, alias="since_id"),
+    currentAdmin: CurrentUser = Depends(requireAdmin),
+):
+    """Stream users with an id above since_id (password hashes left out)."""
+    return _exportResponse("users", exportUsers(sinceId))
+
+
+@router.get("/export/likes.ndjson")
+async def exportLikesNdjson(
+    sinceId: int = Query(0, ge=0, alias="since_id"),
+    currentAdmin: CurrentUser = Depends(requireAdmin),
+):
+    """
+    Stream review likes of users with an id above since_id, ordered by userId.
+    """
+    return _exportResponse("likes", exportLikes(sinceId))
+
+
+@router.get("/export/favorites.ndjson")
+async def exportFavoritesNdjson(
+    sinceId: int = Query(0, ge=0, alias="since_id"),
+    currentAdmin: CurrentUser = Depends(requireAdmin),
+):
+    """
+    Stream favorite movies of users with an id above since_id, ordered by
+    userId.
+    """
+    return _exportResponse("favorites", exportFavorites(sinceId))
+
+
+# ---------------------------
+# Profiling
+# ---------------------------
+
+
+@router.get("/profile")
+async def profileWorker(
+    seconds: float = Query(10, gt=0, le=PROFILE_MAX_SECONDS),
+    intervalMs: float = Query(
+        DEFAULT_SAMPLE_INTERVAL_MS, ge=1, le=1000, alias="interval_ms"
+    ),
+    format: Literal["folded", "pstats"] = "folded",
+    currentAdmin: CurrentUser = Depends(requireAdmin),
+):
+    """
+    Sample this worker's threads for the given seconds, then download the
+    profile.
+
+    "folded" gives folded stacks for flamegraph.pl or speedscope, "pstats" a
+    file for pstats or snakeviz.
+    """
+    try:
+        profiler = startProfile(seconds, intervalMs / 1000)
+    except ProfilerBusyError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    # the sampler has its own thread; wait on the loop, not a pool thread
+    try:
+        await anyio.sleep(seconds)
+    finally:
+        # still stop the sampler when the client has gone away
+        with anyio.CancelScope(shield=True):
+            await run_in_threadpool(finishProfile, profiler)
+
+    fileName = f"profile-{os.getpid()}"
+    if format == "pstats":
+        return Response(
+            profiler.pstatsData(),
+            media_type="application/octet-stream",
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="{fileName}.pstats"'
+                )
+            },
+        )
+    return PlainTextResponse(
+        profiler.folded(),
+        headers={
+            "Content-Disposition": f'attachment; filename="{fileName}.folded"'
+        },
+    )
+
+
+# ---------------------------
+# Storage statistics
+# ---------------------------
+
+
+@router.get("/stats/storage")
+async def storageStats(currentAdmin: CurrentUser = Depends(requireAdmin)):
+    """
+    Item count, estimated memory, cache hits and misses, load and save counters
+    of every repo.
+    """
+    return await run_in_threadpool(getStorageStats)
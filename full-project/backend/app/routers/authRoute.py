@@ -1,12 +1,16 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
 from datetime import datetime, timedelta
 from ..schemas.user import CurrentUser, Password, Email, Username
 from ..schemas.role import Role
+from ..utilities.metrics import span, SPAN_JWT_DECODE
+from ..utilities.lazyImport import lazyImport
 from fastapi.responses import RedirectResponse
 from ..services.userService import getUserByEmail, getUserByUsername
+from ..repos.userRepo import loadUsersAsync
+from .cacheDependencies import warmCaches
 from ..services.authService import (
     validatePassword,
     ensureUserExists,
@@ -16,6 +20,9 @@ from ..services.authService import (
     InvalidPasswordError,
 )
 
+jwt = lazyImport("jose.jwt")
+joseExceptions = lazyImport("jose.exceptions")
+
 SECRET_KEY = "CHANGEME"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
@@ -33,12 +40,13 @@ def createAccessToken(username: str):
 
 def decodeAccesstoken(token: str):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with span(SPAN_JWT_DECODE):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload.get("sub")
-    except JWTError:
+    except joseExceptions.JWTError:
         return None
 
-def getCurrentUser(token: str = Depends(oauth2_scheme)) -> CurrentUser:
+async def getCurrentUser(token: str = Depends(oauth2_scheme)) -> CurrentUser:
     """
     Resolve the current user from the bearer token (username for now).
     Maps domain errors to HTTP errors.
@@ -50,8 +58,11 @@ def getCurrentUser(token: str = Depends(oauth2_scheme)) -> CurrentUser:
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
+    # every authenticated route reads the users; fill a cold cache off the loop
+    await warmCaches(loadUsersAsync)
     try:
+        # a dict lookup in the user cache's username index, cheap on the loop
         user = ensureUserExists(getUserByUsername(username))
     except UserNotFoundError:
         raise HTTPException(
@@ -63,7 +74,9 @@ def getCurrentUser(token: str = Depends(oauth2_scheme)) -> CurrentUser:
     return CurrentUser(id=user.id, username=user.username, role=user.role)
 
 
-def requireAdmin(currentUser: CurrentUser = Depends(getCurrentUser)) -> CurrentUser:
+async def requireAdmin(
+    currentUser: CurrentUser = Depends(getCurrentUser),
+) -> CurrentUser:
     if currentUser.role != Role.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -72,11 +85,29 @@ def requireAdmin(currentUser: CurrentUser = Depends(getCurrentUser)) -> CurrentU
     return currentUser
 
 
+async def requireAdminHeader(authorization: str | None) -> CurrentUser:
+    """
+    requireAdmin for a raw Authorization header, for middleware that runs
+    outside the routes.
+
+    Raises:
+        HTTPException: 401 without a valid bearer token, 403 for non-admins.
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await requireAdmin(await getCurrentUser(token))
+
+
 # =================================ROUTE HANDLERS==================================
 
 
 @router.post("/token")
-def login(
+async def login(
    username: Annotated[
         Username,
         Form(
@@ -96,6 +127,7 @@ def login(
     Logs in user and blocks banned users before their password is validated.
     All domain auth errors are mapped to HTTP here.
     """
+    await warmCaches(loadUsersAsync)
     try:
         user = ensureUserExists(getUserByUsername(username))
 
@@ -105,7 +137,7 @@ def login(
                 detail="Account banned due to repeated violations",
             )
 
-        validatePassword(user, password)
+        await run_in_threadpool(validatePassword, user, password)
 
     except (UserNotFoundError, InvalidPasswordError):
         raise HTTPException(
@@ -126,7 +158,7 @@ def login(
 
 
 @router.post("/logout")
-def logout(currentUser: CurrentUser = Depends(getCurrentUser)):
+async def logout(currentUser: CurrentUser = Depends(getCurrentUser)):
     """
     Logs the current user out by clearing or invalidating their token/session.
     """
@@ -136,12 +168,13 @@ def logout(currentUser: CurrentUser = Depends(getCurrentUser)):
 
 
 @router.get("/adminDashboard")
-def getAdminDashboard(admin: CurrentUser = Depends(requireAdmin)):
+async def getAdminDashboard(admin: CurrentUser = Depends(requireAdmin)):
     return {"message": "Welcome to the admin dashboard"}
 
 
 @router.post("/generate-reset-token")
-def generateResetTokenRoute(username: Annotated[Username, Form(...)]):
+async def generateResetTokenRoute(username: Annotated[Username, Form(...)]):
+    await warmCaches(loadUsersAsync)
     try:
         user = ensureUserExists(getUserByUsername(username))
     except UserNotFoundError:
@@ -152,7 +185,7 @@ def generateResetTokenRoute(username: Annotated[Username, Form(...)]):
 
 
 @router.post("/reset-password")
-def resettingPassword(
+async def resettingPassword(
     token: Annotated[str, Form(...)], new_password: Annotated[Password, Form(...)]
 ):
     """
@@ -164,7 +197,7 @@ def resettingPassword(
     Raises:
         HTTPException: invalid token.
     """
-    success = resetPassword(token, new_password)
+    success = await run_in_threadpool(resetPassword, token, new_password)
     if not success:
         raise HTTPException(status_code=400, detail="Invalid or expired token")
 
@@ -0,0 +1,51 @@
+"""
+Router dependencies that make sure repo caches are warm before a handler reads
+them.
+
+Handlers read the in-memory caches on the event loop, which is cheap once
+they are filled. Filling one reads and validates a whole data file, so a
+router lists the caches its handlers read and these dependencies await the
+repos' async loaders first: a cold cache is filled on a worker thread, and
+a request arriving while another thread is filling it waits there too,
+never on the repo's load lock inside the loop. As in the startup warm-up,
+a missing data file leaves its cache cold, so the handler reports the
+error as it always has.
+"""
+
+from typing import Any, Awaitable, Callable
+
+
+async def warmCaches(*loaders: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Await each async cache loader in turn; a missing data file is left to the
+    handler.
+
+    Args:
+        loaders (Callable): Async repo loaders, e.g. loadMoviesAsync.
+    """
+    for loader in loaders:
+        try:
+            await loader()
+        except FileNotFoundError:
+            pass
+
+
+def requireWarmCaches(
+    *loaders: Callable[[], Awaitable[Any]]
+) -> Callable[[], Awaitable[None]]:
+    """
+    Build a dependency that warms the given caches before the handler runs.
+
+    Args:
+        loaders (Callable): Async repo loaders, e.g. loadMoviesAsync.
+
+    Returns:
+        Callable: A dependency for APIRouter(dependencies=[Depends(...)]).
+    """
+    async def ensureWarm() -> None:
+        await warmCaches(*loaders)
+
+    return ensureWarm
+
+
+__all__ = ["warmCaches", "requireWarmCaches"]
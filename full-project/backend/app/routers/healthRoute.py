@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from ..utilities import warmup
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/ready")
+async def getReadiness():
+    """
+    Report whether this worker has warmed its caches.
+
+    Answers 503 while the startup warm-up is still running, with the state of
+    each cache.
+    """
+    report = warmup.CACHE_WARMER.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
@@ -1,33 +1,63 @@
 from fastapi import APIRouter, Depends, HTTPException
-from ..services.likeReviewService import likeReview, unlikeReview, listLikedReviews, ReviewNotFoundError, AlreadyLikedError
+from fastapi.concurrency import run_in_threadpool
+from ..services.likeReviewService import (
+    likeReview,
+    likeReviews,
+    unlikeReview,
+    listLikedReviews,
+    ReviewNotFoundError,
+    AlreadyLikedError,
+)
 from ..schemas.user import CurrentUser
+from ..schemas.likedReviews import LikeBatch
 from ..routers.authRoute import getCurrentUser
 
 router = APIRouter(prefix = "/likeReview", tags = ["likedReviews"])
 
+
+@router.post("/batch", status_code=201)
+async def likeSeveralReviews(
+    payload: LikeBatch, currentUser: CurrentUser = Depends(getCurrentUser)
+):
+    """
+    Like several reviews at once; nothing is liked if any review is missing.
+    """
+    try:
+        return await run_in_threadpool(
+            likeReviews, currentUser.id, payload.reviewIds
+        )
+    except ReviewNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
 @router.post("/{reviewId}", status_code=201)
-def likeAReview(reviewId: int, currentUser: CurrentUser = Depends(getCurrentUser)):
+async def likeAReview(
+    reviewId: int, currentUser: CurrentUser = Depends(getCurrentUser)
+):
     """Like a review."""
     try:
-        return likeReview(currentUser.id, reviewId)
+        return await run_in_threadpool(likeReview, currentUser.id, reviewId)
     except ReviewNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except AlreadyLikedError as e:
         raise HTTPException(status_code=409, detail=str(e))
 
+
 @router.delete("/{reviewId}")
-def unlikeAReview(reviewId: int, currentUser: CurrentUser = Depends(getCurrentUser)):
+async def unlikeAReview(
+    reviewId: int, currentUser: CurrentUser = Depends(getCurrentUser)
+):
     """Unlike a review."""
     try:
-        return unlikeReview(currentUser.id, reviewId)
+        return await run_in_threadpool(unlikeReview, currentUser.id, reviewId)
     except ReviewNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+
 @router.get("/")
-def getLikedReviews(currentUser: CurrentUser = Depends(getCurrentUser)):
+async def getLikedReviews(currentUser: CurrentUser = Depends(getCurrentUser)):
     """Get all liked reviews for the current user."""
     try:
-        return listLikedReviews(currentUser.id)
+        return await run_in_threadpool(listLikedReviews, currentUser.id)
     except ReviewNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
-    
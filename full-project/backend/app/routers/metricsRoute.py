@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..utilities import metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get(
+    "/metrics", response_class=PlainTextResponse, include_in_schema=False
+)
+async def getMetrics():
+    """
+    Request counts, latency histograms and span breakdowns in Prometheus text
+    format.
+
+    Empty apart from the metric headers unless METRICS_ENABLED=1.
+    """
+    return PlainTextResponse(
+        metrics.REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
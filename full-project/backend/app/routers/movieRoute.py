@@ -1,10 +1,12 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Response
+from fastapi.concurrency import run_in_threadpool
 from app.routers.authRoute import requireAdmin
 from app.schemas.movie import Movie, MovieCreate, MovieUpdate
 from app.services.movieService import (
     MovieNotFoundError,
     listMovies,
+    encodeMovies,
     createMovie,
     getMovieById,
     updateMovie,
@@ -12,15 +14,25 @@ from app.services.movieService import (
     searchMovie,
     getMovieByFilter,
 )
-
-router = APIRouter(prefix="/movies", tags=["movies"])
+from app.services.recommendationService import similarMovies
+from app.repos.movieRepo import loadMoviesAsync
+from app.routers.cacheDependencies import requireWarmCaches
+
+router = APIRouter(
+    prefix="/movies",
+    tags=["movies"],
+    dependencies=[Depends(requireWarmCaches(loadMoviesAsync))],
+)
 
 
 @router.get("/search", response_model=List[Movie])
-def searchMovies(query: Optional[str] = None):
+async def searchMovies(query: Optional[str] = None):
     keyword = (query or "").lower().strip()
 
-    results = searchMovie(keyword)  # returns List[Movie]
+    # scans every movie, so off the event loop
+    results = await run_in_threadpool(
+        searchMovie, keyword
+    )  # returns List[Movie]
 
     if not results:
         raise HTTPException(status_code=404, detail="Movie not found")
@@ -29,7 +41,7 @@ def searchMovies(query: Optional[str] = None):
 
 
 @router.get("/filter", response_model=List[Movie])
-def filterMovies(
+async def filterMovies(
     genre: Optional[str] = None,
     year: Optional[int] = None,
     director: Optional[str] = None,
@@ -40,32 +52,40 @@ def filterMovies(
     directorQuery = director.lower().strip() if director else None
     starQuery = star.lower().strip() if star else None
 
-    results = getMovieByFilter(genreQuery, year, directorQuery, starQuery)
+    results = await run_in_threadpool(
+        getMovieByFilter, genreQuery, year, directorQuery, starQuery
+    )
 
     return results
 
 @router.get("/meta")
-def getMoviesMeta():
+async def getMoviesMeta():
     """ Returns the different filters that movies have in order to view on the html"""
-    movies = listMovies()
-    
+    return await run_in_threadpool(collectMoviesMeta, listMovies())
+
+
+def collectMoviesMeta(movies: List[Movie]) -> dict:
+    """
+    Collects every genre, decade, director and star; scans all movies, so run
+    it off the event loop
+    """
     genres = set()
     for movie in movies:
         if hasattr(movie, "movieGenres") and movie.movieGenres:
             genres.update(movie.movieGenres)
-    
+
     decades = set()
     for movie in movies:
         if hasattr(movie, "datePublished") and movie.datePublished:
             year = movie.datePublished.year
             decade = (year // 10) * 10 
             decades.add(decade)
-    
+
     directors = set()
     for movie in movies:
         if hasattr(movie, "directors") and movie.directors:
             directors.update(movie.directors)
-    
+
     stars = set()
     for movie in movies:
         if hasattr(movie, "mainStars") and movie.mainStars:
@@ -80,39 +100,59 @@ def getMoviesMeta():
 
 
 @router.get("", response_model=List[Movie])
-def getMovies():
-    return listMovies()
+async def getMovies():
+    """
+    Returns every movie, stitched from each movie's cached JSON.
+    """
+    # encodes every movie on the first call, so off the event loop
+    body = await run_in_threadpool(encodeMovies, listMovies())
+    return Response(body, media_type="application/json")
 
 
 @router.get("/{movieId}", response_model=Movie)
-def getMovie(movieId: int):
+async def getMovie(movieId: int):
     try:
         return getMovieById(movieId)
     except MovieNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
+@router.get("/{movieId}/similar", response_model=List[Movie])
+async def getSimilarMovies(movieId: int, limit: int = 10):
+    """
+    Returns the movies closest in genres, directors, stars and description.
+    """
+    try:
+        getMovieById(movieId)
+    except MovieNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if limit < 1:
+        limit = 10
+    # the first call loads or builds the similarity graph
+    return await run_in_threadpool(similarMovies, movieId, limit)
+
+
 # ADMIN ONLY #
 
 
 @router.post("", response_model=Movie, status_code=status.HTTP_201_CREATED)
-def addMovie(payload: MovieCreate, admin: dict = Depends(requireAdmin)):
-    return createMovie(payload)
+async def addMovie(payload: MovieCreate, admin: dict = Depends(requireAdmin)):
+    return await run_in_threadpool(createMovie, payload)
 
 
 @router.put("/{movieId}", response_model=Movie)
-def modifyMovieDetails(
+async def modifyMovieDetails(
     movieId: int, payload: MovieUpdate, admin: dict = Depends(requireAdmin)
 ):
     try:
-        return updateMovie(movieId, payload)
+        return await run_in_threadpool(updateMovie, movieId, payload)
     except MovieNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
 @router.delete("/{movieId}", status_code=status.HTTP_204_NO_CONTENT)
-def removeMovie(movieId: int, admin: dict = Depends(requireAdmin)):
+async def removeMovie(movieId: int, admin: dict = Depends(requireAdmin)):
     try:
-        deleteMovie(movieId)
+        await run_in_threadpool(deleteMovie, movieId)
     except MovieNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
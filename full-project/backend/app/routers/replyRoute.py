@@ -1,19 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from typing import List
 from ..schemas.reply import Reply, ReplyCreate
 from ..services.replyService import listReplies, createReply
 from .authRoute import getCurrentUser
+from .cacheDependencies import requireWarmCaches
+from ..repos.replyRepo import loadRepliesAsync
 from ..schemas.user import CurrentUser
 
-router = APIRouter(prefix="/replies", tags=["replies"])
+router = APIRouter(
+    prefix="/replies",
+    tags=["replies"],
+    dependencies=[Depends(requireWarmCaches(loadRepliesAsync))],
+)
 
 @router.get("/{reviewId}", response_model=List[Reply])
-def getReplies(reviewId: int):
+async def getReplies(reviewId: int):
     """ Returns all replies that match a reviewId """
-    return listReplies(reviewId)
+    # scans every reply, so off the event loop
+    return await run_in_threadpool(listReplies, reviewId)
 
 
 @router.post("", response_model=Reply)
-def postReply(payload: ReplyCreate, currentUser: CurrentUser = Depends(getCurrentUser)):
+async def postReply(
+    payload: ReplyCreate, currentUser: CurrentUser = Depends(getCurrentUser)
+):
     """ Creates a new reply (only logged in users are able to post one)"""
-    return createReply(payload)
+    return await run_in_threadpool(createReply, payload)
@@ -1,34 +1,89 @@
 from typing import List
-from fastapi import APIRouter, status, Depends, HTTPException
-from ..schemas.review import Review, ReviewCreate, ReviewUpdate
+from fastapi import APIRouter, status, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from ..schemas.review import (
+    Review,
+    ReviewCreate,
+    ReviewUpdate,
+    ReviewWithLikes,
+    ReviewBatchCreate,
+)
 from ..schemas.user import CurrentUser
 from ..services.reviewService import (
     ReviewNotFoundError,
     flagReview,
     listReviews,
+    listHelpfulReviews,
     createReview,
+    createReviews,
     deleteReview,
     updateReview,
     getReviewById,
     searchReviews,
 )
+from ..services.likeReviewService import (
+    withLikeCounts,
+    encodedWithLikeCounts,
+    topReviews,
+)
 from .authRoute import getCurrentUser, requireAdmin
+from .cacheDependencies import requireWarmCaches
+from ..repos.reviewRepo import loadReviewsAsync
+from ..repos.likeReviewRepo import loadLikeIndexAsync
 from ..schemas.role import Role
 
-router = APIRouter(prefix="/reviews", tags=["reviews"])
+router = APIRouter(
+    prefix="/reviews",
+    tags=["reviews"],
+    dependencies=[
+        Depends(requireWarmCaches(loadReviewsAsync, loadLikeIndexAsync))
+    ],
+)
+
 
+@router.get("/search", response_model=List[ReviewWithLikes])
+async def searchReview(query: str = "", limit: int = 50, offset: int = 0):
+    # scans every review, so off the event loop
+    results = await run_in_threadpool(searchReviews, query)
+    return withLikeCounts(results[offset : offset + limit])
 
-@router.get("/search", response_model=List[Review])
-def searchReview(query: str = "", limit: int = 50, offset: int = 0):
-    results = searchReviews(query)
-    return results[offset : offset + limit]
 
+@router.get("/top", response_model=List[ReviewWithLikes])
+async def getTopReviews(movieId: int, limit: int = 10):
+    """
+    Returns a movie's most-liked reviews, most likes first.
 
-@router.get("", response_model=List[Review])
-def getReviews(page: int = 1, limit: int = 10):
+    """
+    if limit < 1:
+        limit = 10
+    # the first call builds the ranking from the like file
+    return await run_in_threadpool(topReviews, movieId, limit)
+
+
+@router.get("/helpful", response_model=List[ReviewWithLikes])
+async def getHelpfulReviews(movieId: int, page: int = 1, limit: int = 10):
+    """
+    Returns a movie's reviews ranked by how helpful voters found them.
+
+    """
+    if page < 1:
+        page = 1
+    if limit < 1:
+        limit = 10
+    # the first call ranks every review from its vote counts
+    reviews = await run_in_threadpool(
+        listHelpfulReviews, movieId, limit, (page - 1) * limit
+    )
+    return withLikeCounts(reviews)
+
+
+@router.get("", response_model=List[ReviewWithLikes])
+async def getReviews(page: int = 1, limit: int = 10):
     """
     Returns paginated reviews.
 
+    The page is stitched from each review's cached JSON instead of going
+    through response_model validation.
     """
     # Make sure page and limit are valid
     if page < 1:
@@ -42,11 +97,33 @@ def getReviews(page: int = 1, limit: int = 10):
     start = (page - 1) * limit
     end = start + limit
 
-    return reviews[start:end]
+    return Response(
+        encodedWithLikeCounts(reviews, start, end),
+        media_type="application/json",
+    )
+
+
+@router.post("/batch", response_model=List[Review], status_code=201)
+async def postReviews(
+    payload: ReviewBatchCreate,
+    currentUser: CurrentUser = Depends(getCurrentUser),
+):
+    """
+    Create several reviews in one request. Requires authentication.
+
+    Every review is validated before any is saved, and the reviews file is
+    written once for the whole batch.
+
+    Returns:
+        The new reviews, in the order given.
+    """
+    return await run_in_threadpool(
+        createReviews, currentUser.id, payload.reviews
+    )
 
 
 @router.post("/{movieId}", response_model=Review, status_code=201)
-def postReview(
+async def postReview(
     movieId: int,
     payload: ReviewCreate,
     currentUser: CurrentUser = Depends(getCurrentUser),
@@ -60,16 +137,18 @@ def postReview(
     Returns:
         The new review.
     """
-    return createReview(movieId=movieId, userId=currentUser.id, payload=payload)
+    return await run_in_threadpool(
+        createReview, movieId=movieId, userId=currentUser.id, payload=payload
+    )
 
 
-@router.get("/{reviewId}", response_model=Review)
-def getReview(reviewId: int):
-    return getReviewById(reviewId)
+@router.get("/{reviewId}", response_model=ReviewWithLikes)
+async def getReview(reviewId: int):
+    return withLikeCounts([getReviewById(reviewId)])[0]
 
 
 @router.put("/{reviewId}", response_model=Review)
-def putReview(
+async def putReview(
     reviewId: int,
     payload: ReviewUpdate,
     currentUser: CurrentUser = Depends(getCurrentUser),
@@ -86,10 +165,10 @@ def putReview(
     review = getReviewById(reviewId)
     validateReview(review)
     validateReviewOwner(currentUser, review)
-    return updateReview(reviewId, payload)
+    return await run_in_threadpool(updateReview, reviewId, payload)
 
 @router.patch("/{reviewId}/flag", response_model=Review)
-def markReviewAsInappropriate(
+async def markReviewAsInappropriate(
     reviewId: int,
     currentUser: CurrentUser = Depends(getCurrentUser),
 ):
@@ -99,7 +178,7 @@ def markReviewAsInappropriate(
         raise HTTPException(status_code=404, detail=str(exc))
     
     try:
-        updated = flagReview(reviewId)
+        updated = await run_in_threadpool(flagReview, reviewId)
     except ReviewNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
 
@@ -107,7 +186,9 @@ def markReviewAsInappropriate(
 
 
 @router.delete("/{reviewId}", status_code=status.HTTP_204_NO_CONTENT)
-def removeReview(reviewId: int, currentUser: CurrentUser = Depends(getCurrentUser)):
+async def removeReview(
+    reviewId: int, currentUser: CurrentUser = Depends(getCurrentUser)
+):
     """
     Makes sure that only review owners and admins can delete reviews.
 
@@ -122,8 +203,8 @@ def removeReview(reviewId: int, currentUser: CurrentUser = Depends(getCurrentUse
     if currentUser.role == Role.USER:
         validateReviewOwner(currentUser, review)
     else:
-        requireAdmin(currentUser)
-    deleteReview(reviewId)
+        await requireAdmin(currentUser)
+    await run_in_threadpool(deleteReview, reviewId)
     return None
 
 
@@ -374,4 +374,115 @@ def test_admin_role_endpoints_require_admin(client):
         response = testClient.put(ep)
         assert response.status_code == 403
 
-    app.dependency_overrides = {}
\ No newline at end of file
+    app.dependency_overrides = {}
+
+def test_export_reviews_streams_ndjson(client):
+    with patch(
+        "app.routers.adminRoute.exportReviews",
+        return_value=iter([b'{"id":3}\n{"id":4}\n', b'{"id":5}\n']),
+    ) as mockExport:
+        response = client.get("/admin/export/reviews.ndjson?since_id=2")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [line for line in response.text.splitlines()] == [
+        '{"id":3}',
+        '{"id":4}',
+        '{"id":5}',
+    ]
+    mockExport.assert_called_once_with(2)
+
+
+def test_export_likes_defaults_to_everything(client):
+    with patch(
+        "app.routers.adminRoute.exportLikes", return_value=iter([])
+    ) as mockExport:
+        response = client.get("/admin/export/likes.ndjson")
+
+    assert response.status_code == 200
+    assert response.text == ""
+    mockExport.assert_called_once_with(0)
+
+
+def test_export_rejects_negative_since_id(client):
+    response = client.get("/admin/export/users.ndjson?since_id=-1")
+
+    assert response.status_code == 422
+
+
+def test_export_requires_admin():
+    def notAdmin():
+        raise HTTPException(
+            status_code=403, detail="Admin privileges required"
+        )
+
+    app.dependency_overrides = {requireAdmin: notAdmin}
+    try:
+        response = TestClient(app).get("/admin/export/favorites.ndjson")
+    finally:
+        app.dependency_overrides = {}
+
+    assert response.status_code == 403
+
+
+def test_profile_downloads_folded_stacks(client):
+    response = client.get("/admin/profile?seconds=0.05&interval_ms=5")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert ".folded" in response.headers["content-disposition"]
+    assert response.text.strip()
+
+
+def test_profile_downloads_pstats(client):
+    response = client.get("/admin/profile?seconds=0.05&format=pstats")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert ".pstats" in response.headers["content-disposition"]
+
+
+def test_profile_returns_409_while_another_runs(client):
+    from app.utilities.profiler import ProfilerBusyError
+
+    with patch(
+        "app.routers.adminRoute.startProfile",
+        side_effect=ProfilerBusyError("busy"),
+    ):
+        response = client.get("/admin/profile?seconds=1")
+
+    assert response.status_code == 409
+
+
+def test_profile_rejects_too_long_runs(client):
+    response = client.get("/admin/profile?seconds=100000")
+
+    assert response.status_code == 422
+
+
+def test_storage_stats_lists_every_repo(client):
+    response = client.get("/admin/stats/storage")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [repo["repo"] for repo in body["repos"]] == [
+        "movies",
+        "reviews",
+        "users",
+        "replies",
+        "likes",
+        "favorites",
+    ]
+    assert body["totalMemoryBytes"] == sum(
+        repo["memoryBytes"] for repo in body["repos"]
+    )
+    assert {
+        "items",
+        "memoryBytes",
+        "hits",
+        "misses",
+        "lastLoadSeconds",
+        "saves",
+        "lastSaveSeconds",
+        "bytesWritten",
+    } <= set(body["repos"][0])
@@ -1,7 +1,11 @@
+import asyncio
+
 import pytest
 from fastapi.testclient import TestClient
 
 from app.app import app
+from app.repos import userRepo
+from app.repos.lazyRecords import LazyRecords
 from app.routers import authRoute
 from app.schemas.user import (
     User,
@@ -259,3 +263,26 @@ def test_resetPasswordInvalidOrExpired(monkeypatch):
 
     assert response.status_code == 400
     assert "Invalid or expired token" in response.json()["detail"]
+
+
+def test_currentUserIsFoundWithoutScanningUsers(monkeypatch):
+    users = LazyRecords(
+        User,
+        [
+            makeUser(userId=1, username="firstUser"),
+            makeUser(userId=2, username=VALID_USERNAME),
+        ],
+        indexedFields=("id", "username"),
+    )
+    monkeypatch.setattr(userRepo, "_USER_CACHE", users)
+
+    # the dependency runs on the event loop, so it must not walk every user
+    def failingColumn(self, name):
+        raise AssertionError("users should not be scanned")
+
+    monkeypatch.setattr(LazyRecords, "column", failingColumn)
+    token = authRoute.createAccessToken(VALID_USERNAME)
+
+    currentUser = asyncio.run(authRoute.getCurrentUser(token))
+
+    assert (currentUser.id, currentUser.username) == (2, VALID_USERNAME)
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+
+import app.repos.movieRepo as movieRepo
+from app.routers.cacheDependencies import requireWarmCaches, warmCaches
+
+
+def testColdCacheIsFilledOnAWorkerThread(monkeypatch):
+    threads = []
+
+    def fakeLoadMovieCache():
+        threads.append(threading.get_ident())
+        return []
+
+    monkeypatch.setattr(movieRepo, "_MOVIE_CACHE", None)
+    monkeypatch.setattr(movieRepo, "_loadMovieCache", fakeLoadMovieCache)
+
+    asyncio.run(requireWarmCaches(movieRepo.loadMoviesAsync)())
+
+    assert len(threads) == 1 and threading.get_ident() not in threads
+
+
+def testWarmCacheIsNotReloaded(monkeypatch):
+    def failingLoadMovieCache():
+        raise AssertionError("a warm cache should not be reloaded")
+
+    monkeypatch.setattr(movieRepo, "_MOVIE_CACHE", [])
+    monkeypatch.setattr(movieRepo, "_loadMovieCache", failingLoadMovieCache)
+
+    asyncio.run(warmCaches(movieRepo.loadMoviesAsync))
+
+
+def testMissingDataFileIsLeftToTheHandler():
+    loaded = []
+
+    async def missing():
+        raise FileNotFoundError("Missing data file")
+
+    async def present():
+        loaded.append("present")
+
+    asyncio.run(warmCaches(missing, present))
+
+    assert loaded == ["present"]
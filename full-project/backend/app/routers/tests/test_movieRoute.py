@@ -1,3 +1,5 @@
+import asyncio
+import json
 from datetime import date
 from decimal import Decimal
 
@@ -81,7 +83,7 @@ def testSearchMoviesCallsServiceWithNormalizedKeyword(monkeypatch, sampleMoviesL
 
     monkeypatch.setattr(movieRouteModule, "searchMovie", fakeSearchMovie)
 
-    resultMovies = searchMovies("  InCePtIoN  ")
+    resultMovies = asyncio.run(searchMovies("  InCePtIoN  "))
 
     assert capturedKeyword["value"] == "inception"
     assert resultMovies is sampleMoviesList
@@ -94,7 +96,7 @@ def testSearchMoviesRaises404WhenNoResults(monkeypatch):
     monkeypatch.setattr(movieRouteModule, "searchMovie", fakeSearchMovie)
 
     with pytest.raises(HTTPException) as errorInfo:
-        searchMovies("nothing")
+        asyncio.run(searchMovies("nothing"))
 
     assert errorInfo.value.status_code == 404
     assert errorInfo.value.detail == "Movie not found"
@@ -112,11 +114,13 @@ def testFilterMoviesNormalizesAndPassesFilters(monkeypatch, sampleMoviesList):
 
     monkeypatch.setattr(movieRouteModule, "getMovieByFilter", fakeGetMovieByFilter)
 
-    resultMovies = filterMovies(
-        genre="  Action ",
-        year=2010,
-        director=" NoLaN ",
-        star=" LeO ",
+    resultMovies = asyncio.run(
+        filterMovies(
+            genre="  Action ",
+            year=2010,
+            director=" NoLaN ",
+            star=" LeO ",
+        )
     )
 
     assert capturedArgs["genre"] == "action"
@@ -183,10 +187,14 @@ def testGetMoviesReturnsListFromService(monkeypatch, sampleMoviesList):
 
     monkeypatch.setattr(movieRouteModule, "listMovies", fakeListMovies)
 
-    resultMovies = getMovies()
+    response = asyncio.run(getMovies())
 
-    assert resultMovies is sampleMoviesList
-    assert len(resultMovies) == 2
+    # the list is sent as pre-encoded JSON,
+    # identical to what response_model would produce
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == [
+        movie.model_dump(mode="json") for movie in sampleMoviesList
+    ]
 
 
 def testGetMovieReturnsSingleMovie(monkeypatch, sampleMovie):
@@ -195,7 +203,7 @@ def testGetMovieReturnsSingleMovie(monkeypatch, sampleMovie):
 
     monkeypatch.setattr(movieRouteModule, "getMovieById", fakeGetMovieById)
 
-    resultMovie = getMovie(1)
+    resultMovie = asyncio.run(getMovie(1))
 
     assert resultMovie is sampleMovie
     assert resultMovie.id == 1
@@ -209,7 +217,7 @@ def testGetMoviePropagatesServiceErrors(monkeypatch):
     monkeypatch.setattr(movieRouteModule, "getMovieById", fakeGetMovieById)
 
     with pytest.raises(HTTPException) as errorInfo:
-        getMovie(999)
+        asyncio.run(getMovie(999))
 
     assert errorInfo.value.status_code == 404
     assert errorInfo.value.detail == "Movie not found"
@@ -259,6 +267,40 @@ def testGetMovieEndpointReturns404(monkeypatch, client):
     assert responseJson["detail"] == "Movie not found"
 
 
+def testSimilarMoviesEndpointReturnsMovies(
+    monkeypatch, client, sampleMovie, sampleMoviesList
+):
+    calls = []
+
+    def fakeSimilarMovies(movieId, limit):
+        calls.append((movieId, limit))
+        return sampleMoviesList[1:]
+
+    monkeypatch.setattr(
+        movieRouteModule, "getMovieById", lambda movieId: sampleMovie
+    )
+    monkeypatch.setattr(movieRouteModule, "similarMovies", fakeSimilarMovies)
+
+    response = client.get("/movies/1/similar?limit=3")
+
+    assert response.status_code == 200
+    assert [movie["id"] for movie in response.json()] == [
+        movie.id for movie in sampleMoviesList[1:]
+    ]
+    assert calls == [(1, 3)]
+
+
+def testSimilarMoviesEndpointReturns404(monkeypatch, client):
+    def fakeGetMovieById(movieId):
+        raise movieRouteModule.MovieNotFoundError("Movie not found")
+
+    monkeypatch.setattr(movieRouteModule, "getMovieById", fakeGetMovieById)
+
+    response = client.get("/movies/999/similar")
+
+    assert response.status_code == 404
+
+
 def testSearchMoviesEndpointReturnsResults(monkeypatch, client, sampleMoviesList):
     def fakeSearchMovie(keyword):
         return [sampleMoviesList[0]]
@@ -415,4 +457,3 @@ def testModifyMovieDetailsEndpointReturns404(monkeypatch, client):
 
     assert response.status_code == 404
     assert responseJson["detail"] == "Movie not found"
-
@@ -10,7 +10,12 @@ from fastapi import FastAPI, status, HTTPException
 from unittest.mock import patch
 from app.app import app
 from app.routers.reviewRoute import router, getCurrentUser
-from app.schemas.review import Review, ReviewCreate, ReviewUpdate
+from app.schemas.review import (
+    Review,
+    ReviewCreate,
+    ReviewUpdate,
+    ReviewWithLikes,
+)
 
 
 # SETUP & FIXTURES
@@ -146,6 +151,40 @@ class TestReviewRouterIntegration:
         assert len(data) == 2
         assert data[0]["id"] == 2  # now int, not str
 
+    @patch("app.routers.reviewRoute.topReviews")
+    def test_topReviewsEndpoint(self, mockTop, client, sampleReviewData):
+        mockTop.return_value = [
+            ReviewWithLikes(**sampleReviewData.model_dump(), likeCount=4)
+        ]
+
+        response = client.get(
+            "/reviews/top", params={"movieId": 1, "limit": 5}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data[0]["id"] == 1
+        assert data[0]["likeCount"] == 4
+        mockTop.assert_called_once_with(1, 5)
+
+    @patch("app.routers.reviewRoute.withLikeCounts")
+    @patch("app.routers.reviewRoute.listHelpfulReviews")
+    def test_helpfulReviewsEndpoint(
+        self, mockHelpful, mockLikes, client, sampleReviewData
+    ):
+        mockHelpful.return_value = [sampleReviewData]
+        mockLikes.side_effect = lambda reviews: [
+            ReviewWithLikes(**review.model_dump()) for review in reviews
+        ]
+
+        response = client.get(
+            "/reviews/helpful", params={"movieId": 1, "page": 2, "limit": 5}
+        )
+
+        assert response.status_code == 200
+        assert response.json()[0]["id"] == 1
+        mockHelpful.assert_called_once_with(1, 5, 5)
+
     @patch("app.routers.reviewRoute.createReview")
     def test_createReviewEndpoint(self, mockCreate, client, sampleReviewData, app):
         """Test POST /reviews creates a new review"""
@@ -174,6 +213,57 @@ class TestReviewRouterIntegration:
         assert data["reviewTitle"] == "Great Movie!"
         assert data["rating"] == 5
 
+    @patch("app.routers.reviewRoute.createReviews")
+    def test_createReviewsBatchEndpoint(
+        self, mockCreate, client, sampleReviewData, app
+    ):
+        """Test POST /reviews/batch creates every review in one call"""
+        mockCreate.return_value = [sampleReviewData, sampleReviewData]
+        app.dependency_overrides[getCurrentUser] = lambda: FakeUser(
+            id=1, username="testuser", role="user"
+        )
+        item = {
+            "movieId": 1,
+            "reviewTitle": "Great Movie!",
+            "reviewBody": "This movie was amazing, highly recommend",
+            "rating": 5,
+        }
+
+        response = client.post(
+            "/reviews/batch", json={"reviews": [item, {**item, "movieId": 2}]}
+        )
+
+        assert response.status_code == 201
+        assert len(response.json()) == 2
+        userId, items = mockCreate.call_args.args
+        assert userId == 1
+        assert [batchItem.movieId for batchItem in items] == [1, 2]
+
+    @patch("app.routers.reviewRoute.createReviews")
+    def test_createReviewsBatchRejectsInvalidItem(
+        self, mockCreate, client, app
+    ):
+        """
+        Test one invalid review rejects the whole batch before anything is
+        saved
+        """
+        app.dependency_overrides[getCurrentUser] = lambda: FakeUser(
+            id=1, username="testuser", role="user"
+        )
+        item = {
+            "movieId": 1,
+            "reviewTitle": "Great Movie!",
+            "reviewBody": "This movie was amazing, highly recommend",
+            "rating": 5,
+        }
+
+        response = client.post(
+            "/reviews/batch", json={"reviews": [item, {**item, "rating": 11}]}
+        )
+
+        assert response.status_code == 422
+        mockCreate.assert_not_called()
+
     @patch("app.routers.reviewRoute.updateReview")
     @patch("app.routers.reviewRoute.getReviewById")
     def test_updateReviewEndpoint(
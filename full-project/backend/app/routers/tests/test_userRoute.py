@@ -18,6 +18,7 @@ from ..userRoute import getUserProfile
 from app.routers.authRoute import getCurrentUser
 from app.schemas.role import Role
 from app.schemas.movie import Movie
+from app.services.favoritesService import MovieNotFoundError
 
 
 @pytest.fixture
@@ -357,4 +358,37 @@ def test_removeMovieFromWatchlist(mockUpdate, mockLoad, mockGet, client, sampleU
         2,
         UserUpdate(watchlist=expectedUpdatedList)
     )
-    assert response.json()["watchlist"] == expectedUpdatedList
\ No newline at end of file
+    assert response.json()["watchlist"] == expectedUpdatedList
+
+@patch("app.routers.userRoute.recommendMovies")
+def test_getMyRecommendations(mockRecommend, client):
+    client.app.dependency_overrides[getCurrentUser] = lambda: MagicMock(id=3)
+    mockRecommend.return_value = [
+        Movie(id=5, title="Movie5", movieGenre=["Drama"], duration=100)
+    ]
+
+    response = client.get("/users/me/recommendations", params={"limit": 4})
+
+    assert response.status_code == 200
+    assert response.json()[0]["id"] == 5
+    mockRecommend.assert_called_once_with(3, 4)
+
+@patch("app.routers.userRoute.setWatchlist")
+def test_replaceWatchlist(mockSet, client):
+    client.app.dependency_overrides[getCurrentUser] = lambda: MagicMock(id=2)
+    mockSet.return_value = [3, 1]
+
+    response = client.put("/users/watchlist", json={"movieIds": [3, 1, 3]})
+
+    assert response.status_code == 200
+    assert response.json() == {"watchlist": [3, 1]}
+    mockSet.assert_called_once_with(2, [3, 1, 3])
+
+@patch("app.routers.userRoute.setWatchlist")
+def test_replaceWatchlistUnknownMovie(mockSet, client):
+    client.app.dependency_overrides[getCurrentUser] = lambda: MagicMock(id=2)
+    mockSet.side_effect = MovieNotFoundError("Movie '99' not found")
+
+    response = client.put("/users/watchlist", json={"movieIds": [99]})
+
+    assert response.status_code == 404
@@ -1,21 +1,39 @@
 from typing import List
 from fastapi import APIRouter, status, HTTPException, Form, Depends
+from fastapi.concurrency import run_in_threadpool
 from app.routers.authRoute import getCurrentUser
-from ..schemas.user import User, UserCreate, UserUpdate, SafeUser
-from ..services.userService import listUsers, createUser, deleteUser, updateUser, getUserById, UserNotFoundError, UsernameTakenError, EmailTakenError
+from ..schemas.user import User, UserCreate, UserUpdate, SafeUser, WatchlistSet
+from ..services.userService import (
+    listUsers,
+    createUser,
+    deleteUser,
+    updateUser,
+    getUserById,
+    setWatchlist,
+    UserNotFoundError,
+    UsernameTakenError,
+    EmailTakenError,
+)
 from fastapi import Body
 from ..schemas.role import Role
-from ..repos.movieRepo import loadMovies
-from ..repos.userRepo import loadUsers
+from ..repos.movieRepo import loadMovies, loadMoviesAsync
+from ..repos.userRepo import loadUsers, loadUsersAsync
+from .cacheDependencies import requireWarmCaches
 from ..services.favoritesService import MovieNotFoundError
+from ..services.recommendationService import recommendMovies
+from ..schemas.movie import Movie
 
-router = APIRouter(prefix = "/users", tags = ["users"])
+router = APIRouter(
+    prefix="/users",
+    tags=["users"],
+    dependencies=[Depends(requireWarmCaches(loadUsersAsync, loadMoviesAsync))],
+)
 
 class notOwnerError(Exception):
     pass
 
 @router.get("", response_model=List[SafeUser])
-def getUsers(page: int = 1, limit: int = 25):
+async def getUsers(page: int = 1, limit: int = 25):
     if page < 1:
         page = 1
     if limit < 1:
@@ -30,7 +48,7 @@ def getUsers(page: int = 1, limit: int = 25):
 
 
 @router.post("", response_model=User, status_code=201)
-def createNewUser(payload: UserCreate = Body(
+async def createNewUser(payload: UserCreate = Body(
       example={
         "username": "username123",
         "firstName": "user",
@@ -41,13 +59,13 @@ def createNewUser(payload: UserCreate = Body(
       }
 )):
     try:
-        return createUser(payload)
+        return await run_in_threadpool(createUser, payload)
     except UsernameTakenError as e:
         raise HTTPException(status_code=409, detail=str(e))
 
 
 @router.get("/userProfile")
-def getUserProfile(userId: int, currentUser = Depends(getCurrentUser)):
+async def getUserProfile(userId: int, currentUser = Depends(getCurrentUser)):
     """
     Gets the user profile of either the owner or another reviewer
 
@@ -64,28 +82,61 @@ def getUserProfile(userId: int, currentUser = Depends(getCurrentUser)):
     else:       
         isOwner = currentUser.id == userId
         return {"user": user, "isOwner": isOwner}
-    
+
 @router.get("/watchlist")
-def getUserWatchlist(currentUser = Depends(getCurrentUser)):
+async def getUserWatchlist(currentUser = Depends(getCurrentUser)):
     """
     Gets the user's watchlist
     """
     user = getUserById(currentUser.id)
-    movies = {movie.id: movie for movie in loadMovies()}  # dict keyed by ID
+    movies = await run_in_threadpool(moviesById)
     watchlistIds = getWatchlist(user)
 
     moviesToWatch = [movies[movieId] for movieId in watchlistIds if movieId in movies]
     return {"watchlist": moviesToWatch}
 
+
+@router.put("/watchlist")
+async def replaceWatchlist(
+    payload: WatchlistSet, currentUser=Depends(getCurrentUser)
+):
+    """
+    Replaces the user's whole watchlist, saving once
+    """
+    try:
+        watchlist = await run_in_threadpool(
+            setWatchlist, currentUser.id, payload.movieIds
+        )
+    except MovieNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UserNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"watchlist": watchlist}
+
+
+@router.get("/me/recommendations", response_model=List[Movie])
+async def getMyRecommendations(
+    limit: int = 10, currentUser=Depends(getCurrentUser)
+):
+    """
+    Recommends movies from what similar users rated, liked, favorited and
+    saved.
+    """
+    if limit < 1:
+        limit = 10
+    # reads the factors trained at startup or by the batch job
+    return await run_in_threadpool(recommendMovies, currentUser.id, limit)
+
+
 @router.get("/{userId}", response_model = SafeUser)
-def getUser(userId: int):
+async def getUser(userId: int):
     try:
         return getUserById(userId)
     except UserNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @router.put("/{userId}", response_model = User)
-def updatedUser(userId: int, payload: UserUpdate= Body(
+async def updatedUser(userId: int, payload: UserUpdate= Body(
       example={
         "username": "username123",
         "firstName": "user",
@@ -101,62 +152,77 @@ def updatedUser(userId: int, payload: UserUpdate= Body(
             detail="You are not allowed to update this account."
         )
     try:
-        return updateUser(userId, payload)
+        return await run_in_threadpool(updateUser, userId, payload)
     except UserNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except UsernameTakenError as e:
         raise HTTPException(status_code=409, detail=str(e))
 
 @router.delete("/{userId}", status_code=status.HTTP_204_NO_CONTENT)
-def removeUser(userId: int, currentUser = Depends(getCurrentUser)):
+async def removeUser(userId: int, currentUser = Depends(getCurrentUser)):
 
     if currentUser.role != Role.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized to delete users.")
     try:
-        deleteUser(userId)
+        await run_in_threadpool(deleteUser, userId)
     except UserNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     
     return None
 
+
 @router.post("/watchlist/{movieId}")
-def addMovieToWatchlist(movieId: int, currentUser = Depends(getCurrentUser)):
+async def addMovieToWatchlist(
+    movieId: int, currentUser=Depends(getCurrentUser)
+):
     """
     Adds a movie to the user's watchlist
     """
-    movies = {movie.id: movie for movie in loadMovies()}
+    movies = await run_in_threadpool(moviesById)
     user = getUserById(currentUser.id)
     watchlist = getWatchlist(user)
 
     if movieId not in movies:
         raise MovieNotFoundError("This movie does not exist")
-    
+
     if movieId in watchlist:
         return {"watchlist": watchlist}
 
     updatedWatchlist = watchlist + [movieId]
-    updatedUser = updateUser(currentUser.id, UserUpdate(watchlist=updatedWatchlist))
+    updatedUser = await run_in_threadpool(
+        updateUser, currentUser.id, UserUpdate(watchlist=updatedWatchlist)
+    )
 
     return {"watchlist": updatedWatchlist}
 
+
 @router.delete("/watchlist/{movieId}")
-def removeMovieFromWatchlist(movieId: int, currentUser = Depends(getCurrentUser)):
+async def removeMovieFromWatchlist(
+    movieId: int, currentUser=Depends(getCurrentUser)
+):
     """
     Adds a movie to the users watchlist
     """
-    movies = {movie.id: movie for movie in loadMovies()}
+    movies = await run_in_threadpool(moviesById)
     user = getUserById(currentUser.id)
     watchlist = getWatchlist(user)
 
     if movieId not in movies:
         raise MovieNotFoundError("This movie does not exist")
-    
+
     if movieId not in watchlist:
         return {"message": "Movie not in watchlist"}
 
     updatedWatchlist = [movie for movie in watchlist if movie != movieId]
-    updateUser(currentUser.id, UserUpdate(watchlist=updatedWatchlist))
+    await run_in_threadpool(
+        updateUser, currentUser.id, UserUpdate(watchlist=updatedWatchlist)
+    )
     return {"message": "movie removed", "watchlist": updatedWatchlist}
 
+
+def moviesById():
+    # dict keyed by ID; built from every movie, so run it off the event loop
+    return {movie.id: movie for movie in loadMovies()}
+
 def getWatchlist(user):
     return user.watchlist if hasattr(user, "watchlist") else user["watchlist"]
@@ -1,5 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+MAX_BATCH_LIKES = 500
 
 class LikedReview(BaseModel):
     userId: int
@@ -11,4 +13,14 @@ class LikedReviewFull(BaseModel):
     movieTitle: str
     username: str
     reviewTitle: str
-    poster: Optional[str] = None 
\ No newline at end of file
+    poster: Optional[str] = None 
+
+
+class LikeBatch(BaseModel):
+    reviewIds: List[int] = Field(
+        min_length=1,
+        max_length=MAX_BATCH_LIKES,
+        description=(
+            f"ids of the reviews to like, 1 to {MAX_BATCH_LIKES} per request"
+        ),
+    )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 MIN_REVIEW_TITLE_LENGTH = 5
 MAX_REVIEW_TITLE_LENGTH = 100
@@ -7,6 +7,7 @@ MIN_REVIEW_BODY_LENGTH = 10
 MAX_REVIEW_BODY_LENGTH = 1000
 MIN_RATING = 1
 MAX_RATING = 10
+MAX_BATCH_REVIEWS = 100
 
 
 class Review(BaseModel):
@@ -18,6 +19,13 @@ class Review(BaseModel):
     rating: int = Field(ge=1, le=10)
     datePosted: Optional[str] = None
     flagged: Optional[bool] = False
+    # imported from the IMDb "Usefulness Vote" / "Total Votes" columns
+    usefulVotes: int = Field(default=0, ge=0)
+    totalVotes: int = Field(default=0, ge=0)
+
+
+class ReviewWithLikes(Review):
+    likeCount: int = 0
 
 
 class ReviewCreate(BaseModel):
@@ -38,6 +46,18 @@ class ReviewCreate(BaseModel):
     )
 
 
+class ReviewBatchItem(ReviewCreate):
+    movieId: int
+
+
+class ReviewBatchCreate(BaseModel):
+    reviews: List[ReviewBatchItem] = Field(
+        min_length=1,
+        max_length=MAX_BATCH_REVIEWS,
+        description=f"reviews to create, 1 to {MAX_BATCH_REVIEWS} per request",
+    )
+
+
 class ReviewUpdate(BaseModel):
     reviewTitle: Optional[str] = Field(
         default=None,
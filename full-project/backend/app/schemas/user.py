@@ -20,6 +20,7 @@ MIN_USERNAME_LENGTH = 3
 MAX_USERNAME_LENGTH = 30
 MIN_PASSWORD_LENGTH = 8
 MAX_PASSWORD_LENGTH = 256
+MAX_WATCHLIST_MOVIES = 1000
 
 
 def _checkPasswordComplexity(value: str) -> str:
@@ -257,3 +258,21 @@ class SafeUser(BaseModel):
     isBanned: bool
     watchlist: List[int]
     role: Role
+
+
+class WatchlistSet(BaseModel):
+    """
+    Schema for replacing a user's whole watchlist in one request.
+
+    Attributes:
+        movieIds (List[int]): The new watchlist in order; duplicates are
+        dropped.
+    """
+
+    movieIds: List[int] = Field(
+        ...,
+        max_length=MAX_WATCHLIST_MOVIES,
+        description=(
+            f"movie ids for the watchlist, at most {MAX_WATCHLIST_MOVIES}"
+        ),
+    )
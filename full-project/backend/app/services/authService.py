@@ -3,7 +3,8 @@ from typing import TypedDict
 
 from app.schemas.user import User, Password, Email
 from app.utilities.security import verifyPassword, hashPassword
-from app.repos.userRepo import loadUsers, saveUsers
+from app.repos.userRepo import USER_WRITE_LOCK, loadUsers, saveUsers
+from app.repos.lazyRecords import findIndex
 
 
 class ResetTokenData(TypedDict):
@@ -63,11 +64,14 @@ def resetPassword(token: str, new_password: Password) -> bool:
     if not data or data["expires"] < time.time():
         return False
 
-    users = loadUsers()
-    for user in users:
-        if user.email == data["email"]:
-            user.pw = hashPassword(new_password)
-            saveUsers(users)
-            del resetTokens[token]
-            return True
-    return False
+    hashedPw = hashPassword(new_password)
+    with USER_WRITE_LOCK:
+        users = loadUsers()
+        index = findIndex(users, "email", data["email"])
+        if index == -1:
+            return False
+
+        users[index].pw = hashedPw
+        saveUsers(users)
+    del resetTokens[token]
+    return True
@@ -0,0 +1,170 @@
+"""
+Newline-delimited JSON exports of the main data files, for admin tooling.
+
+Each export is a generator of NDJSON chunks read straight from the repo
+caches, a bounded number of records at a time, so a full dump needs no
+more memory than one chunk however large the collection is. The caches are
+not locked for the whole export: writes can land between chunks, and the
+reader finds its place again by the id of the last record it sent.
+
+`sinceId` makes the exports incremental: reviews and users are filtered on
+their own id, which only grows; likes and favorites have no id of their
+own and are filtered (and ordered) by userId instead.
+"""
+
+from typing import Any, Iterator, Set, Type
+from pydantic import BaseModel
+from ..repos.reviewRepo import loadReviews
+from ..repos.userRepo import loadUsers
+from ..repos.likeReviewRepo import loadLikeIndex
+from ..repos.favoritesRepo import loadFavoriteIndex
+from ..repos.lazyRecords import (
+    encodeRecord,
+    fieldAt,
+    findIndex,
+    iterField,
+    recordAt,
+)
+from ..schemas.review import Review
+from ..schemas.user import User
+
+# records (or links) encoded per yielded chunk
+EXPORT_CHUNK_ROWS = 500
+
+# never exported: password hashes stay on the server
+USER_EXPORT_EXCLUDE = {"pw"}
+
+
+def _firstAfter(records: Any, recordId: int) -> int:
+    """
+    Return the position of the first record whose id is above recordId.
+
+    Ids are handed out in increasing order and records are appended, so
+    everything from that position on is newer.
+    """
+    for index, fieldValue in enumerate(iterField(records, "id")):
+        if fieldValue > recordId:
+            return index
+    return len(records)
+
+
+def _resume(records: Any, position: int, lastId: int | None) -> int:
+    """
+    Return where to carry on after the record lastId, last seen at position -
+    1.
+    """
+    if lastId is None:
+        return position
+    if (
+        position <= len(records)
+        and position > 0
+        and fieldAt(records, position - 1, "id") == lastId
+    ):
+        return position
+    # records were inserted or deleted before the cursor since the last chunk
+    index = findIndex(records, "id", lastId)
+    return index + 1 if index != -1 else _firstAfter(records, lastId)
+
+
+def _recordLines(
+    records: Any,
+    model: Type[BaseModel],
+    sinceId: int,
+    exclude: Set[str] | None = None,
+) -> Iterator[bytes]:
+    """
+    Yield chunks of NDJSON lines for the records whose id is above sinceId.
+    """
+    position = _firstAfter(records, sinceId) if sinceId > 0 else 0
+    lastId = None
+    while True:
+        position = _resume(records, position, lastId)
+        stop = min(position + EXPORT_CHUNK_ROWS, len(records))
+        if position >= stop:
+            return
+        try:
+            lines = []
+            for index in range(position, stop):
+                if fieldAt(records, index, "id") > sinceId:
+                    lines.append(
+                        encodeRecord(model, recordAt(records, index), exclude)
+                        + b"\n"
+                    )
+            chunkLastId = fieldAt(records, stop - 1, "id")
+        except IndexError:
+            # the collection shrank while this
+            # chunk was read; find our place again
+            continue
+        position, lastId = stop, chunkLastId
+        if lines:
+            yield b"".join(lines)
+
+
+def _linkLines(index, rightName: str, sinceId: int) -> Iterator[bytes]:
+    """
+    Yield chunks of NDJSON lines for the links of users above sinceId.
+    """
+    prefix = b'{"userId":'
+    middle = f',"{rightName}":'.encode()
+    lines = []
+    for userId, otherId in index.forward.pairsFrom(sinceId + 1):
+        lines.append(b"%s%d%s%d}\n" % (prefix, userId, middle, otherId))
+        if len(lines) >= EXPORT_CHUNK_ROWS:
+            yield b"".join(lines)
+            lines = []
+    if lines:
+        yield b"".join(lines)
+
+
+def exportReviews(sinceId: int = 0) -> Iterator[bytes]:
+    """
+    Stream reviews with an id above sinceId as NDJSON, in stored order.
+
+    Args:
+        sinceId (int): Highest review id the caller already has.
+
+    Returns:
+        Iterator[bytes]: Chunks of newline-terminated JSON reviews.
+    """
+    return _recordLines(loadReviews(), Review, sinceId)
+
+
+def exportUsers(sinceId: int = 0) -> Iterator[bytes]:
+    """
+    Stream users with an id above sinceId as NDJSON, without password hashes.
+
+    Args:
+        sinceId (int): Highest user id the caller already has.
+
+    Returns:
+        Iterator[bytes]: Chunks of newline-terminated JSON users.
+    """
+    return _recordLines(loadUsers(), User, sinceId, USER_EXPORT_EXCLUDE)
+
+
+def exportLikes(sinceId: int = 0) -> Iterator[bytes]:
+    """
+    Stream review likes of users with an id above sinceId as NDJSON.
+
+    Args:
+        sinceId (int): Highest userId the caller already has likes for.
+
+    Returns:
+        Iterator[bytes]: Chunks of {"userId", "reviewId"} lines, ordered by
+            userId.
+    """
+    return _linkLines(loadLikeIndex(), "reviewId", sinceId)
+
+
+def exportFavorites(sinceId: int = 0) -> Iterator[bytes]:
+    """
+    Stream favorite movies of users with an id above sinceId as NDJSON.
+
+    Args:
+        sinceId (int): Highest userId the caller already has favorites for.
+
+    Returns:
+        Iterator[bytes]: Chunks of {"userId", "movieId"} lines, ordered by
+            userId.
+    """
+    return _linkLines(loadFavoriteIndex(), "movieId", sinceId)
@@ -1,8 +1,12 @@
 # services/favoriteService.py
 from fastapi import HTTPException
-from ..repos.favoritesRepo import loadFavorites, saveFavorites
+from ..repos.favoritesRepo import (
+    loadFavoriteIndex,
+    addFavoriteEdge,
+    removeFavoriteEdge,
+)
 from ..repos.movieRepo import loadMovies
-from ..schemas.favorites import Favorite
+from ..repos.lazyRecords import findIndex, selectWhere
 
 class FavoriteError(Exception):
     """Base class for favorite-related errors."""
@@ -22,42 +26,32 @@ class FavoriteNotFoundError(FavoriteError):
 
 def addFavorite(userId: int, movieId: int):
     """Add a movie to user's favorites."""
-    favorites = loadFavorites()
     movies = loadMovies()
 
-    if not any(movie.id == movieId for movie in movies):
+    if findIndex(movies, "id", movieId) == -1:
         raise MovieNotFoundError(f"Movie '{movieId}' not found")
 
     # prevent duplicate
-    if any(favorite.userId == userId and favorite.movieId == movieId for favorite in favorites):
+    if not addFavoriteEdge(userId, movieId):
         raise FavoriteAlreadyExistsError(f"Movie '{movieId}' already in favorites")
-
-    favorites.append(Favorite(userId=userId, movieId=movieId))
-    saveFavorites(favorites)
     return {"message": "Added to favorites"}
 
 def removeFavorite(userId: int, movieId: int):
     """
     Remove a movie from user's favorites.
     """
-    favorites = loadFavorites()
-    
-    if not any(f.userId == userId and f.movieId == movieId for f in favorites):
+    if not removeFavoriteEdge(userId, movieId):
         raise FavoriteNotFoundError(f"Favorite '{movieId}' not found for current user")
-    
-    newList = [
-        favorite for favorite in favorites
-        if not (favorite.userId == userId and favorite.movieId == movieId)
-    ]
-
-    saveFavorites(newList)
     return {"message": "Removed from favorites"}
 
+def countFans(movieId: int) -> int:
+    """Return how many users have a movie in their favorites."""
+    return loadFavoriteIndex().backward.degree(movieId)
+
 def listFavorites(userId: int):
     """List all favorite movies for a user."""
-    favorites = loadFavorites()
     movies = loadMovies()
 
-    favMovieIds = [favorite.movieId for favorite in favorites if favorite.userId == userId]
+    favMovieIds = set(loadFavoriteIndex().forward.neighbours(userId))
 
-    return [movie for movie in movies if movie.id in favMovieIds]
+    return selectWhere(movies, "id", favMovieIds.__contains__)
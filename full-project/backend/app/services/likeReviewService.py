@@ -1,9 +1,27 @@
-from ..repos.likeReviewRepo import loadLikedReviews, saveLikedReviews
+import threading
+from typing import List
+from ..repos.likeReviewRepo import (
+    loadLikeIndex,
+    addLikeEdge,
+    addLikeEdges,
+    removeLikeEdge,
+)
 from ..repos.reviewRepo import loadReviews
-from ..schemas.likedReviews import LikedReview, LikedReviewFull
+from ..repos.lazyRecords import (
+    findIndex,
+    iterField,
+    fieldAt,
+    encodedRecords,
+    jsonArray,
+)
+from ..repos.rankingIndex import RankedGroups
+from ..schemas.likedReviews import LikedReviewFull
+from ..schemas.review import Review, ReviewWithLikes
 from ..services.userService import getUserById
 from ..services.movieService import getMovieById
+from ..services.reviewService import listMovieReviewIds
 from ..externalAPI.tmdbService import getMovieDetailsById
+from ..utilities.metrics import span, SPAN_SERIALIZE
 
 
 class ReviewNotFoundError(Exception):
@@ -11,65 +29,211 @@ class ReviewNotFoundError(Exception):
 
 class AlreadyLikedError(Exception):
     pass
- 
+
+
+# movieId -> reviews ranked by like count,
+# built from the like index it was read from
+_TOP_REVIEWS: RankedGroups | None = None
+_TOP_REVIEWS_SOURCE = None
+_TOP_REVIEWS_LOCK = threading.Lock()
+
+
+def _loadTopReviews() -> RankedGroups:
+    """
+    Return the per-movie like ranking, rebuilding it if the like index was
+    reloaded.
+    """
+    global _TOP_REVIEWS, _TOP_REVIEWS_SOURCE
+    likeIndex = loadLikeIndex()
+    if _TOP_REVIEWS is None or _TOP_REVIEWS_SOURCE is not likeIndex:
+        likers = likeIndex.backward
+        reviews = loadReviews()
+        _TOP_REVIEWS = RankedGroups(
+            (movieId, reviewId, likers.degree(reviewId))
+            for reviewId, movieId in zip(
+                iterField(reviews, "id"), iterField(reviews, "movieId")
+            )
+            if likers.degree(reviewId)
+        )
+        _TOP_REVIEWS_SOURCE = likeIndex
+    return _TOP_REVIEWS
+
+
+def _rerankReview(reviewId: int, movieId: int | None = None) -> None:
+    """
+    Move a review to its current like count in the per-movie ranking.
+    """
+    with _TOP_REVIEWS_LOCK:
+        ranking = _loadTopReviews()
+        if movieId is None:
+            movieId = ranking.groupOf(reviewId)
+        count = countLikes(reviewId)
+        if count and movieId is not None:
+            ranking.set(movieId, reviewId, count)
+        else:
+            ranking.remove(reviewId)
+
 
 def likeReview(userId: int, reviewId: int):
     """Like a review."""
-    likedReviews = loadLikedReviews()
     reviews = loadReviews()
 
-    if not any(review.id == reviewId for review in reviews):
+    index = findIndex(reviews, "id", reviewId)
+    if index == -1:
         raise ReviewNotFoundError(f"Review '{reviewId}' not found")
-    if any(liked.userId == userId and liked.reviewId == reviewId for liked in likedReviews):
+    if not addLikeEdge(userId, reviewId):
         raise AlreadyLikedError(f"Review '{reviewId}' already liked by user '{userId}'")
-    
-    likedReviews.append(LikedReview(userId=userId, reviewId=reviewId))
-    saveLikedReviews(likedReviews)
+    _rerankReview(reviewId, reviews[index].movieId)
     return {"message": "Review liked"}
 
+def likeReviews(userId: int, reviewIds: List[int]):
+    """
+    Like several reviews at once, saving the likes file once.
+
+    Every review must exist; otherwise nothing is liked. Reviews the user
+    already liked are reported instead of failing the batch.
+
+    Raises:
+        ReviewNotFoundError: If any of the reviews does not exist.
+    """
+    reviews = loadReviews()
+    movieIds = {}
+    for reviewId in dict.fromkeys(reviewIds):
+        index = findIndex(reviews, "id", reviewId)
+        if index == -1:
+            raise ReviewNotFoundError(f"Review '{reviewId}' not found")
+        movieIds[reviewId] = fieldAt(reviews, index, "movieId")
+
+    added = addLikeEdges((userId, reviewId) for reviewId in movieIds)
+    liked = [reviewId for _, reviewId in added]
+    for reviewId in liked:
+        _rerankReview(reviewId, movieIds[reviewId])
+    likedSet = set(liked)
+    return {
+        "message": "Reviews liked",
+        "liked": liked,
+        "alreadyLiked": [
+            reviewId for reviewId in movieIds if reviewId not in likedSet
+        ],
+    }
+
 def unlikeReview(userId: int, reviewId: int):
     """Unlike a review."""
-    likedReviews = loadLikedReviews()
-    if not any(liked.userId == userId and liked.reviewId == reviewId for liked in likedReviews):
+    if not removeLikeEdge(userId, reviewId):
         raise ReviewNotFoundError(f"Liked ' {reviewId}' not found for user '{userId}'")
-    # remove the liked review from the list of liked reviews
-    newList = [
-        liked for liked in likedReviews
-        if not (liked.userId == userId and liked.reviewId == reviewId)
-    ]
-    saveLikedReviews(newList)
+    _rerankReview(reviewId)
     return {"message": "Review unliked"}
 
-def listLikedReviews(userId: int):
-    """List all liked reviews for a user."""
-    likedReviews = loadLikedReviews()  #renamed variable
-    reviews = loadReviews()
+def countLikes(reviewId: int) -> int:
+    """Return how many users liked a review."""
+    return loadLikeIndex().backward.degree(reviewId)
+
+def withLikeCounts(reviews: List[Review]) -> List[ReviewWithLikes]:
+    """Attach the current like count to each review."""
+    likers = loadLikeIndex().backward
+    return [
+        ReviewWithLikes(
+            **review.model_dump(), likeCount=likers.degree(review.id)
+        )
+        for review in reviews
+    ]
 
-    likedReviewIds = [liked.reviewId for liked in likedReviews if liked.userId == userId]
 
+def encodedWithLikeCounts(
+    reviews: List[Review], start: int, stop: int
+) -> bytes:
+    """
+    Encode reviews[start:stop] as a JSON array of ReviewWithLikes.
+
+    Splices the current like count into each review's cached encoding, so
+    no Review model is built or serialized.
+    """
+    likers = loadLikeIndex().backward
+    with span(SPAN_SERIALIZE):
+        result = []
+        positions = range(len(reviews))[start:stop]
+        for index, data in zip(
+            positions, encodedRecords(reviews, Review, start, stop)
+        ):
+            likeCount = likers.degree(fieldAt(reviews, index, "id"))
+            result.append(b"%s,\"likeCount\":%d}" % (data[:-1], likeCount))
+        return jsonArray(result)
+
+
+def topReviews(movieId: int, limit: int) -> List[ReviewWithLikes]:
+    """
+    Return a movie's most-liked reviews, most likes first.
+
+    Reads the maintained per-movie ranking instead of counting likes. When
+    fewer than limit reviews have likes, the rest are filled with the
+    movie's other reviews, oldest first, from the per-movie review index.
+    """
+    reviews = loadReviews()
     result = []
+    seen = set()
+    offset = 0
+    ranking = _loadTopReviews()
+
+    # ranked reviews may have been deleted since they were liked; skip those
+    while len(result) < limit:
+        batch = ranking.top(movieId, limit, offset)
+        if not batch:
+            break
+        offset += len(batch)
+        for reviewId, count in batch:
+            index = findIndex(reviews, "id", reviewId)
+            if index != -1 and len(result) < limit:
+                result.append(
+                    ReviewWithLikes(
+                        **reviews[index].model_dump(), likeCount=int(count)
+                    )
+                )
+                seen.add(reviewId)
+
+    if len(result) < limit:
+        for reviewId in listMovieReviewIds(reviews, movieId):
+            if len(result) >= limit:
+                break
+            index = (
+                findIndex(reviews, "id", reviewId)
+                if reviewId not in seen
+                else -1
+            )
+            if index != -1:
+                result.append(
+                    ReviewWithLikes(**reviews[index].model_dump(), likeCount=0)
+                )
+    return result
 
-    for review in reviews:
-        if review.id in likedReviewIds:
-
-
-            user = getUserById(review.userId)
+def listLikedReviews(userId: int):
+    """List all liked reviews for a user."""
+    reviews = loadReviews()
 
-            movie = getMovieById(review.movieId)
+    # walks only this user's likes, not every like
+    likedReviewIds = loadLikeIndex().forward.neighbours(userId)
 
-            tmdbDetails = getMovieDetailsById(movie.tmdbId)
-            poster_url = tmdbDetails.poster if hasattr(tmdbDetails, "poster") else None
+    result = []
 
-            result.append(
-                LikedReviewFull(
-                    id=review.id,
-                    movieId=review.movieId,
-                    movieTitle=movie.title,
-                    username=user.username,
-                    reviewTitle=review.reviewTitle,
-                    poster=poster_url,
-                )
+    for reviewId in likedReviewIds:
+        index = findIndex(reviews, "id", reviewId)
+        if index == -1:
+            continue
+        review = reviews[index]
+        user = getUserById(review.userId)
+        movie = getMovieById(review.movieId)
+        tmdbDetails = getMovieDetailsById(movie.tmdbId)
+        poster_url = (
+            tmdbDetails.poster if hasattr(tmdbDetails, "poster") else None
+        )
+
+        result.append(
+            LikedReviewFull(
+                id=review.id,
+                movieId=review.movieId,
+                movieTitle=movie.title,
+                username=user.username,
+                reviewTitle=review.reviewTitle,
+                poster=poster_url,
             )
+        )
     return result
-
-
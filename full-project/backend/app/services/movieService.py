@@ -1,6 +1,14 @@
 from typing import List, Dict, Any
 from ..schemas.movie import Movie, MovieUpdate, MovieCreate
-from ..repos.movieRepo import loadMovies, saveMovies, getNextMovieId
+from ..repos.movieRepo import (
+    MOVIE_WRITE_LOCK,
+    getNextMovieId,
+    loadMovies,
+    saveMovies,
+)
+from ..repos.lazyRecords import findIndex, encodedRecords, jsonArray
+from .recommendationService import indexMovie
+from ..utilities.metrics import span, SPAN_SERIALIZE
 
 
 class MovieError(Exception):
@@ -19,6 +27,14 @@ def listMovies() -> List[Movie]:
     return loadMovies()
 
 
+def encodeMovies(movies: List[Movie]) -> bytes:
+    """
+    Encodes movies as a JSON array, reusing each movie's cached encoding.
+    """
+    with span(SPAN_SERIALIZE):
+        return jsonArray(encodedRecords(movies, Movie))
+
+
 def createMovie(payload: MovieCreate) -> Movie:
     """
     Creates a new movie by generating a new id and adding it into the movies JSON.
@@ -26,22 +42,24 @@ def createMovie(payload: MovieCreate) -> Movie:
     Returns:
         Newly created Movie model
     """
-    movies = loadMovies()
-
-    newMovie = Movie(
-        id=getNextMovieId(),
-        title=payload.title,
-        movieGenres=payload.movieGenres,
-        directors=payload.directors,
-        mainStars=payload.mainStars,
-        description=payload.description,
-        datePublished=payload.datePublished,
-        duration=payload.duration,
-        yearReleased=payload.yearReleased,
-    )
-
-    movies.append(newMovie)
-    saveMovies(movies)
+    with MOVIE_WRITE_LOCK:
+        movies = loadMovies()
+
+        newMovie = Movie(
+            id=getNextMovieId(),
+            title=payload.title,
+            movieGenres=payload.movieGenres,
+            directors=payload.directors,
+            mainStars=payload.mainStars,
+            description=payload.description,
+            datePublished=payload.datePublished,
+            duration=payload.duration,
+            yearReleased=payload.yearReleased,
+        )
+
+        movies.append(newMovie)
+        saveMovies(movies)
+    indexMovie(movies, newMovie)
     return newMovie
 
 
@@ -112,11 +130,10 @@ def getMovieById(movieId: int | str) -> Movie:
     movieId = int(movieId)
     movies = loadMovies()
 
-    for movie in movies:
-        if movie.id == movieId:
-            return movie
-
-    raise MovieNotFoundError()
+    index = findIndex(movies, "id", movieId)
+    if index == -1:
+        raise MovieNotFoundError()
+    return movies[index]
 
 
 def updateMovie(movieId: int, payload: MovieUpdate) -> Movie:
@@ -124,17 +141,18 @@ def updateMovie(movieId: int, payload: MovieUpdate) -> Movie:
     Updates a movie by its ID with the provided fields.
 
     """
-    movies = loadMovies()
     updateFields = payload.model_dump(exclude_unset=True)
+    with MOVIE_WRITE_LOCK:
+        movies = loadMovies()
+        movieIndex = findIndex(movies, "id", movieId)
+        if movieIndex == -1:
+            raise MovieNotFoundError()
 
-    for movieIndex, movie in enumerate(movies):
-        if movie.id == movieId:
-            updatedMovie = movie.model_copy(update=updateFields)
-            movies[movieIndex] = updatedMovie
-            saveMovies(movies)
-            return updatedMovie
-
-    raise MovieNotFoundError()
+        updatedMovie = movies[movieIndex].model_copy(update=updateFields)
+        movies[movieIndex] = updatedMovie
+        saveMovies(movies)
+    indexMovie(movies, updatedMovie)
+    return updatedMovie
 
 
 def deleteMovie(movieId: int) -> None:
@@ -142,20 +160,21 @@ def deleteMovie(movieId: int) -> None:
     Deletes a movie by its ID.
 
     """
-    movies = loadMovies()
-    deleted = False
-    result = []
-
-    for movie in movies:
-        if int(movie.id) == int(movieId):
-            deleted = True
-            continue
-        result.append(movie)
+    with MOVIE_WRITE_LOCK:
+        movies = loadMovies()
+        deleted = False
+        result = []
+
+        for movie in movies:
+            if int(movie.id) == int(movieId):
+                deleted = True
+                continue
+            result.append(movie)
 
-    if not deleted:
-        raise MovieNotFoundError()
+        if not deleted:
+            raise MovieNotFoundError()
 
-    saveMovies(result)
+        saveMovies(result)
 
 
 def searchViaFilters(filters: Dict[str, Any]) -> List[Movie]:
@@ -0,0 +1,366 @@
+import logging
+import os
+import threading
+from collections import defaultdict
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Iterator, List, Tuple
+from ..repos.repo import DATA_DIR
+from ..repos.movieRepo import loadMovies
+from ..repos.reviewRepo import loadReviews
+from ..repos.userRepo import loadUsers
+from ..repos.likeReviewRepo import loadLikeIndex
+from ..repos.favoritesRepo import loadFavoriteIndex
+from ..repos.lazyRecords import findIndex, iterField
+from ..repos.movieVectors import MovieVectorIndex
+from ..repos.annIndex import HnswIndex
+from ..repos.movieSimilarityRepo import (
+    loadSimilarityGraph,
+    addToSimilarityGraph,
+)
+from ..repos.factorModel import (
+    FactorModel,
+    FactorFormatError,
+    trainFactorModel,
+)
+from ..schemas.movie import Movie
+
+logger = logging.getLogger(__name__)
+
+FACTOR_MODEL_PATH = DATA_DIR / "recommendationFactors.bin"
+FACTOR_RANK = 16
+# load or train the factors on a background thread when the app starts
+FACTOR_TRAINING_AT_STARTUP = (
+    os.getenv("FACTOR_TRAINING_AT_STARTUP", "1") == "1"
+)
+# below this many movies the exact
+# inverted-index search is faster than the graph
+SIMILARITY_GRAPH_MIN_MOVIES = 10_000
+
+# how much each kind of interaction says about a user's taste for a movie
+FAVORITE_WEIGHT = 1.0
+WATCHLIST_WEIGHT = 0.5
+LIKED_REVIEW_WEIGHT = 0.5
+
+
+# content vectors for the movie catalog, built
+# from the movies list they were read from
+_MOVIE_VECTORS: MovieVectorIndex | None = None
+_MOVIE_VECTORS_SOURCE = None
+_MOVIE_VECTORS_LOCK = threading.Lock()
+# approximate nearest-neighbour graph over
+# those vectors, for the same movies list
+_SIMILARITY_GRAPH: HnswIndex | None = None
+_SIMILARITY_GRAPH_SOURCE = None
+
+# trained collaborative-filtering factors, read from FACTOR_MODEL_PATH
+_FACTOR_MODEL: FactorModel | None = None
+_FACTOR_MODEL_LOCK = threading.Lock()
+# held for a whole training run, so overlapping runs train once between them
+_FACTOR_TRAINING_LOCK = threading.Lock()
+_FACTOR_TRAINING_THREAD: threading.Thread | None = None
+# (movieId, score) by review ratings, best first, served until the factors
+# are trained; built from the reviews list it was read from
+_FALLBACK_POPULARITY: List[Tuple[int, float]] | None = None
+_FALLBACK_POPULARITY_SOURCE = None
+_FALLBACK_POPULARITY_LOCK = threading.Lock()
+
+
+def _loadMovieVectors(movies) -> MovieVectorIndex:
+    """
+    Return the catalog's content vectors, rebuilding them if the movies were
+    reloaded.
+    """
+    global _MOVIE_VECTORS, _MOVIE_VECTORS_SOURCE
+    if _MOVIE_VECTORS is None or _MOVIE_VECTORS_SOURCE is not movies:
+        _MOVIE_VECTORS = MovieVectorIndex(movies)
+        _MOVIE_VECTORS_SOURCE = movies
+    return _MOVIE_VECTORS
+
+
+def _loadSimilarityGraph(movies) -> HnswIndex:
+    """
+    Return the similar-movies graph, loading or rebuilding it if the movies
+    were reloaded.
+    """
+    global _SIMILARITY_GRAPH, _SIMILARITY_GRAPH_SOURCE
+    if _SIMILARITY_GRAPH is None or _SIMILARITY_GRAPH_SOURCE is not movies:
+        _SIMILARITY_GRAPH = loadSimilarityGraph(
+            movies, _loadMovieVectors(movies)
+        )
+        _SIMILARITY_GRAPH_SOURCE = movies
+    return _SIMILARITY_GRAPH
+
+
+def indexMovie(movies, movie: Movie) -> None:
+    """
+    Add or refresh one movie's vector and graph node after it was created or
+    updated.
+
+    Does nothing until the vectors have been built for this movies list;
+    they are built from the saved list on first use instead.
+    """
+    with _MOVIE_VECTORS_LOCK:
+        if _MOVIE_VECTORS is None or _MOVIE_VECTORS_SOURCE is not movies:
+            return
+        _MOVIE_VECTORS.add(movie)
+        if (
+            _SIMILARITY_GRAPH is not None
+            and _SIMILARITY_GRAPH_SOURCE is movies
+        ):
+            addToSimilarityGraph(
+                _SIMILARITY_GRAPH,
+                movies,
+                movie,
+                _MOVIE_VECTORS.vector(movie.id),
+            )
+
+
+def similarMovies(movieId: int, limit: int = 5) -> List[Movie]:
+    """
+    Return the movies whose genres, directors, stars and description are
+    closest to the given movie, most similar first.
+
+    Computed locally, without calling TMDb, from the movies' TF-IDF vectors:
+    catalogs of SIMILARITY_GRAPH_MIN_MOVIES or more are searched through the
+    approximate nearest-neighbour graph, smaller ones exactly.
+
+    Returns:
+        Up to limit movies; empty if the movie is unknown or shares no
+        features.
+    """
+    movies = loadMovies()
+    movieId = int(movieId)
+    with _MOVIE_VECTORS_LOCK:
+        vectors = _loadMovieVectors(movies)
+        if len(movies) >= SIMILARITY_GRAPH_MIN_MOVIES:
+            ranked = _loadSimilarityGraph(movies).search(
+                vectors.vector(movieId), limit, exclude=(movieId,)
+            )
+        else:
+            ranked = vectors.similar(movieId, limit)
+
+    result = []
+    for similarId, similarity in ranked:
+        index = findIndex(movies, "id", similarId)
+        if index != -1 and similarity > 0:
+            result.append(movies[index])
+    return result
+
+
+def ratingWeight(rating: int) -> float:
+    """
+    Map a 1-10 review rating onto -1..1, so poorly rated movies count against a
+    user's taste.
+    """
+    return (rating - 5.5) / 4.5
+
+
+def collectInteractions() -> Iterator[Tuple[int, int, float]]:
+    """
+    Yield every (userId, movieId, weight) signal: review ratings, liked
+    reviews (for the reviewed movie), favorites and watchlist entries.
+    """
+    reviews = loadReviews()
+    for userId, movieId, rating in zip(
+        iterField(reviews, "userId"),
+        iterField(reviews, "movieId"),
+        iterField(reviews, "rating"),
+    ):
+        yield userId, movieId, ratingWeight(rating)
+
+    reviewMovies = dict(
+        zip(iterField(reviews, "id"), iterField(reviews, "movieId"))
+    )
+    for userId, reviewId in loadLikeIndex().forward.pairs():
+        movieId = reviewMovies.get(reviewId)
+        if movieId is not None:
+            yield userId, movieId, LIKED_REVIEW_WEIGHT
+
+    for userId, movieId in loadFavoriteIndex().forward.pairs():
+        yield userId, movieId, FAVORITE_WEIGHT
+
+    users = loadUsers()
+    for userId, watchlist in zip(
+        iterField(users, "id"), iterField(users, "watchlist")
+    ):
+        for movieId in watchlist or ():
+            yield userId, movieId, WATCHLIST_WEIGHT
+
+
+def userInteractions(userId: int) -> List[Tuple[int, float]]:
+    """
+    Return one user's (movieId, weight) signals, the same ones
+    collectInteractions yields.
+    """
+    reviews = loadReviews()
+    interactions = [
+        (movieId, ratingWeight(rating))
+        for reviewUserId, movieId, rating in zip(
+            iterField(reviews, "userId"),
+            iterField(reviews, "movieId"),
+            iterField(reviews, "rating"),
+        )
+        if reviewUserId == userId
+    ]
+
+    for reviewId in loadLikeIndex().forward.neighbours(userId):
+        index = findIndex(reviews, "id", reviewId)
+        if index != -1:
+            interactions.append((reviews[index].movieId, LIKED_REVIEW_WEIGHT))
+
+    interactions.extend(
+        (movieId, FAVORITE_WEIGHT)
+        for movieId in loadFavoriteIndex().forward.neighbours(userId)
+    )
+
+    users = loadUsers()
+    index = findIndex(users, "id", userId)
+    if index != -1:
+        interactions.extend(
+            (movieId, WATCHLIST_WEIGHT)
+            for movieId in users[index].watchlist or ()
+        )
+    return interactions
+
+
+def trainRecommendations(rank: int = FACTOR_RANK) -> FactorModel:
+    """
+    Factorize every user's interactions and save the factors for
+    recommendMovies.
+
+    This is the batch job; run it whenever enough new activity has built up
+    (see helperFunctions/trainRecommendations.py).
+    """
+    with _FACTOR_TRAINING_LOCK:
+        return _trainAndSave(rank)
+
+
+def _trainAndSave(rank: int) -> FactorModel:
+    """
+    Train, save and cache the factors; the caller holds _FACTOR_TRAINING_LOCK.
+    """
+    global _FACTOR_MODEL
+    model = trainFactorModel(collectInteractions(), rank=rank)
+    model.save(FACTOR_MODEL_PATH)
+    with _FACTOR_MODEL_LOCK:
+        _FACTOR_MODEL = model
+    return model
+
+
+def loadFactorModel() -> FactorModel | None:
+    """
+    Return the cached factors, reading FACTOR_MODEL_PATH on first use.
+
+    Never trains: None until the batch job or the startup training has
+    saved a model.
+    """
+    global _FACTOR_MODEL
+    with _FACTOR_MODEL_LOCK:
+        if _FACTOR_MODEL is None:
+            try:
+                _FACTOR_MODEL = FactorModel.load(FACTOR_MODEL_PATH)
+            except (FileNotFoundError, FactorFormatError):
+                return None
+        return _FACTOR_MODEL
+
+
+def _prepareFactorModel() -> None:
+    """
+    Load the saved factors, or train and save them if there are none.
+    """
+    try:
+        with _FACTOR_TRAINING_LOCK:
+            # a batch run may have saved a model while this one waited
+            if loadFactorModel() is None:
+                _trainAndSave(FACTOR_RANK)
+    except FileNotFoundError:
+        logger.warning("No data to train recommendation factors from")
+    except Exception:
+        logger.exception("Training recommendation factors failed")
+
+
+def startFactorTraining() -> threading.Thread | None:
+    """
+    Load or train the factors on a background thread.
+
+    Called at startup; recommendMovies serves the most popular movies until
+    the model is ready. Does nothing while a previous run is still going.
+    Returns:
+        threading.Thread | None: The thread, or None if one was running.
+    """
+    global _FACTOR_TRAINING_THREAD
+    thread = _FACTOR_TRAINING_THREAD
+    if thread is not None and thread.is_alive():
+        return None
+    thread = threading.Thread(
+        target=_prepareFactorModel, name="factor-training", daemon=True
+    )
+    _FACTOR_TRAINING_THREAD = thread
+    thread.start()
+    return thread
+
+
+def _fallbackPopularity(reviews) -> List[Tuple[int, float]]:
+    """
+    Return every reviewed movie's summed rating weight, best first.
+    """
+    global _FALLBACK_POPULARITY, _FALLBACK_POPULARITY_SOURCE
+    with _FALLBACK_POPULARITY_LOCK:
+        if (
+            _FALLBACK_POPULARITY is None
+            or _FALLBACK_POPULARITY_SOURCE is not reviews
+        ):
+            totals: Dict[int, float] = defaultdict(float)
+            for movieId, rating in zip(
+                iterField(reviews, "movieId"), iterField(reviews, "rating")
+            ):
+                totals[movieId] += ratingWeight(rating)
+            _FALLBACK_POPULARITY = sorted(
+                totals.items(), key=itemgetter(1), reverse=True
+            )
+            _FALLBACK_POPULARITY_SOURCE = reviews
+        return _FALLBACK_POPULARITY
+
+
+def recommendMovies(userId: int, limit: int = 10) -> List[Movie]:
+    """
+    Recommend movies a user has not rated, liked, favorited or saved yet.
+
+    Trained users are scored with their stored factors; users who joined
+    after training are folded in from their current interactions. Users
+    with no usable history get the most popular movies, and so does
+    everyone until the factors have been trained.
+
+    Returns:
+        Up to limit movies, best match first.
+    """
+    model = loadFactorModel()
+    interactions = userInteractions(userId)
+    seen = {movieId for movieId, _ in interactions}
+
+    if model is None:
+        ranked = islice(
+            (
+                (movieId, score)
+                for movieId, score in _fallbackPopularity(loadReviews())
+                if movieId not in seen and score > 0
+            ),
+            limit,
+        )
+    else:
+        factors = model.factorsFor(userId)
+        if factors is None:
+            factors = model.foldIn(interactions)
+        if any(factors):
+            ranked = model.recommend(factors, limit, exclude=seen)
+        else:
+            ranked = model.popular(limit, exclude=seen)
+
+    movies = loadMovies()
+    result = []
+    for movieId, _ in ranked:
+        index = findIndex(movies, "id", movieId)
+        if index != -1:
+            result.append(movies[index])
+    return result
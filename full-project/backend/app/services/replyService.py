@@ -1,6 +1,11 @@
 from datetime import datetime
 from ..schemas.reply import Reply, ReplyCreate
-from ..repos.replyRepo import loadReplies, saveReplies, getNextReplyId
+from ..repos.replyRepo import (
+    REPLY_WRITE_LOCK,
+    getNextReplyId,
+    loadReplies,
+    saveReplies,
+)
 from ..repos.reviewRepo import loadReviews
 from ..services.reviewService import getReviewById
 
@@ -14,16 +19,21 @@ def listReplies(reviewId: int):
 
 def createReply(payload: ReplyCreate) -> Reply:
     """ Creates a new reply and adds to json """
-    replies = loadReplies()
+    with REPLY_WRITE_LOCK:
+        replies = loadReplies()
 
-    newReply = Reply(
-        id=getNextReplyId(),
-        reviewId=payload.reviewId,
-        userId=payload.userId,
-        replyBody=payload.replyBody.strip() if payload.replyBody else "",
-        datePosted=payload.datePosted or datetime.now().strftime("%d %B %Y")
-    )
+        newReply = Reply(
+            id=getNextReplyId(),
+            reviewId=payload.reviewId,
+            userId=payload.userId,
+            replyBody=(
+                payload.replyBody.strip() if payload.replyBody else ""
+            ),
+            datePosted=(
+                payload.datePosted or datetime.now().strftime("%d %B %Y")
+            ),
+        )
 
-    replies.append(newReply)
-    saveReplies(replies)
+        replies.append(newReply)
+        saveReplies(replies)
     return newReply
@@ -1,12 +1,154 @@
-from typing import List
-from ..schemas.review import Review, ReviewUpdate, ReviewCreate
-from ..repos.reviewRepo import loadReviews, saveReviews, getNextReviewId
+import math
+import threading
+from array import array
+from typing import Dict, List
+from ..schemas.review import (
+    Review,
+    ReviewUpdate,
+    ReviewCreate,
+    ReviewBatchItem,
+)
+from ..repos.reviewRepo import (
+    REVIEW_WRITE_LOCK,
+    getNextReviewId,
+    loadReviews,
+    saveReviews,
+)
 from ..repos import movieRepo
+from ..repos.lazyRecords import findIndex, selectWhere, iterField
+from ..repos.adjacency import Adjacency
 from datetime import date
 
+# z for a 95% confidence interval
+HELPFULNESS_Z = 1.96
+
+# movieId -> review ids, most helpful first,
+# built from the reviews list it was read from
+_HELPFUL_REVIEWS: Dict[int, array] | None = None
+_HELPFUL_REVIEWS_SOURCE = None
+_HELPFUL_REVIEWS_LOCK = threading.Lock()
+# movieId -> review ids in id order, built
+# from the reviews list it was read from
+_MOVIE_REVIEWS: Adjacency | None = None
+_MOVIE_REVIEWS_SOURCE = None
+_MOVIE_REVIEWS_LOCK = threading.Lock()
+
 class ReviewNotFoundError(Exception):
     pass
 
+
+def helpfulnessScore(
+    usefulVotes: int, totalVotes: int, z: float = HELPFULNESS_Z
+) -> float:
+    """
+    Lower bound of the Wilson score interval for the share of useful votes.
+
+    Ranks a review with 90 of 100 useful votes above one with 1 of 1, unlike
+    the raw ratio.
+
+    Returns:
+        A score between 0 and 1; 0 for reviews without votes.
+    """
+    if totalVotes <= 0:
+        return 0.0
+    share = min(usefulVotes, totalVotes) / totalVotes
+    zSquared = z * z
+    centre = share + zSquared / (2 * totalVotes)
+    margin = z * math.sqrt(
+        (share * (1 - share) + zSquared / (4 * totalVotes)) / totalVotes
+    )
+    return (centre - margin) / (1 + zSquared / totalVotes)
+
+
+def _loadHelpfulReviews(reviews) -> Dict[int, array]:
+    """
+    Return the per-movie helpfulness ranking, rebuilding it if the reviews were
+    reloaded.
+
+    Scores only change when votes are imported, so the ranking is sorted once
+    and new reviews (no votes, highest id) are appended to the end of their
+    movie.
+    """
+    global _HELPFUL_REVIEWS, _HELPFUL_REVIEWS_SOURCE
+    if _HELPFUL_REVIEWS is None or _HELPFUL_REVIEWS_SOURCE is not reviews:
+        ids = list(iterField(reviews, "id"))
+        # vote counts repeat a lot, so score each (useful, total) pair once
+        scores: Dict[tuple, float] = {}
+        negScores = []
+        for votes in zip(
+            iterField(reviews, "usefulVotes"), iterField(reviews, "totalVotes")
+        ):
+            score = scores.get(votes)
+            if score is None:
+                score = scores[votes] = helpfulnessScore(*votes)
+            negScores.append(-score)
+
+        positions: Dict[int, List[int]] = {}
+        for position, movieId in enumerate(iterField(reviews, "movieId")):
+            positions.setdefault(movieId, []).append(position)
+        # two stable sorts: by id, then by score,
+        # so equal scores stay oldest first
+        ranking: Dict[int, array] = {}
+        for movieId, moviePositions in positions.items():
+            moviePositions.sort(key=ids.__getitem__)
+            moviePositions.sort(key=negScores.__getitem__)
+            ranking[movieId] = array(
+                "q", [ids[position] for position in moviePositions]
+            )
+        _HELPFUL_REVIEWS = ranking
+        _HELPFUL_REVIEWS_SOURCE = reviews
+    return _HELPFUL_REVIEWS
+
+
+def _loadMovieReviews(reviews) -> Adjacency:
+    """
+    Return the per-movie review index, rebuilding it if the reviews were
+    reloaded.
+    """
+    global _MOVIE_REVIEWS, _MOVIE_REVIEWS_SOURCE
+    if _MOVIE_REVIEWS is None or _MOVIE_REVIEWS_SOURCE is not reviews:
+        _MOVIE_REVIEWS = Adjacency(
+            zip(iterField(reviews, "movieId"), iterField(reviews, "id"))
+        )
+        _MOVIE_REVIEWS_SOURCE = reviews
+    return _MOVIE_REVIEWS
+
+
+def listMovieReviewIds(reviews, movieId: int) -> array:
+    """
+    Lists the ids of a movie's reviews, oldest first.
+
+    Reads a per-movie index kept in step with created and deleted reviews,
+    so no other movie's reviews are read.
+
+    Returns:
+        The review ids, ascending
+    """
+    with _MOVIE_REVIEWS_LOCK:
+        return _loadMovieReviews(reviews).neighbours(movieId)
+
+
+def _rankNewReview(reviews, review: Review) -> None:
+    with _HELPFUL_REVIEWS_LOCK:
+        if _HELPFUL_REVIEWS is not None and _HELPFUL_REVIEWS_SOURCE is reviews:
+            _HELPFUL_REVIEWS.setdefault(review.movieId, array("q")).append(
+                review.id
+            )
+    with _MOVIE_REVIEWS_LOCK:
+        if _MOVIE_REVIEWS is not None and _MOVIE_REVIEWS_SOURCE is reviews:
+            _MOVIE_REVIEWS.add(review.movieId, review.id)
+
+
+def _unrankReview(reviews, review: Review) -> None:
+    with _HELPFUL_REVIEWS_LOCK:
+        if _HELPFUL_REVIEWS is not None and _HELPFUL_REVIEWS_SOURCE is reviews:
+            ranked = _HELPFUL_REVIEWS.get(review.movieId)
+            if ranked is not None and review.id in ranked:
+                ranked.remove(review.id)
+    with _MOVIE_REVIEWS_LOCK:
+        if _MOVIE_REVIEWS is not None and _MOVIE_REVIEWS_SOURCE is reviews:
+            _MOVIE_REVIEWS.remove(review.movieId, review.id)
+
 def searchReviews(query: str) -> List[Review]:
     """ Searches reviews by movie title (case-insensitive) or by movie ID 
     
@@ -26,30 +168,52 @@ def searchReviews(query: str) -> List[Review]:
     # If query is a number, treat as movie ID
     if strippedQuery.isdigit():
         movieId = int(strippedQuery)
-        return [review for review in reviews if review.movieId == movieId]
+        return selectWhere(
+            reviews, "movieId", lambda reviewMovieId: reviewMovieId == movieId
+        )
 
-    matchingMovieIds = [
+    matchingMovieIds = {
         movie.id for movie in movies
         if strippedQuery in movie.title.lower()
-    ]
+    }
 
-    return [review for review in reviews if review.movieId in matchingMovieIds]
+    return selectWhere(reviews, "movieId", matchingMovieIds.__contains__)
 
 
 def listReviews() -> List[Review]:
     """ Lists all reviews currently stored """
     return loadReviews()
 
-def createReview(movieId: int, userId: int, payload: ReviewCreate) -> Review:
-    """ 
-    Creates a new review and saves it according to our review schema 
 
-    Returns: 
-        New review
+def listHelpfulReviews(
+    movieId: int, limit: int, offset: int = 0
+) -> List[Review]:
+    """
+    Lists a movie's reviews, most helpful first.
+
+    Helpfulness is the Wilson lower bound of the imported useful / total
+    votes; ties keep the oldest review first. A page is a slice of the
+    movie's precomputed ranking, so no review outside it is read.
+
+    Returns:
+        Up to limit reviews starting at offset
     """
     reviews = loadReviews()
+    with _HELPFUL_REVIEWS_LOCK:
+        ranked = _loadHelpfulReviews(reviews).get(movieId, array("q"))[
+            offset : offset + limit
+        ]
+
+    result = []
+    for reviewId in ranked:
+        index = findIndex(reviews, "id", reviewId)
+        if index != -1:
+            result.append(reviews[index])
+    return result
 
-    newReview = Review(
+
+def _newReview(movieId: int, userId: int, payload: ReviewCreate) -> Review:
+    return Review(
         id=getNextReviewId(),
         movieId=movieId,
         userId=userId,
@@ -59,11 +223,48 @@ def createReview(movieId: int, userId: int, payload: ReviewCreate) -> Review:
         datePosted=date.today().isoformat(),
         flagged=False,
     )
-    
-    reviews.append(newReview)
-    saveReviews(reviews)
+
+def createReview(movieId: int, userId: int, payload: ReviewCreate) -> Review:
+    """ 
+    Creates a new review and saves it according to our review schema 
+
+    Returns: 
+        New review
+    """
+    with REVIEW_WRITE_LOCK:
+        reviews = loadReviews()
+        newReview = _newReview(movieId, userId, payload)
+        reviews.append(newReview)
+        saveReviews(reviews)
+    _rankNewReview(reviews, newReview)
     return newReview
 
+def createReviews(userId: int, items: List[ReviewBatchItem]) -> List[Review]:
+    """
+    Creates several reviews by one user and saves the reviews file once.
+
+    Every item is turned into a Review before any is added, so an invalid
+    item leaves the stored reviews untouched.
+
+    Args:
+        userId (int): Author of every review.
+        items (List[ReviewBatchItem]): The reviews, each with its movieId.
+
+    Returns:
+        The new reviews, in the order given.
+    """
+    if not items:
+        return []
+    with REVIEW_WRITE_LOCK:
+        reviews = loadReviews()
+        newReviews = [_newReview(item.movieId, userId, item) for item in items]
+        for review in newReviews:
+            reviews.append(review)
+        saveReviews(reviews)
+    for review in newReviews:
+        _rankNewReview(reviews, review)
+    return newReviews
+
 def getReviewById(reviewId: int) -> Review:
     """ 
     Retrieves a review by its ID
@@ -76,10 +277,10 @@ def getReviewById(reviewId: int) -> Review:
     """
     reviews = loadReviews()
 
-    for review in reviews:
-        if review.id == reviewId:
-            return review
-    raise ReviewNotFoundError("Review not found")
+    index = findIndex(reviews, "id", reviewId)
+    if index == -1:
+        raise ReviewNotFoundError("Review not found")
+    return reviews[index]
 
 def updateReview(reviewId: int, payload: ReviewUpdate) -> Review:
     """ 
@@ -91,29 +292,29 @@ def updateReview(reviewId: int, payload: ReviewUpdate) -> Review:
     Raises: 
         raises review not found error
     """  
-    reviews = loadReviews()
-    for index, review in enumerate(reviews):
-        if review.id == reviewId:
-            updateData = payload.model_dump(exclude_unset=True)
-            
-            updatedDict = review.model_dump()
-            updatedDict.update(updateData)
-            
-            if 'reviewTitle' in updateData and updatedDict['reviewTitle']:
-                updatedDict['reviewTitle'] = updatedDict['reviewTitle'].strip()
-
-            if 'reviewBody' in updateData and updatedDict['reviewBody']:
-                updatedDict['reviewBody'] = updatedDict['reviewBody'].strip()
-
-            if 'rating' in updateData and updatedDict['rating']:
-                updatedDict['rating'] = int(updatedDict['rating'])
-            
-            updated = Review(**updatedDict)
-            reviews[index] = updated
-            saveReviews(reviews)
-            return updated
-        
-    raise ReviewNotFoundError("Review not found")
+    updateData = payload.model_dump(exclude_unset=True)
+    with REVIEW_WRITE_LOCK:
+        reviews = loadReviews()
+        index = findIndex(reviews, "id", reviewId)
+        if index == -1:
+            raise ReviewNotFoundError("Review not found")
+
+        updatedDict = reviews[index].model_dump()
+        updatedDict.update(updateData)
+
+        if 'reviewTitle' in updateData and updatedDict['reviewTitle']:
+            updatedDict['reviewTitle'] = updatedDict['reviewTitle'].strip()
+
+        if 'reviewBody' in updateData and updatedDict['reviewBody']:
+            updatedDict['reviewBody'] = updatedDict['reviewBody'].strip()
+
+        if 'rating' in updateData and updatedDict['rating']:
+            updatedDict['rating'] = int(updatedDict['rating'])
+
+        updated = Review(**updatedDict)
+        reviews[index] = updated
+        saveReviews(reviews)
+    return updated
 
 def deleteReview(reviewId: int) -> None:
     """ 
@@ -122,38 +323,43 @@ def deleteReview(reviewId: int) -> None:
     Raises: 
         Raises review not found error
     """  
-    reviews = loadReviews()
-    newReviews = [review for review in reviews if review.id != reviewId]
+    with REVIEW_WRITE_LOCK:
+        reviews = loadReviews()
+        index = findIndex(reviews, "id", reviewId)
 
-    if len(newReviews) == len(reviews):
-        raise ReviewNotFoundError("Review not found")
-        
-    saveReviews(newReviews)
+        if index == -1:
+            raise ReviewNotFoundError("Review not found")
+
+        removed = reviews[index]
+        del reviews[index]
+        saveReviews(reviews)
+    _unrankReview(reviews, removed)
 
 def flagReview(reviewId: int) -> Review:
-    reviews = loadReviews()
+    with REVIEW_WRITE_LOCK:
+        reviews = loadReviews()
 
-    for index, review in enumerate(reviews):
-        if review.id == reviewId:
-            updated = review.model_copy(update={"flagged": True})
-            reviews[index] = updated
-            saveReviews(reviews)
-            return updated
+        index = findIndex(reviews, "id", reviewId)
+        if index == -1:
+            raise ReviewNotFoundError("Review not found")
 
-    raise ReviewNotFoundError("Review not found")
+        updated = reviews[index].model_copy(update={"flagged": True})
+        reviews[index] = updated
+        saveReviews(reviews)
+    return updated
 
 def unflagReview(reviewId: int) -> Review:
-    reviews = loadReviews()
+    with REVIEW_WRITE_LOCK:
+        reviews = loadReviews()
 
-    for index, review in enumerate(reviews):
-        if review.id == reviewId:
-            updated = review.model_copy(update={"flagged": False})
-            reviews[index] = updated
-            saveReviews(reviews)
-            return updated
+        index = findIndex(reviews, "id", reviewId)
+        if index == -1:
+            raise ReviewNotFoundError("Review not found")
 
-    raise ReviewNotFoundError("Review not found")
+        updated = reviews[index].model_copy(update={"flagged": False})
+        reviews[index] = updated
+        saveReviews(reviews)
+    return updated
 
 def getFlaggedReviews() -> List[Review]:
-    return [review for review in loadReviews() if review.flagged]
-
+    return selectWhere(loadReviews(), "flagged", bool)
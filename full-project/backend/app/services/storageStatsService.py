@@ -0,0 +1,113 @@
+"""
+Storage statistics of every repo cache, for the admin API and /metrics.
+"""
+
+from typing import Any, Dict, List
+from ..repos import (
+    favoritesRepo,
+    likeReviewRepo,
+    movieRepo,
+    replyRepo,
+    reviewRepo,
+    userRepo,
+)
+
+# repo name -> module with a getStorageStats() function
+STORAGE_REPOS = {
+    "movies": movieRepo,
+    "reviews": reviewRepo,
+    "users": userRepo,
+    "replies": replyRepo,
+    "likes": likeReviewRepo,
+    "favorites": favoritesRepo,
+}
+
+# stat -> (metric name, type, help text)
+_STORAGE_METRICS = {
+    "items": (
+        "spoileralert_repo_items",
+        "gauge",
+        "Records (or links) in the repo cache.",
+    ),
+    "memoryBytes": (
+        "spoileralert_repo_memory_bytes",
+        "gauge",
+        "Estimated memory held by the repo cache.",
+    ),
+    "hits": (
+        "spoileralert_repo_cache_hits_total",
+        "counter",
+        "Reads served from a warm repo cache.",
+    ),
+    "misses": (
+        "spoileralert_repo_cache_misses_total",
+        "counter",
+        "Reads that had to fill the repo cache.",
+    ),
+    "lastLoadSeconds": (
+        "spoileralert_repo_last_load_seconds",
+        "gauge",
+        "Duration of the last cache fill (read, parse, validate).",
+    ),
+    "bytesRead": (
+        "spoileralert_repo_read_bytes_total",
+        "counter",
+        "Bytes read from the data file.",
+    ),
+    "saves": (
+        "spoileralert_repo_saves_total",
+        "counter",
+        "Writes of the data file.",
+    ),
+    "lastSaveSeconds": (
+        "spoileralert_repo_last_save_seconds",
+        "gauge",
+        "Duration of the last write of the data file.",
+    ),
+    "totalSaveSeconds": (
+        "spoileralert_repo_save_seconds_total",
+        "counter",
+        "Time spent writing the data file.",
+    ),
+    "bytesWritten": (
+        "spoileralert_repo_written_bytes_total",
+        "counter",
+        "Bytes written to the data file.",
+    ),
+}
+
+
+def getStorageStats() -> Dict[str, Any]:
+    """
+    Collect the statistics of every repo.
+
+    Returns:
+        Dict[str, Any]: "repos", one entry per repo, and "totalMemoryBytes".
+    """
+    repos: List[Dict[str, Any]] = [
+        {"repo": name, **module.getStorageStats()}
+        for name, module in STORAGE_REPOS.items()
+    ]
+    return {
+        "repos": repos,
+        "totalMemoryBytes": sum(repo["memoryBytes"] for repo in repos),
+    }
+
+
+def storageMetricLines() -> List[str]:
+    """
+    Return the repo statistics as Prometheus text lines, one series per repo.
+    """
+    repos = getStorageStats()["repos"]
+    lines = []
+    for stat, (metric, metricType, helpText) in _STORAGE_METRICS.items():
+        lines += [
+            f"# HELP {metric} {helpText}",
+            f"# TYPE {metric} {metricType}",
+        ]
+        for repo in repos:
+            lines.append(
+                f'{metric}{{repo="{repo["repo"]}",file="{repo["file"]}"}} '
+                f"{repo[stat]}"
+            )
+    return lines
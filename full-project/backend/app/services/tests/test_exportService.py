@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+from app.repos.adjacency import EdgeIndex
+from app.repos.compactStore import ReviewStore
+from app.repos.lazyRecords import LazyRecords, validateRows
+from app.schemas.review import Review
+from app.schemas.user import User
+from app.services import exportService
+
+
+def readLines(chunks) -> list[dict]:
+    return [
+        json.loads(line) for chunk in chunks for line in chunk.splitlines()
+    ]
+
+
+@pytest.fixture
+def reviews(monkeypatch):
+    store = ReviewStore(
+        Review(
+            id=reviewId,
+            movieId=10,
+            userId=reviewId % 3,
+            reviewTitle="Title",
+            reviewBody="A review body",
+            rating=7,
+        )
+        for reviewId in range(1, 8)
+    )
+    monkeypatch.setattr(exportService, "loadReviews", lambda: store)
+    monkeypatch.setattr(exportService, "EXPORT_CHUNK_ROWS", 3)
+    return store
+
+
+def testExportReviewsStreamsEveryReviewInChunks(reviews):
+    chunks = list(exportService.exportReviews())
+
+    assert len(chunks) == 3
+    assert [row["id"] for row in readLines(chunks)] == list(range(1, 8))
+    assert readLines(chunks)[0] == json.loads(reviews[0].model_dump_json())
+
+
+def testExportReviewsSinceId(reviews):
+    assert [
+        row["id"] for row in readLines(exportService.exportReviews(5))
+    ] == [6, 7]
+    assert list(exportService.exportReviews(7)) == []
+
+
+def testExportReviewsKeepsItsPlaceWhenReviewsAreDeleted(reviews):
+    chunks = exportService.exportReviews()
+    first = readLines([next(chunks)])
+    del reviews[0]
+    # id 4, not sent yet
+    del reviews[2]
+    reviews.append(
+        Review(
+            id=8,
+            movieId=10,
+            userId=1,
+            reviewTitle="Title",
+            reviewBody="A review body",
+            rating=7,
+        )
+    )
+
+    assert [row["id"] for row in first + readLines(chunks)] == [
+        1,
+        2,
+        3,
+        5,
+        6,
+        7,
+        8,
+    ]
+
+
+def testExportUsersLeavesOutPasswordHashes(monkeypatch):
+    rows = [
+        {
+            "id": userId,
+            "username": f"user{userId}",
+            "firstName": "Test",
+            "lastName": "User",
+            "age": 30,
+            "email": f"user{userId}@test.com",
+            "pw": "secret-hash",
+        }
+        for userId in (1, 2, 3)
+    ]
+    users = LazyRecords(User, validateRows(User, rows))
+    monkeypatch.setattr(exportService, "loadUsers", lambda: users)
+
+    exported = readLines(exportService.exportUsers(1))
+
+    assert [row["id"] for row in exported] == [2, 3]
+    assert all("pw" not in row for row in exported)
+    assert exported[0]["username"] == "user2"
+    assert users.builtCount() == 0
+
+
+def testExportLinksFilterByUserId(monkeypatch):
+    likes = EdgeIndex([(1, 10), (3, 11), (3, 12), (2, 10)])
+    favorites = EdgeIndex([(4, 100)])
+    monkeypatch.setattr(exportService, "loadLikeIndex", lambda: likes)
+    monkeypatch.setattr(exportService, "loadFavoriteIndex", lambda: favorites)
+
+    assert readLines(exportService.exportLikes(1)) == [
+        {"userId": 2, "reviewId": 10},
+        {"userId": 3, "reviewId": 11},
+        {"userId": 3, "reviewId": 12},
+    ]
+    assert readLines(exportService.exportFavorites()) == [
+        {"userId": 4, "movieId": 100}
+    ]
@@ -0,0 +1,163 @@
+import json
+
+import pytest
+
+from app.repos.adjacency import EdgeIndex
+from app.schemas.review import Review
+from app.services import likeReviewService
+from app.services.likeReviewService import (
+    AlreadyLikedError,
+    ReviewNotFoundError,
+)
+
+
+@pytest.fixture
+def fakeReviews():
+    return [
+        Review(
+            id=1,
+            movieId=10,
+            userId=1,
+            reviewTitle="First",
+            reviewBody="First review body",
+            rating=7,
+        ),
+        Review(
+            id=2,
+            movieId=10,
+            userId=2,
+            reviewTitle="Second",
+            reviewBody="Second review body",
+            rating=8,
+        ),
+        Review(
+            id=3,
+            movieId=10,
+            userId=3,
+            reviewTitle="Third",
+            reviewBody="Third review body",
+            rating=9,
+        ),
+        Review(
+            id=4,
+            movieId=11,
+            userId=3,
+            reviewTitle="Other",
+            reviewBody="Other movie review",
+            rating=5,
+        ),
+    ]
+
+
+@pytest.fixture
+def likeIndex(monkeypatch, fakeReviews):
+    index = EdgeIndex([(7, 2), (8, 2), (7, 3)])
+    monkeypatch.setattr(likeReviewService, "loadLikeIndex", lambda: index)
+    monkeypatch.setattr(likeReviewService, "loadReviews", lambda: fakeReviews)
+    monkeypatch.setattr(likeReviewService, "addLikeEdge", index.add)
+    monkeypatch.setattr(likeReviewService, "removeLikeEdge", index.remove)
+    monkeypatch.setattr(likeReviewService, "_TOP_REVIEWS", None)
+    return index
+
+
+def testTopReviewsOrdersByLikesAndPadsWithUnliked(likeIndex):
+    top = likeReviewService.topReviews(10, 3)
+
+    assert [(review.id, review.likeCount) for review in top] == [
+        (2, 2),
+        (3, 1),
+        (1, 0),
+    ]
+
+
+def testTopReviewsPadsFromTheMoviesOwnReviews(likeIndex, monkeypatch):
+    likeReviewService.topReviews(10, 3)
+    # padding reads the per-movie index, not every stored review
+    monkeypatch.setattr(likeReviewService, "iterField", None)
+
+    assert [review.id for review in likeReviewService.topReviews(10, 5)] == [
+        2,
+        3,
+        1,
+    ]
+    assert [review.id for review in likeReviewService.topReviews(11, 5)] == [4]
+
+
+def testLikeAndUnlikeUpdateRanking(likeIndex):
+    likeReviewService.likeReview(7, 1)
+    likeReviewService.likeReview(9, 1)
+    likeReviewService.likeReview(10, 1)
+    likeReviewService.unlikeReview(7, 2)
+
+    top = likeReviewService.topReviews(10, 2)
+
+    assert [(review.id, review.likeCount) for review in top] == [
+        (1, 3),
+        (2, 1),
+    ]
+    assert likeReviewService.countLikes(1) == 3
+
+
+def testLikeReviewsLikesAllAndReportsDuplicates(likeIndex, monkeypatch):
+    saves = []
+    monkeypatch.setattr(
+        likeReviewService,
+        "addLikeEdges",
+        lambda pairs: saves.append(1)
+        or [pair for pair in pairs if likeIndex.add(*pair)],
+    )
+
+    result = likeReviewService.likeReviews(7, [1, 2, 4, 1])
+
+    assert result["liked"] == [1, 4]
+    assert result["alreadyLiked"] == [2]
+    assert saves == [1]
+    assert [
+        (review.id, review.likeCount)
+        for review in likeReviewService.topReviews(11, 1)
+    ] == [(4, 1)]
+
+
+def testLikeReviewsChangesNothingWhenAReviewIsMissing(likeIndex):
+    with pytest.raises(ReviewNotFoundError):
+        likeReviewService.likeReviews(7, [1, 99])
+
+    assert not likeIndex.forward.contains(7, 1)
+
+
+def testTopReviewsSkipsDeletedReviews(likeIndex, fakeReviews):
+    likeReviewService.topReviews(10, 1)
+    del fakeReviews[1]
+
+    top = likeReviewService.topReviews(10, 1)
+
+    assert [review.id for review in top] == [3]
+
+
+def testLikeReviewErrors(likeIndex):
+    with pytest.raises(ReviewNotFoundError):
+        likeReviewService.likeReview(7, 99)
+    with pytest.raises(AlreadyLikedError):
+        likeReviewService.likeReview(7, 2)
+    with pytest.raises(ReviewNotFoundError):
+        likeReviewService.unlikeReview(7, 1)
+
+
+def testWithLikeCounts(likeIndex, fakeReviews):
+    counted = likeReviewService.withLikeCounts(fakeReviews[:2])
+
+    assert [review.likeCount for review in counted] == [0, 2]
+    assert counted[1].reviewTitle == "Second"
+
+
+def testEncodedWithLikeCountsMatchesWithLikeCounts(likeIndex, fakeReviews):
+    encoded = likeReviewService.encodedWithLikeCounts(fakeReviews, 1, 10)
+
+    expected = [
+        review.model_dump(mode="json")
+        for review in likeReviewService.withLikeCounts(fakeReviews[1:])
+    ]
+    assert json.loads(encoded) == expected
+    assert (
+        likeReviewService.encodedWithLikeCounts(fakeReviews, 10, 20) == b"[]"
+    )
@@ -463,3 +463,4 @@ def testSearchViaFiltersListFilterNoMatch(monkeypatch, sampleMovieList):
     resultMovies = searchViaFilters(filters)
 
     assert resultMovies == []
+
@@ -0,0 +1,203 @@
+import time
+
+import pytest
+
+import app.services.movieService as movieServiceModule
+import app.services.recommendationService as recommendationModule
+import app.repos.movieSimilarityRepo as similarityRepoModule
+from app.repos.factorModel import trainFactorModel
+from app.schemas.movie import Movie, MovieCreate
+from app.schemas.review import Review
+
+
+@pytest.fixture
+def sampleMovies():
+    return [
+        Movie(
+            id=1,
+            title="Heist",
+            movieGenres=["Crime"],
+            directors=["Ann Lee"],
+            description="A crew plans a heist.",
+            duration=120,
+        ),
+        Movie(
+            id=2,
+            title="Heist Two",
+            movieGenres=["Crime"],
+            directors=["Ann Lee"],
+            description="The crew is back.",
+            duration=110,
+        ),
+        Movie(
+            id=3,
+            title="Space",
+            movieGenres=["Sci-Fi"],
+            directors=["Cy Park"],
+            description="Astronauts drift.",
+            duration=140,
+        ),
+    ]
+
+
+def testSimilarMoviesFollowCreatedMovies(monkeypatch, sampleMovies):
+    monkeypatch.setattr(movieServiceModule, "loadMovies", lambda: sampleMovies)
+    monkeypatch.setattr(
+        recommendationModule, "loadMovies", lambda: sampleMovies
+    )
+    monkeypatch.setattr(movieServiceModule, "saveMovies", lambda movies: None)
+    monkeypatch.setattr(movieServiceModule, "getNextMovieId", lambda: 99)
+
+    assert [
+        movie.id for movie in recommendationModule.similarMovies(1, 5)
+    ] == [2]
+    assert recommendationModule.similarMovies(3, 5) == []
+
+    movieServiceModule.createMovie(
+        MovieCreate(
+            title="Orbit",
+            movieGenres=["Sci-Fi"],
+            description="Astronauts again.",
+            duration=150,
+        )
+    )
+
+    assert [
+        movie.id for movie in recommendationModule.similarMovies(3, 5)
+    ] == [99]
+
+
+def testLargeCatalogsSearchTheSimilarityGraph(
+    monkeypatch, tmp_path, sampleMovies
+):
+    monkeypatch.setattr(recommendationModule, "SIMILARITY_GRAPH_MIN_MOVIES", 0)
+    monkeypatch.setattr(
+        similarityRepoModule, "FILE", tmp_path / "movieSimilarity.json"
+    )
+    monkeypatch.setattr(movieServiceModule, "loadMovies", lambda: sampleMovies)
+    monkeypatch.setattr(
+        recommendationModule, "loadMovies", lambda: sampleMovies
+    )
+    monkeypatch.setattr(movieServiceModule, "saveMovies", lambda movies: None)
+    monkeypatch.setattr(movieServiceModule, "getNextMovieId", lambda: 99)
+
+    assert [
+        movie.id for movie in recommendationModule.similarMovies(1, 5)
+    ] == [2]
+    assert (tmp_path / "movieSimilarity.json").exists()
+
+    movieServiceModule.createMovie(
+        MovieCreate(
+            title="Orbit",
+            movieGenres=["Sci-Fi"],
+            description="Astronauts again.",
+            duration=150,
+        )
+    )
+
+    assert [
+        movie.id for movie in recommendationModule.similarMovies(3, 5)
+    ] == [99]
+
+
+def testRecommendMoviesFoldsInNewUsers(monkeypatch, sampleMovies):
+    model = trainFactorModel(
+        [(1, 1, 1.0), (1, 2, 1.0), (2, 1, 1.0), (2, 2, 1.0), (3, 3, 1.0)],
+        rank=2,
+    )
+    monkeypatch.setattr(recommendationModule, "loadFactorModel", lambda: model)
+    monkeypatch.setattr(
+        recommendationModule, "loadMovies", lambda: sampleMovies
+    )
+    monkeypatch.setattr(
+        recommendationModule, "userInteractions", lambda userId: [(1, 1.0)]
+    )
+
+    assert [
+        movie.id for movie in recommendationModule.recommendMovies(42, 1)
+    ] == [2]
+
+
+def testRecommendMoviesFallsBackToPopular(monkeypatch, sampleMovies):
+    model = trainFactorModel([(1, 1, 1.0), (2, 1, 1.0), (2, 3, 1.0)], rank=2)
+    monkeypatch.setattr(recommendationModule, "loadFactorModel", lambda: model)
+    monkeypatch.setattr(
+        recommendationModule, "loadMovies", lambda: sampleMovies
+    )
+    monkeypatch.setattr(
+        recommendationModule, "userInteractions", lambda userId: []
+    )
+
+    assert [
+        movie.id for movie in recommendationModule.recommendMovies(42, 2)
+    ] == [1, 3]
+
+
+def testInteractionWeights():
+    assert recommendationModule.ratingWeight(10) == 1.0
+    assert recommendationModule.ratingWeight(1) == -1.0
+
+
+def testRecommendationsServePopularMoviesUntilTrained(
+    monkeypatch, tmp_path, sampleMovies
+):
+    monkeypatch.setattr(
+        recommendationModule,
+        "FACTOR_MODEL_PATH",
+        tmp_path / "recommendationFactors.bin",
+    )
+    monkeypatch.setattr(recommendationModule, "_FACTOR_MODEL", None)
+
+    def noTraining():
+        raise AssertionError("a request should not train the factors")
+
+    reviews = [
+        Review(id=index, movieId=movieId, userId=7, reviewTitle="Title",
+               reviewBody="Body", rating=rating)
+        for index, (movieId, rating) in enumerate(
+            [(3, 10), (3, 9), (1, 8), (2, 2)]
+        )
+    ]
+    monkeypatch.setattr(
+        recommendationModule, "collectInteractions", noTraining
+    )
+    monkeypatch.setattr(recommendationModule, "loadReviews", lambda: reviews)
+    monkeypatch.setattr(
+        recommendationModule, "loadMovies", lambda: sampleMovies
+    )
+    monkeypatch.setattr(
+        recommendationModule, "userInteractions", lambda userId: [(1, 1.0)]
+    )
+
+    recommended = recommendationModule.recommendMovies(42, 5)
+
+    # movie 1 is already seen and movie 2 is rated poorly
+    assert [movie.id for movie in recommended] == [3]
+
+
+def testStartupTrainingRunsOnce(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        recommendationModule,
+        "FACTOR_MODEL_PATH",
+        tmp_path / "recommendationFactors.bin",
+    )
+    monkeypatch.setattr(recommendationModule, "_FACTOR_MODEL", None)
+    monkeypatch.setattr(recommendationModule, "_FACTOR_TRAINING_THREAD", None)
+    trainings = []
+
+    def slowInteractions():
+        trainings.append(1)
+        time.sleep(0.2)
+        return iter([(1, 1, 1.0), (2, 2, 1.0)])
+
+    monkeypatch.setattr(
+        recommendationModule, "collectInteractions", slowInteractions
+    )
+
+    thread = recommendationModule.startFactorTraining()
+    assert recommendationModule.startFactorTraining() is None
+    thread.join()
+
+    assert len(trainings) == 1
+    assert recommendationModule.loadFactorModel() is not None
+    assert (tmp_path / "recommendationFactors.bin").exists()
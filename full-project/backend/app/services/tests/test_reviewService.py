@@ -3,7 +3,12 @@ from fastapi import HTTPException
 from unittest.mock import patch, MagicMock
 from app.services import reviewService
 from ...schemas.movie import Movie
-from app.schemas.review import Review, ReviewCreate, ReviewUpdate
+from app.schemas.review import (
+    Review,
+    ReviewCreate,
+    ReviewUpdate,
+    ReviewBatchItem,
+)
 from app.services.reviewService import ReviewNotFoundError
 from ...repos import reviewRepo
 
@@ -108,6 +113,40 @@ def test_createReview(mockSave, mockLoad, mockNextId, fakeReviews):
     assert newReview.id == 100
     mockSave.assert_called_once()
 
+@patch("app.services.reviewService.getNextReviewId")
+@patch("app.services.reviewService.loadReviews")
+@patch("app.services.reviewService.saveReviews")
+def test_createReviewsSavesOnce(mockSave, mockLoad, mockNextId, fakeReviews):
+    """
+    this test checks that a batch of reviews is appended in order and saved
+    once
+    """
+    mockLoad.return_value = fakeReviews
+    mockNextId.side_effect = [100, 101]
+
+    items = [
+        ReviewBatchItem(
+            movieId=10,
+            reviewTitle="Batch one",
+            reviewBody="  First batch review body ",
+            rating=7,
+        ),
+        ReviewBatchItem(
+            movieId=11,
+            reviewTitle="Batch two",
+            reviewBody="Second batch review body",
+            rating=4,
+        ),
+    ]
+
+    created = reviewService.createReviews(50001, items)
+
+    assert [
+        (review.id, review.movieId, review.userId) for review in created
+    ] == [(100, 10, 50001), (101, 11, 50001)]
+    assert created[0].reviewBody == "First batch review body"
+    assert fakeReviews[-2:] == created
+    mockSave.assert_called_once_with(fakeReviews)
 
 
 @patch("app.services.reviewService.loadReviews")
@@ -205,3 +244,70 @@ def test_getFlaggedReviews(mockLoad, fakeReviews):
 
     assert len(flagged) == 2
     assert all(review.flagged is True for review in flagged)
+
+
+def test_helpfulnessScorePrefersMoreEvidence():
+    """
+    this test checks that many mostly-useful votes beat a single useful vote
+    """
+    assert reviewService.helpfulnessScore(0, 0) == 0.0
+    assert reviewService.helpfulnessScore(
+        90, 100
+    ) > reviewService.helpfulnessScore(1, 1)
+    assert 0 < reviewService.helpfulnessScore(1, 1) < 1
+
+
+@patch("app.services.reviewService.getNextReviewId")
+@patch("app.services.reviewService.saveReviews")
+@patch("app.services.reviewService.loadReviews")
+def test_listHelpfulReviews(mockLoad, mockSave, mockNextId, fakeReviews):
+    """
+    this test checks that a movie's reviews are listed most helpful first and
+    kept up to date
+    """
+    fakeReviews[0].usefulVotes, fakeReviews[0].totalVotes = 1, 1
+    fakeReviews[2].usefulVotes, fakeReviews[2].totalVotes = 45, 50
+    mockLoad.return_value = fakeReviews
+    mockNextId.return_value = 4
+
+    assert [
+        review.id for review in reviewService.listHelpfulReviews(10, 10)
+    ] == [3, 1]
+    assert [
+        review.id for review in reviewService.listHelpfulReviews(10, 1, 1)
+    ] == [1]
+
+    payload = ReviewCreate(
+        reviewTitle="No votes yet", reviewBody="Just posted this one", rating=6
+    )
+    reviewService.createReview(10, 50001, payload)
+    reviewService.deleteReview(3)
+
+    assert [
+        review.id for review in reviewService.listHelpfulReviews(10, 10)
+    ] == [1, 4]
+    assert reviewService.listHelpfulReviews(99, 10) == []
+
+
+@patch("app.services.reviewService.getNextReviewId")
+@patch("app.services.reviewService.saveReviews")
+@patch("app.services.reviewService.loadReviews")
+def test_listMovieReviewIds(mockLoad, mockSave, mockNextId, fakeReviews):
+    """
+    this test checks that the per-movie review index follows created and
+    deleted reviews
+    """
+    mockLoad.return_value = fakeReviews
+    mockNextId.return_value = 4
+
+    assert list(reviewService.listMovieReviewIds(fakeReviews, 10)) == [1, 3]
+
+    payload = ReviewCreate(
+        reviewTitle="Another take", reviewBody="Just posted this one", rating=6
+    )
+    reviewService.createReview(10, 50001, payload)
+    reviewService.deleteReview(1)
+
+    assert list(reviewService.listMovieReviewIds(fakeReviews, 10)) == [3, 4]
+    assert list(reviewService.listMovieReviewIds(fakeReviews, 11)) == [2]
+    assert list(reviewService.listMovieReviewIds(fakeReviews, 99)) == []
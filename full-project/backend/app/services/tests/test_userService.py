@@ -1,7 +1,7 @@
 import pytest
 import uuid
 from fastapi import HTTPException
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 from app.services import userService
 from app.schemas.user import User, UserCreate, UserUpdate
 from app.schemas.role import Role
@@ -182,6 +182,36 @@ def test_updateUserNotFound(mockLoad, mockSave):
         userService.updateUser(999, payload)
 
 
+# this tests that a whole watchlist is replaced, deduplicated and saved once
+@patch("app.services.userService.loadMovies")
+@patch("app.services.userService.saveUsers")
+@patch("app.services.userService.loadUsers")
+def test_setWatchlist(mockLoad, mockSave, mockMovies, fakeUsers):
+    mockLoad.return_value = fakeUsers
+    mockMovies.return_value = [MagicMock(id=movieId) for movieId in (5, 6, 7)]
+
+    watchlist = userService.setWatchlist(2, [7, 5, 7])
+
+    assert watchlist == [7, 5]
+    assert fakeUsers[1].watchlist == [7, 5]
+    mockSave.assert_called_once()
+
+
+# this tests that an unknown movie rejects the whole watchlist
+@patch("app.services.userService.loadMovies")
+@patch("app.services.userService.saveUsers")
+@patch("app.services.userService.loadUsers")
+def test_setWatchlistUnknownMovie(mockLoad, mockSave, mockMovies, fakeUsers):
+    mockLoad.return_value = fakeUsers
+    mockMovies.return_value = [MagicMock(id=5)]
+
+    with pytest.raises(userService.MovieNotFoundError):
+        userService.setWatchlist(1, [5, 99])
+
+    assert fakeUsers[0].watchlist == []
+    mockSave.assert_not_called()
+
+
 # this tests that a user is deleted correctly
 @patch("app.services.userService.saveUsers")
 @patch("app.services.userService.loadUsers")
@@ -3,7 +3,15 @@ from typing import List
 from fastapi import HTTPException
 from ..schemas.user import User, UserCreate, UserUpdate
 from ..schemas.role import Role
-from ..repos.userRepo import getNextUserId, loadUsers, saveUsers
+from ..repos.userRepo import (
+    USER_WRITE_LOCK,
+    getNextUserId,
+    loadUsers,
+    saveUsers,
+)
+from ..repos.movieRepo import loadMovies
+from ..repos.lazyRecords import findIndex, iterField
+from .favoritesService import MovieNotFoundError
 from ..utilities.security import hashPassword, verifyPassword
 
 class UserNotFoundError(Exception):
@@ -33,11 +41,13 @@ def isUsernameTaken(
     """
     normalizedNewUsername = username.lower()
 
-    for user in users:
-        if exclude_user_id is not None and user.id == exclude_user_id:
+    for userId, existingUsername in zip(
+        iterField(users, "id"), iterField(users, "username")
+    ):
+        if exclude_user_id is not None and userId == exclude_user_id:
             continue
 
-        normalizedExistingUsername = user.username.lower()
+        normalizedExistingUsername = existingUsername.lower()
         if normalizedExistingUsername == normalizedNewUsername:
             return True
 
@@ -65,25 +75,30 @@ def createUser(payload: UserCreate) -> User:
     Expects:
         payload (UserCreate): user creation data is already validated, such as username abiding by constraints
     """
-    users = loadUsers()
-
-    if isUsernameTaken(users, payload.username):
+    if isUsernameTaken(loadUsers(), payload.username):
         raise UsernameTakenError("Username already taken.")
 
+    # hashing is slow, so it happens before the lock is taken
     hashedPw = hashPassword(payload.pw)
 
-    newUser = User(
-        id=getNextUserId(),
-        username=payload.username,
-        firstName=payload.firstName,
-        lastName=payload.lastName,
-        age=payload.age,
-        email=payload.email,
-        pw=hashedPw,
-    )
-
-    users.append(newUser)
-    saveUsers(users)
+    with USER_WRITE_LOCK:
+        users = loadUsers()
+        # another request may have taken the name while this one hashed
+        if isUsernameTaken(users, payload.username):
+            raise UsernameTakenError("Username already taken.")
+
+        newUser = User(
+            id=getNextUserId(),
+            username=payload.username,
+            firstName=payload.firstName,
+            lastName=payload.lastName,
+            age=payload.age,
+            email=payload.email,
+            pw=hashedPw,
+        )
+
+        users.append(newUser)
+        saveUsers(users)
     return newUser
 
 
@@ -101,10 +116,10 @@ def getUserById(userId: int) -> User:
         Exception: user not found
     """
     users = loadUsers()
-    for user in users:
-        if user.id == userId:
-            return user
-    raise UserNotFoundError(f"User '{userId}' not found.")
+    index = findIndex(users, "id", userId)
+    if index == -1:
+        raise UserNotFoundError(f"User '{userId}' not found.")
+    return users[index]
 
 
 def getUserByUsername(username: str) -> User | None:
@@ -118,10 +133,10 @@ def getUserByUsername(username: str) -> User | None:
         User or None if not found
     """
     users = loadUsers()
-    for user in users:
-        if user.username == username:
-            return user
-    return None
+    index = findIndex(users, "username", username)
+    if index == -1:
+        return None
+    return users[index]
 
 
 def updateUser(userId: int, payload: UserUpdate) -> User:
@@ -151,14 +166,48 @@ def updateUser(userId: int, payload: UserUpdate) -> User:
     if "pw" in updateData and updateData["pw"] is not None:
         updateData["pw"] = hashPassword(updateData["pw"])
 
-    for index, current_user in enumerate(users):
-        if current_user.id == userId:
-            updated_user = current_user.model_copy(update=updateData)
-            users[index] = updated_user
-            saveUsers(users)
-            return updated_user
+    with USER_WRITE_LOCK:
+        index = findIndex(users, "id", userId)
+        if index == -1:
+            raise UserNotFoundError(f"User '{userId}' not found.")
+
+        updated_user = users[index].model_copy(update=updateData)
+        users[index] = updated_user
+        saveUsers(users)
+    return updated_user
+
+
+def setWatchlist(userId: int, movieIds: List[int]) -> List[int]:
+    """
+    Replace a user's watchlist and save the users file once.
 
-    raise UserNotFoundError(f"User '{userId}' not found.")
+    Args:
+        userId (int): ID of the user
+        movieIds (List[int]): the new watchlist; repeated ids are kept once,
+            first position wins
+
+    Returns:
+        The saved watchlist
+
+    Raises:
+        MovieNotFoundError: a movie does not exist; the watchlist is left
+            unchanged
+        UserNotFoundError: user not found
+    """
+    watchlist = list(dict.fromkeys(movieIds))
+    knownMovies = set(iterField(loadMovies(), "id"))
+    for movieId in watchlist:
+        if movieId not in knownMovies:
+            raise MovieNotFoundError(f"Movie '{movieId}' not found")
+
+    with USER_WRITE_LOCK:
+        users = loadUsers()
+        index = findIndex(users, "id", userId)
+        if index == -1:
+            raise UserNotFoundError(f"User '{userId}' not found.")
+        users[index] = users[index].model_copy(update={"watchlist": watchlist})
+        saveUsers(users)
+    return watchlist
 
 
 def deleteUser(userId: int):
@@ -170,15 +219,15 @@ def deleteUser(userId: int):
     Raises:
         HTTPException: user not found
     """
-    users = loadUsers()
+    with USER_WRITE_LOCK:
+        users = loadUsers()
 
-    for index, user in enumerate(users):
-        if user.id == userId:
-            del users[index]
-            saveUsers(users)
-            return
+        index = findIndex(users, "id", userId)
+        if index == -1:
+            raise UserNotFoundError(f"User '{userId}' not found.")
 
-    raise UserNotFoundError(f"User '{userId}' not found.")
+        del users[index]
+        saveUsers(users)
 
 
 def getUserByEmail(email: str) -> User | None:
@@ -194,4 +243,3 @@ def getUserByEmail(email: str) -> User | None:
         if user.email.lower() == normalized:
             return user
     raise EmailTakenError(f"Email '{email}' not found.")
-
@@ -0,0 +1,279 @@
+"""
+Response compression (Brotli or gzip) above a minimum body size.
+
+CompressionMiddleware compresses JSON and text responses for clients that
+send a matching Accept-Encoding. Bodies smaller than COMPRESSION_MIN_SIZE
+go out as they are, since compressing them costs more than it saves;
+streamed bodies are compressed chunk by chunk. Responses that already
+carry a Content-Encoding are passed through, which is how the response
+cache serves its own pre-compressed variants (see responseCache.py).
+
+Brotli is used when the `brotli` package is installed; otherwise only
+gzip is offered.
+"""
+
+import gzip
+import os
+import zlib
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import brotli
+except ImportError:
+    # gzip only when brotli is not installed
+    brotli = None
+
+# bodies below this many bytes are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+# encodings offered, most preferred first; an empty list turns compression off
+COMPRESSION_ENCODINGS = [
+    name.strip()
+    for name in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",")
+    if name.strip() and (name.strip() != "br" or brotli is not None)
+]
+
+_COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+_EXCLUDED_TYPES = ("text/event-stream",)
+
+
+def chooseEncoding(
+    acceptEncoding: str | None,
+    encodings: Iterable[str] = COMPRESSION_ENCODINGS,
+) -> str | None:
+    """
+    Pick the encoding to use for an Accept-Encoding header.
+
+    Args:
+        acceptEncoding (str | None): The request's Accept-Encoding value.
+        encodings (Iterable[str]): Encodings we can produce, most preferred
+            first.
+
+    Returns:
+        str | None: The accepted encoding with the highest q-value (ties go to
+        the earlier entry of encodings), or None to send the body as is.
+    """
+    if not acceptEncoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in acceptEncoding.split(","):
+        name, _, parameters = part.strip().partition(";")
+        weight = 1.0
+        parameters = parameters.strip()
+        if parameters.startswith("q="):
+            try:
+                weight = float(parameters[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    best, bestWeight = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > bestWeight:
+            best, bestWeight = encoding, weight
+    return best
+
+
+def compressBody(body: bytes, encoding: str) -> bytes:
+    """
+    Compress a whole body with the given content encoding.
+
+    Raises:
+        ValueError: If the encoding is not supported here.
+    """
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+class _StreamCompressor:
+    """
+    Incremental compressor for streamed bodies.
+    """
+
+    def __init__(self, encoding: str):
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(
+                GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+        elif encoding == "br" and brotli is not None:
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            raise ValueError(f"Unsupported content encoding: {encoding}")
+        self._brotli = encoding == "br"
+
+    def compress(self, chunk: bytes) -> bytes:
+        """
+        Compress one chunk and flush it, so each chunk reaches the client
+        promptly.
+        """
+        if self._brotli:
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        return (
+            self._compressor.finish()
+            if self._brotli
+            else self._compressor.flush()
+        )
+
+
+def isCompressible(headers: List[Tuple[bytes, bytes]]) -> bool:
+    """
+    Check whether response headers describe a body worth compressing.
+    """
+    contentType = ""
+    for name, value in headers:
+        name = name.lower()
+        if name == b"content-encoding":
+            return False
+        if name == b"content-type":
+            contentType = value.decode("latin-1").lower()
+    return contentType.startswith(
+        _COMPRESSIBLE_TYPES
+    ) and not contentType.startswith(_EXCLUDED_TYPES)
+
+
+def withVary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """
+    Return headers with Accept-Encoding added to Vary.
+    """
+    for index, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            if b"accept-encoding" in value.lower():
+                return headers
+            headers = list(headers)
+            headers[index] = (name, value + b", Accept-Encoding")
+            return headers
+    return headers + [(b"vary", b"Accept-Encoding")]
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing large JSON and text responses.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimumSize: int = COMPRESSION_MIN_SIZE,
+        encodings: Iterable[str] = COMPRESSION_ENCODINGS,
+    ):
+        """
+        Args:
+            app: The ASGI application to wrap.
+            minimumSize (int): Smallest body, in bytes, that is compressed.
+            encodings (Iterable[str]): Encodings to offer, most preferred
+                first.
+        """
+        self.app = app
+        self.minimumSize = minimumSize
+        self.encodings = list(encodings)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        acceptEncoding = None
+        for name, value in scope.get("headers", []):
+            if name.lower() == b"accept-encoding":
+                acceptEncoding = value.decode("latin-1")
+        encoding = chooseEncoding(acceptEncoding, self.encodings)
+
+        start = None
+        compressor: _StreamCompressor | None = None
+        passThrough = False
+
+        async def compressingSend(message):
+            nonlocal start, compressor, passThrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passThrough:
+                if start is not None:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            moreBody = message.get("more_body", False)
+            if start is not None:
+                headers = list(start.get("headers", []))
+                compressible = isCompressible(headers)
+                if compressible:
+                    headers = withVary(headers)
+                if (
+                    not compressible
+                    or encoding is None
+                    or (not moreBody and len(body) < self.minimumSize)
+                ):
+                    passThrough = True
+                    await send({**start, "headers": headers})
+                    start = None
+                    await send(message)
+                    return
+
+                headers = [
+                    (name, value)
+                    for name, value in headers
+                    if name.lower() != b"content-length"
+                ]
+                headers.append(
+                    (b"content-encoding", encoding.encode("latin-1"))
+                )
+                if moreBody:
+                    compressor = _StreamCompressor(encoding)
+                    body = compressor.compress(body)
+                else:
+                    body = compressBody(body, encoding)
+                    headers.append(
+                        (b"content-length", str(len(body)).encode("latin-1"))
+                    )
+                await send({**start, "headers": headers})
+                start = None
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": body,
+                        "more_body": moreBody,
+                    }
+                )
+                return
+
+            # later chunks of a streamed, compressed body
+            body = (
+                compressor.compress(body)
+                if moreBody
+                else compressor.compress(body) + compressor.finish()
+            )
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": body,
+                    "more_body": moreBody,
+                }
+            )
+
+        await self.app(scope, receive, compressingSend)
+
+
+__all__ = [
+    "CompressionMiddleware",
+    "chooseEncoding",
+    "compressBody",
+    "isCompressible",
+    "withVary",
+    "COMPRESSION_MIN_SIZE",
+    "COMPRESSION_ENCODINGS",
+    "GZIP_LEVEL",
+    "BROTLI_QUALITY",
+]
@@ -0,0 +1,103 @@
+"""
+Deferred imports of heavy, rarely needed third-party modules.
+
+With LAZY_IMPORTS=1, lazyImport returns a stand-in module that imports
+the real one the first time one of its attributes is used, so starting
+the app does not pay for passlib, python-jose or requests until a login,
+a token check or a TMDb call needs them (or the background warm-up loads
+them, see warmup.py). Without it, lazyImport imports the module at once,
+exactly like an import statement.
+"""
+
+import importlib
+import os
+import sys
+import threading
+from types import ModuleType
+from typing import List
+
+LAZY_IMPORTS = os.getenv("LAZY_IMPORTS", "0") == "1"
+
+# every stand-in made so far, so the warm-up can load them all
+_LAZY_MODULES: List["LazyModule"] = []
+_LAZY_LOCK = threading.Lock()
+
+
+class LazyModule(ModuleType):
+    """
+    Module stand-in that imports the real module on first attribute access.
+
+    Attribute reads, writes and deletes all go to the real module, so
+    unittest.mock.patch works through the stand-in as well.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        object.__setattr__(self, "_lazyModule", None)
+
+    def _load(self) -> ModuleType:
+        module = object.__getattribute__(self, "_lazyModule")
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            object.__setattr__(self, "_lazyModule", module)
+        return module
+
+    @property
+    def isLoaded(self) -> bool:
+        return object.__getattribute__(self, "_lazyModule") is not None
+
+    def __getattr__(self, name: str):
+        # only reached for names the stand-in itself does not have
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._load(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.isLoaded else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazyImport(name: str, lazy: bool | None = None) -> ModuleType:
+    """
+    Import a module now, or return a LazyModule importing it on first use.
+
+    Args:
+        name (str): The dotted module name.
+        lazy (bool | None): Defer the import; defaults to LAZY_IMPORTS.
+            Modules already imported are always returned as they are.
+
+    Returns:
+        ModuleType: The module or its stand-in.
+    """
+    if lazy is None:
+        lazy = LAZY_IMPORTS
+    if not lazy or name in sys.modules:
+        return importlib.import_module(name)
+    module = LazyModule(name)
+    with _LAZY_LOCK:
+        _LAZY_MODULES.append(module)
+    return module
+
+
+def loadLazyModules() -> int:
+    """
+    Import every module still deferred.
+
+    Returns:
+        int: How many modules were imported.
+    """
+    with _LAZY_LOCK:
+        pending = [module for module in _LAZY_MODULES if not module.isLoaded]
+    for module in pending:
+        module._load()
+    return len(pending)
+
+
+__all__ = ["LazyModule", "lazyImport", "loadLazyModules", "LAZY_IMPORTS"]
@@ -0,0 +1,370 @@
+"""
+Per-request timing and hot-path spans, exposed in Prometheus text format.
+
+MetricsMiddleware times every request and counts it by method, route
+template and status. Inside a request, span(name) blocks (or the timed
+decorator) add up the time spent in the expensive steps: repo load, repo
+save, bcrypt, JWT decode, TMDb calls and serialization. When the request
+ends, each step's total goes into a histogram labelled with the route, so
+the request latency can be broken down. Spans run outside a request (cache
+warm-up, the write-behind writer) are recorded under the route
+"background". Worker threads started with run_in_threadpool inherit the
+request's context, so spans in services count too.
+
+Metrics are off unless METRICS_ENABLED=1. While off, the middleware only
+checks a flag and span() returns a shared no-op context manager.
+"""
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Tuple
+
+from fastapi.responses import JSONResponse
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+
+# upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+SPAN_REPO_LOAD = "repo.load"
+SPAN_REPO_SAVE = "repo.save"
+SPAN_BCRYPT = "bcrypt"
+SPAN_JWT_DECODE = "jwt.decode"
+SPAN_TMDB = "tmdb"
+SPAN_SERIALIZE = "serialize"
+
+BACKGROUND_ROUTE = "background"
+# requests that matched no route share one
+# label, so stray paths cannot grow the series
+UNMATCHED_ROUTE = "unmatched"
+
+# span name -> seconds spent so far in the current request
+_REQUEST_SPANS: ContextVar[Dict[str, float] | None] = ContextVar(
+    "requestSpans", default=None
+)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram of durations in seconds.
+    """
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        index = bisect_left(LATENCY_BUCKETS, seconds)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += seconds
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        result, running = [], 0
+        for count in self.counts:
+            running += count
+            result.append(running)
+        return result
+
+
+class MetricsRegistry:
+    """
+    Request counters and latency histograms of one worker process.
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.spans: Dict[Tuple[str, str], Histogram] = {}
+        # functions returning extra exposition
+        # lines, rendered after the request metrics
+        self.collectors: List[Callable[[], List[str]]] = []
+
+    def addCollector(self, collect: Callable[[], List[str]]) -> None:
+        """
+        Add a function whose Prometheus text lines are appended to every
+        render.
+
+        Collectors run whether or not request metrics are enabled.
+        """
+        self.collectors.append(collect)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.latency.clear()
+            self.spans.clear()
+
+    def observeSpan(self, route: str, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.spans.get((route, name))
+            if histogram is None:
+                histogram = self.spans[(route, name)] = Histogram()
+            histogram.observe(seconds)
+
+    def observeRequest(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        spans: Dict[str, float],
+    ) -> None:
+        """
+        Record one finished request and the time each span took during it.
+        """
+        with self._lock:
+            key = (method, route, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.latency.get((method, route))
+            if histogram is None:
+                histogram = self.latency[(method, route)] = Histogram()
+            histogram.observe(seconds)
+            for name, spent in spans.items():
+                histogram = self.spans.get((route, name))
+                if histogram is None:
+                    histogram = self.spans[(route, name)] = Histogram()
+                histogram.observe(spent)
+
+    def render(self) -> str:
+        """
+        Return every metric in the Prometheus text exposition format (version
+        0.0.4).
+        """
+        with self._lock:
+            requests = sorted(self.requests.items())
+            latency = sorted(
+                (key, _copy(histogram))
+                for key, histogram in self.latency.items()
+            )
+            spans = sorted(
+                (key, _copy(histogram))
+                for key, histogram in self.spans.items()
+            )
+
+        lines = [
+            "# HELP spoileralert_requests_total"
+            " Requests handled, by method, route and status.",
+            "# TYPE spoileralert_requests_total counter",
+        ]
+        for (method, route, status), count in requests:
+            lines.append(
+                "spoileralert_requests_total"
+                f"{_labels(method=method, route=route, status=status)}"
+                f" {count}"
+            )
+        lines += [
+            "# HELP spoileralert_request_duration_seconds"
+            " Time from receiving a request to sending its last byte.",
+            "# TYPE spoileralert_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in latency:
+            lines += _histogramLines(
+                "spoileralert_request_duration_seconds",
+                {"method": method, "route": route},
+                histogram,
+            )
+        lines += [
+            "# HELP spoileralert_span_duration_seconds"
+            " Time per request spent in repo loads, saves, bcrypt, JWT, TMDb"
+            " and serialization.",
+            "# TYPE spoileralert_span_duration_seconds histogram",
+        ]
+        for (route, name), histogram in spans:
+            lines += _histogramLines(
+                "spoileralert_span_duration_seconds",
+                {"route": route, "span": name},
+                histogram,
+            )
+        for collect in self.collectors:
+            lines += collect()
+        return "\n".join(lines) + "\n"
+
+
+def _copy(histogram: Histogram) -> Histogram:
+    copy = Histogram()
+    copy.counts = list(histogram.counts)
+    copy.total, copy.count = histogram.total, histogram.count
+    return copy
+
+
+def _escape(value) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\"", "\\\"")
+        .replace("\n", "\\n")
+    )
+
+
+def _labels(**labels) -> str:
+    return (
+        "{"
+        + ",".join(
+            f'{name}="{_escape(value)}"' for name, value in labels.items()
+        )
+        + "}"
+    )
+
+
+def _histogramLines(
+    metric: str, labels: Dict[str, str], histogram: Histogram
+) -> List[str]:
+    lines = []
+    for bound, count in zip(LATENCY_BUCKETS, histogram.cumulative()):
+        lines.append(
+            f"{metric}_bucket{_labels(**labels, le=repr(bound))} {count}"
+        )
+    lines.append(
+        f"{metric}_bucket{_labels(**labels, le='+Inf')} {histogram.count}"
+    )
+    lines.append(f"{metric}_sum{_labels(**labels)} {histogram.total!r}")
+    lines.append(f"{metric}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        spans = _REQUEST_SPANS.get()
+        if spans is None:
+            REGISTRY.observeSpan(BACKGROUND_ROUTE, self.name, elapsed)
+        else:
+            spans[self.name] = spans.get(self.name, 0.0) + elapsed
+        return False
+
+
+_NO_SPAN = nullcontext()
+
+
+def span(name: str):
+    """
+    Time a block as one of the request's spans.
+
+    Args:
+        name (str): The span, e.g. SPAN_REPO_LOAD.
+
+    Returns:
+        A context manager; a shared no-op one while metrics are disabled.
+    """
+    if not REGISTRY.enabled:
+        return _NO_SPAN
+    return _Span(name)
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator timing every call of a function as the span name.
+    """
+    def decorate(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not REGISTRY.enabled:
+                return function(*args, **kwargs)
+            with _Span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class TimedJSONResponse(JSONResponse):
+    """
+    JSONResponse whose rendering is timed as the serialization span.
+    """
+
+    def render(self, content) -> bytes:
+        with span(SPAN_SERIALIZE):
+            return super().render(content)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording each request's latency, status and spans.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = REGISTRY):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        spans: Dict[str, float] = {}
+        token = _REQUEST_SPANS.set(spans)
+        start = time.perf_counter()
+
+        async def recordingSend(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, recordingSend)
+        finally:
+            elapsed = time.perf_counter() - start
+            _REQUEST_SPANS.reset(token)
+            route = scope.get("route")
+            routePath = getattr(route, "path", None) or UNMATCHED_ROUTE
+            self.registry.observeRequest(
+                scope["method"], routePath, status, elapsed, spans
+            )
+
+
+__all__ = [
+    "MetricsMiddleware",
+    "MetricsRegistry",
+    "REGISTRY",
+    "TimedJSONResponse",
+    "span",
+    "timed",
+    "METRICS_ENABLED",
+    "LATENCY_BUCKETS",
+    "SPAN_REPO_LOAD",
+    "SPAN_REPO_SAVE",
+    "SPAN_BCRYPT",
+    "SPAN_JWT_DECODE",
+    "SPAN_TMDB",
+    "SPAN_SERIALIZE",
+]
@@ -1,40 +1,34 @@
 from typing import Optional
-from ..repos.userRepo import loadUsers, saveUsers
+from ..repos.userRepo import USER_WRITE_LOCK, loadUsers, saveUsers
+from ..repos.lazyRecords import findIndex
 from ..schemas.user import User
 
 MAX_PENALTIES = 3  # how many strikes before ban
 
 def findUserByUsername(username: str) -> Optional[User]:
     users = loadUsers()
-    for user in users:
-        if user.username == username:
-            return user
-    return None
+    index = findIndex(users, "username", username)
+    return None if index == -1 else users[index]
 
 def incrementPenaltyForUser(userId: int) -> User:
     """
     Increase penaltyCount for a user and ban them if max reached.
     Returns the updated User model.
     """
-    users = loadUsers()
-    updatedUser = None
-
-    # loop with index so we can update the list
-    for i, user in enumerate(users):
-        if int(user.id) == int(userId):
-            user.penalties += 1
+    with USER_WRITE_LOCK:
+        users = loadUsers()
 
-            if user.penalties >= MAX_PENALTIES:
-                user.isBanned = True
+        index = findIndex(users, "id", int(userId))
+        if index == -1:
+            raise ValueError("User not found")
 
-            updatedUser = user
-            users[i] = user 
-            break
+        updatedUser = users[index]
+        updatedUser.penalties += 1
 
-    if updatedUser is None:
-        raise ValueError("User not found")
+        if updatedUser.penalties >= MAX_PENALTIES:
+            updatedUser.isBanned = True
 
-    saveUsers(users)
+        saveUsers(users)
     return updatedUser
 
 
@@ -0,0 +1,357 @@
+"""
+In-process profiling of a running worker, without restarting it.
+
+SamplingProfiler wakes every few milliseconds for a given number of
+seconds and records the call stack of every other thread (the event loop
+and the threadpool workers alike). The samples are downloaded either as
+folded stacks, one "frame;frame;frame count" line per stack, which
+flamegraph.pl and speedscope turn into a flamegraph, or as a pstats file
+built from the samples (times are sample counts times the interval), for
+pstats, snakeviz and the like. Only one sampling run at a time.
+startProfile samples on a background thread of its own until
+finishProfile stops it, so a caller can wait on the event loop meanwhile.
+
+ProfileMiddleware adds a per-request mode: an admin request carrying
+`profile=1` in its query string runs under cProfile and gets the cProfile
+report back instead of its normal body. cProfile only sees the event loop
+thread, so work handed to run_in_threadpool shows up as the await on it,
+and other requests running on the loop at the same time are included.
+"""
+
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Tuple
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+# longest sampling run an admin can ask for, in seconds
+PROFILE_MAX_SECONDS = 300
+DEFAULT_SAMPLE_INTERVAL_MS = 5
+# lines of the cProfile report returned by ?profile=1
+PROFILE_REPORT_LINES = 60
+
+# (file name, first line, function name), the function key pstats uses
+FunctionKey = Tuple[str, int, str]
+
+_SAMPLING_LOCK = threading.Lock()
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running."""
+    pass
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of every thread but its own at a fixed interval.
+    """
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL_MS / 1000):
+        """
+        Args:
+            interval (float): Seconds between samples.
+        """
+        self.interval = interval
+        # (thread name, stack from the outermost frame in) -> times seen
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.seconds = 0.0
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def sample(self) -> None:
+        """
+        Record the current stack of every other thread once.
+        """
+        ownThread = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for threadId, frame in sys._current_frames().items():
+            if threadId == ownThread:
+                continue
+            stack: List[FunctionKey] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    (code.co_filename, code.co_firstlineno, code.co_name)
+                )
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[
+                (names.get(threadId, str(threadId)), tuple(stack))
+            ] += 1
+        self.samples += 1
+
+    def run(self, seconds: float) -> "SamplingProfiler":
+        """
+        Sample on the calling thread until seconds have passed or stop is
+        called.
+
+        Returns:
+            SamplingProfiler: self, for chaining.
+        """
+        start = time.perf_counter()
+        deadline = start + seconds
+        nextSample = start
+        while nextSample < deadline and not self._stopping.is_set():
+            self.sample()
+            nextSample += self.interval
+            delay = nextSample - time.perf_counter()
+            if delay > 0:
+                self._stopping.wait(delay)
+        self.seconds = time.perf_counter() - start
+        return self
+
+    def start(self, seconds: float) -> "SamplingProfiler":
+        """
+        Run on a background thread for at most seconds; see stop.
+
+        Returns:
+            SamplingProfiler: self, for chaining.
+        """
+        self._thread = threading.Thread(
+            target=self.run,
+            args=(seconds,),
+            name="sampling-profiler",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        """
+        End a background run, waiting at most for the sample in progress.
+
+        Returns:
+            SamplingProfiler: self, for chaining.
+        """
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def folded(self) -> str:
+        """
+        Return the samples as folded stacks, the thread name as the root frame.
+        """
+        lines = []
+        for (threadName, stack), count in sorted(
+            self.stacks.items(), key=lambda item: -item[1]
+        ):
+            frames = [threadName] + [
+                f"{name} ({_shortName(fileName)}:{line})"
+                for fileName, line, name in stack
+            ]
+            lines.append(
+                ";".join(frame.replace(";", ",") for frame in frames)
+                + f" {count}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def pstatsData(self) -> bytes:
+        """
+        Return the samples as a marshalled pstats file.
+
+        A function's own time counts the samples where it was running, its
+        cumulative time those where it was anywhere on the stack, and its call
+        count the samples it appeared in.
+        """
+        # function -> [own samples, inclusive
+        # samples, {caller: inclusive samples}]
+        totals: Dict[FunctionKey, list] = {}
+        for (_, stack), count in self.stacks.items():
+            seen = set()
+            for depth, function in enumerate(stack):
+                entry = totals.setdefault(function, [0, 0, Counter()])
+                if function not in seen:
+                    seen.add(function)
+                    entry[1] += count
+                if depth:
+                    entry[2][stack[depth - 1]] += count
+            if stack:
+                totals[stack[-1]][0] += count
+
+        interval = self.interval
+        stats = {}
+        for function, (own, inclusive, callers) in totals.items():
+            stats[function] = (
+                inclusive,
+                inclusive,
+                own * interval,
+                inclusive * interval,
+                {
+                    caller: (calls, calls, 0.0, calls * interval)
+                    for caller, calls in callers.items()
+                },
+            )
+        return marshal.dumps(stats)
+
+
+def _shortName(fileName: str) -> str:
+    """
+    Trim a source path to the part after site-packages or the backend
+    directory.
+    """
+    for marker in ("site-packages/", "backend/"):
+        position = fileName.rfind(marker)
+        if position != -1:
+            return fileName[position + len(marker):]
+    return fileName
+
+
+def profileFor(
+    seconds: float, interval: float = DEFAULT_SAMPLE_INTERVAL_MS / 1000
+) -> SamplingProfiler:
+    """
+    Sample this worker for seconds; blocks the calling thread meanwhile.
+
+    Raises:
+        ProfilerBusyError: If another sampling run is in progress.
+    """
+    if not _SAMPLING_LOCK.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running on this worker")
+    try:
+        return SamplingProfiler(interval).run(seconds)
+    finally:
+        _SAMPLING_LOCK.release()
+
+
+def startProfile(
+    seconds: float, interval: float = DEFAULT_SAMPLE_INTERVAL_MS / 1000
+) -> SamplingProfiler:
+    """
+    Start sampling this worker on a background thread and return at once.
+
+    The run ends after seconds or when finishProfile is called, which must
+    follow either way so the next run can start.
+    Raises:
+        ProfilerBusyError: If another sampling run is in progress.
+    """
+    if not _SAMPLING_LOCK.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running on this worker")
+    try:
+        return SamplingProfiler(interval).start(seconds)
+    except BaseException:
+        _SAMPLING_LOCK.release()
+        raise
+
+
+def finishProfile(profiler: SamplingProfiler) -> SamplingProfiler:
+    """
+    Stop a run begun with startProfile and let the next one start.
+    """
+    try:
+        return profiler.stop()
+    finally:
+        _SAMPLING_LOCK.release()
+
+
+def _wantsProfile(scope) -> bool:
+    queryString = scope.get("query_string", b"")
+    if b"profile=" not in queryString:
+        return False
+    return (
+        parse_qs(queryString.decode("latin-1")).get("profile", [""])[-1] == "1"
+    )
+
+
+def _header(scope, name: bytes) -> str | None:
+    for headerName, value in scope.get("headers", []):
+        if headerName.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfileMiddleware:
+    """
+    ASGI middleware answering admin requests with ?profile=1 with their
+    cProfile report.
+    """
+
+    def __init__(
+        self, app, authorize: Callable[[str | None], Awaitable[object]]
+    ):
+        """
+        Args:
+            app: The ASGI application to wrap.
+            authorize: Coroutine function given the Authorization header; it
+                raises HTTPException unless the caller may profile.
+        """
+        self.app = app
+        self.authorize = authorize
+        self._busy = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _wantsProfile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.authorize(_header(scope, b"authorization"))
+        except HTTPException as error:
+            response = JSONResponse(
+                {"detail": error.detail},
+                status_code=error.status_code,
+                headers=error.headers,
+            )
+            await response(scope, receive, send)
+            return
+        if self._busy:
+            # cProfile can only follow one request at a time
+            response = JSONResponse(
+                {"detail": "Another request is being profiled"},
+                status_code=409,
+            )
+            await response(scope, receive, send)
+            return
+
+        status = 500
+
+        async def discardingSend(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        self._busy = True
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profiler.enable()
+            try:
+                await self.app(scope, receive, discardingSend)
+            finally:
+                profiler.disable()
+        finally:
+            self._busy = False
+        elapsedMs = (time.perf_counter() - start) * 1000
+
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats(
+            "cumulative"
+        ).print_stats(PROFILE_REPORT_LINES)
+        response = PlainTextResponse(
+            report.getvalue(),
+            headers={
+                "X-Profiled-Status": str(status),
+                "X-Profiled-Time-Ms": f"{elapsedMs:.2f}",
+            },
+        )
+        await response(scope, receive, send)
+
+
+__all__ = [
+    "SamplingProfiler",
+    "ProfileMiddleware",
+    "ProfilerBusyError",
+    "profileFor",
+    "PROFILE_MAX_SECONDS",
+    "DEFAULT_SAMPLE_INTERVAL_MS",
+    "PROFILE_REPORT_LINES",
+]
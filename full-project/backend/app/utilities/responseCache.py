@@ -0,0 +1,274 @@
+"""
+Cache of rendered responses for read-heavy GET endpoints.
+
+ResponseCacheMiddleware keeps the body and headers of successful GET
+responses, keyed by path and query string. Each cached route is tagged
+with the data files it is built from; an entry is only served while none
+of those files has been saved since it was rendered (see repo.dataVersion),
+so any write through the repos invalidates it.
+
+Every cached response carries an ETag (a hash of the body) and
+`Cache-Control: no-cache`, so clients revalidate each time and get an
+empty 304 when their If-None-Match still matches.
+
+A hit is answered without running the router, so the entry also keeps the
+route that rendered it and puts it back in the scope, where outer
+middleware (metrics) expects to find it.
+
+Bodies of at least COMPRESSION_MIN_SIZE bytes are also kept compressed,
+one variant per content encoding, made the first time a client asks for
+that encoding; each variant gets its own ETag.
+"""
+
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Pattern, Tuple
+from ..repos.repo import dataVersion
+from .compression import (
+    COMPRESSION_ENCODINGS,
+    COMPRESSION_MIN_SIZE,
+    chooseEncoding,
+    compressBody,
+    isCompressible,
+    withVary,
+)
+
+# how many rendered responses to keep, least recently used are dropped first
+RESPONSE_CACHE_ENTRIES = int(os.getenv("RESPONSE_CACHE_ENTRIES", "512"))
+
+# path pattern -> data files the response is built from
+CACHED_ROUTES: List[Tuple[str, Tuple[str, ...]]] = [
+    (r"/movies", ("movies.json",)),
+    (r"/movies/meta", ("movies.json",)),
+    (r"/movies/\d+", ("movies.json",)),
+    (r"/reviews", ("reviews.json", "likeReviews.json")),
+    (r"/replies/\d+", ("replies.json",)),
+]
+
+# headers the cache writes itself instead of storing
+_REPLACED_HEADERS = (b"content-length", b"etag", b"cache-control")
+
+
+def makeETag(body: bytes) -> str:
+    """
+    Return a strong ETag for a response body.
+    """
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etagMatches(ifNoneMatch: str, etag: str) -> bool:
+    """
+    Check an If-None-Match header value against an ETag.
+
+    Weak validators (W/"...") match their strong form, as RFC 9110 asks for
+    GET.
+    """
+    for candidate in ifNoneMatch.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def variantETag(etag: str, encoding: str) -> str:
+    """
+    Return the ETag of a compressed variant of a body with the given ETag.
+    """
+    return f'{etag[:-1]}-{encoding}"'
+
+
+class _CachedResponse:
+    __slots__ = ("versions", "headers", "body", "etag", "variants", "route")
+
+    def __init__(
+        self,
+        versions: Tuple[int, ...],
+        headers: List[Tuple[bytes, bytes]],
+        body: bytes,
+        route=None,
+    ):
+        self.versions = versions
+        self.headers = headers
+        self.body = body
+        self.etag = makeETag(body)
+        # the route the router matched when the response was rendered
+        self.route = route
+        # content encoding -> compressed body
+        self.variants: Dict[str, bytes] = {}
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware serving cached GET responses with ETag revalidation.
+    """
+
+    def __init__(
+        self,
+        app,
+        routes: Iterable[Tuple[str, Tuple[str, ...]]] = CACHED_ROUTES,
+        maxEntries: int = RESPONSE_CACHE_ENTRIES,
+        compressMinSize: int = COMPRESSION_MIN_SIZE,
+        encodings: Iterable[str] = COMPRESSION_ENCODINGS,
+    ):
+        """
+        Args:
+            app: The ASGI application to wrap.
+            routes (Iterable): (path regex, data file names) pairs; the regex
+                must match the whole path.
+            maxEntries (int): Most responses kept at once.
+            compressMinSize (int): Smallest body, in bytes, that is kept
+                compressed.
+            encodings (Iterable[str]): Content encodings to offer, most
+                preferred first.
+        """
+        self.app = app
+        self.routes: List[Tuple[Pattern[str], Tuple[str, ...]]] = [
+            (re.compile(pattern), tuple(files)) for pattern, files in routes
+        ]
+        self.maxEntries = maxEntries
+        self.compressMinSize = compressMinSize
+        self.encodings = list(encodings)
+        self._entries: "OrderedDict[Tuple[str, bytes], _CachedResponse]" = (
+            OrderedDict()
+        )
+
+    def _filesFor(self, path: str) -> Tuple[str, ...] | None:
+        for pattern, files in self.routes:
+            if pattern.fullmatch(path):
+                return files
+        return None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def _sendCached(self, send, entry: _CachedResponse, scope) -> None:
+        headers, body, etag = entry.headers, entry.body, entry.etag
+        compressible = self.encodings and isCompressible(headers)
+        encoding = None
+        if compressible and len(body) >= self.compressMinSize:
+            encoding = chooseEncoding(
+                _header(scope, b"accept-encoding"), self.encodings
+            )
+        if encoding is not None:
+            variant = entry.variants.get(encoding)
+            if variant is None:
+                variant = entry.variants[encoding] = compressBody(
+                    body, encoding
+                )
+            headers = headers + [
+                (b"content-encoding", encoding.encode("latin-1"))
+            ]
+            body, etag = variant, variantETag(etag, encoding)
+
+        validators = [
+            (b"etag", etag.encode("latin-1")),
+            (b"cache-control", b"no-cache"),
+        ]
+        if compressible:
+            validators = withVary(validators)
+        ifNoneMatch = _header(scope, b"if-none-match")
+        if ifNoneMatch is not None and etagMatches(ifNoneMatch, etag):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": validators,
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers = (
+            headers
+            + validators
+            + [(b"content-length", str(len(body)).encode("latin-1"))]
+        )
+        await send(
+            {"type": "http.response.start", "status": 200, "headers": headers}
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or self.maxEntries <= 0
+        ):
+            await self.app(scope, receive, send)
+            return
+        files = self._filesFor(scope["path"])
+        if files is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = (scope["path"], scope.get("query_string", b""))
+        # read the versions before rendering, so a save during rendering leaves
+        # the entry stale
+        versions = tuple(dataVersion(name) for name in files)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.versions == versions:
+            self._entries.move_to_end(key)
+            if entry.route is not None:
+                scope["route"] = entry.route
+            await self._sendCached(send, entry, scope)
+            return
+
+        start: Dict | None = None
+        chunks: List[bytes] = []
+        streamed = False
+
+        async def capture(message):
+            nonlocal start, streamed
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    streamed = True
+
+        await self.app(scope, receive, capture)
+        if start is None:
+            return
+        body = b"".join(chunks)
+
+        rawHeaders = start.get("headers", [])
+        if (
+            start["status"] != 200
+            or streamed
+            or any(name.lower() == b"set-cookie" for name, _ in rawHeaders)
+        ):
+            # pass anything else through untouched
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        headers = [
+            (name, value)
+            for name, value in rawHeaders
+            if name.lower() not in _REPLACED_HEADERS
+        ]
+        entry = _CachedResponse(versions, headers, body, scope.get("route"))
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxEntries:
+            self._entries.popitem(last=False)
+        await self._sendCached(send, entry, scope)
+
+
+def _header(scope, name: bytes) -> str | None:
+    for headerName, value in scope.get("headers", []):
+        if headerName.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+__all__ = [
+    "ResponseCacheMiddleware",
+    "CACHED_ROUTES",
+    "RESPONSE_CACHE_ENTRIES",
+    "makeETag",
+    "variantETag",
+    "etagMatches",
+]
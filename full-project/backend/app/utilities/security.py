@@ -1,23 +1,42 @@
-from passlib.context import CryptContext
+from .metrics import timed, SPAN_BCRYPT
+from .lazyImport import lazyImport
 
-# Allow bcrypt to silently truncate >72-byte passwords instead of throwing
-try:
-    pwdContext = CryptContext(
-        schemes=["bcrypt"],
-        deprecated="auto",
-        truncate_error=False  # supported in Passlib >=1.7.4
-    )
-except TypeError:
-    # fallback for older versions of Passlib that don’t support truncate_error
-    pwdContext = CryptContext(
-        schemes=["bcrypt"],
-        deprecated="auto"
-    )
+passlibContext = lazyImport("passlib.context")
 
+_PWD_CONTEXT = None
+
+
+def getPwdContext():
+    """
+    Return the bcrypt CryptContext, built on first use so passlib can be
+    imported lazily.
+    """
+    global _PWD_CONTEXT
+    if _PWD_CONTEXT is None:
+        # Allow bcrypt to silently truncate
+        # >72-byte passwords instead of throwing
+        try:
+            _PWD_CONTEXT = passlibContext.CryptContext(
+                schemes=["bcrypt"],
+                deprecated="auto",
+                # supported in Passlib >=1.7.4
+                truncate_error=False
+            )
+        except TypeError:
+            # fallback for older versions of Passlib
+            # that don’t support truncate_error
+            _PWD_CONTEXT = passlibContext.CryptContext(
+                schemes=["bcrypt"],
+                deprecated="auto"
+            )
+    return _PWD_CONTEXT
+
+@timed(SPAN_BCRYPT)
 def hashPassword(password: str) -> str:
     """Hash a plain-text password using bcrypt."""
-    return pwdContext.hash(password)
+    return getPwdContext().hash(password)
 
+@timed(SPAN_BCRYPT)
 def verifyPassword(plainPassword: str, hashedPassword: str) -> bool:
     """Verify a plain-text password against a hashed password"""
-    return pwdContext.verify(plainPassword, hashedPassword)
+    return getPwdContext().verify(plainPassword, hashedPassword)
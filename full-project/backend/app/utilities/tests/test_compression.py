@@ -0,0 +1,112 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.utilities.compression import (
+    CompressionMiddleware,
+    chooseEncoding,
+    compressBody,
+)
+
+
+@pytest.fixture
+def client():
+    appInstance = FastAPI()
+    appInstance.add_middleware(
+        CompressionMiddleware, minimumSize=100, encodings=["gzip"]
+    )
+
+    @appInstance.get("/large")
+    async def large():
+        return [
+            {"id": index, "title": "A long enough title"}
+            for index in range(50)
+        ]
+
+    @appInstance.get("/small")
+    async def small():
+        return {"id": 1}
+
+    @appInstance.get("/binary")
+    async def binary():
+        return PlainTextResponse(
+            "x" * 500, media_type="application/octet-stream"
+        )
+
+    @appInstance.get("/stream")
+    async def stream():
+        async def lines():
+            for index in range(100):
+                yield f'{{"id":{index}}}\n'.encode()
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return TestClient(appInstance)
+
+
+def rawBody(response) -> bytes:
+    # the test client decodes gzip itself; re-read the bytes as sent
+    return b"".join(response.iter_raw())
+
+
+def testChooseEncodingHonoursQValuesAndPreference():
+    assert chooseEncoding("gzip, deflate, br", ["br", "gzip"]) == "br"
+    assert chooseEncoding("gzip;q=1.0, br;q=0.5", ["br", "gzip"]) == "gzip"
+    assert chooseEncoding("br;q=0, *", ["br", "gzip"]) == "gzip"
+    assert chooseEncoding("identity", ["br", "gzip"]) is None
+    assert chooseEncoding(None, ["gzip"]) is None
+
+
+def testLargeJsonIsCompressed(client):
+    with client.stream(
+        "GET", "/large", headers={"Accept-Encoding": "gzip"}
+    ) as response:
+        body = rawBody(response)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(body)
+    assert gzip.decompress(body).startswith(b'[{"id":0,')
+
+
+def testSmallUnacceptedAndBinaryBodiesAreLeftAlone(client):
+    assert (
+        "content-encoding"
+        not in client.get(
+            "/small", headers={"Accept-Encoding": "gzip"}
+        ).headers
+    )
+    assert (
+        "content-encoding"
+        not in client.get(
+            "/large", headers={"Accept-Encoding": "identity"}
+        ).headers
+    )
+    assert (
+        "content-encoding"
+        not in client.get(
+            "/binary", headers={"Accept-Encoding": "gzip"}
+        ).headers
+    )
+
+
+def testStreamedBodiesAreCompressedInChunks(client):
+    with client.stream(
+        "GET", "/stream", headers={"Accept-Encoding": "gzip"}
+    ) as response:
+        body = rawBody(response)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(body).decode().splitlines()[-1] == '{"id":99}'
+
+
+def testBrotliRoundTrip():
+    brotli = pytest.importorskip("brotli")
+
+    assert (
+        brotli.decompress(compressBody(b"hello" * 100, "br")) == b"hello" * 100
+    )
@@ -0,0 +1,51 @@
+import sys
+from unittest.mock import patch
+
+import pytest
+
+import app.utilities.lazyImport as lazyImportModule
+from app.utilities.lazyImport import LazyModule, lazyImport, loadLazyModules
+
+
+@pytest.fixture
+def freshModule(monkeypatch):
+    # a stdlib module nothing else in the tests imports
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    monkeypatch.setattr(lazyImportModule, "_LAZY_MODULES", [])
+    return "colorsys"
+
+
+def testEagerModeImportsAtOnce(freshModule):
+    module = lazyImport(freshModule, lazy=False)
+
+    assert not isinstance(module, LazyModule)
+    assert freshModule in sys.modules
+
+
+def testLazyModuleImportsOnFirstAttribute(freshModule):
+    module = lazyImport(freshModule, lazy=True)
+
+    assert isinstance(module, LazyModule) and not module.isLoaded
+    assert freshModule not in sys.modules
+    assert module.rgb_to_hsv(1, 0, 0) == (0.0, 1.0, 1)
+    assert module.isLoaded
+
+
+def testAlreadyImportedModulesAreNotWrapped():
+    assert lazyImport("json", lazy=True) is sys.modules["json"]
+
+
+def testPatchingThroughTheStandInReachesTheRealModule(freshModule):
+    module = lazyImport(freshModule, lazy=True)
+
+    with patch.object(module, "rgb_to_hsv", return_value="patched"):
+        assert sys.modules[freshModule].rgb_to_hsv() == "patched"
+    assert module.rgb_to_hsv(1, 0, 0) == (0.0, 1.0, 1)
+
+
+def testLoadLazyModulesImportsWhatIsPending(freshModule):
+    module = lazyImport(freshModule, lazy=True)
+
+    assert loadLazyModules() == 1
+    assert module.isLoaded
+    assert loadLazyModules() == 0
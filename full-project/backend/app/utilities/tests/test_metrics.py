@@ -0,0 +1,173 @@
+from contextlib import nullcontext
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.testclient import TestClient
+
+import app.utilities.metrics as metrics
+from app.utilities.metrics import (
+    MetricsMiddleware,
+    MetricsRegistry,
+    TimedJSONResponse,
+    span,
+    timed,
+)
+from app.utilities.responseCache import ResponseCacheMiddleware
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = MetricsRegistry(enabled=True)
+    monkeypatch.setattr(metrics, "REGISTRY", registry)
+    return registry
+
+
+@pytest.fixture
+def client(registry):
+    appInstance = FastAPI(default_response_class=TimedJSONResponse)
+    appInstance.add_middleware(MetricsMiddleware, registry=registry)
+
+    def loadInThread():
+        with span(metrics.SPAN_REPO_LOAD):
+            return [{"id": 1}]
+
+    @appInstance.get("/movies/{movieId}")
+    async def getMovie(movieId: int):
+        if movieId == 404:
+            raise HTTPException(status_code=404, detail="Movie not found")
+        return await run_in_threadpool(loadInThread)
+
+    return TestClient(appInstance)
+
+
+def testRequestsAreCountedByRouteTemplateAndStatus(client, registry):
+    client.get("/movies/1")
+    client.get("/movies/2")
+    client.get("/movies/404")
+    client.get("/nowhere")
+
+    assert registry.requests == {
+        ("GET", "/movies/{movieId}", 200): 2,
+        ("GET", "/movies/{movieId}", 404): 1,
+        ("GET", metrics.UNMATCHED_ROUTE, 404): 1,
+    }
+    assert registry.latency[("GET", "/movies/{movieId}")].count == 3
+
+
+def testSpansInWorkerThreadsAndRenderingAreAttributedToTheRoute(
+    client, registry
+):
+    client.get("/movies/1")
+
+    assert (
+        registry.spans[("/movies/{movieId}", metrics.SPAN_REPO_LOAD)].count
+        == 1
+    )
+    assert (
+        registry.spans[("/movies/{movieId}", metrics.SPAN_SERIALIZE)].count
+        == 1
+    )
+
+
+def testSpansOutsideRequestsAreRecordedAsBackground(registry):
+    @timed(metrics.SPAN_BCRYPT)
+    def hashSomething():
+        return "hashed"
+
+    assert hashSomething() == "hashed"
+    assert (
+        registry.spans[(metrics.BACKGROUND_ROUTE, metrics.SPAN_BCRYPT)].count
+        == 1
+    )
+
+
+def testDisabledMetricsRecordNothing(client, registry):
+    registry.enabled = False
+
+    client.get("/movies/1")
+
+    assert isinstance(span(metrics.SPAN_TMDB), nullcontext)
+    assert registry.requests == {} and registry.spans == {}
+
+
+def testRenderUsesPrometheusTextFormat(registry):
+    registry.observeRequest(
+        "GET", '/odd"route', 200, 0.003, {metrics.SPAN_REPO_SAVE: 0.0005}
+    )
+    text = registry.render()
+
+    assert "# TYPE spoileralert_request_duration_seconds histogram" in text
+    assert (
+        'spoileralert_requests_total'
+        '{method="GET",route="/odd\\"route",status="200"} 1'
+        in text
+    )
+    assert (
+        'spoileralert_request_duration_seconds_bucket'
+        '{method="GET",route="/odd\\"route",le="0.0025"} 0'
+        in text
+    )
+    assert (
+        'spoileralert_request_duration_seconds_bucket'
+        '{method="GET",route="/odd\\"route",le="0.005"} 1'
+        in text
+    )
+    assert (
+        'spoileralert_request_duration_seconds_bucket'
+        '{method="GET",route="/odd\\"route",le="+Inf"} 1'
+        in text
+    )
+    assert (
+        'spoileralert_span_duration_seconds_bucket'
+        '{route="/odd\\"route",span="repo.save",le="0.0005"} 1'
+        in text
+    )
+    assert (
+        'spoileralert_span_duration_seconds_count'
+        '{route="/odd\\"route",span="repo.save"} 1'
+        in text
+    )
+    assert text.endswith("\n")
+
+
+def testMetricsEndpointServesTheRegistry(registry):
+    from app.app import app
+
+    registry.observeRequest("GET", "/movies", 200, 0.01, {})
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(
+        "text/plain; version=0.0.4"
+    )
+    assert 'route="/movies"' in response.text
+
+
+def testCollectorLinesAreAppendedEvenWhenDisabled(registry):
+    registry.enabled = False
+    registry.addCollector(
+        lambda: ['spoileralert_repo_items{repo="movies",file="movies.json"} 3']
+    )
+
+    assert registry.render().endswith(
+        'spoileralert_repo_items{repo="movies",file="movies.json"} 3\n'
+    )
+
+
+def testResponseCacheHitsKeepTheirRoute(registry):
+    appInstance = FastAPI(default_response_class=TimedJSONResponse)
+    appInstance.add_middleware(
+        ResponseCacheMiddleware, routes=[(r"/movies/\d+", ("movies.json",))]
+    )
+    appInstance.add_middleware(MetricsMiddleware, registry=registry)
+
+    @appInstance.get("/movies/{movieId}")
+    async def getMovie(movieId: int):
+        return {"id": movieId}
+
+    client = TestClient(appInstance)
+    client.get("/movies/1")
+    client.get("/movies/1")
+
+    assert registry.requests == {("GET", "/movies/{movieId}", 200): 2}
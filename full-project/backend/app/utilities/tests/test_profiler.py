@@ -0,0 +1,150 @@
+import marshal
+import pstats
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+import app.utilities.profiler as profilerModule
+from app.utilities.profiler import (
+    ProfileMiddleware,
+    ProfilerBusyError,
+    SamplingProfiler,
+    finishProfile,
+    profileFor,
+    startProfile,
+)
+
+
+def spinUntil(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(100))
+
+
+@pytest.fixture
+def busyThread():
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=spinUntil, args=(stop,), name="busy-worker"
+    )
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+def testSamplingProfilerRecordsOtherThreads(busyThread):
+    profiler = SamplingProfiler(interval=0.001).run(0.05)
+
+    assert profiler.samples > 1
+    folded = profiler.folded()
+    assert any(
+        line.startswith("busy-worker;") and "spinUntil (" in line
+        for line in folded.splitlines()
+    )
+    assert all(
+        line.rsplit(" ", 1)[1].isdigit() for line in folded.splitlines()
+    )
+
+
+def testPstatsDataLoadsIntoPstats(busyThread, tmp_path):
+    profiler = SamplingProfiler(interval=0.001).run(0.05)
+    path = tmp_path / "profile.pstats"
+    path.write_bytes(profiler.pstatsData())
+
+    stats = pstats.Stats(str(path))
+    spinner = next(key for key in stats.stats if key[2] == "spinUntil")
+    calls, _, ownTime, cumulativeTime, _ = stats.stats[spinner]
+    assert calls > 0 and cumulativeTime >= ownTime
+
+
+def testPstatsDataCountsRecursionOnce():
+    profiler = SamplingProfiler(interval=0.01)
+    outer, inner = ("a.py", 1, "outer"), ("a.py", 5, "inner")
+    profiler.stacks[("main", (outer, inner, outer))] = 3
+
+    stats = marshal.loads(profiler.pstatsData())
+
+    assert stats[outer][1] == 3
+    assert stats[outer][2] == pytest.approx(0.03)
+    assert stats[inner][4] == {outer: (3, 3, 0.0, pytest.approx(0.03))}
+
+
+def testProfileForAllowsOneRunAtATime():
+    assert profilerModule._SAMPLING_LOCK.acquire()
+    try:
+        with pytest.raises(ProfilerBusyError):
+            profileFor(0.01)
+    finally:
+        profilerModule._SAMPLING_LOCK.release()
+
+    assert profileFor(0.01).samples >= 1
+
+
+def testStartProfileSamplesOnItsOwnThread(busyThread):
+    started = time.perf_counter()
+    profiler = startProfile(60, interval=0.001)
+    try:
+        assert time.perf_counter() - started < 1
+        with pytest.raises(ProfilerBusyError):
+            startProfile(0.01)
+        time.sleep(0.05)
+    finally:
+        finishProfile(profiler)
+
+    assert profiler.samples > 1 and profiler.seconds < 1
+    assert "busy-worker" in profiler.folded()
+    # the next run may start once the first has finished
+    finishProfile(startProfile(0.01))
+
+
+@pytest.fixture
+def client():
+    async def authorize(authorization):
+        if authorization != "Bearer admin":
+            raise HTTPException(
+                status_code=403, detail="Admin privileges required"
+            )
+
+    appInstance = FastAPI()
+    appInstance.add_middleware(ProfileMiddleware, authorize=authorize)
+
+    def countMovies():
+        return sum(range(200_000))
+
+    @appInstance.get("/movies")
+    async def getMovies():
+        countMovies()
+        return [{"id": 1}]
+
+    return TestClient(appInstance)
+
+
+def testRequestsWithoutProfileAreUntouched(client):
+    response = client.get(
+        "/movies?profile=0", headers={"Authorization": "Bearer admin"}
+    )
+
+    assert response.json() == [{"id": 1}]
+
+
+def testProfileReportIsReturnedToAdmins(client):
+    response = client.get(
+        "/movies?profile=1", headers={"Authorization": "Bearer admin"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["x-profiled-status"] == "200"
+    assert "function calls" in response.text
+    assert "countMovies" in response.text
+
+
+def testProfileIsRefusedToNonAdmins(client):
+    response = client.get(
+        "/movies?profile=1", headers={"Authorization": "Bearer someone"}
+    )
+
+    assert response.status_code == 403
+    assert response.json() == {"detail": "Admin privileges required"}
@@ -0,0 +1,161 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+import app.repos.repo as repo
+import app.utilities.responseCache as responseCacheModule
+from app.utilities.responseCache import (
+    ResponseCacheMiddleware,
+    etagMatches,
+    makeETag,
+    variantETag,
+)
+
+
+@pytest.fixture
+def renders():
+    return []
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, renders):
+    monkeypatch.setattr(repo, "DATA_DIR", tmp_path)
+    appInstance = FastAPI()
+    appInstance.add_middleware(
+        ResponseCacheMiddleware,
+        routes=[(r"/movies(/\d+)?", ("movies.json",))],
+        maxEntries=2,
+        compressMinSize=10,
+        encodings=["gzip"],
+    )
+
+    @appInstance.get("/movies")
+    async def getMovies(page: int = 1):
+        renders.append(("list", page))
+        return [{"id": 1, "page": page}]
+
+    @appInstance.get("/movies/{movieId}")
+    async def getMovie(movieId: int):
+        renders.append(("one", movieId))
+        if movieId == 404:
+            raise HTTPException(status_code=404, detail="Movie not found")
+        return {"id": movieId}
+
+    @appInstance.get("/users")
+    async def getUsers():
+        renders.append(("users", 0))
+        return []
+
+    return TestClient(appInstance)
+
+
+def testRepeatedGetsAreServedFromCache(client, renders):
+    first = client.get("/movies", headers={"Accept-Encoding": "identity"})
+    second = client.get("/movies", headers={"Accept-Encoding": "identity"})
+
+    assert first.json() == second.json() == [{"id": 1, "page": 1}]
+    assert (
+        first.headers["etag"]
+        == second.headers["etag"]
+        == makeETag(first.content)
+    )
+    assert first.headers["cache-control"] == "no-cache"
+    assert renders == [("list", 1)]
+
+    client.get("/movies?page=2")
+    assert renders == [("list", 1), ("list", 2)]
+
+
+def testIfNoneMatchGets304(client):
+    etag = client.get("/movies/5").headers["etag"]
+
+    response = client.get("/movies/5", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert (
+        client.get(
+            "/movies/5", headers={"If-None-Match": '"other"'}
+        ).status_code
+        == 200
+    )
+
+
+def testSavingTheDataFileInvalidates(client, renders):
+    etag = client.get("/movies").headers["etag"]
+
+    repo._baseSaveAll("movies.json", [])
+    response = client.get("/movies", headers={"If-None-Match": etag})
+
+    # re-rendered, but the body did not change so the client still gets a 304
+    assert renders == [("list", 1), ("list", 1)]
+    assert response.status_code == 304
+
+
+def testErrorsAndUncachedRoutesPassThrough(client, renders):
+    assert client.get("/movies/404").status_code == 404
+    assert client.get("/movies/404").status_code == 404
+    client.get("/users")
+    response = client.get("/users")
+
+    assert "etag" not in response.headers
+    assert renders == [("one", 404), ("one", 404), ("users", 0), ("users", 0)]
+
+
+def testLeastRecentlyUsedEntriesAreDropped(client, renders):
+    for path in [
+        "/movies/1",
+        "/movies/2",
+        "/movies/1",
+        "/movies/3",
+        "/movies/1",
+        "/movies/2",
+    ]:
+        client.get(path)
+
+    assert renders == [("one", 1), ("one", 2), ("one", 3), ("one", 2)]
+
+
+def testCompressedVariantIsMadeOnce(client, monkeypatch, renders):
+    calls = []
+    realCompress = responseCacheModule.compressBody
+
+    def countingCompress(body, encoding):
+        calls.append(encoding)
+        return realCompress(body, encoding)
+
+    monkeypatch.setattr(responseCacheModule, "compressBody", countingCompress)
+    plain = client.get("/movies", headers={"Accept-Encoding": "identity"})
+
+    for _ in range(3):
+        with client.stream(
+            "GET", "/movies", headers={"Accept-Encoding": "gzip"}
+        ) as response:
+            body = b"".join(response.iter_raw())
+        assert response.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(body) == plain.content
+
+    assert calls == ["gzip"]
+    assert renders == [("list", 1)]
+    assert response.headers["etag"] == variantETag(
+        plain.headers["etag"], "gzip"
+    )
+    assert response.headers["vary"] == "Accept-Encoding"
+    revalidated = client.get(
+        "/movies",
+        headers={
+            "Accept-Encoding": "gzip",
+            "If-None-Match": response.headers["etag"],
+        },
+    )
+    assert revalidated.status_code == 304
+
+
+def testEtagMatching():
+    assert etagMatches('"a", "b"', '"b"')
+    assert etagMatches('W/"b"', '"b"')
+    assert etagMatches("*", '"b"')
+    assert not etagMatches('"a"', '"b"')
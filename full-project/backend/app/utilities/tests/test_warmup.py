@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.repos.likeReviewRepo as likeReviewRepo
+import app.repos.reviewRepo as reviewRepo
+import app.utilities.warmup as warmup
+from app.routers import reviewRoute
+from app.utilities.warmup import CacheWarmer
+
+
+def testRunWarmsEveryLoaderOnWorkerThreads():
+    threads = []
+
+    def loader():
+        threads.append(threading.get_ident())
+
+    warmer = CacheWarmer({"movies": loader, "users": loader}, mode="blocking")
+    assert not warmer.ready
+
+    asyncio.run(warmer.start())
+
+    assert warmer.ready
+    assert threading.get_ident() not in threads and len(threads) == 2
+    assert {
+        name: cache["state"]
+        for name, cache in warmer.report()["caches"].items()
+    } == {
+        "movies": "ready",
+        "users": "ready",
+    }
+
+
+def testMissingFilesAndFailuresLeaveTheCacheCold():
+    def missing():
+        raise FileNotFoundError("Missing data file")
+
+    def broken():
+        raise ValueError("bad row")
+
+    warmer = CacheWarmer(
+        {"replies": missing, "likes": broken}, mode="blocking"
+    )
+    asyncio.run(warmer.run())
+
+    report = warmer.report()
+    assert report["ready"] is True
+    assert report["caches"]["replies"]["state"] == "missing"
+    assert report["caches"]["likes"]["state"] == "failed"
+
+
+def testBackgroundModeReturnsBeforeTheCachesAreWarm():
+    release = threading.Event()
+
+    async def scenario():
+        warmer = CacheWarmer({"reviews": release.wait}, mode="background")
+        await warmer.start()
+        await asyncio.sleep(0.01)
+        assert not warmer.ready
+        assert warmer.report()["caches"]["reviews"]["state"] == "loading"
+        release.set()
+        await warmer.stop()
+        return warmer
+
+    assert asyncio.run(scenario()).ready
+
+
+def testOffModeIsReadyWithoutLoading():
+    warmer = CacheWarmer({"movies": lambda: 1 / 0}, mode="off")
+    asyncio.run(warmer.start())
+
+    assert warmer.ready
+    assert warmer.report()["caches"]["movies"]["state"] == "pending"
+
+
+def testReadyEndpointReflectsTheWarmer(monkeypatch):
+    from app.app import app
+
+    warmer = CacheWarmer({"movies": lambda: None}, mode="blocking")
+    monkeypatch.setattr(warmup, "CACHE_WARMER", warmer)
+    client = TestClient(app)
+
+    assert client.get("/ready").status_code == 503
+    asyncio.run(warmer.run())
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["caches"]["movies"]["state"] == "ready"
+
+
+@pytest.mark.parametrize("filling", ["reviews", "likes"])
+def testRequestsWaitingOnAWarmUpDoNotBlockTheEventLoop(
+    filling, tmp_path, monkeypatch
+):
+    reviewsFile = tmp_path / "reviews.json"
+    reviewsFile.write_text("[]", encoding="utf-8")
+    likesFile = tmp_path / "likeReviews.json"
+    likesFile.write_text("[]", encoding="utf-8")
+    monkeypatch.setattr(reviewRepo, "REVIEW_DATA_PATH", reviewsFile)
+    monkeypatch.setattr(reviewRepo, "_REVIEW_CACHE", None)
+    monkeypatch.setattr(reviewRepo, "_NEXT_REVIEW_ID", None)
+    monkeypatch.setattr(likeReviewRepo, "FILE", likesFile)
+    monkeypatch.setattr(likeReviewRepo, "_LIKE_INDEX", None)
+
+    app = FastAPI()
+    app.include_router(reviewRoute.router)
+
+    @app.get("/ping")
+    async def ping():
+        return {}
+
+    # stands in for a warm-up thread that is still filling one of the caches
+    lock = {
+        "reviews": reviewRepo._REVIEW_LOAD_LOCK,
+        "likes": likeReviewRepo._LIKE_LOCK,
+    }[filling]
+    held, release = threading.Event(), threading.Event()
+
+    def warmingUp():
+        with lock:
+            held.set()
+            release.wait(5)
+
+    warmer = threading.Thread(target=warmingUp)
+    warmer.start()
+    held.wait()
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            start = time.perf_counter()
+            reviews = asyncio.create_task(client.get("/reviews"))
+            await asyncio.sleep(0.05)
+            pong = await client.get("/ping")
+            elapsed = time.perf_counter() - start
+            release.set()
+            return pong, elapsed, await reviews
+
+    try:
+        pong, elapsed, reviews = asyncio.run(scenario())
+    finally:
+        release.set()
+        warmer.join()
+
+    assert pong.status_code == 200 and elapsed < 1
+    assert reviews.status_code == 200 and reviews.json() == []
@@ -0,0 +1,169 @@
+"""
+Cache warm-up at startup, in parallel and optionally in the background.
+
+CacheWarmer fills every repo cache (and imports any module deferred by
+LAZY_IMPORTS) on worker threads, all at once. WARMUP_MODE picks when:
+
+- "background" (default): the server starts taking requests at once and
+  the caches fill behind it. A request needing a cache that is still
+  filling waits for that one fill instead of starting its own, on a
+  worker thread (see routers/cacheDependencies.py), so /ready and
+  requests for warm caches keep being served meanwhile.
+- "blocking": startup waits until every cache is warm, as before.
+- "off": nothing is warmed; each cache fills on its first request.
+
+GET /ready answers 503 until the warm-up is over and 200 afterwards, so a
+load balancer only sends traffic to warm workers. A missing data file
+leaves its cache cold, so the request that needs it reports the error as
+before warm-up existed; any other failure is logged and also leaves the
+cache cold.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict
+
+import anyio
+
+from ..repos import (
+    favoritesRepo,
+    likeReviewRepo,
+    movieRepo,
+    replyRepo,
+    reviewRepo,
+    userRepo,
+)
+from .lazyImport import loadLazyModules
+
+WARMUP_MODE = os.getenv("WARMUP_MODE", "background")
+
+STATE_PENDING = "pending"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_MISSING = "missing"
+STATE_FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+def defaultLoaders() -> Dict[str, Callable[[], Any]]:
+    """
+    Return the loaders warmed at startup, looked up at call time so tests can
+    patch the repos.
+    """
+    return {
+        "movies": lambda: movieRepo.loadMovies(),
+        "reviews": lambda: reviewRepo.loadReviews(),
+        "users": lambda: userRepo.loadUsers(),
+        "replies": lambda: replyRepo.loadReplies(),
+        "likes": lambda: likeReviewRepo.loadLikeIndex(),
+        "favorites": lambda: favoritesRepo.loadFavoriteIndex(),
+        "imports": loadLazyModules,
+    }
+
+
+class CacheWarmer:
+    """
+    Runs a set of loaders on worker threads and tracks how each one went.
+    """
+
+    def __init__(
+        self,
+        loaders: Dict[str, Callable[[], Any]] | None = None,
+        mode: str = WARMUP_MODE,
+    ):
+        """
+        Args:
+            loaders (Dict[str, Callable]): Name -> function filling one cache;
+                defaults to defaultLoaders().
+            mode (str): "background", "blocking" or "off".
+        """
+        self.loaders = loaders if loaders is not None else defaultLoaders()
+        self.mode = mode
+        self.states: Dict[str, str] = {
+            name: STATE_PENDING for name in self.loaders
+        }
+        self.seconds: Dict[str, float] = {}
+        self.totalSeconds: float | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        if self.mode == "off":
+            return True
+        return self.totalSeconds is not None
+
+    async def _warm(self, name: str, loader: Callable[[], Any]) -> None:
+        self.states[name] = STATE_LOADING
+        start = time.perf_counter()
+        try:
+            await anyio.to_thread.run_sync(loader)
+            self.states[name] = STATE_READY
+        except FileNotFoundError:
+            self.states[name] = STATE_MISSING
+        except Exception:
+            logger.exception("Warming %s failed", name)
+            self.states[name] = STATE_FAILED
+        self.seconds[name] = time.perf_counter() - start
+
+    async def run(self) -> None:
+        """
+        Run every loader at once and wait for all of them.
+        """
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                self._warm(name, loader)
+                for name, loader in self.loaders.items()
+            )
+        )
+        self.totalSeconds = time.perf_counter() - start
+
+    async def start(self) -> None:
+        """
+        Warm according to the mode: wait for it, start it in the background, or
+        skip it.
+        """
+        if self.mode == "blocking":
+            await self.run()
+        elif self.mode == "background":
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Wait for a background warm-up still running, so shutdown does not cut a
+        load in half.
+        """
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "mode": self.mode,
+            "seconds": (
+                round(self.totalSeconds, 3)
+                if self.totalSeconds is not None
+                else None
+            ),
+            "caches": {
+                name: {
+                    "state": state,
+                    "seconds": (
+                        round(self.seconds[name], 3)
+                        if name in self.seconds
+                        else None
+                    ),
+                }
+                for name, state in self.states.items()
+            },
+        }
+
+
+CACHE_WARMER = CacheWarmer()
+
+
+__all__ = ["CacheWarmer", "CACHE_WARMER", "defaultLoaders", "WARMUP_MODE"]
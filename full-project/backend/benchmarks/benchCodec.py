@@ -0,0 +1,132 @@
+"""
+Benchmark repo load/save of a large reviews file per JSON codec.
+
+Compares the original stdlib path (json.load, json.dump with indent=2) with the
+codecs _baseLoadAll/_baseSaveAll can use now. Run from full-project/backend:
+
+    python -m benchmarks.benchCodec --reviews 1000000
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from app.repos import repo
+
+
+def makeReviews(count: int, seed: int = 310) -> list[dict]:
+    """
+    Build review dicts shaped like reviewRepo saves them.
+    """
+    rng = random.Random(seed)
+    words = ["great", "movie", "plot", "acting", "boring", "twist", "ending",
+             "scene", "character", "director", "score", "masterpiece"]
+    reviews = []
+    for reviewId in range(1, count + 1):
+        bodyLength = rng.randint(10, 120)
+        reviews.append(
+            {
+                "id": reviewId,
+                "movieId": rng.randint(1, 10),
+                "userId": rng.randint(1, count // 5 + 1),
+                "reviewTitle": " ".join(
+                    rng.choices(words, k=rng.randint(2, 6))
+                ),
+                "reviewBody": " ".join(rng.choices(words, k=bodyLength)),
+                "rating": rng.randint(1, 10),
+                "datePosted": (
+                    f"{rng.randint(1, 28)} March {rng.randint(2000, 2024)}"
+                ),
+                "flagged": rng.random() < 0.01,
+            }
+        )
+    return reviews
+
+
+def legacySave(path: Path, items: list[dict]) -> None:
+    """
+    The save path as it was before the codec switch.
+    """
+    with path.open("w", encoding="utf-8") as file:
+        json.dump(
+            items,
+            file,
+            indent=2,
+            ensure_ascii=False,
+            default=repo._encodeValue,
+        )
+
+
+def legacyLoad(path: Path) -> list[dict]:
+    """
+    The load path as it was before the codec switch.
+    """
+    with path.open("r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def timeIt(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def runBenchmark(reviewCount: int) -> list[dict]:
+    """
+    Time save and load per codec and return one result row per codec.
+    """
+    items = makeReviews(reviewCount)
+    results = []
+    codecs = ["json", "orjson"] if repo.orjson else ["json"]
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        legacyPath = Path(tempDir) / "legacy.json"
+        saveSeconds = timeIt(legacySave, legacyPath, items)
+        loadSeconds = timeIt(legacyLoad, legacyPath)
+        results.append({
+            "codec": "legacy (json, indent=2)",
+            "reviews": reviewCount,
+            "saveSeconds": round(saveSeconds, 3),
+            "loadSeconds": round(loadSeconds, 3),
+            "fileBytes": legacyPath.stat().st_size,
+        })
+
+        originalCodec = repo.JSON_CODEC
+        try:
+            for codec in codecs:
+                repo.JSON_CODEC = codec
+                path = Path(tempDir) / f"{codec}.json"
+                saveSeconds = timeIt(repo._baseSaveAll, path, items)
+                loadSeconds = timeIt(repo._baseLoadAll, path)
+                results.append({
+                    "codec": f"{codec} (compact)",
+                    "reviews": reviewCount,
+                    "saveSeconds": round(saveSeconds, 3),
+                    "loadSeconds": round(loadSeconds, 3),
+                    "fileBytes": path.stat().st_size,
+                })
+        finally:
+            repo.JSON_CODEC = originalCodec
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reviews", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    results = runBenchmark(args.reviews)
+    print(f"{'codec':<26}{'save s':>9}{'load s':>9}{'size MB':>10}")
+    for row in results:
+        sizeMb = row["fileBytes"] / 1_000_000
+        print(
+            f"{row['codec']:<26}{row['saveSeconds']:>9}"
+            f"{row['loadSeconds']:>9}{sizeMb:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
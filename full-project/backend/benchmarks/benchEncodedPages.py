@@ -0,0 +1,150 @@
+"""
+Benchmark serializing large list pages: response_model against cached bytes.
+
+Serves the same 10k movies and a 10k-review page two ways through FastAPI:
+returning models so response_model validates and encodes every object
+(the old routes), and returning a Response stitched from the records'
+cached JSON (the current routes). Reports the first (cold) request and the
+mean of the following warm ones. Run from full-project/backend:
+
+    python -m benchmarks.benchEncodedPages --items 10000
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.repos.adjacency import EdgeIndex
+from app.repos.compactStore import ReviewStore
+from app.repos.lazyRecords import LazyRecords, validateRows
+from app.schemas.movie import Movie
+from app.schemas.review import Review, ReviewWithLikes
+from app.services import likeReviewService
+from app.services.movieService import encodeMovies
+from benchmarks.benchCodec import makeReviews
+
+
+def makeMovies(count: int, seed: int = 390) -> list[dict]:
+    rng = random.Random(seed)
+    genres = [
+        "Action",
+        "Comedy",
+        "Drama",
+        "Horror",
+        "Romance",
+        "Sci-Fi",
+        "Thriller",
+    ]
+    return [
+        {
+            "id": movieId,
+            "title": f"Movie {movieId}",
+            "movieIMDbRating": round(rng.uniform(1, 10), 1),
+            "movieGenres": rng.sample(genres, 2),
+            "directors": [f"Director {rng.randint(1, 500)}"],
+            "mainStars": [f"Star {rng.randint(1, 3000)}" for _ in range(3)],
+            "description": "A story about "
+            + " ".join(rng.choices(genres, k=20)).lower(),
+            "datePublished": (
+                f"{rng.randint(1950, 2024)}-0{rng.randint(1, 9)}"
+                f"-1{rng.randint(0, 9)}"
+            ),
+            "duration": rng.randint(80, 200),
+        }
+        for movieId in range(1, count + 1)
+    ]
+
+
+def makeApp(movies, reviews) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/before/movies", response_model=List[Movie])
+    async def moviesBefore():
+        return movies
+
+    @app.get("/after/movies", response_model=List[Movie])
+    async def moviesAfter():
+        return Response(encodeMovies(movies), media_type="application/json")
+
+    @app.get("/before/reviews", response_model=List[ReviewWithLikes])
+    async def reviewsBefore():
+        return likeReviewService.withLikeCounts(reviews[0 : len(reviews)])
+
+    @app.get("/after/reviews", response_model=List[ReviewWithLikes])
+    async def reviewsAfter():
+        return Response(
+            likeReviewService.encodedWithLikeCounts(reviews, 0, len(reviews)),
+            media_type="application/json",
+        )
+
+    return app
+
+
+def timeRequests(
+    client: TestClient, path: str, repeat: int
+) -> tuple[float, float, bytes]:
+    start = time.perf_counter()
+    body = client.get(path).content
+    coldMs = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for _ in range(repeat):
+        client.get(path)
+    warmMs = (time.perf_counter() - start) * 1000 / max(repeat, 1)
+    return coldMs, warmMs, body
+
+
+def runBenchmark(count: int, repeat: int) -> list[dict]:
+    rng = random.Random(7)
+    likes = EdgeIndex(
+        (rng.randint(1, count), rng.randint(1, count))
+        for _ in range(count * 3)
+    )
+    likeReviewService.loadLikeIndex = lambda: likes
+
+    client = TestClient(makeApp(
+        LazyRecords(Movie, validateRows(Movie, makeMovies(count))),
+        ReviewStore.fromRows(validateRows(Review, makeReviews(count))),
+    ))
+
+    rows = []
+    for collection in ("movies", "reviews"):
+        before = timeRequests(client, f"/before/{collection}", repeat)
+        after = timeRequests(client, f"/after/{collection}", repeat)
+        assert before[2] == after[2], f"{collection} bodies differ"
+        rows += [
+            {
+                "step": f"{collection} response_model cold (ms)",
+                "value": round(before[0], 1),
+            },
+            {
+                "step": f"{collection} response_model warm (ms)",
+                "value": round(before[1], 1),
+            },
+            {
+                "step": f"{collection} cached bytes cold (ms)",
+                "value": round(after[0], 1),
+            },
+            {
+                "step": f"{collection} cached bytes warm (ms)",
+                "value": round(after[1], 1),
+            },
+        ]
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    for row in runBenchmark(args.items, args.repeat):
+        print(f"{row['step']:<38}{row['value']:>10}")
+
+
+if __name__ == "__main__":
+    main()
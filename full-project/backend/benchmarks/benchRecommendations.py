@@ -0,0 +1,146 @@
+"""
+Benchmark training and serving the collaborative-filtering factor model.
+
+Generates clustered synthetic interactions (users prefer movies from a few
+taste groups), holds out one interaction per sampled user, then reports
+training time, recommendation latency for trained and folded-in users and
+hit rate@10 against a most-popular baseline. Run from full-project/backend:
+
+    python -m benchmarks.benchRecommendations --interactions 1000000
+"""
+
+import argparse
+import random
+import time
+
+from app.repos.factorModel import trainFactorModel
+
+
+def makeInteractions(
+    count: int,
+    userCount: int,
+    movieCount: int,
+    groups: int = 20,
+    seed: int = 360,
+):
+    """
+    Build (userId, movieId, weight) triples where each user mostly picks
+    movies from their two favourite taste groups.
+    """
+    rng = random.Random(seed)
+    tastes = {
+        userId: rng.sample(range(groups), 2)
+        for userId in range(1, userCount + 1)
+    }
+    groupMovies = [
+        list(range(group + 1, movieCount + 1, groups))
+        for group in range(groups)
+    ]
+    interactions = []
+    for _ in range(count):
+        userId = rng.randint(1, userCount)
+        if rng.random() < 0.8:
+            movies = groupMovies[rng.choice(tastes[userId])]
+            # a few movies per group are far more popular than the rest
+            movieId = movies[
+                min(int(rng.paretovariate(1.0)) - 1, len(movies) - 1)
+            ]
+        else:
+            movieId = rng.randint(1, movieCount)
+        interactions.append(
+            (userId, movieId, rng.choice([1.0, 1.0, 0.5, 0.5, -0.5]))
+        )
+    return interactions
+
+
+def hitRate(model, heldOut, history, limit: int, useFactors: bool) -> float:
+    hits = 0
+    for userId, movieId in heldOut:
+        seen = {seenMovie for seenMovie, _ in history[userId]}
+        if useFactors:
+            ranked = model.recommend(
+                model.factorsFor(userId), limit, exclude=seen
+            )
+        else:
+            ranked = model.popular(limit, exclude=seen)
+        hits += any(rankedMovie == movieId for rankedMovie, _ in ranked)
+    return hits / max(len(heldOut), 1)
+
+
+def runBenchmark(
+    count: int, userCount: int, movieCount: int, rank: int
+) -> list[dict]:
+    rng = random.Random(7)
+    interactions = makeInteractions(count, userCount, movieCount)
+
+    # hold out one positive interaction for a sample of users
+    sampledUsers = set(
+        rng.sample(range(1, userCount + 1), min(2000, userCount))
+    )
+    heldOut, training, heldOutUsers = [], [], set()
+    history = {userId: [] for userId in sampledUsers}
+    for userId, movieId, weight in interactions:
+        if (
+            userId in sampledUsers
+            and weight > 0
+            and userId not in heldOutUsers
+        ):
+            heldOut.append((userId, movieId))
+            heldOutUsers.add(userId)
+            continue
+        training.append((userId, movieId, weight))
+        if userId in history:
+            history[userId].append((movieId, weight))
+    heldOut = [
+        (userId, movieId) for userId, movieId in heldOut if history[userId]
+    ]
+
+    start = time.perf_counter()
+    model = trainFactorModel(training, rank=rank)
+    trainSeconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for userId, _ in heldOut[:500]:
+        model.recommend(model.factorsFor(userId), 10)
+    servedMs = (
+        (time.perf_counter() - start) * 1000 / max(len(heldOut[:500]), 1)
+    )
+
+    start = time.perf_counter()
+    for userId, _ in heldOut[:500]:
+        model.recommend(model.foldIn(history[userId]), 10)
+    foldInMs = (
+        (time.perf_counter() - start) * 1000 / max(len(heldOut[:500]), 1)
+    )
+
+    return [
+        {"step": "train (s)", "value": round(trainSeconds, 2)},
+        {"step": "recommend (ms)", "value": round(servedMs, 2)},
+        {"step": "fold-in + recommend (ms)", "value": round(foldInMs, 2)},
+        {
+            "step": "hit rate@10 factors",
+            "value": round(hitRate(model, heldOut, history, 10, True), 3),
+        },
+        {
+            "step": "hit rate@10 popular",
+            "value": round(hitRate(model, heldOut, history, 10, False), 3),
+        },
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--interactions", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--movies", type=int, default=5_000)
+    parser.add_argument("--rank", type=int, default=16)
+    args = parser.parse_args()
+
+    for row in runBenchmark(
+        args.interactions, args.users, args.movies, args.rank
+    ):
+        print(f"{row['step']:<28}{row['value']:>12}")
+
+
+if __name__ == "__main__":
+    main()
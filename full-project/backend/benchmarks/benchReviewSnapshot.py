@@ -0,0 +1,85 @@
+"""
+Benchmark opening a large review store from JSON versus the columnar snapshot.
+
+Run from full-project/backend:
+
+    python -m benchmarks.benchReviewSnapshot --reviews 1000000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from app.repos import repo, reviewRepo
+from app.repos.reviewSnapshot import ReviewSnapshot, writeReviewSnapshot
+from benchmarks.benchCodec import makeReviews
+
+
+def timeIt(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def coldLoad(dataPath: Path) -> None:
+    """
+    Load the review cache from scratch the way the app does on first access.
+    """
+    reviewRepo.REVIEW_DATA_PATH = dataPath
+    reviewRepo._REVIEW_CACHE = None
+    reviewRepo._NEXT_REVIEW_ID = None
+    reviewRepo.loadReviews()
+
+
+def runBenchmark(reviewCount: int) -> list[dict]:
+    items = makeReviews(reviewCount)
+    originalPath = reviewRepo.REVIEW_DATA_PATH
+    results = []
+    with tempfile.TemporaryDirectory() as tempDir:
+        jsonPath = Path(tempDir) / "reviews.json"
+        repo._baseSaveAll(jsonPath, items)
+        jsonSeconds = timeIt(coldLoad, jsonPath)
+
+        snapshotPath = jsonPath.with_suffix(".bin")
+        writeReviewSnapshot(snapshotPath, items)
+        snapshotSeconds = timeIt(coldLoad, jsonPath)
+
+        openSeconds = timeIt(lambda: ReviewSnapshot(snapshotPath).close())
+
+        results.append(
+            {"step": "open snapshot (mmap)", "seconds": round(openSeconds, 4)}
+        )
+        results.append(
+            {"step": "cache from JSON", "seconds": round(jsonSeconds, 3)}
+        )
+        results.append(
+            {
+                "step": "cache from snapshot",
+                "seconds": round(snapshotSeconds, 3),
+            }
+        )
+        results.append(
+            {"step": "JSON bytes", "seconds": jsonPath.stat().st_size}
+        )
+        results.append(
+            {"step": "snapshot bytes", "seconds": snapshotPath.stat().st_size}
+        )
+
+    reviewRepo.REVIEW_DATA_PATH = originalPath
+    reviewRepo._REVIEW_CACHE = None
+    reviewRepo._NEXT_REVIEW_ID = None
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reviews", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    for row in runBenchmark(args.reviews):
+        print(f"{row['step']:<24}{row['seconds']:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark similar-movie queries: HNSW graph against the exact inverted index.
+
+Generates a synthetic catalog where movies fall into themes (a theme favours
+some genres, directors, stars and description words), builds the content
+vectors and the HNSW graph over them, then reports build time, mean query
+latency for both searches and recall@10 of the graph. A graph result counts as
+a hit when its exact similarity reaches the 10th best exact similarity, so ties
+at the cut-off are not counted as misses. Run from full-project/backend:
+
+    python -m benchmarks.benchSimilarMovies --movies 5000
+"""
+
+import argparse
+import random
+import time
+
+from app.repos.annIndex import HnswIndex
+from app.repos.movieVectors import MovieVectorIndex
+
+GENRES = [
+    "Action",
+    "Adventure",
+    "Animation",
+    "Biography",
+    "Comedy",
+    "Crime",
+    "Drama",
+    "Family",
+    "Fantasy",
+    "History",
+    "Horror",
+    "Music",
+    "Mystery",
+    "Romance",
+    "Sci-Fi",
+    "Sport",
+    "Thriller",
+    "War",
+    "Western",
+]
+
+
+def makeMovies(count: int, themes: int = 60, seed: int = 370) -> list[dict]:
+    """
+    Build movie dicts whose features mostly come from one of `themes` themes.
+    """
+    rng = random.Random(seed)
+    vocabulary = [f"w{index}" for index in range(20 * themes)]
+    themeFeatures = [
+        {
+            "genres": rng.sample(GENRES, 4),
+            "directors": [f"Director {theme}-{index}" for index in range(8)],
+            "stars": [f"Star {theme}-{index}" for index in range(30)],
+            "words": rng.sample(vocabulary, 60),
+        }
+        for theme in range(themes)
+    ]
+    movies = []
+    for movieId in range(1, count + 1):
+        theme = themeFeatures[rng.randrange(themes)]
+        words = [
+            (
+                rng.choice(theme["words"])
+                if rng.random() < 0.7
+                else rng.choice(vocabulary)
+            )
+            for _ in range(25)
+        ]
+        movies.append(
+            {
+                "id": movieId,
+                "movieGenres": rng.sample(theme["genres"], rng.randint(1, 3)),
+                "directors": [rng.choice(theme["directors"])],
+                "mainStars": rng.sample(theme["stars"], 3),
+                "description": " ".join(words),
+            }
+        )
+    return movies
+
+
+def runBenchmark(count: int, queries: int, limit: int = 10) -> list[dict]:
+    movies = makeMovies(count)
+    rng = random.Random(7)
+
+    start = time.perf_counter()
+    vectors = MovieVectorIndex(movies)
+    vectorSeconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph = HnswIndex()
+    for movie in movies:
+        graph.add(movie["id"], vectors.vector(movie["id"]))
+    graphSeconds = time.perf_counter() - start
+
+    sample = rng.sample([movie["id"] for movie in movies], min(queries, count))
+
+    start = time.perf_counter()
+    exact = {movieId: vectors.similar(movieId, limit) for movieId in sample}
+    exactMs = (time.perf_counter() - start) * 1000 / len(sample)
+
+    start = time.perf_counter()
+    approximate = {
+        movieId: graph.search(
+            vectors.vector(movieId), limit, exclude=(movieId,)
+        )
+        for movieId in sample
+    }
+    graphMs = (time.perf_counter() - start) * 1000 / len(sample)
+
+    hits = expected = 0
+    for movieId in sample:
+        if not exact[movieId]:
+            continue
+        cutoff = exact[movieId][-1][1] - 1e-9
+        hits += sum(
+            similarity >= cutoff for _, similarity in approximate[movieId]
+        )
+        expected += len(exact[movieId])
+
+    return [
+        {"step": "vectors (s)", "value": round(vectorSeconds, 2)},
+        {"step": "graph build (s)", "value": round(graphSeconds, 2)},
+        {"step": "exact query (ms)", "value": round(exactMs, 2)},
+        {"step": "graph query (ms)", "value": round(graphMs, 2)},
+        {
+            "step": f"graph recall@{limit}",
+            "value": round(hits / max(expected, 1), 3),
+        },
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--movies", type=int, default=5_000)
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    for row in runBenchmark(args.movies, args.queries):
+        print(f"{row['step']:<28}{row['value']:>12}")
+
+
+if __name__ == "__main__":
+    main()
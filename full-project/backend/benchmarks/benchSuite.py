@@ -0,0 +1,355 @@
+r"""
+Benchmark suite for the main services, auth and whole requests.
+
+For each dataset size (the number of reviews and of users; movies are a
+hundredth of that) it writes a synthetic data directory (see
+syntheticData.py), points the repos
+at it and times searchMovie, getMovieByFilter, searchReviews,
+getReviewById, createReview, likeReview, listLikedReviews, bearer-token
+resolution and a mix of GET requests through TestClient. The first call of
+each benchmark is reported apart, since it includes loading the caches.
+
+Results can be written as JSON and compared with an earlier run; the
+command exits with status 1 when a benchmark got slower than the allowed
+tolerance. Run from full-project/backend:
+
+    python -m benchmarks.benchSuite --sizes 1000,100000,1000000 \
+        --output bench.json
+    python -m benchmarks.benchSuite --sizes 1000,100000 --compare bench.json
+
+TMDb is not called: listLikedReviews gets no posters while benchmarked.
+createReview and likeReview save their data file on every call, as they
+do without the write-behind loop, so they are the slowest at large sizes.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import mean, median
+from typing import Callable, Dict, List
+
+from fastapi.testclient import TestClient
+
+from app.repos import (
+    favoritesRepo,
+    likeReviewRepo,
+    movieRepo,
+    repo,
+    reviewRepo,
+    userRepo,
+)
+from app.routers.authRoute import createAccessToken, getCurrentUser
+from app.schemas.review import ReviewCreate
+from app.services import likeReviewService, movieService, reviewService
+from app.repos.lazyRecords import fieldAt
+from benchmarks.syntheticData import generateDataset
+
+DEFAULT_SIZES = "1000,100000,1000000"
+
+
+def makeDataset(directory: Path, size: int, seed: int = 430) -> Dict[str, int]:
+    """
+    Write movies, users, reviews, likes and favorites for one dataset size.
+
+    Returns:
+        Dict[str, int]: How many records of each kind were written.
+    """
+    return generateDataset(
+        directory,
+        reviews=size,
+        users=size,
+        movies=max(size // 100, 10),
+        seed=seed,
+    )
+
+
+def useDataDirectory(directory: Path | None) -> None:
+    """
+    Point the repos at another data directory (None for the real one) and drop
+    their caches.
+    """
+    base = directory or repo.DATA_DIR
+    movieRepo.MOVIE_DATA_PATH = base / "movies.json"
+    movieRepo._MOVIE_CACHE = movieRepo._NEXT_MOVIE_ID = None
+    userRepo._USER_DATA_PATH = base / "users.json"
+    userRepo._USER_CACHE = userRepo._NEXT_USER_ID = None
+    reviewRepo.REVIEW_DATA_PATH = base / "reviews.json"
+    reviewRepo._REVIEW_CACHE = reviewRepo._NEXT_REVIEW_ID = None
+    likeReviewRepo.FILE = base / "likeReviews.json"
+    likeReviewRepo._LIKE_INDEX = None
+    favoritesRepo.FILE = base / "favorites.json"
+    favoritesRepo._FAVORITE_INDEX = None
+
+
+def measure(
+    name: str,
+    size: int,
+    function: Callable[[int], object],
+    budget: float,
+    maxCalls: int,
+) -> dict:
+    """
+    Time function(call number): once cold, then repeatedly until the time
+    budget or maxCalls is used up.
+    """
+    start = time.perf_counter()
+    function(0)
+    coldMs = (time.perf_counter() - start) * 1000
+
+    timings = []
+    deadline = time.perf_counter() + budget
+    while len(timings) < maxCalls and (
+        not timings or time.perf_counter() < deadline
+    ):
+        start = time.perf_counter()
+        function(len(timings) + 1)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return {
+        "name": name,
+        "size": size,
+        "coldMs": round(coldMs, 3),
+        "meanMs": round(mean(timings), 3),
+        "p50Ms": round(median(timings), 3),
+        "p95Ms": round(
+            timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3
+        ),
+        "calls": len(timings),
+    }
+
+
+def runSize(size: int, budget: float, maxCalls: int) -> List[dict]:
+    """
+    Build one dataset and run every benchmark against it.
+    """
+    rng = random.Random(size)
+    results = []
+    with tempfile.TemporaryDirectory() as tempDir:
+        directory = Path(tempDir)
+        counts = makeDataset(directory, size)
+        useDataDirectory(directory)
+        try:
+            movieCount = counts["movies"]
+            payload = ReviewCreate(
+                reviewTitle="Benchmarked",
+                reviewBody="Written by the benchmark suite",
+                rating=7,
+            )
+            likedUser = next(
+                iter(likeReviewRepo.loadLikeIndex().forward.keys())
+            )
+            loop = asyncio.new_event_loop()
+            token = createAccessToken(f"user{size // 2}")
+            movies = movieRepo.loadMovies()
+            titles = [
+                fieldAt(movies, rng.randrange(movieCount), "title")
+                for _ in range(50)
+            ]
+
+            benchmarks = [
+                (
+                    "searchMovie",
+                    lambda call: movieService.searchMovie("drama"),
+                ),
+                (
+                    "getMovieByFilter",
+                    lambda call: movieService.getMovieByFilter(
+                        genre="comedy", year=1990
+                    ),
+                ),
+                (
+                    "searchReviews",
+                    lambda call: reviewService.searchReviews(
+                        rng.choice(titles)
+                    ),
+                ),
+                (
+                    "getReviewById",
+                    lambda call: reviewService.getReviewById(
+                        rng.randint(1, size)
+                    ),
+                ),
+                (
+                    "createReview",
+                    lambda call: reviewService.createReview(
+                        rng.randint(1, movieCount), 1, payload
+                    ),
+                ),
+                # user ids above the dataset's never liked anything, so every
+                # like is new
+                (
+                    "likeReview",
+                    lambda call: likeReviewService.likeReview(
+                        size + 1 + call, rng.randint(1, size)
+                    ),
+                ),
+                (
+                    "listLikedReviews",
+                    lambda call: likeReviewService.listLikedReviews(likedUser),
+                ),
+                (
+                    "auth.getCurrentUser",
+                    lambda call: loop.run_until_complete(
+                        getCurrentUser(token)
+                    ),
+                ),
+            ]
+            for name, function in benchmarks:
+                results.append(measure(name, size, function, budget, maxCalls))
+            loop.close()
+
+            client = TestClient(_loadApp())
+            paths = [
+                lambda: f"/movies/{rng.randint(1, movieCount)}",
+                lambda: (
+                    "/movies/filter?genre=drama"
+                    f"&year={rng.choice([1960, 1980, 2000])}"
+                ),
+                lambda: f"/reviews?page={rng.randint(1, 50)}&limit=10",
+                lambda: f"/reviews/{rng.randint(1, size)}",
+            ]
+
+            def request(call: int) -> None:
+                response = client.get(paths[call % len(paths)]())
+                response.raise_for_status()
+
+            row = measure(
+                "testclient.mixedGets", size, request, budget, maxCalls * 10
+            )
+            row["requestsPerSecond"] = (
+                round(1000 / row["meanMs"], 1) if row["meanMs"] else None
+            )
+            results.append(row)
+        finally:
+            useDataDirectory(None)
+    return results
+
+
+def _loadApp():
+    from app.app import app
+
+    return app
+
+
+def compareResults(
+    baseline: List[dict], current: List[dict], tolerance: float
+) -> List[dict]:
+    """
+    Pair each current result with the baseline run of the same benchmark and
+    size.
+
+    Returns:
+        List[dict]: name, size, both mean times, their ratio and whether it
+        is a regression (slower by more than tolerance, e.g. 0.25 for 25%).
+    """
+    previous = {(row["name"], row["size"]): row for row in baseline}
+    rows = []
+    for row in current:
+        old = previous.get((row["name"], row["size"]))
+        if old is None or not old["meanMs"]:
+            continue
+        ratio = row["meanMs"] / old["meanMs"]
+        rows.append({
+            "name": row["name"],
+            "size": row["size"],
+            "baselineMs": old["meanMs"],
+            "currentMs": row["meanMs"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + tolerance,
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        default=DEFAULT_SIZES,
+        help="comma-separated review/user counts",
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=2.0,
+        help="seconds of warm calls per benchmark",
+    )
+    parser.add_argument(
+        "--max-calls",
+        type=int,
+        default=200,
+        help="most warm calls per benchmark",
+    )
+    parser.add_argument(
+        "--output", type=Path, help="write the results to this JSON file"
+    )
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        help="JSON results of an earlier run to compare against",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed slowdown before a regression, 0.25 = 25%%",
+    )
+    args = parser.parse_args()
+
+    # the like lookups need no posters; keep TMDb out of the timings
+    likeReviewService.getMovieDetailsById = lambda tmdbId: None
+
+    print(
+        f"{'benchmark':<24}{'size':>10}{'cold ms':>12}"
+        f"{'mean ms':>12}{'p95 ms':>12}"
+    )
+    results = []
+    for size in (int(value) for value in args.sizes.split(",")):
+        for row in runSize(size, args.budget, args.max_calls):
+            print(
+                f"{row['name']:<24}{row['size']:>10}{row['coldMs']:>12.2f}"
+                f"{row['meanMs']:>12.3f}{row['p95Ms']:>12.3f}"
+            )
+            results.append(row)
+
+    if args.output:
+        report = {
+            "createdAt": datetime.now(timezone.utc).isoformat(
+                timespec="seconds"
+            ),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "jsonCodec": repo.JSON_CODEC,
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))[
+            "results"
+        ]
+        comparison = compareResults(baseline, results, args.tolerance)
+        print(
+            f"\n{'benchmark':<24}{'size':>10}{'before ms':>12}"
+            f"{'now ms':>12}{'ratio':>9}"
+        )
+        for row in comparison:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(
+                f"{row['name']:<24}{row['size']:>10}"
+                f"{row['baselineMs']:>12.3f}{row['currentMs']:>12.3f}"
+                f"{row['ratio']:>8.2f}x{flag}"
+            )
+        if any(row["regression"] for row in comparison):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Local stand-in for the TMDb API, for load tests that must not hit the real one.
+
+Answers the three endpoints tmdbService uses with made-up but stable data:
+/search/movie?query=..., /movie/{id} and /movie/{id}/recommendations. Any
+api_key is accepted, a missing one gets TMDb's 401 error body. An optional
+latency is added to every answer to mimic the network. Point the backend
+at it with TMDB_BASE_URL. Run from full-project/backend:
+
+    python -m benchmarks.fakeTmdb --port 8765 --latency-ms 40
+    TMDB_BASE_URL=http://127.0.0.1:8765/3 TMDB_API_KEY=fake uvicorn app.app:app
+"""
+
+import argparse
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import parse_qs, urlparse
+
+RECOMMENDATIONS_PER_MOVIE = 20
+
+
+def fakeMovie(tmdbId: int, title: str | None = None) -> dict:
+    """
+    Return the TMDb movie body for an id; the same id always gives the same
+    movie.
+    """
+    return {
+        "id": tmdbId,
+        "title": title or f"Fake Movie {tmdbId}",
+        "poster_path": f"/fake{tmdbId}.jpg",
+        "overview": f"Overview of fake movie {tmdbId}.",
+        "vote_average": round(1 + tmdbId % 90 / 10, 1),
+    }
+
+
+def searchId(query: str) -> int:
+    return zlib.crc32(query.lower().encode("utf-8")) % 1_000_000 + 1
+
+
+class FakeTmdbHandler(BaseHTTPRequestHandler):
+    """
+    Request handler; the server's `latency` attribute is the delay in seconds.
+    """
+
+    def log_message(self, format, *args):
+        # one line per request would swamp the load test's output
+        pass
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if not query.get("api_key"):
+            self._send(
+                401,
+                {
+                    "status_code": 7,
+                    "status_message": (
+                        "Invalid API key: You must be granted a valid key."
+                    ),
+                },
+            )
+            return
+
+        parts = url.path.strip("/").split("/")
+        if parts and parts[0] == "3":
+            parts = parts[1:]
+        if parts == ["search", "movie"]:
+            title = query.get("query", [""])[0]
+            results = [fakeMovie(searchId(title), title)] if title else []
+            self._send(
+                200,
+                {"page": 1, "results": results, "total_results": len(results)},
+            )
+        elif len(parts) == 2 and parts[0] == "movie" and parts[1].isdigit():
+            self._send(200, fakeMovie(int(parts[1])))
+        elif (
+            len(parts) == 3
+            and parts[0] == "movie"
+            and parts[1].isdigit()
+            and parts[2] == "recommendations"
+        ):
+            tmdbId = int(parts[1])
+            results = [
+                fakeMovie(tmdbId * 31 + offset)
+                for offset in range(1, RECOMMENDATIONS_PER_MOVIE + 1)
+            ]
+            self._send(
+                200,
+                {"page": 1, "results": results, "total_results": len(results)},
+            )
+        else:
+            self._send(
+                404,
+                {
+                    "status_code": 34,
+                    "status_message": (
+                        "The resource you requested could not be found."
+                    ),
+                },
+            )
+
+
+def startFakeTmdb(
+    host: str = "127.0.0.1", port: int = 0, latencyMs: float = 0
+) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start the fake server on a daemon thread.
+
+    Args:
+        host (str): Address to listen on.
+        port (int): Port to listen on, 0 for any free port.
+        latencyMs (float): Delay added to every answer, in milliseconds.
+
+    Returns:
+        Tuple[ThreadingHTTPServer, str]: The server (call shutdown() to stop
+            it) and the base URL to use as TMDB_BASE_URL.
+    """
+    server = ThreadingHTTPServer((host, port), FakeTmdbHandler)
+    server.daemon_threads = True
+    server.latency = latencyMs / 1000
+    threading.Thread(
+        target=server.serve_forever, name="fake-tmdb", daemon=True
+    ).start()
+    return server, f"http://{host}:{server.server_address[1]}/3"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0,
+        help="delay added to every answer",
+    )
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), FakeTmdbHandler)
+    server.daemon_threads = True
+    server.latency = args.latency_ms / 1000
+    print(f"Fake TMDb on http://{args.host}:{args.port}/3")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,551 @@
+r"""
+Load test: virtual users sending a realistic traffic mix to a running backend.
+
+Each virtual user logs in, then keeps picking a scenario by weight (browse
+movies, filter, read reviews, log in again, post a review, like a review,
+favorite a movie, list liked reviews) and sends its request over async
+httpx, as fast as the server answers or with a think time in between.
+Afterwards it prints the throughput and p50/p95/p99 latency of every
+endpoint, and can write them as JSON.
+
+Logins need the synthetic accounts (user1..userN, see syntheticData.py).
+With --generate the test writes such a dataset, starts the backend with
+uvicorn on it and points TMDb at a local fake (fakeTmdb.py), so it needs
+nothing else. Run from full-project/backend:
+
+    python -m benchmarks.loadTest --generate 100000 --vus 50 --duration 60 \
+        --output load.json
+    python -m benchmarks.loadTest --base-url http://127.0.0.1:8000 \
+        --users 1000 --movies 10 --reviews 1000
+
+Locust is not used, so the test runs with what the backend already installs.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.fakeTmdb import startFakeTmdb
+from benchmarks.syntheticData import SYNTHETIC_PASSWORD, generateDataset
+
+DEFAULT_MIX = (
+    "movieList=2,movie=20,filter=15,reviews=15,review=10,login=5,"
+    "postReview=8,like=10,favorite=5,likedReviews=5"
+)
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+class Recorder:
+    """
+    Latencies and status codes per endpoint, kept once the warm-up is over.
+    """
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.recording = False
+
+    def add(self, endpoint: str, status: int, elapsedMs: float) -> None:
+        if self.recording:
+            self.latencies[endpoint].append(elapsedMs)
+            self.statuses[endpoint][status] += 1
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Return the nearest-rank percentile of sorted values (fraction 0.95 for
+    p95).
+    """
+    if not values:
+        return 0.0
+    return values[
+        min(len(values) - 1, max(0, int(len(values) * fraction + 0.5) - 1))
+    ]
+
+
+def summarize(recorder: Recorder, seconds: float) -> List[dict]:
+    """
+    Turn recorded requests into one row per endpoint plus a total row.
+
+    Status 0 stands for a request that got no answer (timeout, refused).
+    """
+    rows = []
+    everything: List[float] = []
+    for endpoint in sorted(recorder.latencies):
+        timings = sorted(recorder.latencies[endpoint])
+        everything += timings
+        statuses = recorder.statuses[endpoint]
+        rows.append(_row(endpoint, timings, seconds, statuses))
+    total = Counter()
+    for statuses in recorder.statuses.values():
+        total.update(statuses)
+    rows.append(_row("TOTAL", sorted(everything), seconds, total))
+    return rows
+
+
+def _row(
+    endpoint: str, timings: List[float], seconds: float, statuses: Counter
+) -> dict:
+    return {
+        "endpoint": endpoint,
+        "requests": len(timings),
+        "requestsPerSecond": (
+            round(len(timings) / seconds, 1) if seconds else 0.0
+        ),
+        "ok": sum(
+            count for status, count in statuses.items() if 200 <= status < 400
+        ),
+        "clientErrors": sum(
+            count for status, count in statuses.items() if 400 <= status < 500
+        ),
+        "serverErrors": sum(
+            count
+            for status, count in statuses.items()
+            if status >= 500 or status == 0
+        ),
+        "p50Ms": round(percentile(timings, 0.50), 2),
+        "p95Ms": round(percentile(timings, 0.95), 2),
+        "p99Ms": round(percentile(timings, 0.99), 2),
+        "maxMs": round(timings[-1], 2) if timings else 0.0,
+    }
+
+
+def parseMix(mix: str) -> Tuple[List[str], List[int]]:
+    """
+    Parse "name=weight,..." into scenario names and weights.
+
+    Raises:
+        ValueError: If a name is not a known scenario or a weight is not a
+            positive integer.
+    """
+    names, weights = [], []
+    for part in mix.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in VirtualUser.SCENARIOS:
+            raise ValueError(
+                f"Unknown scenario: {name} "
+                f"(known: {', '.join(VirtualUser.SCENARIOS)})"
+            )
+        if not weight.isdigit() or int(weight) < 1:
+            raise ValueError(f"Weight of {name} must be a positive integer")
+        names.append(name)
+        weights.append(int(weight))
+    return names, weights
+
+
+class VirtualUser:
+    """
+    One simulated client: a synthetic account, a bearer token and a random
+    stream.
+    """
+
+    SCENARIOS = (
+        "movieList", "movie", "filter", "reviews", "review",
+        "login", "postReview", "like", "favorite", "likedReviews",
+    )
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        recorder: Recorder,
+        counts: Dict[str, int],
+        meta: dict,
+        rng: random.Random,
+    ):
+        self.client = client
+        self.recorder = recorder
+        self.counts = counts
+        self.genres = [genre.lower() for genre in meta.get("genres", [])] or [
+            "drama"
+        ]
+        self.decades = meta.get("decades", []) or [2000]
+        self.rng = rng
+        self.username = f"user{rng.randint(1, counts['users'])}"
+        self.headers: Dict[str, str] = {}
+
+    async def _request(
+        self, endpoint: str, method: str, url: str, **kwargs
+    ) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.add(
+                endpoint, 0, (time.perf_counter() - start) * 1000
+            )
+            return None
+        self.recorder.add(
+            endpoint,
+            response.status_code,
+            (time.perf_counter() - start) * 1000,
+        )
+        return response
+
+    async def login(self) -> None:
+        response = await self._request(
+            "POST /token", "POST", "/token",
+            data={"username": self.username, "password": SYNTHETIC_PASSWORD},
+        )
+        if response is not None and response.status_code == 200:
+            self.headers = {
+                "Authorization": f"Bearer {response.json()['access_token']}"
+            }
+
+    async def movieList(self) -> None:
+        await self._request("GET /movies", "GET", "/movies")
+
+    async def movie(self) -> None:
+        await self._request(
+            "GET /movies/{movieId}",
+            "GET",
+            f"/movies/{self.rng.randint(1, self.counts['movies'])}",
+        )
+
+    async def filter(self) -> None:
+        params = {"genre": self.rng.choice(self.genres)}
+        if self.rng.random() < 0.5:
+            params["year"] = self.rng.choice(
+                self.decades
+            ) + self.rng.randrange(10)
+        await self._request(
+            "GET /movies/filter", "GET", "/movies/filter", params=params
+        )
+
+    async def reviews(self) -> None:
+        # most readers stay on the first pages
+        page = min(
+            int(self.rng.expovariate(0.2)) + 1,
+            max(self.counts["reviews"] // 10, 1),
+        )
+        await self._request(
+            "GET /reviews",
+            "GET",
+            "/reviews",
+            params={"page": page, "limit": 10},
+        )
+
+    async def review(self) -> None:
+        await self._request(
+            "GET /reviews/{reviewId}",
+            "GET",
+            f"/reviews/{self.rng.randint(1, self.counts['reviews'])}",
+        )
+
+    async def postReview(self) -> None:
+        payload = {
+            "reviewTitle": "Load test",
+            "reviewBody": "Posted by the load test.",
+            "rating": self.rng.randint(1, 10),
+        }
+        await self._request(
+            "POST /reviews/{movieId}",
+            "POST",
+            f"/reviews/{self.rng.randint(1, self.counts['movies'])}",
+            json=payload,
+            headers=self.headers,
+        )
+
+    async def like(self) -> None:
+        await self._request(
+            "POST /likeReview/{reviewId}",
+            "POST",
+            f"/likeReview/{self.rng.randint(1, self.counts['reviews'])}",
+            headers=self.headers,
+        )
+
+    async def favorite(self) -> None:
+        await self._request(
+            "POST /favorites/{movieId}",
+            "POST",
+            f"/favorites/{self.rng.randint(1, self.counts['movies'])}",
+            headers=self.headers,
+        )
+
+    async def likedReviews(self) -> None:
+        # asks TMDb for the poster of every liked review's movie
+        await self._request(
+            "GET /likeReview/", "GET", "/likeReview/", headers=self.headers
+        )
+
+    async def run(
+        self,
+        names: List[str],
+        weights: List[int],
+        deadline: float,
+        thinkMs: float,
+    ) -> None:
+        await self.login()
+        scenarios: Dict[str, Callable] = {
+            name: getattr(self, name) for name in names
+        }
+        while time.perf_counter() < deadline:
+            await scenarios[self.rng.choices(names, weights)[0]]()
+            if thinkMs:
+                await asyncio.sleep(self.rng.expovariate(1000 / thinkMs))
+
+
+async def runLoad(
+    baseUrl: str,
+    counts: Dict[str, int],
+    mix: str = DEFAULT_MIX,
+    virtualUsers: int = 20,
+    duration: float = 30,
+    warmup: float = 5,
+    thinkMs: float = 0,
+    seed: int = 450,
+) -> Tuple[List[dict], float]:
+    """
+    Run the virtual users against a backend and summarize what they saw.
+
+    Args:
+        baseUrl (str): Where the backend listens, e.g. http://127.0.0.1:8000.
+        counts (Dict[str, int]): How many users, movies and reviews the backend
+            holds.
+        mix (str): Scenario weights as "name=weight,...".
+        virtualUsers (int): Number of concurrent clients.
+        duration (float): Seconds measured, after the warm-up.
+        warmup (float): Seconds of traffic sent first and not recorded.
+        thinkMs (float): Mean pause between a user's requests, 0 for none.
+        seed (int): Seed of the users' random streams.
+
+    Returns:
+        Tuple[List[dict], float]: One row per endpoint plus a TOTAL row, and
+            the seconds measured.
+    """
+    names, weights = parseMix(mix)
+    recorder = Recorder()
+    limits = httpx.Limits(
+        max_connections=virtualUsers, max_keepalive_connections=virtualUsers
+    )
+    async with httpx.AsyncClient(
+        base_url=baseUrl, limits=limits, timeout=60
+    ) as client:
+        meta = (await client.get("/movies/meta")).json()
+        rng = random.Random(seed)
+        users = [
+            VirtualUser(
+                client, recorder, counts, meta, random.Random(rng.random())
+            )
+            for _ in range(virtualUsers)
+        ]
+        deadline = time.perf_counter() + warmup + duration
+        tasks = [
+            asyncio.create_task(user.run(names, weights, deadline, thinkMs))
+            for user in users
+        ]
+
+        await asyncio.sleep(warmup)
+        recorder.recording = True
+        start = time.perf_counter()
+        await asyncio.gather(*tasks)
+        seconds = time.perf_counter() - start
+    return summarize(recorder, seconds), seconds
+
+
+def startBackend(
+    dataDir: Path, port: int, tmdbBaseUrl: str, timeout: float = 300
+) -> subprocess.Popen:
+    """
+    Start uvicorn serving the backend on dataDir, and wait until its caches are
+    warm.
+
+    Raises:
+        RuntimeError: If the server exits or does not answer within timeout
+            seconds.
+    """
+    environment = {
+        **os.environ,
+        "DATA_DIR": str(dataDir),
+        "TMDB_BASE_URL": tmdbBaseUrl,
+        "TMDB_API_KEY": "fake-key",
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.app:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=environment,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(
+                f"Backend exited with status {process.returncode}"
+            )
+        try:
+            # /ready answers 503 until the background warm-up is over
+            if (
+                httpx.get(
+                    f"http://127.0.0.1:{port}/ready", timeout=timeout
+                ).status_code
+                == 200
+            ):
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError("Backend did not start in time")
+
+
+def printRows(rows: List[dict]) -> None:
+    print(
+        f"{'endpoint':<30}{'requests':>10}{'req/s':>9}{'ok':>8}"
+        f"{'4xx':>6}{'5xx':>6}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    )
+    for row in rows:
+        print(
+            f"{row['endpoint']:<30}{row['requests']:>10}"
+            f"{row['requestsPerSecond']:>9.1f}{row['ok']:>8}"
+            f"{row['clientErrors']:>6}{row['serverErrors']:>6}"
+            f"{row['p50Ms']:>10.2f}{row['p95Ms']:>10.2f}"
+            f"{row['p99Ms']:>10.2f}{row['maxMs']:>10.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--base-url",
+        default="http://127.0.0.1:8000",
+        help="backend to test, unless --generate",
+    )
+    parser.add_argument(
+        "--generate",
+        type=int,
+        help="write this many reviews and users, then serve them locally",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8700,
+        help="port of the backend started by --generate",
+    )
+    parser.add_argument(
+        "--tmdb-latency-ms",
+        type=float,
+        default=40,
+        help="delay of the fake TMDb, with --generate",
+    )
+    parser.add_argument(
+        "--users",
+        type=int,
+        default=1000,
+        help="synthetic accounts on the backend",
+    )
+    parser.add_argument(
+        "--movies", type=int, default=10, help="movies on the backend"
+    )
+    parser.add_argument(
+        "--reviews", type=int, default=1000, help="reviews on the backend"
+    )
+    parser.add_argument(
+        "--mix", default=DEFAULT_MIX, help="scenario weights, name=weight,..."
+    )
+    parser.add_argument(
+        "--vus", type=int, default=20, help="concurrent virtual users"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=30, help="seconds measured"
+    )
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=5,
+        help="seconds of unrecorded traffic first",
+    )
+    parser.add_argument(
+        "--think-ms",
+        type=float,
+        default=0,
+        help="mean pause between a user's requests",
+    )
+    parser.add_argument("--seed", type=int, default=450)
+    parser.add_argument(
+        "--output", type=Path, help="write the results to this JSON file"
+    )
+    args = parser.parse_args()
+
+    counts = {
+        "users": args.users,
+        "movies": args.movies,
+        "reviews": args.reviews,
+    }
+    process = fakeTmdb = None
+    tempDir = None
+    baseUrl = args.base_url
+    try:
+        if args.generate:
+            tempDir = tempfile.TemporaryDirectory()
+            written = generateDataset(
+                Path(tempDir.name), reviews=args.generate, users=args.generate,
+                movies=max(args.generate // 100, 10), seed=args.seed,
+            )
+            counts = {name: written[name] for name in counts}
+            fakeTmdb, tmdbBaseUrl = startFakeTmdb(
+                latencyMs=args.tmdb_latency_ms
+            )
+            process = startBackend(Path(tempDir.name), args.port, tmdbBaseUrl)
+            baseUrl = f"http://127.0.0.1:{args.port}"
+
+        rows, seconds = asyncio.run(
+            runLoad(
+                baseUrl,
+                counts,
+                args.mix,
+                args.vus,
+                args.duration,
+                args.warmup,
+                args.think_ms,
+                args.seed,
+            )
+        )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        if fakeTmdb is not None:
+            fakeTmdb.shutdown()
+        if tempDir is not None:
+            tempDir.cleanup()
+
+    printRows(rows)
+    if args.output:
+        report = {
+            "createdAt": datetime.now(timezone.utc).isoformat(
+                timespec="seconds"
+            ),
+            "baseUrl": baseUrl,
+            "counts": counts,
+            "mix": args.mix,
+            "virtualUsers": args.vus,
+            "seconds": round(seconds, 2),
+            "results": rows,
+        }
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,532 @@
+r"""
+Generate large synthetic datasets shaped like the imported IMDb data.
+
+DataProfile reads the movieReviews.csv and metadata.json files under
+app/data and keeps the empirical distributions the generator samples from:
+review and title lengths in words, the review vocabulary, ratings, review
+dates, usefulness votes, reviews per user and reviews per movie, plus the
+genres, directors, stars, years and runtimes of the real movies.
+
+generateDataset writes movies.json, users.json, reviews.json,
+likeReviews.json and favorites.json in the repo's format. Rows are
+written one at a time, and a user or movie is picked through a handful of
+activity classes instead of per-record weight tables, so memory stays flat
+however many reviews are generated. Likes per review follow the
+usefulness votes (scaled by likeScale); favorites per user follow reviews
+per user. With snapshot=True the reviews are also written as the columnar
+reviews.bin that reviewRepo opens instead of the JSON. That writer keeps
+the columns in memory, about the size of the review text.
+
+Run from full-project/backend:
+
+    python -m benchmarks.syntheticData --reviews 10000000 --users 2000000 \
+        --out /tmp/synthetic
+"""
+
+import argparse
+import csv
+import json
+import math
+import random
+import time
+from bisect import bisect_left
+from collections import Counter
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from app.repos import repo
+from app.repos.reviewRepo import REVIEW_DATA_PATH
+from app.repos.reviewSnapshot import writeReviewSnapshot
+from app.utilities.security import hashPassword
+
+SOURCE_DIR = repo.DATA_DIR
+# words kept in the sampling vocabulary, most frequent first
+VOCABULARY_SIZE = 20_000
+# words pre-drawn from the vocabulary; texts are slices of this pool
+WORD_POOL_SIZE = 1 << 20
+# every generated user can log in with this password
+SYNTHETIC_PASSWORD = "Synthetic1"
+
+
+class DataProfile:
+    """
+    Empirical distributions read from the IMDb review CSVs and movie metadata.
+    """
+
+    def __init__(self, sourceDir: Path = SOURCE_DIR):
+        """
+        Args:
+            sourceDir (Path): Directory holding one folder per movie with
+                movieReviews.csv and metadata.json.
+
+        Raises:
+            FileNotFoundError: If no movieReviews.csv is found.
+        """
+        self.bodyLengths: List[int] = []
+        self.titleLengths: List[int] = []
+        self.ratings: List[int] = []
+        self.dates: List[str] = []
+        self.votes: List[Tuple[int, int]] = []
+        self.reviewsPerMovie: List[int] = []
+        bodyWords: Counter = Counter()
+        titleWords: Counter = Counter()
+        reviewsPerUser: Counter = Counter()
+
+        csvPaths = sorted(Path(sourceDir).glob("*/movieReviews.csv"))
+        if not csvPaths:
+            raise FileNotFoundError(f"No movieReviews.csv under {sourceDir}")
+        for csvPath in csvPaths:
+            count = 0
+            with csvPath.open(newline="", encoding="utf-8") as file:
+                for row in csv.DictReader(file):
+                    rating = (row.get("User's Rating out of 10") or "").strip()
+                    # rows scraped without a rating
+                    # carry page text in that column
+                    if not rating.isdigit():
+                        continue
+                    body = (row.get("Review") or "").lower().split()
+                    title = (row.get("Review Title") or "").lower().split()
+                    self.bodyLengths.append(max(len(body), 1))
+                    self.titleLengths.append(max(len(title), 1))
+                    bodyWords.update(body)
+                    titleWords.update(title)
+                    self.ratings.append(int(rating))
+                    self.dates.append(row.get("Date of Review") or "")
+                    self.votes.append(
+                        (
+                            int(row.get("Usefulness Vote") or 0),
+                            int(row.get("Total Votes") or 0),
+                        )
+                    )
+                    reviewsPerUser[row.get("User")] += 1
+                    count += 1
+            self.reviewsPerMovie.append(count)
+
+        self.bodyVocabulary, self.bodyWeights = _vocabulary(bodyWords)
+        self.titleVocabulary, self.titleWeights = _vocabulary(titleWords)
+        # how many users wrote k reviews, as (k, users) pairs
+        self.userActivity: List[Tuple[int, int]] = sorted(
+            Counter(reviewsPerUser.values()).items()
+        )
+
+        self.movies = [
+            json.loads(path.read_text(encoding="utf-8"))
+            for path in sorted(Path(sourceDir).glob("*/metadata.json"))
+        ]
+
+
+def _vocabulary(words: Counter) -> Tuple[List[str], List[int]]:
+    """
+    Return the most frequent words and their cumulative counts, for
+    random.choices.
+    """
+    common = words.most_common(VOCABULARY_SIZE)
+    return [word for word, _ in common], list(
+        accumulate(count for _, count in common)
+    )
+
+
+class ActivityPicker:
+    """
+    Picks record ids with a skewed activity distribution in constant memory.
+
+    Ids are split into classes by activity (e.g. users who write k reviews);
+    a pick chooses a class by its share of all activity, then an id inside
+    it. Class members are spread over the id range by a fixed permutation
+    so the busy ids are not all at one end.
+    """
+
+    def __init__(
+        self,
+        population: int,
+        activity: List[Tuple[int, int]],
+        rng: random.Random,
+    ):
+        """
+        Args:
+            population (int): Ids to pick from, 1..population.
+            activity (List[Tuple[int, int]]): (activity, weight) pairs; a class
+                gets a share of the ids proportional to its weight.
+            rng (random.Random): Source of randomness.
+        """
+        self.population = population
+        self.rng = rng
+        activity = activity[:population]
+        totalWeight = sum(weight for _, weight in activity)
+        sizes = [
+            max(1, round(population * weight / totalWeight))
+            for _, weight in activity
+        ]
+        # fix rounding on the largest class so
+        # the classes cover every id exactly once
+        largest = sizes.index(max(sizes))
+        sizes[largest] += population - sum(sizes)
+        self._starts = [0] + list(accumulate(sizes))[:-1]
+        self._sizes = sizes
+        self._cumulative = list(
+            accumulate(
+                level * size for (level, _), size in zip(activity, sizes)
+            )
+        )
+        self._step = _coprimeStep(population)
+
+    def pick(self) -> int:
+        """
+        Return one id, busier ids more often.
+        """
+        klass = bisect_left(
+            self._cumulative, self.rng.random() * self._cumulative[-1]
+        )
+        klass = min(klass, len(self._sizes) - 1)
+        position = self._starts[klass] + self.rng.randrange(self._sizes[klass])
+        return position * self._step % self.population + 1
+
+
+class WordSampler:
+    """
+    Draws word sequences with the vocabulary's frequencies.
+
+    Drawing every word separately is most of the generator's run time, so
+    words are drawn once into a pool and each text is a slice of the pool
+    starting at a random offset.
+    """
+
+    def __init__(
+        self,
+        vocabulary: List[str],
+        weights: List[int],
+        rng: random.Random,
+        poolSize: int = WORD_POOL_SIZE,
+    ):
+        self.rng = rng
+        self._pool = rng.choices(vocabulary, cum_weights=weights, k=poolSize)
+
+    def text(self, words: int) -> str:
+        words = min(words, len(self._pool))
+        start = self.rng.randrange(len(self._pool) - words + 1)
+        return " ".join(self._pool[start : start + words])
+
+
+def _coprimeStep(population: int) -> int:
+    step = max(1, int(population * 0.618))
+    while math.gcd(step, population) != 1:
+        step += 1
+    return step
+
+
+def _writeArray(path: Path, rows: Iterator[dict]) -> int:
+    """
+    Stream rows into a JSON array file, replacing it atomically when done.
+
+    Returns:
+        int: The number of rows written.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_suffix(path.suffix + ".tmp")
+    count = 0
+    with temp.open("wb") as file:
+        file.write(b"[")
+        for row in rows:
+            if count:
+                file.write(b",\n")
+            file.write(repo._encodeJson(row))
+            count += 1
+        file.write(b"]")
+    temp.replace(path)
+    return count
+
+
+def _movieRows(
+    profile: DataProfile, count: int, rng: random.Random
+) -> Iterator[dict]:
+    genres = [
+        genre
+        for movie in profile.movies
+        for genre in movie.get("movieGenres") or []
+    ]
+    directors = [
+        name
+        for movie in profile.movies
+        for name in movie.get("directors") or []
+    ]
+    stars = [
+        name
+        for movie in profile.movies
+        for name in movie.get("mainStars") or []
+    ]
+    years = [
+        int(str(movie["datePublished"])[:4])
+        for movie in profile.movies
+        if movie.get("datePublished")
+    ]
+    durations = [
+        movie["duration"] for movie in profile.movies if movie.get("duration")
+    ]
+    ratings = [
+        movie["movieIMDbRating"]
+        for movie in profile.movies
+        if movie.get("movieIMDbRating")
+    ]
+    for movieId in range(1, count + 1):
+        title = " ".join(
+            rng.choices(
+                profile.titleVocabulary,
+                cum_weights=profile.titleWeights,
+                k=rng.randint(1, 4),
+            )
+        )
+        yield {
+            "id": movieId,
+            "title": f"{title.title()} {movieId}",
+            "movieIMDbRating": round(
+                min(10.0, max(1.0, rng.choice(ratings) + rng.gauss(0, 1))), 1
+            ),
+            "movieGenres": sorted(
+                set(rng.choices(genres, k=rng.randint(1, 3)))
+            ),
+            # suffixes grow the pools of names past the handful in the metadata
+            "directors": [
+                f"{rng.choice(directors)} {rng.randint(1, count // 20 + 1)}"
+            ],
+            "mainStars": [
+                f"{rng.choice(stars)} {rng.randint(1, count // 5 + 1)}"
+                for _ in range(3)
+            ],
+            "description": " ".join(
+                rng.choices(
+                    profile.bodyVocabulary,
+                    cum_weights=profile.bodyWeights,
+                    k=rng.randint(15, 40),
+                )
+            ),
+            "datePublished": (
+                f"{rng.randint(min(years) - 30, max(years))}"
+                f"-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            ),
+            "duration": max(60, int(rng.choice(durations) + rng.gauss(0, 15))),
+            # every real movie has one, and the fake TMDb answers for any id
+            "tmdbId": movieId,
+        }
+
+
+def _userRows(
+    count: int, movies: ActivityPicker, rng: random.Random
+) -> Iterator[dict]:
+    # one bcrypt hash for every user; hashing each
+    # password would take hours at this scale
+    passwordHash = hashPassword(SYNTHETIC_PASSWORD)
+    for userId in range(1, count + 1):
+        yield {
+            "id": userId,
+            "username": f"user{userId}",
+            "firstName": "Synthetic",
+            "lastName": f"User{userId}",
+            "age": rng.randint(16, 90),
+            "email": f"user{userId}@example.com",
+            "pw": passwordHash,
+            "watchlist": list(
+                dict.fromkeys(movies.pick() for _ in range(rng.randint(0, 5)))
+            ),
+        }
+
+
+def _reviewRows(
+    profile: DataProfile,
+    count: int,
+    users: ActivityPicker,
+    movies: ActivityPicker,
+    rng: random.Random,
+) -> Iterator[dict]:
+    titles = WordSampler(
+        profile.titleVocabulary,
+        profile.titleWeights,
+        rng,
+        WORD_POOL_SIZE // 16,
+    )
+    bodies = WordSampler(profile.bodyVocabulary, profile.bodyWeights, rng)
+    for reviewId in range(1, count + 1):
+        usefulVotes, totalVotes = rng.choice(profile.votes)
+        yield {
+            "id": reviewId,
+            "movieId": movies.pick(),
+            "userId": users.pick(),
+            "reviewTitle": titles.text(
+                rng.choice(profile.titleLengths)
+            ).capitalize(),
+            "reviewBody": bodies.text(
+                rng.choice(profile.bodyLengths)
+            ).capitalize(),
+            "rating": rng.choice(profile.ratings),
+            "datePosted": rng.choice(profile.dates),
+            "flagged": False,
+            "usefulVotes": usefulVotes,
+            "totalVotes": totalVotes,
+        }
+
+
+def _likeRows(
+    profile: DataProfile,
+    reviewCount: int,
+    userCount: int,
+    users: ActivityPicker,
+    likeScale: float,
+    rng: random.Random,
+) -> Iterator[dict]:
+    for reviewId in range(1, reviewCount + 1):
+        likes = min(
+            userCount,
+            int(rng.choice(profile.votes)[0] * likeScale + rng.random()),
+        )
+        for userId in sorted({users.pick() for _ in range(likes)}):
+            yield {"userId": userId, "reviewId": reviewId}
+
+
+def _favoriteRows(
+    profile: DataProfile,
+    userCount: int,
+    movieCount: int,
+    movies: ActivityPicker,
+    rng: random.Random,
+) -> Iterator[dict]:
+    levels = [level for level, _ in profile.userActivity]
+    weights = [users for _, users in profile.userActivity]
+    for userId in range(1, userCount + 1):
+        favorites = min(
+            movieCount, rng.choices(levels, weights)[0] - (rng.random() < 0.5)
+        )
+        for movieId in sorted({movies.pick() for _ in range(favorites)}):
+            yield {"userId": userId, "movieId": movieId}
+
+
+def generateDataset(
+    outDir: Path,
+    reviews: int,
+    users: int,
+    movies: int | None = None,
+    likeScale: float = 0.25,
+    snapshot: bool = False,
+    seed: int = 440,
+    profile: DataProfile | None = None,
+) -> Dict[str, int]:
+    """
+    Write a synthetic dataset into outDir in the repo's file format.
+
+    Args:
+        outDir (Path): Directory for the data files (created if missing).
+        reviews (int): Number of reviews.
+        users (int): Number of users.
+        movies (int | None): Number of movies; one per 1000 reviews (at least
+            10) by default.
+        likeScale (float): Likes per review as a fraction of the sampled
+            usefulness votes.
+        snapshot (bool): Also write the columnar reviews.bin snapshot.
+        seed (int): Seed for a reproducible dataset.
+        profile (DataProfile | None): Distributions to sample; read from
+            app/data if omitted.
+
+    Returns:
+        Dict[str, int]: How many records of each kind were written.
+    """
+    profile = profile or DataProfile()
+    movies = movies or max(10, reviews // 1000)
+    outDir = Path(outDir)
+    rng = random.Random(seed)
+
+    # movie popularity follows the spread of the CSV
+    # review counts per movie; those are all well-known
+    # films, so the spread is floored to keep a long tail
+    logCounts = [math.log(count) for count in profile.reviewsPerMovie if count]
+    mean = sum(logCounts) / len(logCounts)
+    sigma = max(
+        1.0,
+        (sum((value - mean) ** 2 for value in logCounts) / len(logCounts))
+        ** 0.5,
+    )
+    moviePopularity = sorted(
+        Counter(
+            max(1, round(rng.lognormvariate(0, sigma) * 4))
+            for _ in range(min(movies, 10_000))
+        ).items()
+    )
+
+    def pickers(
+        streamRng: random.Random,
+    ) -> Tuple[ActivityPicker, ActivityPicker]:
+        # users are as skewed as the CSV reviewers
+        return ActivityPicker(
+            users, profile.userActivity, streamRng
+        ), ActivityPicker(movies, moviePopularity, streamRng)
+
+    def reviewRows() -> Iterator[dict]:
+        # a fresh generator per call, so the snapshot
+        # gets the same rows as reviews.json
+        reviewRng = random.Random(seed + 1)
+        return _reviewRows(profile, reviews, *pickers(reviewRng), reviewRng)
+
+    userPicker, moviePicker = pickers(rng)
+    counts = {
+        "movies": _writeArray(
+            outDir / "movies.json", _movieRows(profile, movies, rng)
+        ),
+        "users": _writeArray(
+            outDir / "users.json", _userRows(users, moviePicker, rng)
+        ),
+        "reviews": _writeArray(outDir / REVIEW_DATA_PATH.name, reviewRows()),
+        "likes": _writeArray(
+            outDir / "likeReviews.json",
+            _likeRows(profile, reviews, users, userPicker, likeScale, rng),
+        ),
+        "favorites": _writeArray(
+            outDir / "favorites.json",
+            _favoriteRows(profile, users, movies, moviePicker, rng),
+        ),
+    }
+    if snapshot:
+        writeReviewSnapshot(
+            (outDir / REVIEW_DATA_PATH.name).with_suffix(".bin"), reviewRows()
+        )
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reviews", type=int, default=100_000)
+    parser.add_argument(
+        "--users", type=int, default=None, help="default: one per 5 reviews"
+    )
+    parser.add_argument(
+        "--movies",
+        type=int,
+        default=None,
+        help="default: one per 1000 reviews",
+    )
+    parser.add_argument("--like-scale", type=float, default=0.25)
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="also write the columnar reviews.bin",
+    )
+    parser.add_argument("--seed", type=int, default=440)
+    parser.add_argument(
+        "--out", type=Path, required=True, help="output directory"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generateDataset(
+        args.out,
+        reviews=args.reviews,
+        users=args.users or max(1, args.reviews // 5),
+        movies=args.movies,
+        likeScale=args.like_scale,
+        snapshot=args.snapshot,
+        seed=args.seed,
+    )
+    for name, count in counts.items():
+        print(f"{name:<12}{count:>14,}")
+    print(f"written to {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()